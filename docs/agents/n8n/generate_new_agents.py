@@ -1,35 +1,183 @@
 #!/usr/bin/env python3
 """
-Generate n8n workflow JSON files for MS Teams, Outlook Calendar, and Outlook Mail agents.
-Also generates an updated main agent JSON with the 3 new tool nodes.
+Generate n8n sub-agent workflow JSON files for every user integration in the tool catalog,
+and an updated main agent JSON that routes to all of them.
+
+The catalog is the XML written by the ExportToolsCommand:
+
+    php bin/console app:tools:export --filter=user -o /tmp/tools.xml
+    python3 docs/agents/n8n/generate_new_agents.py --catalog /tmp/tools.xml
+
+System prompts are rendered from templates/skills/prompts/{type}_full.xml.twig (or {type}.xml.twig).
+Node ids are derived from the agent type, so regenerating keeps them stable, and a file is only
+rewritten when its content hash changed. Every run reports the size of each system prompt.
 """
 
+import argparse
+import hashlib
 import json
-import uuid
+import math
 import os
+import re
+import sys
+import uuid
+import xml.etree.ElementTree as ET
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATE_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), '..', '..', 'templates', 'skills', 'prompts')
+DEFAULT_API_BASE_URL = 'https://subscribe-workflows.vcec.cloud'
+
+# Namespace for node ids derived from content (uuid5), never change it or all node ids change
+NODE_ID_NAMESPACE = uuid.UUID('6f1c2a7e-3b5d-4e8f-9a0b-1c2d3e4f5a6b')
+
+# Sections the generator adds to every sub-agent prompt, unless the template already has them
+GENERATED_SECTIONS = ('context', 'tool-discovery')
+
+MAX_CAPABILITIES = 8
+
+
+def node_id(*parts):
+    """Stable node id for a node role within a workflow."""
+    return str(uuid.uuid5(NODE_ID_NAMESPACE, ':'.join(parts)))
+
+
+def load_catalog(path):
+    """Read the integrations from an ExportToolsCommand XML export ('-' reads stdin)."""
+    tree = ET.parse(sys.stdin if path == '-' else path)
+
+    integrations = []
+    for element in tree.getroot().findall('integration'):
+        tools = []
+        for tool in element.findall('tool'):
+            tools.append({
+                'name': tool.get('name'),
+                'description': (tool.findtext('description') or '').strip(),
+            })
+
+        integrations.append({
+            'type': element.get('type'),
+            'name': element.get('name'),
+            'category': element.get('category'),
+            'tools': tools,
+        })
+
+    return integrations
+
+
+def find_template(integration_type):
+    """Path of the prompt template of an integration type, None if it has none."""
+    for filename in (f'{integration_type}_full.xml.twig', f'{integration_type}.xml.twig'):
+        filepath = os.path.join(TEMPLATE_DIR, filename)
+        if os.path.isfile(filepath):
+            return filepath
+    return None
+
+
+# =========================================================================
+# Twig subset
+# =========================================================================
+# The prompt templates only use variables, if/else blocks, verbatim blocks and
+# escaped braces. Anything else fails loudly instead of producing a broken prompt.
+
+TWIG_VERBATIM = re.compile(r"\{%-?\s*verbatim\s*-?%\}(.*?)\{%-?\s*endverbatim\s*-?%\}", re.S)
+TWIG_TAG = re.compile(r"\{%-?\s*(.*?)\s*-?%\}", re.S)
+TWIG_EXPRESSION = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+OPEN_BRACES, CLOSE_BRACES = '\x00', '\x01'
+
+
+def render_twig(source, variables):
+    """Render a prompt template for n8n with the given variables."""
+    parts = TWIG_VERBATIM.split(source)
+
+    # Odd parts are verbatim block contents
+    return ''.join(part if i % 2 else render_block(part, variables) for i, part in enumerate(parts))
+
+
+def render_block(source, variables):
+    output = []
+    stack = []
+    active = True
+    position = 0
 
-def read_twig_template(filename):
-    """Read a Twig template and convert it for n8n usage."""
-    filepath = os.path.join(TEMPLATE_DIR, filename)
-    with open(filepath, 'r') as f:
-        content = f.read()
+    for match in TWIG_TAG.finditer(source):
+        if active:
+            output.append(render_expressions(source[position:match.start()], variables))
+        position = match.end()
+        tag = match.group(1)
 
-    # Replace Twig variables with n8n expressions or static values
-    # {{ 'now'|date('Y-m-d') }} -> 2026-02-10
-    content = content.replace("{{ 'now'|date('Y-m-d') }}", "2026-02-10")
-    # {{ tool_count }} -> (dynamic)
-    content = content.replace("{{ tool_count }}", "(dynamic)")
-    # {{ integration_id }} -> {integration_id} (single braces to avoid n8n evaluation)
-    content = content.replace("{{ integration_id }}", "{integration_id}")
+        if tag.startswith('if '):
+            condition = evaluate_condition(tag[3:], variables)
+            stack.append((active, condition))
+            active = active and condition
+        elif tag == 'else':
+            parent, condition = stack[-1]
+            active = parent and not condition
+        elif tag == 'endif':
+            active, _ = stack.pop()
+        elif tag.startswith('set ') and not active:
+            continue
+        else:
+            raise ValueError(f'Unsupported Twig tag: {{% {tag} %}}')
 
-    return content
+    if stack:
+        raise ValueError('Unclosed {% if %} block')
+
+    output.append(render_expressions(source[position:], variables))
+    return ''.join(output)
+
+
+def evaluate_condition(expression, variables):
+    match = re.fullmatch(r'(\w+) is defined and \1', expression)
+    if match:
+        return bool(variables.get(match.group(1)))
+
+    match = re.fullmatch(r'(\w+) is not defined or not \1', expression)
+    if match:
+        return not variables.get(match.group(1))
+
+    raise ValueError(f'Unsupported Twig condition: {expression}')
+
+
+def render_expressions(text, variables):
+    text = text.replace("{{ '{{' }}", OPEN_BRACES).replace("{{ '}}' }}", CLOSE_BRACES)
+
+    def replace(match):
+        expression = match.group(1)
+        # Evaluated by n8n, so the prompt doesn't change with the day it was generated
+        if expression == "'now'|date('Y-m-d')":
+            return "{{ $now.format('yyyy-MM-dd') }}"
+        if expression in variables:
+            value = variables[expression]
+            return '' if value is None else str(value)
+        # Literal placeholders in examples, e.g. {{page-1-name}}
+        return match.group(0)
+
+    text = TWIG_EXPRESSION.sub(replace, text)
+    return text.replace(OPEN_BRACES, '{{').replace(CLOSE_BRACES, '}}')
+
+
+# =========================================================================
+# Sub-agent prompts
+# =========================================================================
+
+def section_pattern(tag):
+    return re.compile(rf'\n?[ \t]*<{tag}>.*?</{tag}>[ \t]*\n?', re.S)
+
+
+def drop_duplicate_sections(xml_content, tags=GENERATED_SECTIONS):
+    """Keep only the first occurrence of each section."""
+    for tag in tags:
+        matches = list(section_pattern(tag).finditer(xml_content))
+        for match in reversed(matches[1:]):
+            xml_content = xml_content[:match.start()] + '\n' + xml_content[match.end():]
+    return xml_content
 
 
 def add_context_section(xml_content, insert_after_tag="</stateless-operation>"):
     """Insert <context> section with n8n expressions after the specified tag."""
+    if '<context>' in xml_content:
+        return xml_content
+
     context_section = """
   <context>
     <user-info>
@@ -41,54 +189,69 @@ def add_context_section(xml_content, insert_after_tag="</stateless-operation>"):
   </context>
 """
     if insert_after_tag in xml_content:
-        xml_content = xml_content.replace(
-            insert_after_tag,
-            insert_after_tag + context_section
-        )
-    else:
-        # Fallback: insert before </system-prompt>
-        xml_content = xml_content.replace(
-            "</system-prompt>",
-            context_section + "\n</system-prompt>"
-        )
-    return xml_content
+        return xml_content.replace(insert_after_tag, insert_after_tag + context_section, 1)
+
+    # Fallback: insert before </system-prompt>
+    return xml_content.replace("</system-prompt>", context_section + "\n</system-prompt>", 1)
 
 
-def add_tool_discovery_section(xml_content, tool_type, insert_after_tag="</context>"):
-    """Insert <tool-discovery> section with n8n URLs."""
+def add_tool_discovery_section(xml_content, tool_type, api_base_url, insert_after_tag="</context>"):
+    """Insert <tool-discovery> section with n8n URLs, unless the prompt explains tool usage itself."""
+    if '<tool-discovery>' in xml_content or '<n8n-tool-usage>' in xml_content:
+        return xml_content
+
     discovery_section = f"""
   <tool-discovery>
     <endpoint>
-      <url>https://subscribe-workflows.vcec.cloud/api/integrations/{{{{ $('When Executed by Another Workflow').item.json.tenantID }}}}/?workflow_user_id={{{{ $('When Executed by Another Workflow').item.json.userID }}}}&amp;tool_type={tool_type}</url>
+      <url>{api_base_url}/api/integrations/{{{{ $('When Executed by Another Workflow').item.json.tenantID }}}}/?workflow_user_id={{{{ $('When Executed by Another Workflow').item.json.userID }}}}&amp;tool_type={tool_type}</url>
       <method>GET</method>
       <purpose>Fetch available tools for this user</purpose>
     </endpoint>
     <execution>
-      <url>https://subscribe-workflows.vcec.cloud/api/integrations/{{{{ $('When Executed by Another Workflow').item.json.tenantID }}}}/execute?workflow_user_id={{{{ $('When Executed by Another Workflow').item.json.userID }}}}</url>
+      <url>{api_base_url}/api/integrations/{{{{ $('When Executed by Another Workflow').item.json.tenantID }}}}/execute?workflow_user_id={{{{ $('When Executed by Another Workflow').item.json.userID }}}}</url>
       <method>POST</method>
       <purpose>Execute a specific tool</purpose>
     </execution>
   </tool-discovery>
 """
-    if insert_after_tag in xml_content:
-        xml_content = xml_content.replace(
-            insert_after_tag,
-            insert_after_tag + discovery_section
-        )
-    return xml_content
+    return xml_content.replace(insert_after_tag, insert_after_tag + discovery_section, 1)
+
+
+def build_system_prompt(integration, template_path, api_base_url):
+    with open(template_path, 'r') as f:
+        source = f.read()
+
+    prompt = render_twig(source, {
+        'api_base_url': api_base_url,
+        'tool_count': len(integration['tools']),
+        # Single braces to avoid n8n evaluation
+        'integration_id': '{integration_id}',
+    })
+    prompt = add_context_section(prompt)
+    prompt = add_tool_discovery_section(prompt, integration['type'], api_base_url)
+
+    return drop_duplicate_sections(prompt)
+
+
+def count_tokens(text):
+    """Token count of a prompt, estimated from its length if tiktoken is not installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        return math.ceil(len(text) / 4), True
 
+    return len(tiktoken.get_encoding('o200k_base').encode(text)), False
 
-def create_sub_agent_json(system_prompt, tool_type, service_name):
+
+# =========================================================================
+# Workflows
+# =========================================================================
+
+def create_sub_agent_json(system_prompt, tool_type, service_name, api_base_url):
     """Create a sub-agent workflow JSON following the standard template."""
 
-    # Generate unique UUIDs for all nodes
-    ids = {
-        'trigger': str(uuid.uuid4()),
-        'agent': str(uuid.uuid4()),
-        'llm': str(uuid.uuid4()),
-        'tools': str(uuid.uuid4()),
-        'execute': str(uuid.uuid4()),
-    }
+    workflow_key = f'{tool_type}_agent'
+    ids = {role: node_id(workflow_key, role) for role in ('trigger', 'agent', 'llm', 'tools', 'execute')}
 
     workflow = {
         "nodes": [
@@ -147,7 +310,7 @@ def create_sub_agent_json(system_prompt, tool_type, service_name):
             {
                 "parameters": {
                     "toolDescription": f"Always call this tool FIRST to understand what {service_name} tools are available for this user. This returns a dynamic list of tools based on the user's {service_name} integration configuration. The response will show you which tools you can execute via CURRENT_USER_EXECUTE_TOOL. If the tools array is empty, the user hasn't configured a {service_name} integration yet.",
-                    "url": f"=https://subscribe-workflows.vcec.cloud/api/integrations/{{{{ $('When Executed by Another Workflow').item.json.tenantID }}}}/?workflow_user_id={{{{ $('When Executed by Another Workflow').item.json.userID }}}}&tool_type={tool_type}",
+                    "url": f"={api_base_url}/api/integrations/{{{{ $('When Executed by Another Workflow').item.json.tenantID }}}}/?workflow_user_id={{{{ $('When Executed by Another Workflow').item.json.userID }}}}&tool_type={tool_type}",
                     "authentication": "genericCredentialType",
                     "genericAuthType": "httpBasicAuth",
                     "options": {}
@@ -168,7 +331,7 @@ def create_sub_agent_json(system_prompt, tool_type, service_name):
                 "parameters": {
                     "toolDescription": f"Execute a {service_name} tool after discovering available tools with CURRENT_USER_TOOLS. You must specify the tool_id from the discovery response and provide all required parameters as strings. Analyze the tool's parameter schema from CURRENT_USER_TOOLS to know which parameters to include.",
                     "method": "POST",
-                    "url": "=https://subscribe-workflows.vcec.cloud/api/integrations/{{ $('When Executed by Another Workflow').item.json.tenantID }}/execute?workflow_user_id={{ $('When Executed by Another Workflow').item.json.userID }}",
+                    "url": f"={api_base_url}/api/integrations/{{{{ $('When Executed by Another Workflow').item.json.tenantID }}}}/execute?workflow_user_id={{{{ $('When Executed by Another Workflow').item.json.userID }}}}",
                     "authentication": "genericCredentialType",
                     "genericAuthType": "httpBasicAuth",
                     "sendBody": True,
@@ -233,18 +396,38 @@ def create_sub_agent_json(system_prompt, tool_type, service_name):
     return workflow
 
 
-def create_tool_workflow_node(name, description, workflow_id_placeholder, position, task_description_hint):
+def describe_capabilities(integration):
+    """Short capability lines from the first sentence of each tool description."""
+    capabilities = []
+    for tool in integration['tools']:
+        sentence = re.split(r'(?<=[.!?])\s', tool['description'], maxsplit=1)[0].rstrip('.')
+        if sentence and sentence not in capabilities:
+            capabilities.append(sentence)
+    return capabilities[:MAX_CAPABILITIES]
+
+
+def describe_keywords(integration):
+    words = [integration['name'].lower(), integration['type'].replace('_', ' ')]
+    words += [part for part in re.split(r'[\s_]+', integration['name'].lower()) if len(part) > 2]
+    return ', '.join(dict.fromkeys(words))
+
+
+def create_tool_workflow_node(integration, agent_types, position):
     """Create a toolWorkflow node for the main agent."""
 
-    node_id = str(uuid.uuid4())
+    name = agent_name(integration)
+    service_name = integration['name']
+    workflow_id_placeholder = f"PLACEHOLDER_{integration['type'].upper()}_WORKFLOW_ID"
+    description = (
+        f"Use this tool when the user wants to interact with {service_name}. This includes:\n"
+        + '\n'.join(f'- {capability}' for capability in describe_capabilities(integration))
+        + f"\n\nKeywords: {describe_keywords(integration)}"
+    )
+    task_description_hint = f"Based on the user request and conversation history, what specific {service_name}-related task should this agent perform? Be precise and include all necessary context. If this is a multi-agent workflow, only describe the {service_name} portion."
 
     standard_schema = [
-        {"id": "userID", "displayName": "userID", "required": False, "defaultMatch": False, "display": True, "canBeUsedToMatch": True, "type": "string", "removed": False},
-        {"id": "tenantID", "displayName": "tenantID", "required": False, "defaultMatch": False, "display": True, "canBeUsedToMatch": True, "type": "string", "removed": False},
-        {"id": "locale", "displayName": "locale", "required": False, "defaultMatch": False, "display": True, "canBeUsedToMatch": True, "type": "string", "removed": False},
-        {"id": "userPrompt", "displayName": "userPrompt", "required": False, "defaultMatch": False, "display": True, "canBeUsedToMatch": True, "type": "string", "removed": False},
-        {"id": "taskDescription", "displayName": "taskDescription", "required": False, "defaultMatch": False, "display": True, "canBeUsedToMatch": True, "type": "string", "removed": False},
-        {"id": "previousAgentData", "displayName": "previousAgentData", "required": False, "defaultMatch": False, "display": True, "canBeUsedToMatch": True, "type": "string", "removed": False},
+        {"id": field, "displayName": field, "required": False, "defaultMatch": False, "display": True, "canBeUsedToMatch": True, "type": "string", "removed": False}
+        for field in ('userID', 'tenantID', 'locale', 'userPrompt', 'taskDescription', 'previousAgentData')
     ]
 
     return {
@@ -265,7 +448,7 @@ def create_tool_workflow_node(name, description, workflow_id_placeholder, positi
                     "locale": "={{ $('SET USER').item.json.locale }}",
                     "userPrompt": "={{ $('SET USER').item.json.chatInput }}",
                     "taskDescription": "={{ $fromAI('taskDescription', '" + task_description_hint + "', 'string') }}",
-                    "previousAgentData": "={{ $fromAI(\"previousAgentData\", \"If this is a multi-agent workflow and a previous agent (JIRA, Confluence, SharePoint, GitLab, Trello, MS Teams, Outlook Calendar, Outlook Mail, System Tools) returned data in its response, construct a previousAgentData object: {agentType: \\\"jira|confluence|sharepoint|gitlab|trello|msteams|outlook_calendar|outlook_mail|system\\\", data: {the data object from previous agent response}, context: \\\"brief description of the data\\\"}. IMPORTANT: Extract data from the previous tool response.data field if available. Return null if no previous agent was called or response.data does not exist.\", \"string\") }}"
+                    "previousAgentData": "={{ $fromAI(\"previousAgentData\", \"If this is a multi-agent workflow and a previous agent returned data in its response, construct a previousAgentData object: {agentType: \\\"" + '|'.join(agent_types) + "\\\", data: {the data object from previous agent response}, context: \\\"brief description of the data\\\"}. IMPORTANT: Extract data from the previous tool response.data field if available. Return null if no previous agent was called or response.data does not exist.\", \"string\") }}"
                 },
                 "matchingColumns": [],
                 "schema": standard_schema,
@@ -276,250 +459,202 @@ def create_tool_workflow_node(name, description, workflow_id_placeholder, positi
         "type": "@n8n/n8n-nodes-langchain.toolWorkflow",
         "typeVersion": 2.2,
         "position": position,
-        "id": node_id,
+        "id": node_id('main_agent', integration['type']),
         "name": name
     }
 
 
-def main():
-    output_dir = SCRIPT_DIR
-
-    # =========================================================================
-    # 1. MS Teams Sub-Agent
-    # =========================================================================
-    print("Generating MS Teams agent...")
-    msteams_prompt = read_twig_template('msteams_full.xml.twig')
-    msteams_prompt = add_context_section(msteams_prompt)
-    msteams_prompt = add_tool_discovery_section(msteams_prompt, 'msteams')
-
-    msteams_workflow = create_sub_agent_json(
-        system_prompt=msteams_prompt,
-        tool_type='msteams',
-        service_name='MS Teams',
-    )
+def agent_name(integration):
+    return f"{integration['name']} Agent"
 
-    with open(os.path.join(output_dir, 'msteams_agent.json'), 'w') as f:
-        json.dump(msteams_workflow, f, indent=2, ensure_ascii=False)
-    print(f"  -> {os.path.join(output_dir, 'msteams_agent.json')}")
-
-    # =========================================================================
-    # 2. Outlook Calendar Sub-Agent
-    # =========================================================================
-    print("Generating Outlook Calendar agent...")
-    outlook_cal_prompt = read_twig_template('outlook_calendar_full.xml.twig')
-    outlook_cal_prompt = add_context_section(outlook_cal_prompt)
-    outlook_cal_prompt = add_tool_discovery_section(outlook_cal_prompt, 'outlook_calendar')
-
-    outlook_cal_workflow = create_sub_agent_json(
-        system_prompt=outlook_cal_prompt,
-        tool_type='outlook_calendar',
-        service_name='Outlook Calendar',
-    )
 
-    with open(os.path.join(output_dir, 'outlook_calendar_agent.json'), 'w') as f:
-        json.dump(outlook_cal_workflow, f, indent=2, ensure_ascii=False)
-    print(f"  -> {os.path.join(output_dir, 'outlook_calendar_agent.json')}")
-
-    # =========================================================================
-    # 3. Outlook Mail Sub-Agent
-    # =========================================================================
-    print("Generating Outlook Mail agent...")
-    outlook_mail_prompt = read_twig_template('outlook_mail_full.xml.twig')
-    outlook_mail_prompt = add_context_section(outlook_mail_prompt)
-    outlook_mail_prompt = add_tool_discovery_section(outlook_mail_prompt, 'outlook_mail')
-
-    outlook_mail_workflow = create_sub_agent_json(
-        system_prompt=outlook_mail_prompt,
-        tool_type='outlook_mail',
-        service_name='Outlook Mail',
-    )
+def create_agent_xml(integration):
+    capabilities = '\n'.join(f'        - {capability}' for capability in describe_capabilities(integration))
+    return f"""
+    <agent>
+      <name>{agent_name(integration)}</name>
+      <workflow>{integration['type']}_agent_workflow</workflow>
+      <capabilities>
+{capabilities}
+      </capabilities>
+      <keywords>{describe_keywords(integration)}</keywords>
+      <integration-type>{integration['type']}</integration-type>
+    </agent>"""
 
-    with open(os.path.join(output_dir, 'outlook_mail_agent.json'), 'w') as f:
-        json.dump(outlook_mail_workflow, f, indent=2, ensure_ascii=False)
-    print(f"  -> {os.path.join(output_dir, 'outlook_mail_agent.json')}")
-
-    # =========================================================================
-    # 4. Updated Main Agent
-    # =========================================================================
-    print("Generating updated main agent...")
-
-    with open(os.path.join(output_dir, 'main_agent.json'), 'r') as f:
-        main_agent = json.load(f)
-
-    # Create 3 new tool workflow nodes
-    msteams_node = create_tool_workflow_node(
-        name="MS Teams Agent",
-        description="Use this tool when the user wants to interact with Microsoft Teams. This includes:\n- Listing teams and channels\n- Reading channel messages\n- Sending messages to channels\n- Creating new channels\n- Listing and reading 1:1 and group chats\n- Sending chat messages\n\nKeywords: teams, microsoft teams, ms teams, channel, chat, message, send message, team, group chat, direct message",
-        workflow_id_placeholder="PLACEHOLDER_MSTEAMS_WORKFLOW_ID",
-        position=[720, 992],
-        task_description_hint="Based on the user request and conversation history, what specific MS Teams-related task should this agent perform? Be precise and include all necessary context. If this is a multi-agent workflow, only describe the MS Teams portion."
-    )
 
-    outlook_cal_node = create_tool_workflow_node(
-        name="Outlook Calendar Agent",
-        description="Use this tool when the user wants to interact with Outlook Calendar. This includes:\n- Listing calendar events within a date range\n- Getting event details\n- Searching for events by subject\n- Checking free/busy availability for people\n- Listing available calendars\n\nKeywords: outlook, calendar, event, meeting, appointment, schedule, termin, availability, free busy, kalender, besprechung",
-        workflow_id_placeholder="PLACEHOLDER_OUTLOOK_CALENDAR_WORKFLOW_ID",
-        position=[896, 992],
-        task_description_hint="Based on the user request and conversation history, what specific Outlook Calendar-related task should this agent perform? Be precise and include all necessary context. If this is a multi-agent workflow, only describe the Outlook Calendar portion."
+def update_main_prompt(prompt, integrations):
+    """Add agents missing from <specialized-agents> and the routing step; existing entries are kept as they are."""
+    section = re.search(r'<specialized-agents>(.*?)\n  </specialized-agents>', prompt, re.S)
+    if not section:
+        raise ValueError('Main agent prompt has no <specialized-agents> section')
+
+    known_types = set(re.findall(r'<integration-type>([^<]+)</integration-type>', section.group(1)))
+    missing = [integration for integration in integrations if integration['type'] not in known_types]
+    if missing:
+        insert_at = section.end(1)
+        prompt = prompt[:insert_at] + '\n' + ''.join(create_agent_xml(i) for i in missing) + prompt[insert_at:]
+
+    # Keep the agent count and list in the description in sync with the section
+    section = re.search(r'<specialized-agents>(.*?)</specialized-agents>', prompt, re.S)
+    names = re.findall(r'<agent>\s*<name>([^<]+)</name>', section.group(1))
+    listing = ', '.join(names[:-1]) + ', and ' + names[-1] if len(names) > 1 else ''.join(names)
+    prompt = re.sub(
+        r'(You have access to )\d+( specialized agents:\s*\n\s*)[^\n]*',
+        lambda m: f'{m.group(1)}{len(names)}{m.group(2)}{listing}.',
+        prompt,
+        count=1
     )
 
-    outlook_mail_node = create_tool_workflow_node(
-        name="Outlook Mail Agent",
-        description="Use this tool when the user wants to interact with Outlook Mail. This includes:\n- Searching emails using keywords\n- Reading full email content\n- Listing mail folders\n- Listing messages in folders with pagination\n\nKeywords: outlook, mail, email, e-mail, inbox, nachricht, postfach, search email, read email, folder, posteingang",
-        workflow_id_placeholder="PLACEHOLDER_OUTLOOK_MAIL_WORKFLOW_ID",
-        position=[1072, 992],
-        task_description_hint="Based on the user request and conversation history, what specific Outlook Mail-related task should this agent perform? Be precise and include all necessary context. If this is a multi-agent workflow, only describe the Outlook Mail portion."
-    )
+    # Keyword routing lines, inserted before the general questions fallback
+    for integration in missing:
+        name = agent_name(integration)
+        if f'→ {name}' not in prompt:
+            prompt = re.sub(
+                r'(\n([ \t]*)- General questions → )',
+                lambda m: f"\n{m.group(2)}- {integration['name']} keywords → {name}{m.group(1)}",
+                prompt,
+                count=1
+            )
 
-    # Add new nodes to the main agent
-    main_agent['nodes'].append(msteams_node)
-    main_agent['nodes'].append(outlook_cal_node)
-    main_agent['nodes'].append(outlook_mail_node)
+    return prompt
 
-    # Add new connections
-    main_agent['connections']['MS Teams Agent'] = {
-        "ai_tool": [[{"node": "AI Agent", "type": "ai_tool", "index": 0}]]
-    }
-    main_agent['connections']['Outlook Calendar Agent'] = {
-        "ai_tool": [[{"node": "AI Agent", "type": "ai_tool", "index": 0}]]
-    }
-    main_agent['connections']['Outlook Mail Agent'] = {
-        "ai_tool": [[{"node": "AI Agent", "type": "ai_tool", "index": 0}]]
-    }
 
-    # Update the main agent system prompt to include new agents in the specialized-agents section
-    # Find the AI Agent node and update its system message
-    for node in main_agent['nodes']:
-        if node['name'] == 'AI Agent':
-            current_prompt = node['parameters']['options']['systemMessage']
+def update_main_agent(main_agent, integrations):
+    """Add a toolWorkflow node and connection for every integration the main agent can't route to yet."""
+    tool_nodes = [node for node in main_agent['nodes'] if node['type'] == '@n8n/n8n-nodes-langchain.toolWorkflow']
+    existing_names = {node['name'].lower() for node in tool_nodes}
+    agent_types = [integration['type'] for integration in integrations] + ['system']
 
-            # Add new agents to the specialized-agents section (before closing tag)
-            new_agents_xml = """
-    <agent>
-      <name>MS Teams Agent</name>
-      <workflow>msteams_agent_workflow</workflow>
-      <capabilities>
-        - List teams and channels
-        - Read channel messages
-        - Send messages to channels
-        - Create new channels
-        - List and read 1:1 and group chats
-        - Send chat messages
-      </capabilities>
-      <keywords>teams, microsoft teams, ms teams, channel, chat, message, send message, team, group chat, direct message</keywords>
-      <integration-type>msteams</integration-type>
-      <special-note>MS Teams agent can send messages and create channels - these are irreversible write operations</special-note>
-    </agent>
+    added = 0
+    for integration in integrations:
+        name = agent_name(integration)
+        if name.lower() in existing_names:
+            continue
 
-    <agent>
-      <name>Outlook Calendar Agent</name>
-      <workflow>outlook_calendar_agent_workflow</workflow>
-      <capabilities>
-        - List calendar events within a date range
-        - Get event details
-        - Search for events by subject
-        - Check free/busy availability for people
-        - List available calendars
-      </capabilities>
-      <keywords>outlook, calendar, event, meeting, appointment, schedule, termin, availability, free busy, kalender, besprechung</keywords>
-      <integration-type>outlook_calendar</integration-type>
-      <special-note>Read-only calendar access - cannot create, modify, or delete events</special-note>
-    </agent>
+        # Grid of three columns below the existing agent nodes
+        index = len(tool_nodes) + added
+        position = [720 + (index % 3) * 176, 672 + (index // 3) * 160]
 
-    <agent>
-      <name>Outlook Mail Agent</name>
-      <workflow>outlook_mail_agent_workflow</workflow>
-      <capabilities>
-        - Search emails using keywords
-        - Read full email content
-        - List mail folders
-        - List messages in folders with pagination
-      </capabilities>
-      <keywords>outlook, mail, email, e-mail, inbox, nachricht, postfach, search email, read email, folder, posteingang</keywords>
-      <integration-type>outlook_mail</integration-type>
-      <special-note>Read-only mail access - cannot send, delete, or modify emails</special-note>
-    </agent>"""
+        main_agent['nodes'].append(create_tool_workflow_node(integration, agent_types, position))
+        main_agent['connections'][name] = {
+            "ai_tool": [[{"node": "AI Agent", "type": "ai_tool", "index": 0}]]
+        }
+        added += 1
 
-            # Insert before </specialized-agents>
-            current_prompt = current_prompt.replace(
-                "  </specialized-agents>",
-                new_agents_xml + "\n  </specialized-agents>"
-            )
+    for node in main_agent['nodes']:
+        if node['name'] == 'AI Agent':
+            options = node['parameters']['options']
+            options['systemMessage'] = update_main_prompt(options['systemMessage'], integrations)
+            break
 
-            # Update the description to mention 10 agents instead of 7
-            current_prompt = current_prompt.replace(
-                "You have access to 7 specialized agents:",
-                "You have access to 10 specialized agents:"
-            )
-            current_prompt = current_prompt.replace(
-                "JIRA Agent, Confluence Agent, SharePoint Agent, GitLab Agent, Trello Agent, and System Tools Agent.",
-                "JIRA Agent, Confluence Agent, SharePoint Agent, GitLab Agent, Trello Agent, MS Teams Agent, Outlook Calendar Agent, Outlook Mail Agent, and System Tools Agent."
-            )
+    return main_agent
 
-            # Update routing examples with new agent types
-            new_routing_examples = """
-    <example>
-      <user-request>Send a message to the project channel in Teams</user-request>
-      <analysis>
-        - Intent: Send a Teams channel message
-        - Keywords: \"Teams\", \"channel\", \"message\"
-        - Agent needed: MS Teams Agent
-        - Single agent task (write operation)
-      </analysis>
-      <action>Delegate to MS Teams Agent, wait for completion, return confirmation</action>
-    </example>
-
-    <example>
-      <user-request>What meetings do I have tomorrow?</user-request>
-      <analysis>
-        - Intent: Query calendar events
-        - Keywords: \"meetings\", \"tomorrow\"
-        - Agent needed: Outlook Calendar Agent
-        - Single agent task
-      </analysis>
-      <action>Delegate to Outlook Calendar Agent, wait for completion, return events</action>
-    </example>
-
-    <example>
-      <user-request>Find emails from Sarah about the budget report</user-request>
-      <analysis>
-        - Intent: Search emails
-        - Keywords: \"emails\", \"find\"
-        - Agent needed: Outlook Mail Agent
-        - Single agent task
-      </analysis>
-      <action>Delegate to Outlook Mail Agent, wait for completion, return search results</action>
-    </example>"""
-
-            # Insert before </routing-examples>
-            current_prompt = current_prompt.replace(
-                "  </routing-examples>",
-                new_routing_examples + "\n  </routing-examples>"
-            )
 
-            # Add new agent keywords to routing step 2
-            current_prompt = current_prompt.replace(
-                "        - General questions → Handle directly without delegation",
-                "        - MS Teams keywords → MS Teams Agent\n        - Outlook Calendar keywords → Outlook Calendar Agent\n        - Outlook Mail keywords → Outlook Mail Agent\n        - General questions → Handle directly without delegation"
-            )
+def write_if_changed(path, content, check):
+    """Write content unless the file already has it; returns created, updated or unchanged."""
+    encoded = content.encode('utf-8')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(encoded).digest():
+                return 'unchanged'
+        status = 'updated'
+    else:
+        status = 'created'
 
-            node['parameters']['options']['systemMessage'] = current_prompt
-            break
+    if not check:
+        with open(path, 'wb') as f:
+            f.write(encoded)
+    return status
 
-    with open(os.path.join(output_dir, 'main_agent_updated.json'), 'w') as f:
-        json.dump(main_agent, f, indent=2, ensure_ascii=False)
-    print(f"  -> {os.path.join(output_dir, 'main_agent_updated.json')}")
 
-    print("\nDone! Generated 4 files:")
-    print("  1. msteams_agent.json - MS Teams sub-agent workflow")
-    print("  2. outlook_calendar_agent.json - Outlook Calendar sub-agent workflow")
-    print("  3. outlook_mail_agent.json - Outlook Mail sub-agent workflow")
-    print("  4. main_agent_updated.json - Updated main orchestrator with 3 new tool nodes")
-    print("\nNOTE: After importing sub-agents into n8n, replace these placeholders in main_agent_updated.json:")
-    print("  - PLACEHOLDER_MSTEAMS_WORKFLOW_ID")
-    print("  - PLACEHOLDER_OUTLOOK_CALENDAR_WORKFLOW_ID")
-    print("  - PLACEHOLDER_OUTLOOK_MAIL_WORKFLOW_ID")
+def dump_json(data):
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--catalog', required=True, help="Tool catalog from 'bin/console app:tools:export' ('-' for stdin)")
+    parser.add_argument('--only', action='append', default=[], metavar='TYPE', help='Only generate these integration types')
+    parser.add_argument('--output-dir', default=SCRIPT_DIR)
+    parser.add_argument('--api-base-url', default=DEFAULT_API_BASE_URL)
+    parser.add_argument('--report', metavar='PATH', help='Write the prompt size report as JSON')
+    parser.add_argument('--check', action='store_true', help='Write nothing, exit with 1 if any file would change')
+    args = parser.parse_args()
+
+    integrations = []
+    skipped = []
+    for integration in load_catalog(args.catalog):
+        if args.only and integration['type'] not in args.only:
+            continue
+
+        if integration['category'] != 'user':
+            skipped.append((integration['type'], 'system integration, covered by the System Tools Agent'))
+        elif not integration['tools']:
+            skipped.append((integration['type'], 'no static tools (discovered per instance)'))
+        elif not find_template(integration['type']):
+            skipped.append((integration['type'], 'no prompt template'))
+        else:
+            integrations.append(integration)
+
+    integrations.sort(key=lambda integration: integration['type'])
+
+    report = []
+    changed = 0
+    for integration in integrations:
+        template_path = find_template(integration['type'])
+        prompt = build_system_prompt(integration, template_path, args.api_base_url)
+        workflow = create_sub_agent_json(prompt, integration['type'], integration['name'], args.api_base_url)
+
+        filename = f"{integration['type']}_agent.json"
+        status = write_if_changed(os.path.join(args.output_dir, filename), dump_json(workflow), args.check)
+        changed += status != 'unchanged'
+
+        tokens, estimated = count_tokens(prompt)
+        report.append({
+            'type': integration['type'],
+            'file': filename,
+            'template': os.path.basename(template_path),
+            'tools': len(integration['tools']),
+            'prompt_chars': len(prompt),
+            'prompt_bytes': len(prompt.encode('utf-8')),
+            'prompt_tokens': tokens,
+            'tokens_estimated': estimated,
+            'status': status,
+        })
+
+    main_status = 'skipped'
+    main_path = os.path.join(args.output_dir, 'main_agent.json')
+    if integrations and os.path.exists(main_path):
+        with open(main_path, 'r') as f:
+            main_agent = update_main_agent(json.load(f), integrations)
+        main_status = write_if_changed(os.path.join(args.output_dir, 'main_agent_updated.json'), dump_json(main_agent), args.check)
+        changed += main_status != 'unchanged'
+
+    print(f"{'Agent':<20} {'Tools':>5} {'Chars':>8} {'Tokens':>8}  Status")
+    for entry in report:
+        tokens = ('~' if entry['tokens_estimated'] else '') + str(entry['prompt_tokens'])
+        print(f"{entry['type']:<20} {entry['tools']:>5} {entry['prompt_chars']:>8} {tokens:>8}  {entry['status']}")
+    print(f"{'main_agent_updated':<20} {'':>5} {'':>8} {'':>8}  {main_status}")
+
+    for integration_type, reason in skipped:
+        print(f"Skipped {integration_type}: {reason}")
+
+    if any(entry['tokens_estimated'] for entry in report):
+        print("~ Token counts estimated from length, install tiktoken for exact counts")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'agents': report, 'skipped': dict(skipped)}, f, indent=2)
+
+    if args.check and changed:
+        print(f"\n{changed} file(s) out of date")
+        return 1
+
+    print(f"\n{changed} file(s) {'would change' if args.check else 'written'}, {len(report) + 1 - changed} unchanged")
+    if main_status in ('created', 'updated') and not args.check:
+        print("NOTE: After importing new sub-agents into n8n, replace the PLACEHOLDER_*_WORKFLOW_ID values in main_agent_updated.json")
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
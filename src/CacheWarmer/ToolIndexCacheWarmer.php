@@ -0,0 +1,38 @@
+<?php
+
+namespace App\CacheWarmer;
+
+use App\Integration\IntegrationRegistry;
+use Symfony\Component\Filesystem\Filesystem;
+use Symfony\Component\HttpKernel\CacheWarmer\CacheWarmerInterface;
+
+/**
+ * Compiles the tool name → integration index used by the /execute endpoints.
+ *
+ * The index is written as a plain PHP array so it is served from OPcache
+ * instead of instantiating every integration's ToolDefinitions per request.
+ */
+class ToolIndexCacheWarmer implements CacheWarmerInterface
+{
+    public function __construct(
+        private readonly IntegrationRegistry $integrationRegistry,
+    ) {
+    }
+
+    public function isOptional(): bool
+    {
+        return false;
+    }
+
+    public function warmUp(string $cacheDir, ?string $buildDir = null): array
+    {
+        $index = $this->integrationRegistry->buildToolIndex();
+
+        (new Filesystem())->dumpFile(
+            $cacheDir . '/' . IntegrationRegistry::TOOL_INDEX_FILE,
+            "<?php\n\nreturn " . var_export($index, true) . ";\n"
+        );
+
+        return [];
+    }
+}
@@ -0,0 +1,67 @@
+<?php
+
+namespace App\Command;
+
+use App\Repository\AuditStatRollupRepository;
+use Symfony\Component\Console\Attribute\AsCommand;
+use Symfony\Component\Console\Command\Command;
+use Symfony\Component\Console\Input\InputInterface;
+use Symfony\Component\Console\Input\InputOption;
+use Symfony\Component\Console\Output\OutputInterface;
+use Symfony\Component\Console\Style\SymfonyStyle;
+
+#[AsCommand(
+    name: 'app:audit:rebuild-rollups',
+    description: 'Backfill the daily audit statistics rollups from existing audit log rows',
+)]
+class RebuildAuditRollupsCommand extends Command
+{
+    public function __construct(
+        private AuditStatRollupRepository $auditStatRollupRepository,
+    ) {
+        parent::__construct();
+    }
+
+    protected function configure(): void
+    {
+        $this->addOption('days', null, InputOption::VALUE_REQUIRED, 'Only rebuild the last N days (default: entire audit log)');
+    }
+
+    protected function execute(InputInterface $input, OutputInterface $output): int
+    {
+        $io = new SymfonyStyle($input, $output);
+        $io->title('Rebuild Audit Rollups');
+
+        $today = new \DateTimeImmutable('today');
+        $days = $input->getOption('days');
+
+        if ($days !== null) {
+            if (!ctype_digit((string) $days) || (int) $days < 1) {
+                $io->error('--days must be a positive integer.');
+                return Command::INVALID;
+            }
+            $from = $today->modify(sprintf('-%d days', (int) $days - 1));
+        } else {
+            $oldest = $this->auditStatRollupRepository->findOldestAuditDate();
+            if ($oldest === null) {
+                $io->info('Audit log is empty, nothing to rebuild.');
+                return Command::SUCCESS;
+            }
+            $from = $oldest->setTime(0, 0);
+        }
+
+        $totalDays = (int) $from->diff($today)->days + 1;
+        $rows = 0;
+
+        $io->progressStart($totalDays);
+        for ($day = $from; $day <= $today; $day = $day->modify('+1 day')) {
+            $rows += $this->auditStatRollupRepository->rebuildDay($day);
+            $io->progressAdvance();
+        }
+        $io->progressFinish();
+
+        $io->success(sprintf('Rebuilt %d day(s) of audit rollups (%d rows affected).', $totalDays, $rows));
+
+        return Command::SUCCESS;
+    }
+}
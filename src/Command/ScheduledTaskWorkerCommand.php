@@ -2,9 +2,12 @@
 
 namespace App\Command;
 
+use App\Entity\ScheduledTask;
+use App\Entity\ScheduledTaskExecution;
 use App\Message\ExecuteScheduledTaskMessage;
 use App\Repository\ScheduledTaskRepository;
 use App\Service\ScheduledTask\ScheduledTaskExecutor;
+use App\Service\ScheduledTask\ScheduledTaskWakeup;
 use Doctrine\ORM\EntityManagerInterface;
 use Psr\Log\LoggerInterface;
 use Symfony\Component\Console\Attribute\AsCommand;
@@ -21,6 +24,17 @@ use Symfony\Component\Messenger\MessageBusInterface;
 )]
 class ScheduledTaskWorkerCommand extends Command
 {
+    private const CLAIM_BATCH_SIZE = 20;
+
+    // Upper bound for a single wait, keeps shutdown responsive and the schedule fresh
+    private const MAX_WAIT_SECONDS = 5.0;
+
+    // Wait while an overdue task is locked by another worker, instead of polling it in a loop
+    private const LOCKED_TASK_WAIT_SECONDS = 1.0;
+
+    // A task whose claim fails is retried this much later, so it can't block the others
+    private const FAILED_CLAIM_RETRY = '+15 minutes';
+
     private bool $shouldStop = false;
 
     public function __construct(
@@ -29,6 +43,7 @@ class ScheduledTaskWorkerCommand extends Command
         private EntityManagerInterface $entityManager,
         private LoggerInterface $logger,
         private MessageBusInterface $messageBus,
+        private ScheduledTaskWakeup $wakeup,
     ) {
         parent::__construct();
     }
@@ -70,59 +85,120 @@ class ScheduledTaskWorkerCommand extends Command
                 // Clear entity manager to avoid stale data
                 $this->entityManager->clear();
 
-                $now = new \DateTime('now', new \DateTimeZone('UTC'));
-                $dueTasks = $this->taskRepository->findDueForExecution($now);
+                do {
+                    $claimed = $this->claimDueTasks();
 
-                if (count($dueTasks) > 0) {
-                    $io->info(sprintf('Found %d due task(s)', count($dueTasks)));
-                }
-
-                foreach ($dueTasks as $task) {
-                    if ($this->shouldStop) { // @phpstan-ignore if.alwaysFalse (modified by signal handler)
-                        break;
+                    if (count($claimed) > 0) {
+                        $io->info(sprintf('Claimed %d due task(s)', count($claimed)));
                     }
 
-                    $io->info(sprintf('Dispatching task "%s" (UUID: %s)', $task->getName(), $task->getUuid()));
-
-                    try {
-                        $execution = $this->executor->createPendingExecution($task, 'scheduled');
-
-                        // Update next execution time immediately so it won't be picked up again
-                        $task->setLastExecutionAt(new \DateTime('now', new \DateTimeZone('UTC')));
-                        $task->computeNextExecutionAt();
-
-                        $this->entityManager->flush();
-
-                        $this->messageBus->dispatch(new ExecuteScheduledTaskMessage(
-                            $task->getId(),
-                            $execution->getId(),
-                            'scheduled',
-                        ));
-
-                        $io->info(sprintf('Task "%s" dispatched (execution #%d)', $task->getName(), $execution->getId()));
-                    } catch (\Throwable $e) {
-                        $this->logger->error('Failed to dispatch scheduled task', [
-                            'task_uuid' => $task->getUuid(),
-                            'error' => $e->getMessage(),
-                        ]);
-                        $io->error(sprintf('Task "%s" failed: %s', $task->getName(), $e->getMessage()));
+                    foreach ($claimed as [$task, $execution]) {
+                        $this->dispatchExecution($io, $task, $execution);
                     }
-                }
+                } while (count($claimed) === self::CLAIM_BATCH_SIZE && !$this->shouldStop); // @phpstan-ignore booleanNot.alwaysTrue (modified by signal handler)
             } catch (\Throwable $e) {
                 $this->logger->error('Worker loop error', ['error' => $e->getMessage()]);
                 $io->error('Worker loop error: ' . $e->getMessage());
+
+                // A failed claim transaction closes the entity manager; let the process manager restart us
+                if (!$this->entityManager->isOpen()) {
+                    return Command::FAILURE;
+                }
             }
 
             if ($once) {
                 break;
             }
 
-            // Sleep 60 seconds between checks
-            sleep(60);
+            // Sleep until the next task is due, or until a task is created or rescheduled
+            $this->wakeup->wait($this->secondsUntilNextTask());
         } while (!$this->shouldStop); // @phpstan-ignore booleanNot.alwaysTrue (modified by signal handler)
 
         $io->info('Scheduled task worker stopped');
 
         return Command::SUCCESS;
     }
+
+    /**
+     * Atomically claim due tasks: rows are locked with SKIP LOCKED, and the pending
+     * execution and the next execution time are written in the same transaction.
+     * Several workers can run side by side without dispatching a task twice.
+     *
+     * A task that can't be claimed (e.g. its schedule can't be computed) is logged
+     * and moved back by FAILED_CLAIM_RETRY, the other tasks are claimed as usual.
+     *
+     * @return array<int, array{0: ScheduledTask, 1: ScheduledTaskExecution}>
+     */
+    private function claimDueTasks(): array
+    {
+        return $this->entityManager->wrapInTransaction(function (): array {
+            $now = new \DateTime('now', new \DateTimeZone('UTC'));
+            $claimed = [];
+
+            foreach ($this->taskRepository->lockDueForExecution($now, self::CLAIM_BATCH_SIZE) as $task) {
+                try {
+                    // Computed first, so a failing task leaves no pending execution behind
+                    $task->computeNextExecutionAt();
+                    $task->setLastExecutionAt(new \DateTime('now', new \DateTimeZone('UTC')));
+
+                    $claimed[] = [$task, $this->executor->createPendingExecution($task, 'scheduled')];
+                } catch (\Throwable $e) {
+                    $this->logger->error('Failed to claim scheduled task, retrying later', [
+                        'task_uuid' => $task->getUuid(),
+                        'error' => $e->getMessage(),
+                    ]);
+
+                    $task->setNextExecutionAt((clone $now)->modify(self::FAILED_CLAIM_RETRY));
+                }
+            }
+
+            $this->entityManager->flush();
+
+            return $claimed;
+        });
+    }
+
+    private function dispatchExecution(SymfonyStyle $io, ScheduledTask $task, ScheduledTaskExecution $execution): void
+    {
+        $io->info(sprintf('Dispatching task "%s" (UUID: %s)', $task->getName(), $task->getUuid()));
+
+        try {
+            $this->messageBus->dispatch(new ExecuteScheduledTaskMessage(
+                $task->getId(),
+                $execution->getId(),
+                'scheduled',
+            ));
+
+            $io->info(sprintf('Task "%s" dispatched (execution #%d)', $task->getName(), $execution->getId()));
+        } catch (\Throwable $e) {
+            $this->logger->error('Failed to dispatch scheduled task', [
+                'task_uuid' => $task->getUuid(),
+                'error' => $e->getMessage(),
+            ]);
+            $io->error(sprintf('Task "%s" failed: %s', $task->getName(), $e->getMessage()));
+        }
+    }
+
+    private function secondsUntilNextTask(): float
+    {
+        try {
+            $next = $this->taskRepository->findNextExecutionAt();
+        } catch (\Throwable $e) {
+            $this->logger->error('Failed to read next scheduled task', ['error' => $e->getMessage()]);
+
+            return self::MAX_WAIT_SECONDS;
+        }
+
+        if ($next === null) {
+            return self::MAX_WAIT_SECONDS;
+        }
+
+        $seconds = (float) $next->format('U.u') - microtime(true);
+        if ($seconds <= 0) {
+            // Still due after claiming, so another worker holds its lock
+            return self::LOCKED_TASK_WAIT_SECONDS;
+        }
+
+        return min(self::MAX_WAIT_SECONDS, $seconds);
+    }
 }
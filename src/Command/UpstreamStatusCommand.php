@@ -0,0 +1,66 @@
+<?php
+
+namespace App\Command;
+
+use App\Service\Http\UpstreamCircuitBreaker;
+use Symfony\Component\Console\Attribute\AsCommand;
+use Symfony\Component\Console\Command\Command;
+use Symfony\Component\Console\Input\InputInterface;
+use Symfony\Component\Console\Input\InputOption;
+use Symfony\Component\Console\Output\OutputInterface;
+use Symfony\Component\Console\Style\SymfonyStyle;
+
+#[AsCommand(
+    name: 'app:upstream:status',
+    description: 'Show the circuit breaker state and in-flight requests of every upstream used in the last day',
+)]
+class UpstreamStatusCommand extends Command
+{
+    public function __construct(
+        private UpstreamCircuitBreaker $circuitBreaker,
+    ) {
+        parent::__construct();
+    }
+
+    protected function configure(): void
+    {
+        $this->addOption('json', null, InputOption::VALUE_NONE, 'Output as JSON (e.g. for monitoring scripts)');
+    }
+
+    protected function execute(InputInterface $input, OutputInterface $output): int
+    {
+        $states = $this->circuitBreaker->getStates();
+
+        if ($input->getOption('json')) {
+            $output->writeln(json_encode($states, JSON_PRETTY_PRINT));
+            return Command::SUCCESS;
+        }
+
+        $io = new SymfonyStyle($input, $output);
+        $io->title('Upstream Circuit Breakers');
+
+        if ($states === []) {
+            $io->info('No upstream was called in the last day.');
+            return Command::SUCCESS;
+        }
+
+        $io->table(
+            ['Upstream', 'State', 'Failures', 'In flight', 'Opened at', 'Reason'],
+            array_map(fn(array $state) => [
+                $state['upstream'],
+                $state['state'],
+                sprintf('%d/%d', $state['failures'], UpstreamCircuitBreaker::FAILURE_THRESHOLD),
+                sprintf('%d/%d', $state['in_flight'], UpstreamCircuitBreaker::MAX_CONCURRENT_REQUESTS),
+                $state['opened_at'] !== null ? date('Y-m-d H:i:s', $state['opened_at']) : '-',
+                $state['reason'] ?? '-',
+            ], $states)
+        );
+
+        $open = count(array_filter($states, fn(array $state) => $state['state'] !== 'closed'));
+        if ($open > 0) {
+            $io->warning(sprintf('%d upstream(s) failing fast.', $open));
+        }
+
+        return Command::SUCCESS;
+    }
+}
@@ -9,13 +9,19 @@ use Symfony\Component\HttpFoundation\Request;
 use Symfony\Component\HttpFoundation\Response;
 use Symfony\Component\Routing\Attribute\Route;
 use Symfony\Component\Security\Http\Attribute\IsGranted;
+use Symfony\Contracts\Cache\CacheInterface;
+use Symfony\Contracts\Cache\ItemInterface;
 
 #[Route('/audit-log')]
 #[IsGranted('ROLE_USER')]
 class AuditLogController extends AbstractController
 {
+    private const GROUPED_PER_PAGE = 20;
+    private const GROUP_COUNT_CACHE_TTL = 60; // seconds, the total is informational only
+
     public function __construct(
-        private AuditLogRepository $auditLogRepository
+        private AuditLogRepository $auditLogRepository,
+        private CacheInterface $cache
     ) {
     }
 
@@ -92,21 +98,33 @@ class AuditLogController extends AbstractController
 
         // Get audit logs based on view mode
         if ($viewMode === 'grouped') {
+            // Keyset pagination: "after" walks forward from a group, "before" walks back
+            $after = $this->decodeGroupCursor($request->query->get('after'));
+            $before = $after === null ? $this->decodeGroupCursor($request->query->get('before')) : null;
             $result = $this->auditLogRepository->findByOrganisationGroupedByExecutionId(
                 $organisation->getId(),
                 $filters,
-                $page,
-                20, // Fewer groups per page
-                $sortDir
+                self::GROUPED_PER_PAGE,
+                $sortDir,
+                $after ?? $before,
+                $before !== null
             );
 
+            if ($result['prev_cursor'] === null) {
+                $page = 1;
+            }
+
+            $total = $this->countExecutionGroups($organisation->getId(), $filters);
+
             return $this->render('audit_log/index.html.twig', [
                 'logs' => [],
                 'grouped_logs' => $result['groups'],
-                'total' => $result['total'],
-                'pages' => $result['pages'],
-                'current_page' => $result['current_page'],
-                'per_page' => $result['per_page'],
+                'next_cursor' => $result['next_cursor'] ? $this->encodeGroupCursor($result['next_cursor']) : null,
+                'prev_cursor' => $result['prev_cursor'] ? $this->encodeGroupCursor($result['prev_cursor']) : null,
+                'total' => $total,
+                'pages' => (int) ceil($total / self::GROUPED_PER_PAGE),
+                'current_page' => $page,
+                'per_page' => self::GROUPED_PER_PAGE,
                 'organisation' => $organisation,
                 'filters' => [
                     'search' => $search,
@@ -149,4 +167,53 @@ class AuditLogController extends AbstractController
             ],
         ]);
     }
+
+    private function countExecutionGroups(int $organisationId, array $filters): int
+    {
+        // The default "last 15 minutes" filter is relative, so round it to keep the cache key stable
+        $keyFilters = $filters;
+        foreach (['date_from', 'date_to'] as $dateKey) {
+            if (isset($keyFilters[$dateKey])) {
+                $keyFilters[$dateKey] = $keyFilters[$dateKey]->format('Y-m-d H:i');
+            }
+        }
+        $cacheKey = sprintf('audit_log_group_count_%d_%s', $organisationId, md5(json_encode($keyFilters)));
+
+        return $this->cache->get($cacheKey, function (ItemInterface $item) use ($organisationId, $filters): int {
+            $item->expiresAfter(self::GROUP_COUNT_CACHE_TTL);
+
+            return $this->auditLogRepository->countExecutionGroups($organisationId, $filters);
+        });
+    }
+
+    /**
+     * @param array{created_at: string, execution_id: ?string} $cursor
+     */
+    private function encodeGroupCursor(array $cursor): string
+    {
+        return rtrim(strtr(base64_encode(json_encode([$cursor['created_at'], $cursor['execution_id']])), '+/', '-_'), '=');
+    }
+
+    /**
+     * @return array{created_at: string, execution_id: ?string}|null
+     */
+    private function decodeGroupCursor(?string $value): ?array
+    {
+        if ($value === null || $value === '') {
+            return null;
+        }
+
+        $decoded = json_decode((string) base64_decode(strtr($value, '-_', '+/')), true);
+        if (
+            !is_array($decoded)
+            || count($decoded) !== 2
+            || !is_string($decoded[0])
+            || \DateTime::createFromFormat('Y-m-d H:i:s', $decoded[0]) === false
+            || !(is_string($decoded[1]) || $decoded[1] === null)
+        ) {
+            return null;
+        }
+
+        return ['created_at' => $decoded[0], 'execution_id' => $decoded[1]];
+    }
 }
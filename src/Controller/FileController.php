@@ -36,6 +36,8 @@ class FileController extends AbstractController
         }
 
         $files = [];
+        $nextToken = null;
+        $pageToken = $request->query->get('page_token');
         $connectionError = null;
         $isConnected = false;
 
@@ -44,7 +46,9 @@ class FileController extends AbstractController
             $isConnected = $this->fileStorageService->isConnected();
 
             if ($isConnected) {
-                $files = $this->fileStorageService->listFiles($organisation->getUuid());
+                $page = $this->fileStorageService->listFiles($organisation->getUuid(), $pageToken);
+                $files = $page['files'];
+                $nextToken = $page['next_token'];
             } else {
                 $connectionError = 'Unable to connect to file storage service. Please check if MinIO is running and accessible.';
             }
@@ -59,6 +63,8 @@ class FileController extends AbstractController
 
         return $this->render('file/index.html.twig', [
             'files' => $files,
+            'next_page_token' => $nextToken,
+            'is_first_page' => empty($pageToken),
             'organisation' => $organisation,
             'connectionError' => $connectionError,
             'isConnected' => $isConnected,
@@ -2,6 +2,7 @@
 
 namespace App\Controller;
 
+use App\Service\Integration\RemoteMcp\RemoteMcpSessionPool;
 use Doctrine\DBAL\Connection;
 use Symfony\Bundle\FrameworkBundle\Controller\AbstractController;
 use Symfony\Component\HttpFoundation\JsonResponse;
@@ -15,7 +16,8 @@ class HealthController extends AbstractController
     public function __construct(
         private Connection $connection,
         private CacheInterface $cache,
-        private HttpClientInterface $httpClient
+        private HttpClientInterface $httpClient,
+        private RemoteMcpSessionPool $remoteMcpSessionPool
     ) {
     }
 
@@ -91,6 +93,13 @@ class HealthController extends AbstractController
             }
         }
 
+        // Remote MCP session pool usage (informational, never affects health status)
+        try {
+            $checks['pools']['remote_mcp_sessions'] = $this->remoteMcpSessionPool->getStats();
+        } catch (\Exception $e) {
+            $checks['pools']['remote_mcp_sessions'] = 'unavailable';
+        }
+
         $statusCode = $checks['status'] === 'healthy' ? Response::HTTP_OK : Response::HTTP_SERVICE_UNAVAILABLE;
 
         return new JsonResponse($checks, $statusCode);
@@ -7,13 +7,21 @@ use App\Entity\IntegrationConfig;
 use App\Entity\Organisation;
 use App\Entity\User;
 use App\Integration\IntegrationRegistry;
+use App\Integration\ToolDefinition;
 use App\Repository\IntegrationConfigRepository;
 use App\Repository\OrganisationRepository;
 use App\Service\AuditLogService;
 use App\Service\ConnectionStatusService;
 use App\Service\EncryptionService;
+use App\Service\ExecutionContextCache;
+use App\Service\Http\MultiplexingHttpClient;
+use App\Service\Http\UpstreamScope;
+use App\Service\Http\UpstreamUnavailableException;
 use App\Service\Integration\RemoteMcpService;
+use App\Service\MetricsService;
+use App\Service\ToolCatalogCache;
 use App\Service\ToolProviderService;
+use App\Service\ToolResultShaper;
 use Psr\Log\LoggerInterface;
 use Symfony\Bundle\FrameworkBundle\Controller\AbstractController;
 use Symfony\Component\DependencyInjection\Attribute\Autowire;
@@ -25,6 +33,8 @@ use Symfony\Component\Routing\Attribute\Route;
 #[Route('/api/integrations')]
 class IntegrationApiController extends AbstractController
 {
+    private const MAX_BATCH_SIZE = 20;
+
     public function __construct(
         private OrganisationRepository $organisationRepository,
         private IntegrationConfigRepository $integrationConfigRepository,
@@ -34,6 +44,12 @@ class IntegrationApiController extends AbstractController
         private AuditLogService $auditLogService,
         private ConnectionStatusService $connectionStatusService,
         private RemoteMcpService $remoteMcpService,
+        private ToolCatalogCache $toolCatalogCache,
+        private MultiplexingHttpClient $httpClient,
+        private ExecutionContextCache $executionContextCache,
+        private ToolResultShaper $toolResultShaper,
+        private MetricsService $metricsService,
+        private UpstreamScope $upstreamScope,
         #[Autowire(service: 'monolog.logger.integration_api')]
         private LoggerInterface $logger,
         private string $apiAuthUser,
@@ -64,18 +80,33 @@ class IntegrationApiController extends AbstractController
         // Capture execution_id for audit logging
         $executionId = $request->query->get('execution_id');
 
-        // Resolve user for tool access mode filtering
-        $user = null;
-        if ($criteria->getWorkflowUserId()) {
-            $user = $this->integrationConfigRepository->findUserByWorkflowUserId(
-                $organisation,
-                $criteria->getWorkflowUserId()
+        // Serve the assembled tool list from the versioned catalog cache when possible
+        $cached = $this->toolCatalogCache->get($organisation->getId(), $criteria);
+        $entry = $cached['entry'];
+
+        if ($entry === null) {
+            // Resolve user for tool access mode filtering
+            $user = null;
+            if ($criteria->getWorkflowUserId()) {
+                $user = $this->integrationConfigRepository->findUserByWorkflowUserId(
+                    $organisation,
+                    $criteria->getWorkflowUserId()
+                );
+            }
+
+            // Delegate to service
+            $tools = $this->toolProviderService->getToolsForOrganisation($organisation, $criteria, $user);
+
+            // Use manual json_encode to preserve stdClass as {} (Symfony serializer converts to [])
+            $entry = $this->toolCatalogCache->save(
+                $organisation->getId(),
+                $criteria,
+                $cached['version'],
+                json_encode(['tools' => $tools]),
+                count($tools)
             );
         }
 
-        // Delegate to service
-        $tools = $this->toolProviderService->getToolsForOrganisation($organisation, $criteria, $user);
-
         // Log API access with execution_id
         $this->auditLogService->logWithOrganisation(
             'api.get_tools',
@@ -84,26 +115,34 @@ class IntegrationApiController extends AbstractController
             [
                 'workflow_user_id' => $criteria->getWorkflowUserId(),
                 'tool_types' => $criteria->getToolTypes(),
-                'tools_count' => count($tools),
+                'tools_count' => $entry['tools_count'],
             ],
             $executionId
         );
 
-        // Use manual json_encode to preserve stdClass as {} (Symfony serializer converts to [])
-        return new JsonResponse(json_encode(['tools' => $tools]), Response::HTTP_OK, [], true);
+        $response = new JsonResponse($entry['json'], Response::HTTP_OK, [], true);
+        $response->setEtag($entry['etag']);
+
+        // Answers If-None-Match with 304 and an empty body
+        $response->isNotModified($request);
+
+        return $response;
     }
 
     #[Route('/{organisationUuid}/execute', name: 'api_integration_execute', methods: ['POST'])]
     public function executeTool(string $organisationUuid, Request $request): JsonResponse
     {
         // Validate Basic Auth
-        if (!$this->validateBasicAuth($request)) {
+        if (!$this->metricsService->measure('auth', fn() => $this->validateBasicAuth($request))) {
             return $this->json(['error' => 'Unauthorized'], Response::HTTP_UNAUTHORIZED);
         }
 
-        // Get organisation
-        $organisation = $this->organisationRepository->findOneBy(['uuid' => $organisationUuid]);
-        if (!$organisation) {
+        // Get organisation (cached per worker, see ExecutionContextCache)
+        $organisationContext = $this->metricsService->measure(
+            'organisation',
+            fn() => $this->executionContextCache->resolveOrganisation($organisationUuid)
+        );
+        if (!$organisationContext) {
             return $this->json(['error' => 'Organisation not found'], Response::HTTP_NOT_FOUND);
         }
 
@@ -118,8 +157,118 @@ class IntegrationApiController extends AbstractController
             return $this->json(['error' => 'Tool ID is required'], Response::HTTP_BAD_REQUEST);
         }
 
+        return $this->executeSingleTool($organisationContext, $toolId, $parameters, $workflowUserId, $executionId);
+    }
+
+    /**
+     * Execute several independent tools in one request.
+     *
+     * Body: {"calls": [{"tool_id": "...", "parameters": {...}}, ...], "workflow_user_id": "...", "execution_id": "..."}
+     * Calls run concurrently; their upstream HTTP requests are multiplexed, so the batch takes
+     * about as long as the slowest call. Results are returned in request order, each with its
+     * own status code, and every call is audited like a single /execute call.
+     */
+    #[Route('/{organisationUuid}/execute-batch', name: 'api_integration_execute_batch', methods: ['POST'])]
+    public function executeToolBatch(string $organisationUuid, Request $request): JsonResponse
+    {
+        // Validate Basic Auth
+        if (!$this->metricsService->measure('auth', fn() => $this->validateBasicAuth($request))) {
+            return $this->json(['error' => 'Unauthorized'], Response::HTTP_UNAUTHORIZED);
+        }
+
+        // Get organisation (cached per worker, see ExecutionContextCache)
+        $organisationContext = $this->metricsService->measure(
+            'organisation',
+            fn() => $this->executionContextCache->resolveOrganisation($organisationUuid)
+        );
+        if (!$organisationContext) {
+            return $this->json(['error' => 'Organisation not found'], Response::HTTP_NOT_FOUND);
+        }
+
+        $data = json_decode($request->getContent(), true);
+        $calls = $data['calls'] ?? null;
+        $workflowUserId = $data['workflow_user_id'] ?? null;
+        $executionId = $data['execution_id'] ?? $request->query->get('execution_id');
+
+        if (!is_array($calls) || $calls === [] || !array_is_list($calls)) {
+            return $this->json(['error' => 'A non-empty "calls" array is required'], Response::HTTP_BAD_REQUEST);
+        }
+
+        if (count($calls) > self::MAX_BATCH_SIZE) {
+            return $this->json([
+                'error' => sprintf('A batch may contain at most %d calls', self::MAX_BATCH_SIZE),
+            ], Response::HTTP_BAD_REQUEST);
+        }
+
+        $this->logger->info('API Tool batch execution requested', [
+            'organisation' => $organisationContext['name'],
+            'calls' => count($calls),
+            'workflow_user_id' => $workflowUserId,
+        ]);
+
+        $tasks = [];
+        foreach ($calls as $index => $call) {
+            $toolId = is_array($call) ? ($call['tool_id'] ?? null) : null;
+            $parameters = is_array($call) && is_array($call['parameters'] ?? null) ? $call['parameters'] : [];
+
+            $tasks[$index] = function () use ($organisationContext, $toolId, $parameters, $workflowUserId, $executionId): JsonResponse {
+                if (!is_string($toolId) || $toolId === '') {
+                    return $this->json(['error' => 'Tool ID is required'], Response::HTTP_BAD_REQUEST);
+                }
+
+                return $this->executeSingleTool($organisationContext, $toolId, $parameters, $workflowUserId, $executionId);
+            };
+        }
+
+        $results = [];
+        foreach ($this->httpClient->runConcurrently($tasks) as $index => $outcome) {
+            $toolId = $calls[$index]['tool_id'] ?? null;
+
+            if (isset($outcome['error'])) {
+                $errorDetails = $this->formatExceptionDetails($outcome['error']);
+                $results[] = [
+                    'tool_id' => $toolId,
+                    'status_code' => $this->resolveHttpStatusCode($errorDetails['code']),
+                    'success' => false,
+                    'error' => 'Tool execution failed',
+                    'message' => $errorDetails['message'],
+                    'error_code' => $errorDetails['code'],
+                    'hint' => $errorDetails['hint'],
+                ];
+                continue;
+            }
+
+            /** @var JsonResponse $response */
+            $response = $outcome['result'];
+            $results[] = [
+                'tool_id' => $toolId,
+                'status_code' => $response->getStatusCode(),
+            ] + (json_decode($response->getContent(), true) ?? []);
+        }
+
+        return $this->json([
+            'success' => !in_array(false, array_map(fn(array $r) => $r['success'] ?? false, $results), true),
+            'results' => $results,
+        ]);
+    }
+
+    /**
+     * Resolve, authorize and execute a single tool call, including audit logging.
+     * Shared by the single and batch execute endpoints.
+     *
+     * @param array{id: int, uuid: string, name: string, version: string, entity: Organisation} $organisationContext
+     */
+    private function executeSingleTool(
+        array $organisationContext,
+        string $toolId,
+        array $parameters,
+        ?string $workflowUserId,
+        ?string $executionId
+    ): JsonResponse {
+        $organisation = $organisationContext['entity'];
+
         $this->logger->info('API Tool execution requested', [
-            'organisation' => $organisation->getName(),
+            'organisation' => $organisationContext['name'],
             'tool_id' => $toolId,
             'workflow_user_id' => $workflowUserId
         ]);
@@ -147,19 +296,10 @@ class IntegrationApiController extends AbstractController
         }
 
         try {
-            // Find the integration that handles this tool
-            $targetIntegration = null;
-            $targetTool = null;
-
-            foreach ($this->integrationRegistry->getAllIntegrations() as $integration) {
-                foreach ($integration->getTools() as $tool) {
-                    if ($tool->getName() === $toolName) {
-                        $targetIntegration = $integration;
-                        $targetTool = $tool;
-                        break 2;
-                    }
-                }
-            }
+            // Find the integration that handles this tool (precompiled tool-name index)
+            $resolvedTool = $this->metricsService->measure('tool_lookup', fn() => $this->integrationRegistry->findTool($toolName));
+            $targetIntegration = $resolvedTool['integration'] ?? null;
+            $targetTool = $resolvedTool['tool'] ?? null;
 
             if (!$targetIntegration || !$targetTool) {
                 // Fallback: Check if this is a remote MCP tool (tools are dynamic, not in getTools())
@@ -180,26 +320,25 @@ class IntegrationApiController extends AbstractController
                 return $this->json(['error' => 'Tool not found'], Response::HTTP_NOT_FOUND);
             }
 
-            // Resolve user for access mode check
-            $accessUser = null;
+            // Resolve user access mode (cached per worker)
+            $accessMode = null;
             if ($workflowUserId) {
-                $accessUser = $this->integrationConfigRepository->findUserByWorkflowUserId(
-                    $organisation,
-                    $workflowUserId
+                $accessMode = $this->metricsService->measure(
+                    'user',
+                    fn() => $this->executionContextCache->getAccessMode($organisationContext, $workflowUserId)
                 );
             }
 
             // Check tool category against user's access mode
-            if ($accessUser !== null) {
-                $allowedCategories = $accessUser->getAllowedToolCategories();
-                if (!in_array($targetTool->getCategory(), $allowedCategories, true)) {
+            if ($accessMode !== null) {
+                if (!in_array($targetTool->getCategory(), $accessMode['categories'], true)) {
                     return $this->json([
                         'error' => 'Tool restricted by access mode',
                         'message' => sprintf(
                             'Tool "%s" requires "%s" access, but your access mode is "%s"',
                             $toolName,
                             $targetTool->getCategory()->value,
-                            $accessUser->getToolAccessMode()
+                            $accessMode['mode']
                         ),
                     ], Response::HTTP_FORBIDDEN);
                 }
@@ -213,23 +352,22 @@ class IntegrationApiController extends AbstractController
                     return $this->json(['error' => 'Configuration ID required for user integration tools'], Response::HTTP_BAD_REQUEST);
                 }
 
-                $config = $this->integrationConfigRepository->find($configId);
-                if (!$config || $config->getOrganisation() !== $organisation) {
+                // Config with decrypted credentials (cached per worker)
+                $config = $this->metricsService->measure(
+                    'credentials',
+                    fn() => $this->executionContextCache->getConfig($organisationContext, $configId)
+                );
+                if (!$config) {
                     return $this->json(['error' => 'Configuration not found'], Response::HTTP_NOT_FOUND);
                 }
 
-                if (!$config->isActive() || $config->isToolDisabled($toolName)) {
+                if (!$config['active'] || in_array($toolName, $config['disabled_tools'], true)) {
                     return $this->json(['error' => 'Tool is disabled'], Response::HTTP_FORBIDDEN);
                 }
 
                 // Get user from config
-                $user = $config->getUser();
-
-                // Decrypt credentials
-                $encryptedCreds = $config->getEncryptedCredentials();
-                if ($encryptedCreds) {
-                    $credentials = json_decode($this->encryptionService->decrypt($encryptedCreds), true);
-                }
+                $user = $config['user_id'] !== null ? $this->executionContextCache->getUserReference($config['user_id']) : null;
+                $credentials = $config['credentials'];
 
                 // Validate credentials are available for user integrations
                 if (empty($credentials)) {
@@ -248,23 +386,23 @@ class IntegrationApiController extends AbstractController
                 }
 
                 // Update last accessed
-                $this->integrationConfigRepository->updateLastAccessed($config);
+                $this->executionContextCache->markAccessed($organisationContext, $config);
             } else {
                 // For system tools, check if disabled (if config exists)
-                $config = $this->integrationConfigRepository->findOneByOrganisationAndType(
-                    $organisation,
+                $systemConfig = $this->executionContextCache->getSystemToolConfig(
+                    $organisationContext,
                     $targetIntegration->getType(),
                     $workflowUserId
                 );
 
-                if ($config && (!$config->isActive() || $config->isToolDisabled($toolName))) {
+                if ($systemConfig && (!$systemConfig['active'] || in_array($toolName, $systemConfig['disabled_tools'], true))) {
                     return $this->json(['error' => 'Tool is disabled'], Response::HTTP_FORBIDDEN);
                 }
             }
 
             // Add organisation context to parameters
-            $parameters['organisationId'] = $organisation->getId();
-            $parameters['organisationUuid'] = $organisation->getUuid();
+            $parameters['organisationId'] = $organisationContext['id'];
+            $parameters['organisationUuid'] = $organisationContext['uuid'];
             $parameters['workflowUserId'] = $workflowUserId;
             if ($configId) {
                 $parameters['configId'] = $configId;
@@ -285,11 +423,26 @@ class IntegrationApiController extends AbstractController
                 $executionId
             );
 
-            // Execute the tool
-            $result = $targetIntegration->executeTool($toolName, $parameters, $credentials);
+            // Execute the tool, its upstream requests are labelled with it and guarded per config
+            // (see InstrumentedHttpClient and CircuitBreakingHttpClient)
+            $this->metricsService->setToolContext($targetIntegration->getType(), $toolName);
+            try {
+                $upstreamScope = $configId ? 'config:' . $configId : 'organisation:' . $organisationContext['id'];
+                $result = $this->metricsService->measure(
+                    'tool_execution',
+                    fn() => $this->upstreamScope->run($upstreamScope, fn() => $targetIntegration->executeTool($toolName, $parameters, $credentials))
+                );
+            } finally {
+                $this->metricsService->setToolContext(null, null);
+            }
+            $this->metricsService->increment('workoflow_tool_calls_total', [
+                'integration' => $targetIntegration->getType(),
+                'tool' => $toolName,
+                'status' => 'success',
+            ]);
 
             $this->logger->info('API Tool executed successfully', [
-                'organisation' => $organisation->getName(),
+                'organisation' => $organisationContext['name'],
                 'tool_id' => $toolId,
                 'integration_type' => $targetIntegration->getType()
             ]);
@@ -310,10 +463,7 @@ class IntegrationApiController extends AbstractController
                 $executionId
             );
 
-            return $this->json([
-                'success' => true,
-                'result' => $result
-            ]);
+            return $this->toolResultResponse($result, $organisationContext['uuid'], $targetTool);
         } catch (\Exception $e) {
             $errorDetails = $this->formatExceptionDetails($e);
 
@@ -321,16 +471,25 @@ class IntegrationApiController extends AbstractController
             // Only applies to user integrations with valid config
             if (
                 isset($config) &&
-                $config instanceof IntegrationConfig &&
+                is_array($config) &&
                 $targetIntegration !== null &&
                 $targetIntegration->requiresCredentials() &&
                 $this->connectionStatusService->isCredentialFailure($e, $targetIntegration->getType())
             ) {
-                $this->connectionStatusService->markDisconnected($config, $errorDetails['message']);
+                $configEntity = $this->integrationConfigRepository->find($config['id']);
+                if ($configEntity instanceof IntegrationConfig) {
+                    $this->connectionStatusService->markDisconnected($configEntity, $errorDetails['message']);
+                }
             }
 
+            $this->metricsService->increment('workoflow_tool_calls_total', [
+                'integration' => $targetIntegration?->getType() ?? 'unknown',
+                'tool' => $toolName,
+                'status' => 'error',
+            ]);
+
             $this->logger->error('API Tool execution failed', [
-                'organisation' => $organisation->getName(),
+                'organisation' => $organisationContext['name'],
                 'tool_id' => $toolId,
                 'tool_name' => $toolName,
                 'error' => $errorDetails['message'],
@@ -410,9 +569,7 @@ class IntegrationApiController extends AbstractController
         try {
             $url = rtrim($orchestratorApiUrl, '/') . '/api/tools/execute';
 
-            /** @var \Symfony\Contracts\HttpClient\HttpClientInterface $httpClient */
-            $httpClient = \Symfony\Component\HttpClient\HttpClient::create();
-            $response = $httpClient->request('POST', $url, [
+            $response = $this->httpClient->request('POST', $url, [
                 'json' => [
                     'tool_name' => $toolName,
                     'parameters' => $parameters,
@@ -492,7 +649,7 @@ class IntegrationApiController extends AbstractController
         if (
             !$config
             || $config->getIntegrationType() !== 'remote_mcp'
-            || $config->getOrganisation() !== $organisation
+            || $config->getOrganisation()?->getId() !== $organisation->getId()
         ) {
             return null;
         }
@@ -552,7 +709,16 @@ class IntegrationApiController extends AbstractController
                 'organisationId', 'organisationUuid', 'workflowUserId', 'configId',
             ]));
 
-            $result = $this->remoteMcpService->executeTool($credentials, $remoteToolName, $forwardParams, $configId);
+            // Remote tool names are chosen by each server, they are not used as labels
+            $this->metricsService->setToolContext('remote_mcp', 'remote_mcp');
+            try {
+                $result = $this->metricsService->measure(
+                    'tool_execution',
+                    fn() => $this->remoteMcpService->executeTool($credentials, $remoteToolName, $forwardParams, $configId)
+                );
+            } finally {
+                $this->metricsService->setToolContext(null, null);
+            }
 
             $this->integrationConfigRepository->updateLastAccessed($config);
 
@@ -571,7 +737,7 @@ class IntegrationApiController extends AbstractController
                 $executionId
             );
 
-            return $this->json(['success' => true, 'result' => $result]);
+            return $this->toolResultResponse($result, $organisation->getUuid());
         } catch (\Exception $e) {
             $errorDetails = $this->formatExceptionDetails($e);
 
@@ -609,6 +775,26 @@ class IntegrationApiController extends AbstractController
         }
     }
 
+    /**
+     * Successful tool response, with results over their budget shaped by the ToolResultShaper.
+     * The full result stays fetchable through the "continuation" handle.
+     *
+     * @param array<mixed> $result
+     */
+    private function toolResultResponse(array $result, string $organisationUuid, ?ToolDefinition $tool = null): JsonResponse
+    {
+        return $this->metricsService->measure('serialization', function () use ($result, $organisationUuid, $tool): JsonResponse {
+            $shaped = $this->toolResultShaper->shape($result, $organisationUuid, $tool);
+
+            $response = ['success' => true, 'result' => $shaped['result']];
+            if ($shaped['continuation'] !== null) {
+                $response['continuation'] = $shaped['continuation'];
+            }
+
+            return $this->json($response);
+        });
+    }
+
     /**
      * Map an exception error code to an appropriate HTTP status code.
      * Returns the code as-is if it's a valid 4xx/5xx, otherwise defaults to 500.
@@ -645,6 +831,20 @@ class IntegrationApiController extends AbstractController
      */
     private function formatExceptionDetails(\Throwable $e): array
     {
+        // Rejected by the circuit breaker without calling the upstream (may be wrapped by the integration)
+        for ($cause = $e; $cause !== null; $cause = $cause->getPrevious()) {
+            if ($cause instanceof UpstreamUnavailableException) {
+                return [
+                    'message' => 'Upstream unavailable: ' . $cause->getMessage(),
+                    'code' => Response::HTTP_SERVICE_UNAVAILABLE,
+                    'hint' => sprintf(
+                        'The external service is failing or overloaded - retry in %d seconds',
+                        $cause->getRetryAfter()
+                    ),
+                ];
+            }
+        }
+
         // Handle Symfony HttpClient ClientException (4xx errors)
         if ($e instanceof \Symfony\Component\HttpClient\Exception\ClientException) {
             $response = $e->getResponse();
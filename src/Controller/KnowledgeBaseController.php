@@ -8,6 +8,7 @@ use Symfony\Bundle\FrameworkBundle\Controller\AbstractController;
 use Symfony\Component\HttpFoundation\JsonResponse;
 use Symfony\Component\HttpFoundation\Request;
 use Symfony\Component\HttpFoundation\Response;
+use Symfony\Component\HttpFoundation\StreamedResponse;
 use Symfony\Component\Routing\Attribute\Route;
 use Symfony\Component\Security\Http\Attribute\IsGranted;
 
@@ -77,8 +78,16 @@ class KnowledgeBaseController extends AbstractController
         }
 
         $safeFilename = preg_replace('/[^\w\-. ()]+/', '_', $result['filename']);
-        $response = new Response($result['content']);
+        $response = new StreamedResponse(function () use ($result): void {
+            foreach ($result['chunks'] as $chunk) {
+                echo $chunk;
+                flush();
+            }
+        });
         $response->headers->set('Content-Type', $result['content_type']);
+        if ($result['content_length'] !== null) {
+            $response->headers->set('Content-Length', (string) $result['content_length']);
+        }
         $response->headers->set('Content-Disposition', sprintf('attachment; filename="%s"', $safeFilename));
         $response->headers->set('X-Content-Type-Options', 'nosniff');
 
@@ -5,13 +5,18 @@ namespace App\Controller;
 use App\DTO\ToolFilterCriteria;
 use App\Entity\IntegrationConfig;
 use App\Integration\IntegrationRegistry;
+use App\Integration\ToolDefinition;
 use App\Repository\IntegrationConfigRepository;
 use App\Repository\UserOrganisationRepository;
 use App\Service\AuditLogService;
 use App\Service\ConnectionStatusService;
 use App\Service\EncryptionService;
+use App\Service\Http\UpstreamScope;
+use App\Service\Http\UpstreamUnavailableException;
 use App\Service\Integration\RemoteMcpService;
+use App\Service\MetricsService;
 use App\Service\ToolProviderService;
+use App\Service\ToolResultShaper;
 use Psr\Log\LoggerInterface;
 use Symfony\Bundle\FrameworkBundle\Controller\AbstractController;
 use Symfony\Component\DependencyInjection\Attribute\Autowire;
@@ -39,6 +44,9 @@ class McpApiController extends AbstractController
         private ConnectionStatusService $connectionStatusService,
         private RemoteMcpService $remoteMcpService,
         private HttpClientInterface $httpClient,
+        private ToolResultShaper $toolResultShaper,
+        private MetricsService $metricsService,
+        private UpstreamScope $upstreamScope,
         #[Autowire(service: 'monolog.logger.integration_api')]
         private LoggerInterface $logger,
         private string $apiAuthUser,
@@ -102,7 +110,7 @@ class McpApiController extends AbstractController
     public function executeTool(Request $request): JsonResponse
     {
         // Validate token and get user/organisation
-        $authResult = $this->authenticateToken($request);
+        $authResult = $this->metricsService->measure('auth', fn() => $this->authenticateToken($request), 'mcp');
         if ($authResult instanceof JsonResponse) {
             return $authResult;
         }
@@ -153,18 +161,14 @@ class McpApiController extends AbstractController
         $targetIntegration = null;
 
         try {
-            // Find the integration that handles this tool
-            $targetTool = null;
-
-            foreach ($this->integrationRegistry->getAllIntegrations() as $integration) {
-                foreach ($integration->getTools() as $tool) {
-                    if ($tool->getName() === $toolName) {
-                        $targetIntegration = $integration;
-                        $targetTool = $tool;
-                        break 2;
-                    }
-                }
-            }
+            // Find the integration that handles this tool (precompiled tool-name index)
+            $resolvedTool = $this->metricsService->measure(
+                'tool_lookup',
+                fn() => $this->integrationRegistry->findTool($toolName),
+                'mcp'
+            );
+            $targetIntegration = $resolvedTool['integration'] ?? null;
+            $targetTool = $resolvedTool['tool'] ?? null;
 
             if (!$targetIntegration || !$targetTool) {
                 // Fallback: Check if this is a remote MCP tool (tools are dynamic, not in getTools())
@@ -205,7 +209,11 @@ class McpApiController extends AbstractController
                 // Decrypt credentials
                 $encryptedCreds = $config->getEncryptedCredentials();
                 if ($encryptedCreds) {
-                    $credentials = json_decode($this->encryptionService->decrypt($encryptedCreds), true);
+                    $credentials = $this->metricsService->measure(
+                        'credentials',
+                        fn() => json_decode($this->encryptionService->decrypt($encryptedCreds), true),
+                        'mcp'
+                    );
                 }
 
                 // Validate credentials are available for user integrations
@@ -260,8 +268,24 @@ class McpApiController extends AbstractController
                 $executionId
             );
 
-            // Execute the tool
-            $result = $targetIntegration->executeTool($toolName, $parameters, $credentials);
+            // Execute the tool, its upstream requests are labelled with it and guarded per config
+            // (see InstrumentedHttpClient and CircuitBreakingHttpClient)
+            $this->metricsService->setToolContext($targetIntegration->getType(), $toolName);
+            try {
+                $upstreamScope = $configId ? 'config:' . $configId : 'organisation:' . $organisation->getId();
+                $result = $this->metricsService->measure(
+                    'tool_execution',
+                    fn() => $this->upstreamScope->run($upstreamScope, fn() => $targetIntegration->executeTool($toolName, $parameters, $credentials)),
+                    'mcp'
+                );
+            } finally {
+                $this->metricsService->setToolContext(null, null);
+            }
+            $this->metricsService->increment('workoflow_tool_calls_total', [
+                'integration' => $targetIntegration->getType(),
+                'tool' => $toolName,
+                'status' => 'success',
+            ]);
 
             $this->logger->info('MCP Tool executed successfully', [
                 'organisation' => $organisation->getName(),
@@ -286,10 +310,7 @@ class McpApiController extends AbstractController
                 $executionId
             );
 
-            return $this->json([
-                'success' => true,
-                'result' => $result
-            ]);
+            return $this->toolResultResponse($result, $organisation->getUuid(), $targetTool);
         } catch (\Exception $e) {
             $errorDetails = $this->formatExceptionDetails($e);
 
@@ -303,6 +324,12 @@ class McpApiController extends AbstractController
                 $this->connectionStatusService->markDisconnected($config, $errorDetails['message']);
             }
 
+            $this->metricsService->increment('workoflow_tool_calls_total', [
+                'integration' => $targetIntegration?->getType() ?? 'unknown',
+                'tool' => $toolName,
+                'status' => 'error',
+            ]);
+
             $this->logger->error('MCP Tool execution failed', [
                 'organisation' => $organisation->getName(),
                 'tool_id' => $toolId,
@@ -420,7 +447,17 @@ class McpApiController extends AbstractController
                 'organisationId', 'organisationUuid', 'workflowUserId', 'configId',
             ]));
 
-            $result = $this->remoteMcpService->executeTool($credentials, $remoteToolName, $forwardParams, $config->getId());
+            // Remote tool names are chosen by each server, they are not used as labels
+            $this->metricsService->setToolContext('remote_mcp', 'remote_mcp');
+            try {
+                $result = $this->metricsService->measure(
+                    'tool_execution',
+                    fn() => $this->remoteMcpService->executeTool($credentials, $remoteToolName, $forwardParams, $config->getId()),
+                    'mcp'
+                );
+            } finally {
+                $this->metricsService->setToolContext(null, null);
+            }
 
             $this->integrationConfigRepository->updateLastAccessed($config);
 
@@ -440,7 +477,7 @@ class McpApiController extends AbstractController
                 $executionId
             );
 
-            return $this->json(['success' => true, 'result' => $result]);
+            return $this->toolResultResponse($result, $organisation->getUuid());
         } catch (\Exception $e) {
             $errorDetails = $this->formatExceptionDetails($e);
 
@@ -654,6 +691,26 @@ class McpApiController extends AbstractController
         return null;
     }
 
+    /**
+     * Successful tool response, with results over their budget shaped by the ToolResultShaper.
+     * The full result stays fetchable through the "continuation" handle.
+     *
+     * @param array<mixed> $result
+     */
+    private function toolResultResponse(array $result, string $organisationUuid, ?ToolDefinition $tool = null): JsonResponse
+    {
+        return $this->metricsService->measure('serialization', function () use ($result, $organisationUuid, $tool): JsonResponse {
+            $shaped = $this->toolResultShaper->shape($result, $organisationUuid, $tool);
+
+            $response = ['success' => true, 'result' => $shaped['result']];
+            if ($shaped['continuation'] !== null) {
+                $response['continuation'] = $shaped['continuation'];
+            }
+
+            return $this->json($response);
+        }, 'mcp');
+    }
+
     /**
      * Format exception details for API response.
      *
@@ -661,6 +718,20 @@ class McpApiController extends AbstractController
      */
     private function formatExceptionDetails(\Throwable $e): array
     {
+        // Rejected by the circuit breaker without calling the upstream (may be wrapped by the integration)
+        for ($cause = $e; $cause !== null; $cause = $cause->getPrevious()) {
+            if ($cause instanceof UpstreamUnavailableException) {
+                return [
+                    'message' => 'Upstream unavailable: ' . $cause->getMessage(),
+                    'code' => Response::HTTP_SERVICE_UNAVAILABLE,
+                    'hint' => sprintf(
+                        'The external service is failing or overloaded - retry in %d seconds',
+                        $cause->getRetryAfter()
+                    ),
+                ];
+            }
+        }
+
         // Handle Symfony HttpClient ClientException (4xx errors)
         if ($e instanceof \Symfony\Component\HttpClient\Exception\ClientException) {
             $response = $e->getResponse();
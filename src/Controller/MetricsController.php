@@ -0,0 +1,34 @@
+<?php
+
+namespace App\Controller;
+
+use App\Service\MetricsService;
+use Symfony\Bundle\FrameworkBundle\Controller\AbstractController;
+use Symfony\Component\HttpFoundation\Request;
+use Symfony\Component\HttpFoundation\Response;
+use Symfony\Component\Routing\Attribute\Route;
+
+/**
+ * Prometheus scrape endpoint, protected by the API Basic Auth credentials.
+ */
+class MetricsController extends AbstractController
+{
+    public function __construct(
+        private MetricsService $metricsService,
+        private string $apiAuthUser,
+        private string $apiAuthPassword,
+    ) {
+    }
+
+    #[Route('/api/metrics', name: 'api_metrics', methods: ['GET'])]
+    public function metrics(Request $request): Response
+    {
+        if ($request->getUser() !== $this->apiAuthUser || $request->getPassword() !== $this->apiAuthPassword) {
+            return new Response('Unauthorized', Response::HTTP_UNAUTHORIZED, ['WWW-Authenticate' => 'Basic realm="metrics"']);
+        }
+
+        return new Response($this->metricsService->render(), Response::HTTP_OK, [
+            'Content-Type' => 'text/plain; version=0.0.4; charset=utf-8',
+        ]);
+    }
+}
@@ -79,6 +79,9 @@ class SharedFileController extends AbstractController
             });
 
             $response->headers->set('Content-Type', $contentType);
+            if (isset($headResult['ContentLength'])) {
+                $response->headers->set('Content-Length', (string) $headResult['ContentLength']);
+            }
             $response->headers->set('Cache-Control', 'public, max-age=3600');
 
             // Add Content-Disposition for better download experience
@@ -10,6 +10,7 @@ use App\Repository\IntegrationConfigRepository;
 use App\Repository\OrganisationRepository;
 use App\Service\AuditLogService;
 use App\Service\OrchestratorCapabilitiesService;
+use App\Service\SkillPromptCache;
 use Psr\Log\LoggerInterface;
 use Symfony\Bundle\FrameworkBundle\Controller\AbstractController;
 use Symfony\Component\DependencyInjection\Attribute\Autowire;
@@ -27,6 +28,7 @@ class SkillsApiController extends AbstractController
         private IntegrationRegistry $integrationRegistry,
         private AuditLogService $auditLogService,
         private OrchestratorCapabilitiesService $orchestratorCapabilitiesService,
+        private SkillPromptCache $skillPromptCache,
         #[Autowire(service: 'monolog.logger.integration_api')]
         private LoggerInterface $logger,
         private string $apiAuthUser,
@@ -34,6 +36,11 @@ class SkillsApiController extends AbstractController
     ) {
     }
 
+    /**
+     * GET /api/skills/
+     * Rendered system prompts are cached (see SkillPromptCache) and the response carries
+     * an ETag, so an unchanged skill set is answered with 304 Not Modified.
+     */
     #[Route('/', name: 'api_skills_list', methods: ['GET'])]
     public function getSkills(Request $request): JsonResponse
     {
@@ -47,6 +54,7 @@ class SkillsApiController extends AbstractController
         $workflowUserId = $request->query->get('workflow_user_id');
         $toolTypeFilter = $request->query->get('tool_type'); // CSV: "jira,confluence" or single: "sharepoint"
         $executionId = $request->query->get('execution_id');
+        $locale = $request->getLocale();
 
         $skills = [];
 
@@ -61,7 +69,7 @@ class SkillsApiController extends AbstractController
                 return $this->json(['error' => 'Organisation not found'], Response::HTTP_NOT_FOUND);
             }
 
-            $skills = array_merge($skills, $this->getUserIntegrationSkills($organisation, $workflowUserId, $toolTypes));
+            $skills = array_merge($skills, $this->getUserIntegrationSkills($organisation, $workflowUserId, $toolTypes, $locale));
         }
 
         // Include system-level skills
@@ -71,7 +79,7 @@ class SkillsApiController extends AbstractController
                 $skills = array_merge($skills, $this->getOrchestratorAgentSkills($organisation, $workflowUserId));
             } else {
                 // N8N or no org: return static system integrations
-                $skills = array_merge($skills, $this->getSystemIntegrationSkills($toolTypes));
+                $skills = array_merge($skills, $this->getSystemIntegrationSkills($toolTypes, $locale));
             }
         }
 
@@ -90,10 +98,16 @@ class SkillsApiController extends AbstractController
             );
         }
 
-        return $this->json(['skills' => $skills]);
+        $response = $this->json(['skills' => $skills]);
+        $response->setEtag(hash('xxh128', $response->getContent()));
+
+        // Answers If-None-Match with 304 and an empty body
+        $response->isNotModified($request);
+
+        return $response;
     }
 
-    private function getUserIntegrationSkills(Organisation $organisation, ?string $workflowUserId, array $toolTypes): array
+    private function getUserIntegrationSkills(Organisation $organisation, ?string $workflowUserId, array $toolTypes, string $locale): array
     {
         $skills = [];
 
@@ -108,7 +122,8 @@ class SkillsApiController extends AbstractController
             $workflowUserId
         );
 
-        // Get user integrations
+        // Get user integrations with their active configured instances
+        $instances = [];
         foreach ($this->integrationRegistry->getUserIntegrations() as $integration) {
             $integrationType = $integration->getType();
 
@@ -118,44 +133,52 @@ class SkillsApiController extends AbstractController
             }
 
             // Filter configs by integration type and active status
-            $configs = array_filter(
-                $allUserConfigs,
-                fn($config) => $config->getIntegrationType() === $integrationType && $config->isActive()
-            );
-
-            // Create skill entry for each configured instance
-            foreach ($configs as $config) {
-                $skillData = [
-                    'type' => $integrationType,
-                    'name' => $integration->getName(),
-                    'instance_id' => $config->getId(),
-                    'instance_name' => $config->getName(),
-                    'instance_context' => $config->getInstanceContext(),
-                ];
-
-                // Add system prompt if this is a personalized skill
-                if ($integration instanceof PersonalizedSkillInterface) {
-                    try {
-                        $skillData['system_prompt'] = $integration->getSystemPrompt($config);
-                    } catch (\Exception $e) {
-                        $this->logger->error('Failed to get system prompt for {type} instance {id}: {error}', [
-                            'type' => $integrationType,
-                            'id' => $config->getId(),
-                            'error' => $e->getMessage(),
-                        ]);
-                        $skillData['system_prompt'] = null;
-                        $skillData['system_prompt_error'] = 'Failed to generate system prompt. The integration may need to be reconnected.';
-                    }
+            foreach ($allUserConfigs as $config) {
+                if ($config->getIntegrationType() === $integrationType && $config->isActive()) {
+                    $instances[] = [$integration, $config];
                 }
+            }
+        }
+
+        // Load all cached system prompts in one round trip
+        $this->skillPromptCache->prefetch(
+            array_values(array_filter($instances, fn(array $instance) => $instance[0] instanceof PersonalizedSkillInterface)),
+            $locale
+        );
 
-                $skills[] = $skillData;
+        // Create skill entry for each configured instance
+        foreach ($instances as [$integration, $config]) {
+            $integrationType = $integration->getType();
+            $skillData = [
+                'type' => $integrationType,
+                'name' => $integration->getName(),
+                'instance_id' => $config->getId(),
+                'instance_name' => $config->getName(),
+                'instance_context' => $config->getInstanceContext(),
+            ];
+
+            // Add system prompt if this is a personalized skill
+            if ($integration instanceof PersonalizedSkillInterface) {
+                try {
+                    $skillData['system_prompt'] = $this->skillPromptCache->getSystemPrompt($integration, $config, $locale);
+                } catch (\Exception $e) {
+                    $this->logger->error('Failed to get system prompt for {type} instance {id}: {error}', [
+                        'type' => $integrationType,
+                        'id' => $config->getId(),
+                        'error' => $e->getMessage(),
+                    ]);
+                    $skillData['system_prompt'] = null;
+                    $skillData['system_prompt_error'] = 'Failed to generate system prompt. The integration may need to be reconnected.';
+                }
             }
+
+            $skills[] = $skillData;
         }
 
         return $skills;
     }
 
-    private function getSystemIntegrationSkills(array $toolTypes): array
+    private function getSystemIntegrationSkills(array $toolTypes, string $locale): array
     {
         $skills = [];
 
@@ -186,7 +209,7 @@ class SkillsApiController extends AbstractController
 
             // Add system prompt if this is a personalized skill (system tools don't implement this)
             if ($integration instanceof PersonalizedSkillInterface) {
-                $skillData['system_prompt'] = $integration->getSystemPrompt();
+                $skillData['system_prompt'] = $this->skillPromptCache->getSystemPrompt($integration, null, $locale);
             }
 
             $skills[] = $skillData;
@@ -9,6 +9,7 @@ use Doctrine\ORM\Mapping as ORM;
 #[ORM\Entity(repositoryClass: AuditLogRepository::class)]
 #[ORM\HasLifecycleCallbacks]
 #[ORM\Index(name: 'idx_audit_execution_id', columns: ['execution_id'])]
+#[ORM\Index(name: 'idx_audit_org_created', columns: ['organisation_id', 'created_at'])]
 class AuditLog
 {
     #[ORM\Id]
@@ -0,0 +1,96 @@
+<?php
+
+namespace App\Entity;
+
+use App\Repository\AuditStatRollupRepository;
+use Doctrine\DBAL\Types\Types;
+use Doctrine\ORM\Mapping as ORM;
+
+/**
+ * Daily audit event counter per organisation, action, user/workflow user and tool.
+ *
+ * Rows are maintained with raw upserts by AuditStatRollupRepository while audit
+ * events are written; the dimension hash keeps the unique key short.
+ */
+#[ORM\Entity(repositoryClass: AuditStatRollupRepository::class)]
+#[ORM\Table(name: 'audit_stat_rollup')]
+#[ORM\UniqueConstraint(name: 'uniq_rollup_bucket', columns: ['organisation_id', 'bucket_date', 'dimension_hash'])]
+class AuditStatRollup
+{
+    #[ORM\Id]
+    #[ORM\GeneratedValue]
+    #[ORM\Column]
+    private ?int $id = null;
+
+    #[ORM\Column]
+    private int $organisationId;
+
+    #[ORM\Column(type: Types::DATE_MUTABLE)]
+    private \DateTimeInterface $bucketDate;
+
+    #[ORM\Column(length: 32, options: ['fixed' => true])]
+    private string $dimensionHash;
+
+    #[ORM\Column(length: 255)]
+    private string $action;
+
+    #[ORM\Column(nullable: true)]
+    private ?int $userId = null;
+
+    #[ORM\Column(length: 255, nullable: true)]
+    private ?string $workflowUserId = null;
+
+    #[ORM\Column(length: 100, nullable: true)]
+    private ?string $integrationType = null;
+
+    #[ORM\Column(length: 255, nullable: true)]
+    private ?string $toolName = null;
+
+    #[ORM\Column]
+    private int $eventCount = 0;
+
+    public function getId(): ?int
+    {
+        return $this->id;
+    }
+
+    public function getOrganisationId(): int
+    {
+        return $this->organisationId;
+    }
+
+    public function getBucketDate(): \DateTimeInterface
+    {
+        return $this->bucketDate;
+    }
+
+    public function getAction(): string
+    {
+        return $this->action;
+    }
+
+    public function getUserId(): ?int
+    {
+        return $this->userId;
+    }
+
+    public function getWorkflowUserId(): ?string
+    {
+        return $this->workflowUserId;
+    }
+
+    public function getIntegrationType(): ?string
+    {
+        return $this->integrationType;
+    }
+
+    public function getToolName(): ?string
+    {
+        return $this->toolName;
+    }
+
+    public function getEventCount(): int
+    {
+        return $this->eventCount;
+    }
+}
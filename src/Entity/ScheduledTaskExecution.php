@@ -37,6 +37,9 @@ class ScheduledTaskExecution
     #[ORM\Column(nullable: true)]
     private ?int $duration = null;
 
+    #[ORM\Column(nullable: true)]
+    private ?int $timeToFirstByte = null;
+
     #[ORM\Column(type: Types::DATETIME_MUTABLE, nullable: true)]
     private ?\DateTimeInterface $deletedAt = null;
 
@@ -131,6 +134,17 @@ class ScheduledTaskExecution
         return $this;
     }
 
+    public function getTimeToFirstByte(): ?int
+    {
+        return $this->timeToFirstByte;
+    }
+
+    public function setTimeToFirstByte(?int $timeToFirstByte): static
+    {
+        $this->timeToFirstByte = $timeToFirstByte;
+        return $this;
+    }
+
     public function getScheduledTask(): ?ScheduledTask
     {
         return $this->scheduledTask;
@@ -0,0 +1,94 @@
+<?php
+
+namespace App\Entity;
+
+use App\Repository\StoredFileRepository;
+use Doctrine\DBAL\Types\Types;
+use Doctrine\ORM\Mapping as ORM;
+
+/**
+ * Metadata index of an object in the file storage bucket.
+ *
+ * Written by FileStorageService when a file is uploaded, so listing a folder
+ * doesn't need a HEAD request per object. Objects uploaded before the index
+ * existed are added the first time they are listed.
+ */
+#[ORM\Entity(repositoryClass: StoredFileRepository::class)]
+#[ORM\Table(name: 'stored_file')]
+#[ORM\UniqueConstraint(name: 'uniq_stored_file_key', columns: ['storage_key'])]
+class StoredFile
+{
+    #[ORM\Id]
+    #[ORM\GeneratedValue]
+    #[ORM\Column]
+    private ?int $id = null;
+
+    #[ORM\Column(length: 512)]
+    private string $storageKey;
+
+    #[ORM\Column(length: 255)]
+    private string $originalName;
+
+    #[ORM\Column(nullable: true)]
+    private ?int $uploadedBy;
+
+    #[ORM\Column(length: 255, nullable: true)]
+    private ?string $mimeType;
+
+    #[ORM\Column(type: Types::BIGINT)]
+    private string $size;
+
+    #[ORM\Column(type: Types::DATETIME_MUTABLE)]
+    private \DateTimeInterface $uploadedAt;
+
+    public function __construct(
+        string $storageKey,
+        string $originalName,
+        ?int $uploadedBy,
+        ?string $mimeType,
+        int $size,
+        \DateTimeInterface $uploadedAt,
+    ) {
+        $this->storageKey = $storageKey;
+        $this->originalName = mb_substr($originalName, 0, 255);
+        $this->uploadedBy = $uploadedBy;
+        $this->mimeType = $mimeType;
+        $this->size = (string) $size;
+        $this->uploadedAt = $uploadedAt;
+    }
+
+    public function getId(): ?int
+    {
+        return $this->id;
+    }
+
+    public function getStorageKey(): string
+    {
+        return $this->storageKey;
+    }
+
+    public function getOriginalName(): string
+    {
+        return $this->originalName;
+    }
+
+    public function getUploadedBy(): ?int
+    {
+        return $this->uploadedBy;
+    }
+
+    public function getMimeType(): ?string
+    {
+        return $this->mimeType;
+    }
+
+    public function getSize(): int
+    {
+        return (int) $this->size;
+    }
+
+    public function getUploadedAt(): \DateTimeInterface
+    {
+        return $this->uploadedAt;
+    }
+}
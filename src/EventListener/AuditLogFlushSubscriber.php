@@ -0,0 +1,42 @@
+<?php
+
+namespace App\EventListener;
+
+use App\Service\AuditLogService;
+use App\Service\MetricsService;
+use Symfony\Component\Console\ConsoleEvents;
+use Symfony\Component\EventDispatcher\EventSubscriberInterface;
+use Symfony\Component\HttpKernel\KernelEvents;
+use Symfony\Component\Messenger\Event\WorkerMessageFailedEvent;
+use Symfony\Component\Messenger\Event\WorkerMessageHandledEvent;
+use Symfony\Component\Messenger\Event\WorkerStoppedEvent;
+
+/**
+ * Writes buffered audit events once the unit of work is finished:
+ * after the response is sent, after a console command and after each handled message.
+ */
+class AuditLogFlushSubscriber implements EventSubscriberInterface
+{
+    public function __construct(
+        private AuditLogService $auditLogService,
+        private MetricsService $metricsService,
+    ) {
+    }
+
+    public static function getSubscribedEvents(): array
+    {
+        return [
+            // Low priority so events logged by other terminate listeners are included
+            KernelEvents::TERMINATE => [['flush', -1024]],
+            ConsoleEvents::TERMINATE => [['flush', -1024]],
+            WorkerMessageHandledEvent::class => 'flush',
+            WorkerMessageFailedEvent::class => 'flush',
+            WorkerStoppedEvent::class => 'flush',
+        ];
+    }
+
+    public function flush(): void
+    {
+        $this->metricsService->measure('audit_write', fn() => $this->auditLogService->flush(), 'terminate');
+    }
+}
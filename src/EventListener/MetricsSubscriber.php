@@ -0,0 +1,71 @@
+<?php
+
+namespace App\EventListener;
+
+use App\Service\MetricsService;
+use Symfony\Component\Console\ConsoleEvents;
+use Symfony\Component\DependencyInjection\Attribute\Autowire;
+use Symfony\Component\EventDispatcher\EventSubscriberInterface;
+use Symfony\Component\HttpKernel\Event\ResponseEvent;
+use Symfony\Component\HttpKernel\Event\TerminateEvent;
+use Symfony\Component\HttpKernel\KernelEvents;
+use Symfony\Component\Messenger\Event\WorkerMessageHandledEvent;
+
+/**
+ * Records the request duration and writes the buffered metrics once the unit of work is finished.
+ * In debug mode, the phase timings of the request are sent as Server-Timing header.
+ */
+class MetricsSubscriber implements EventSubscriberInterface
+{
+    public function __construct(
+        private MetricsService $metricsService,
+        #[Autowire('%kernel.debug%')]
+        private bool $debug,
+    ) {
+    }
+
+    public static function getSubscribedEvents(): array
+    {
+        return [
+            KernelEvents::RESPONSE => ['addServerTiming', -1024],
+            // After AuditLogFlushSubscriber, so the audit write is included
+            KernelEvents::TERMINATE => [['onTerminate', -2048]],
+            ConsoleEvents::TERMINATE => [['flush', -2048]],
+            WorkerMessageHandledEvent::class => ['flush', -1024],
+        ];
+    }
+
+    public function addServerTiming(ResponseEvent $event): void
+    {
+        if (!$this->debug || !$event->isMainRequest()) {
+            return;
+        }
+
+        $serverTiming = $this->metricsService->getServerTiming();
+        if ($serverTiming !== null) {
+            $event->getResponse()->headers->set('Server-Timing', $serverTiming);
+        }
+    }
+
+    public function onTerminate(TerminateEvent $event): void
+    {
+        $request = $event->getRequest();
+        $route = $request->attributes->get('_route');
+        $startedAt = $request->server->get('REQUEST_TIME_FLOAT');
+
+        if (is_string($route) && is_float($startedAt)) {
+            $this->metricsService->observe(
+                'workoflow_http_request_duration_seconds',
+                microtime(true) - $startedAt,
+                ['route' => $route]
+            );
+        }
+
+        $this->metricsService->flush();
+    }
+
+    public function flush(): void
+    {
+        $this->metricsService->flush();
+    }
+}
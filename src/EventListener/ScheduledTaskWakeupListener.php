@@ -0,0 +1,57 @@
+<?php
+
+namespace App\EventListener;
+
+use App\Entity\ScheduledTask;
+use App\Service\ScheduledTask\ScheduledTaskWakeup;
+use Doctrine\Bundle\DoctrineBundle\Attribute\AsDoctrineListener;
+use Doctrine\ORM\Event\OnFlushEventArgs;
+use Doctrine\ORM\Event\PostFlushEventArgs;
+use Doctrine\ORM\Events;
+
+/**
+ * Wakes the scheduled task worker after a flush that created or rescheduled a
+ * task, so it can recompute how long to sleep. Sent after the commit, so the
+ * worker sees the new schedule.
+ */
+#[AsDoctrineListener(event: Events::onFlush)]
+#[AsDoctrineListener(event: Events::postFlush)]
+class ScheduledTaskWakeupListener
+{
+    private bool $scheduleChanged = false;
+
+    public function __construct(
+        private readonly ScheduledTaskWakeup $wakeup,
+    ) {
+    }
+
+    public function onFlush(OnFlushEventArgs $args): void
+    {
+        $uow = $args->getObjectManager()->getUnitOfWork();
+
+        foreach ($uow->getScheduledEntityInsertions() as $entity) {
+            if ($entity instanceof ScheduledTask) {
+                $this->scheduleChanged = true;
+                return;
+            }
+        }
+
+        foreach ($uow->getScheduledEntityUpdates() as $entity) {
+            if ($entity instanceof ScheduledTask) {
+                $changedFields = array_keys($uow->getEntityChangeSet($entity));
+                if (array_intersect($changedFields, ['nextExecutionAt', 'active']) !== []) {
+                    $this->scheduleChanged = true;
+                    return;
+                }
+            }
+        }
+    }
+
+    public function postFlush(PostFlushEventArgs $args): void
+    {
+        if ($this->scheduleChanged) {
+            $this->scheduleChanged = false;
+            $this->wakeup->notify();
+        }
+    }
+}
@@ -0,0 +1,35 @@
+<?php
+
+namespace App\EventListener;
+
+use App\Service\TokenCache;
+use Symfony\Component\Console\ConsoleEvents;
+use Symfony\Component\EventDispatcher\EventSubscriberInterface;
+use Symfony\Component\HttpKernel\KernelEvents;
+use Symfony\Component\Messenger\Event\WorkerMessageHandledEvent;
+
+/**
+ * Refreshes tokens that were handed out close to their expiry once the unit of
+ * work is finished, so the token exchange is not part of any tool call latency.
+ */
+class TokenCacheRefreshSubscriber implements EventSubscriberInterface
+{
+    public function __construct(
+        private TokenCache $tokenCache,
+    ) {
+    }
+
+    public static function getSubscribedEvents(): array
+    {
+        return [
+            KernelEvents::TERMINATE => 'refresh',
+            ConsoleEvents::TERMINATE => 'refresh',
+            WorkerMessageHandledEvent::class => 'refresh',
+        ];
+    }
+
+    public function refresh(): void
+    {
+        $this->tokenCache->refreshPending();
+    }
+}
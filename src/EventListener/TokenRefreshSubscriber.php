@@ -3,6 +3,7 @@
 namespace App\EventListener;
 
 use App\Entity\User;
+use App\Service\TokenCache;
 use Doctrine\ORM\EntityManagerInterface;
 use KnpU\OAuth2ClientBundle\Client\ClientRegistry;
 use Psr\Log\LoggerInterface;
@@ -18,7 +19,8 @@ class TokenRefreshSubscriber implements EventSubscriberInterface
         private TokenStorageInterface $tokenStorage,
         private ContainerInterface $container,
         private EntityManagerInterface $entityManager,
-        private LoggerInterface $logger
+        private LoggerInterface $logger,
+        private TokenCache $tokenCache
     ) {
     }
 
@@ -48,13 +50,29 @@ class TokenRefreshSubscriber implements EventSubscriberInterface
             return;
         }
 
-        $expiresIn = $user->getTokenExpiresAt()->getTimestamp() - time();
-        if ($expiresIn > 300) { // More than 5 minutes remaining
+        $expiresAt = $user->getTokenExpiresAt()->getTimestamp();
+        if ($expiresAt - time() > 300) { // More than 5 minutes remaining
             return;
         }
 
         try {
-            $this->refreshToken($user);
+            // Parallel requests of the same user share one refresh; while the current
+            // token is still valid it is kept and refreshed after the response is sent
+            $refreshToken = $user->getRefreshToken();
+            $tokens = $this->tokenCache->get(
+                TokenCache::key('google_user', (string) $user->getId()),
+                fn(): array => $this->fetchToken($refreshToken),
+                [
+                    'value' => [
+                        'access_token' => $user->getAccessToken(),
+                        'refresh_token' => $refreshToken,
+                        'expires_at' => $expiresAt,
+                    ],
+                    'expires_at' => $expiresAt,
+                ]
+            );
+
+            $this->applyTokens($user, $tokens);
         } catch (\Exception $e) {
             $this->logger->error('Failed to refresh OAuth token', [
                 'user' => $user->getId(),
@@ -63,33 +81,53 @@ class TokenRefreshSubscriber implements EventSubscriberInterface
         }
     }
 
-    private function refreshToken(User $user): void
+    /**
+     * Use the refresh token to get a new access token from Google.
+     *
+     * @return array{value: array{access_token: string, refresh_token: string, expires_at: int}, expires_at: int}
+     */
+    private function fetchToken(string $refreshToken): array
     {
         /** @var ClientRegistry $clientRegistry */
         $clientRegistry = $this->container->get('knpu.oauth2.registry');
         $client = $clientRegistry->getClient('google');
         $provider = $client->getOAuth2Provider();
 
-        // Use the refresh token to get a new access token
         $newAccessToken = $provider->getAccessToken('refresh_token', [
-            'refresh_token' => $user->getRefreshToken()
+            'refresh_token' => $refreshToken
         ]);
 
-        // Update user with new tokens
-        $user->setAccessToken($newAccessToken->getToken());
+        $expiresAt = $newAccessToken->getExpires() ?: time() + 3600;
 
-        // Update refresh token if a new one was provided
-        if ($newAccessToken->getRefreshToken()) {
-            $user->setRefreshToken($newAccessToken->getRefreshToken());
-        }
+        return [
+            'value' => [
+                'access_token' => $newAccessToken->getToken(),
+                // Keep the current refresh token if no new one was provided
+                'refresh_token' => $newAccessToken->getRefreshToken() ?: $refreshToken,
+                'expires_at' => $expiresAt,
+            ],
+            'expires_at' => $expiresAt,
+        ];
+    }
 
-        // Update expiry time
-        if ($newAccessToken->getExpires()) {
-            $expiresAt = new \DateTime();
-            $expiresAt->setTimestamp($newAccessToken->getExpires());
-            $user->setTokenExpiresAt($expiresAt);
+    /**
+     * Store tokens on the user unless they are the ones it already has.
+     *
+     * @param array{access_token: ?string, refresh_token: ?string, expires_at: int} $tokens
+     */
+    private function applyTokens(User $user, array $tokens): void
+    {
+        if ($tokens['access_token'] === $user->getAccessToken()) {
+            return;
         }
 
+        $user->setAccessToken($tokens['access_token']);
+        $user->setRefreshToken($tokens['refresh_token']);
+
+        $expiresAt = new \DateTime();
+        $expiresAt->setTimestamp($tokens['expires_at']);
+        $user->setTokenExpiresAt($expiresAt);
+
         $this->entityManager->flush();
 
         $this->logger->info('Successfully refreshed OAuth token', [
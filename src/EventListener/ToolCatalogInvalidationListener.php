@@ -0,0 +1,119 @@
+<?php
+
+namespace App\EventListener;
+
+use App\Entity\IntegrationConfig;
+use App\Entity\Organisation;
+use App\Entity\User;
+use App\Entity\UserOrganisation;
+use App\Service\ExecutionContextCache;
+use App\Service\ToolCatalogCache;
+use Doctrine\Bundle\DoctrineBundle\Attribute\AsDoctrineListener;
+use Doctrine\ORM\Event\OnFlushEventArgs;
+use Doctrine\ORM\Event\PostFlushEventArgs;
+use Doctrine\ORM\Events;
+use Doctrine\ORM\UnitOfWork;
+
+/**
+ * Bumps the tool catalog version of every organisation whose tool list
+ * inputs changed during a flush (configs, tool toggles, access modes).
+ *
+ * Changed configs are also dropped from this worker's execution context
+ * cache right away; other workers see the new catalog version.
+ */
+#[AsDoctrineListener(event: Events::onFlush)]
+#[AsDoctrineListener(event: Events::postFlush)]
+class ToolCatalogInvalidationListener
+{
+    /**
+     * IntegrationConfig fields that are written on every tool call but don't affect the tool list
+     */
+    private const IGNORED_CONFIG_FIELDS = ['lastAccessedAt', 'updatedAt'];
+
+    /**
+     * @var array<int, true>
+     */
+    private array $pendingOrganisationIds = [];
+
+    /**
+     * @var array<int, true>
+     */
+    private array $pendingConfigIds = [];
+
+    public function __construct(
+        private readonly ToolCatalogCache $toolCatalogCache,
+        private readonly ExecutionContextCache $executionContextCache,
+    ) {
+    }
+
+    public function onFlush(OnFlushEventArgs $args): void
+    {
+        $uow = $args->getObjectManager()->getUnitOfWork();
+
+        foreach ($uow->getScheduledEntityInsertions() as $entity) {
+            $this->collect($entity);
+        }
+
+        foreach ($uow->getScheduledEntityDeletions() as $entity) {
+            $this->collect($entity);
+        }
+
+        foreach ($uow->getScheduledEntityUpdates() as $entity) {
+            if ($this->isRelevantUpdate($entity, $uow)) {
+                $this->collect($entity);
+            }
+        }
+    }
+
+    public function postFlush(PostFlushEventArgs $args): void
+    {
+        $organisationIds = array_keys($this->pendingOrganisationIds);
+        $configIds = array_keys($this->pendingConfigIds);
+        $this->pendingOrganisationIds = [];
+        $this->pendingConfigIds = [];
+
+        foreach ($organisationIds as $organisationId) {
+            $this->toolCatalogCache->invalidateOrganisation($organisationId);
+        }
+
+        foreach ($configIds as $configId) {
+            $this->executionContextCache->invalidateConfig($configId);
+        }
+    }
+
+    private function isRelevantUpdate(object $entity, UnitOfWork $uow): bool
+    {
+        $changedFields = array_keys($uow->getEntityChangeSet($entity));
+
+        return match (true) {
+            $entity instanceof IntegrationConfig => array_diff($changedFields, self::IGNORED_CONFIG_FIELDS) !== [],
+            $entity instanceof User => in_array('toolAccessMode', $changedFields, true),
+            $entity instanceof UserOrganisation => in_array('workflowUserId', $changedFields, true),
+            $entity instanceof Organisation => true,
+            default => false,
+        };
+    }
+
+    private function collect(object $entity): void
+    {
+        if ($entity instanceof IntegrationConfig && $entity->getId() !== null) {
+            $this->pendingConfigIds[$entity->getId()] = true;
+        }
+
+        $organisations = match (true) {
+            $entity instanceof IntegrationConfig, $entity instanceof UserOrganisation => [$entity->getOrganisation()],
+            $entity instanceof User => $entity->getUserOrganisations()->map(
+                fn(UserOrganisation $userOrganisation) => $userOrganisation->getOrganisation()
+            )->toArray(),
+            $entity instanceof Organisation => [$entity],
+            default => [],
+        };
+
+        foreach ($organisations as $organisation) {
+            $organisationId = $organisation?->getId();
+            if ($organisationId !== null) {
+                $this->pendingOrganisationIds[$organisationId] = true;
+            }
+        }
+    }
+}
@@ -6,14 +6,30 @@ use Symfony\Component\DependencyInjection\Attribute\AutowireIterator;
 
 class IntegrationRegistry
 {
+    /**
+     * File name of the compiled tool-name index inside the kernel cache directory
+     */
+    public const TOOL_INDEX_FILE = 'tool_index.php';
+
     /**
      * @var IntegrationInterface[]
      */
     private array $integrations = [];
 
+    /**
+     * @var array<string, array{integration: string, description: string, parameters: array, category: string, result_fields: string[], max_result_bytes: ?int}>|null
+     */
+    private ?array $toolIndex = null;
+
+    /**
+     * @var array<string, ToolDefinition>
+     */
+    private array $resolvedTools = [];
+
     public function __construct(
         #[AutowireIterator('app.integration')]
-        iterable $integrations
+        iterable $integrations,
+        private ?string $cacheDir = null
     ) {
         foreach ($integrations as $integration) {
             $this->integrations[$integration->getType()] = $integration;
@@ -73,4 +89,87 @@ class IntegrationRegistry
     {
         return array_filter($this->integrations, fn($i) => $i->requiresCredentials());
     }
+
+    /**
+     * Resolve a tool by name to the integration that handles it.
+     *
+     * Uses the tool-name index compiled during cache warmup, so lookups don't
+     * build the ToolDefinitions of every integration on each request.
+     *
+     * @return array{integration: IntegrationInterface, tool: ToolDefinition}|null
+     */
+    public function findTool(string $toolName): ?array
+    {
+        $entry = $this->getToolIndex()[$toolName] ?? null;
+        if ($entry === null) {
+            return null;
+        }
+
+        $integration = $this->integrations[$entry['integration']] ?? null;
+        if ($integration === null) {
+            return null;
+        }
+
+        $this->resolvedTools[$toolName] ??= new ToolDefinition(
+            $toolName,
+            $entry['description'],
+            $entry['parameters'],
+            ToolCategory::from($entry['category']),
+            $entry['result_fields'] ?? [],
+            $entry['max_result_bytes'] ?? null
+        );
+
+        return [
+            'integration' => $integration,
+            'tool' => $this->resolvedTools[$toolName],
+        ];
+    }
+
+    /**
+     * Build the tool-name index from all registered integrations.
+     * On duplicate tool names the first registered integration wins.
+     *
+     * @return array<string, array{integration: string, description: string, parameters: array, category: string, result_fields: string[], max_result_bytes: ?int}>
+     */
+    public function buildToolIndex(): array
+    {
+        $index = [];
+        foreach ($this->integrations as $type => $integration) {
+            foreach ($integration->getTools() as $tool) {
+                $index[$tool->getName()] ??= [
+                    'integration' => $type,
+                    'description' => $tool->getDescription(),
+                    'parameters' => $tool->getParameters(),
+                    'category' => $tool->getCategory()->value,
+                    'result_fields' => $tool->getResultFields(),
+                    'max_result_bytes' => $tool->getMaxResultBytes(),
+                ];
+            }
+        }
+
+        return $index;
+    }
+
+    /**
+     * Load the compiled index, falling back to building it in memory
+     * when the cache has not been warmed up yet.
+     *
+     * @return array<string, array{integration: string, description: string, parameters: array, category: string, result_fields: string[], max_result_bytes: ?int}>
+     */
+    private function getToolIndex(): array
+    {
+        if ($this->toolIndex !== null) {
+            return $this->toolIndex;
+        }
+
+        $indexFile = $this->cacheDir !== null ? $this->cacheDir . '/' . self::TOOL_INDEX_FILE : null;
+        if ($indexFile !== null && is_file($indexFile)) {
+            $index = include $indexFile;
+            if (is_array($index)) {
+                return $this->toolIndex = $index;
+            }
+        }
+
+        return $this->toolIndex = $this->buildToolIndex();
+    }
 }
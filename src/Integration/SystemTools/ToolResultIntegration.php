@@ -0,0 +1,118 @@
+<?php
+
+namespace App\Integration\SystemTools;
+
+use App\Integration\PlatformSkillInterface;
+use App\Integration\ToolDefinition;
+use App\Service\ToolResultShaper;
+
+/**
+ * Lets agents read the parts of a tool result that were left out to keep it small.
+ *
+ * Results over their budget come back with a "continuation" block holding a handle,
+ * see ToolResultShaper.
+ */
+class ToolResultIntegration implements PlatformSkillInterface
+{
+    public function __construct(
+        private ToolResultShaper $toolResultShaper
+    ) {
+    }
+
+    public function getType(): string
+    {
+        return 'system.tool_result';
+    }
+
+    public function getName(): string
+    {
+        return 'Tool Result Continuation';
+    }
+
+    public function getTools(): array
+    {
+        return [
+            new ToolDefinition(
+                'tool_result_continue',
+                'Read the rest of a shortened tool result. Call this when a tool response contains a "continuation" '
+                . 'block or a field ending in "[truncated ... continue with handle ...]".',
+                [
+                    [
+                        'name' => 'handle',
+                        'type' => 'string',
+                        'required' => true,
+                        'description' => 'The continuation handle from the shortened result'
+                    ],
+                    [
+                        'name' => 'path',
+                        'type' => 'string',
+                        'required' => false,
+                        'description' => 'Dot path of the field to read, e.g. "issues.0.labels". '
+                            . 'Leave empty for the whole result'
+                    ],
+                    [
+                        'name' => 'offset',
+                        'type' => 'integer',
+                        'required' => false,
+                        'description' => 'Character offset to start reading a text field from, or index of the first item to read from a list (default: 0)'
+                    ],
+                    [
+                        'name' => 'length',
+                        'type' => 'integer',
+                        'required' => false,
+                        'description' => 'Number of characters to read from a text field (default: 20000)'
+                    ]
+                ]
+            )
+        ];
+    }
+
+    public function executeTool(string $toolName, array $parameters, ?array $credentials = null): array
+    {
+        if ($toolName !== 'tool_result_continue') {
+            throw new \InvalidArgumentException("Unknown tool: $toolName");
+        }
+
+        if (empty($parameters['handle']) || empty($parameters['organisationUuid'])) {
+            throw new \InvalidArgumentException('A continuation handle is required');
+        }
+
+        return $this->toolResultShaper->continue(
+            $parameters['organisationUuid'],
+            (string) $parameters['handle'],
+            (string) ($parameters['path'] ?? ''),
+            (int) ($parameters['offset'] ?? 0),
+            isset($parameters['length']) ? (int) $parameters['length'] : null
+        );
+    }
+
+    public function requiresCredentials(): bool
+    {
+        return false; // System tools don't require external service credentials
+    }
+
+    public function validateCredentials(array $credentials): bool
+    {
+        return true; // No external credentials needed
+    }
+
+    public function getCredentialFields(): array
+    {
+        return []; // System tools don't need credential fields
+    }
+
+    public function isExperimental(): bool
+    {
+        return false;
+    }
+
+    public function getSetupInstructions(): ?string
+    {
+        return null;
+    }
+
+    public function getLogoPath(): string
+    {
+        return '/images/logos/workoflow-logo.png';
+    }
+}
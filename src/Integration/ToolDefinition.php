@@ -4,11 +4,18 @@ namespace App\Integration;
 
 class ToolDefinition
 {
+    /**
+     * @param string[] $resultFields Dot paths of the essential result fields ("*" matches every list item),
+     *                               kept when the result exceeds its budget (see ToolResultShaper)
+     * @param int|null $maxResultBytes Budget for the JSON-encoded result, null for the default
+     */
     public function __construct(
         private string $name,
         private string $description,
         private array $parameters = [],
-        private ToolCategory $category = ToolCategory::READ
+        private ToolCategory $category = ToolCategory::READ,
+        private array $resultFields = [],
+        private ?int $maxResultBytes = null
     ) {
     }
 
@@ -32,6 +39,19 @@ class ToolDefinition
         return $this->category;
     }
 
+    /**
+     * @return string[]
+     */
+    public function getResultFields(): array
+    {
+        return $this->resultFields;
+    }
+
+    public function getMaxResultBytes(): ?int
+    {
+        return $this->maxResultBytes;
+    }
+
     public function toArray(): array
     {
         return [
@@ -45,7 +45,7 @@ class ConfluenceIntegration implements PersonalizedSkillInterface
                         'name' => 'maxResults',
                         'type' => 'integer',
                         'required' => false,
-                        'description' => 'Maximum number of results (default: 50)'
+                        'description' => 'Maximum number of results (default: 50, max: 500). All result pages up to this limit are fetched in one call'
                     ]
                 ]
             ),
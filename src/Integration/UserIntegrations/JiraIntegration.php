@@ -33,7 +33,7 @@ class JiraIntegration implements PersonalizedSkillInterface
         return [
             new ToolDefinition(
                 'jira_search',
-                'Search for Jira issues using JQL (Jira Query Language). Returns: Object with startAt, maxResults, total, and issues array. Each issue is a flat object with: key, summary, status, statusCategory, priority, issueType, projectKey, assignee (name), assigneeId, reporter, created (YYYY-MM-DD), updated (YYYY-MM-DD), dueDate, labels, parentKey, sprint, sprintId. Use additionalFields to include custom fields in _rawFields.',
+                'Search for Jira issues using JQL (Jira Query Language). Result pages are fetched automatically, so one call can return e.g. all issues of an epic (parent = KEY-1) up to maxResults. Returns: Object with isLast, nextPageToken (only if more issues match, pass it back to get the next issues), and issues array. Each issue is a flat object with: key, summary, status, statusCategory, priority, issueType, projectKey, assignee (name), assigneeId, reporter, created (YYYY-MM-DD), updated (YYYY-MM-DD), dueDate, labels, parentKey, sprint, sprintId. Use additionalFields to include custom fields in _rawFields.',
                 [
                     [
                         'name' => 'jql',
@@ -45,14 +45,32 @@ class JiraIntegration implements PersonalizedSkillInterface
                         'name' => 'maxResults',
                         'type' => 'integer',
                         'required' => false,
-                        'description' => 'Maximum number of results (default: 50)'
+                        'description' => 'Maximum number of results (default: 50, max: 1000). All result pages up to this limit are fetched in one call'
                     ],
                     [
                         'name' => 'additionalFields',
                         'type' => 'array',
                         'required' => false,
                         'description' => 'Custom field IDs to include in raw format (e.g., ["customfield_10030", "customfield_10031"]). These are returned unprocessed in _rawFields alongside the standard flat fields.'
+                    ],
+                    [
+                        'name' => 'nextPageToken',
+                        'type' => 'string',
+                        'required' => false,
+                        'description' => 'nextPageToken of a previous jira_search result with the same jql, to continue after its last issue'
                     ]
+                ],
+                resultFields: [
+                    'issues.*.key',
+                    'issues.*.summary',
+                    'issues.*.status',
+                    'issues.*.priority',
+                    'issues.*.issueType',
+                    'issues.*.assignee',
+                    'issues.*.updated',
+                    'issues.*.dueDate',
+                    'issues.*.parentKey',
+                    'issues.*._rawFields',
                 ]
             ),
             new ToolDefinition(
@@ -87,7 +105,7 @@ class JiraIntegration implements PersonalizedSkillInterface
             ),
             new ToolDefinition(
                 'jira_get_sprints_from_board',
-                'Get all sprints from a Scrum board (Scrum boards only - does NOT work with Kanban boards). Use jira_get_board first to verify board type. For Kanban boards, use jira_get_kanban_issues instead. Returns: Object with maxResults, startAt, total, isLast, and values array. Each sprint contains: id, self, state (future/active/closed), name, startDate, endDate, completeDate (for closed sprints), originBoardId',
+                'Get all sprints from a Scrum board (Scrum boards only - does NOT work with Kanban boards). Use jira_get_board first to verify board type. For Kanban boards, use jira_get_kanban_issues instead. Returns: Object with maxResults, startAt, isLast, and values array (all sprints of the board). Each sprint contains: id, self, state (future/active/closed), name, startDate, endDate, completeDate (for closed sprints), originBoardId',
                 [
                     [
                         'name' => 'boardId',
@@ -111,7 +129,7 @@ class JiraIntegration implements PersonalizedSkillInterface
                         'name' => 'maxResults',
                         'type' => 'integer',
                         'required' => false,
-                        'description' => 'Maximum number of results (default: 100)'
+                        'description' => 'Maximum number of results (default: 100, max: 1000). All result pages up to this limit are fetched in one call'
                     ],
                     [
                         'name' => 'assignee',
@@ -228,7 +246,7 @@ class JiraIntegration implements PersonalizedSkillInterface
                         'name' => 'maxResults',
                         'type' => 'integer',
                         'required' => false,
-                        'description' => 'Maximum number of results (default: 50)'
+                        'description' => 'Maximum number of results (default: 50, max: 1000). All result pages up to this limit are fetched in one call'
                     ],
                     [
                         'name' => 'assignee',
@@ -264,7 +282,7 @@ class JiraIntegration implements PersonalizedSkillInterface
                         'name' => 'maxResults',
                         'type' => 'integer',
                         'required' => false,
-                        'description' => 'Maximum number of results (default: 50)'
+                        'description' => 'Maximum number of results (default: 50, max: 1000). All result pages up to this limit are fetched in one call'
                     ],
                     [
                         'name' => 'assignee',
@@ -581,7 +599,8 @@ class JiraIntegration implements PersonalizedSkillInterface
                 $credentials,
                 $parameters['jql'],
                 $parameters['maxResults'] ?? 50,
-                $parameters['additionalFields'] ?? null
+                $parameters['additionalFields'] ?? null,
+                $parameters['nextPageToken'] ?? null
             ),
             'jira_get_issue' => $this->jiraService->getIssue(
                 $credentials,
@@ -37,8 +37,15 @@ class MsTeamsIntegration implements PersonalizedSkillInterface
         return [
             new ToolDefinition(
                 'teams_list_teams',
-                'List all Microsoft Teams the user is a member of. Returns team name, description, and ID. Use this as the starting point to navigate teams and channels.',
-                []
+                'List all Microsoft Teams the user is a member of. Returns team name, description, and ID. Use this as the starting point to navigate teams and channels. Set includeChannels to also get the channels of every team in the same call.',
+                [
+                    [
+                        'name' => 'includeChannels',
+                        'type' => 'boolean',
+                        'required' => false,
+                        'description' => 'Also return the channels (name, description, membership type, ID) of each team (default: false). Use this instead of calling teams_list_channels for every team.'
+                    ]
+                ]
             ),
             new ToolDefinition(
                 'teams_list_channels',
@@ -204,7 +211,10 @@ class MsTeamsIntegration implements PersonalizedSkillInterface
         }
 
         return match ($toolName) {
-            'teams_list_teams' => $this->msTeamsService->listTeams($credentials),
+            'teams_list_teams' => $this->msTeamsService->listTeams(
+                $credentials,
+                (bool) ($parameters['includeChannels'] ?? false)
+            ),
             'teams_list_channels' => $this->msTeamsService->listChannels(
                 $credentials,
                 $parameters['teamId']
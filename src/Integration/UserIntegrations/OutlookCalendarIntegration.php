@@ -70,6 +70,18 @@ class OutlookCalendarIntegration implements PersonalizedSkillInterface
                     ]
                 ]
             ),
+            new ToolDefinition(
+                'outlook_calendar_get_events',
+                'Get full details of several calendar events at once (up to 20). Returns the same fields as outlook_calendar_get_event for each event, plus an errors list for IDs that could not be read. Use this instead of calling outlook_calendar_get_event for every listed event.',
+                [
+                    [
+                        'name' => 'eventIds',
+                        'type' => 'array',
+                        'required' => true,
+                        'description' => 'Array of event IDs (from list or search results), at most 20'
+                    ]
+                ]
+            ),
             new ToolDefinition(
                 'outlook_calendar_search',
                 'Search calendar events by subject text. Optionally filter by date range. Returns matching events sorted by date.',
@@ -150,6 +162,10 @@ class OutlookCalendarIntegration implements PersonalizedSkillInterface
                 $credentials,
                 $parameters['eventId']
             ),
+            'outlook_calendar_get_events' => $this->outlookCalendarService->getEvents(
+                $credentials,
+                (array) $parameters['eventIds']
+            ),
             'outlook_calendar_search' => $this->outlookCalendarService->searchEvents(
                 $credentials,
                 $parameters['query'],
@@ -75,6 +75,28 @@ class OutlookMailIntegration implements PersonalizedSkillInterface
                     ]
                 ]
             ),
+            new ToolDefinition(
+                'outlook_mail_get_messages',
+                'Read the full content of several emails at once (up to 20). Returns the same fields as outlook_mail_get_message for each email, plus an errors list for IDs that could not be read. Use this instead of calling outlook_mail_get_message for every search result.',
+                [
+                    [
+                        'name' => 'messageIds',
+                        'type' => 'array',
+                        'required' => true,
+                        'description' => 'Array of email message IDs (from search results or folder listing), at most 20'
+                    ]
+                ],
+                resultFields: [
+                    'messages.*.id',
+                    'messages.*.subject',
+                    'messages.*.from',
+                    'messages.*.receivedDateTime',
+                    'messages.*.body',
+                    'messages.*.hasAttachments',
+                    'messages.*.attachments',
+                    'errors',
+                ]
+            ),
             new ToolDefinition(
                 'outlook_mail_list_folders',
                 'List all mail folders in the user\'s mailbox. Returns folder name, total item count, and unread item count. Includes standard folders (Inbox, Sent Items, Drafts) and custom folders.',
@@ -131,6 +153,10 @@ class OutlookMailIntegration implements PersonalizedSkillInterface
                 $credentials,
                 $parameters['messageId']
             ),
+            'outlook_mail_get_messages' => $this->outlookMailService->getMessages(
+                $credentials,
+                (array) $parameters['messageIds']
+            ),
             'outlook_mail_list_folders' => $this->outlookMailService->listFolders($credentials),
             'outlook_mail_list_messages' => $this->outlookMailService->listMessages(
                 $credentials,
@@ -10,6 +10,7 @@ use App\Integration\CredentialField;
 use App\Service\Integration\SapC4cService;
 use App\Service\Integration\AzureOboTokenService;
 use App\Service\Integration\SapC4cOAuthService;
+use App\Service\TokenCache;
 use Psr\Log\LoggerInterface;
 use Twig\Environment;
 
@@ -21,7 +22,8 @@ class SapC4cIntegration implements PersonalizedSkillInterface
         private Environment $twig,
         private ?AzureOboTokenService $azureOboTokenService = null,
         private ?SapC4cOAuthService $sapC4cOAuthService = null,
-        private ?LoggerInterface $logger = null
+        private ?LoggerInterface $logger = null,
+        private ?TokenCache $tokenCache = null
     ) {
     }
 
@@ -65,84 +67,105 @@ class SapC4cIntegration implements PersonalizedSkillInterface
                 );
             }
 
-            try {
-                $this->logger?->info('Starting OAuth2 token exchange for SAP C4C');
+            // Reuse the C4C token of earlier tool calls, only one worker runs the exchange
+            $exchange = fn(): array => $this->exchangeUserDelegationToken($credentials);
+            $token = $this->tokenCache !== null
+                ? $this->tokenCache->get(
+                    TokenCache::key('sap_c4c', $credentials['azure_refresh_token'], $credentials['base_url'], $credentials['c4c_oauth_client_id']),
+                    $exchange
+                )
+                : $exchange()['value'];
 
-                // Get Azure AD app credentials from environment
-                $azureClientId = $_ENV['AZURE_CLIENT_ID'] ?? '';
-                $azureClientSecret = $_ENV['AZURE_CLIENT_SECRET'] ?? '';
+            // Return credentials with Bearer token for API calls
+            return array_merge($credentials, [
+                'c4c_access_token' => $token['access_token'],
+                'auth_type' => 'bearer',
+            ]);
+        }
 
-                if (empty($azureClientId) || empty($azureClientSecret)) {
-                    throw new \RuntimeException(
-                        'Azure AD app credentials not configured. Please set AZURE_CLIENT_ID and AZURE_CLIENT_SECRET.'
-                    );
-                }
+        return $credentials;
+    }
 
-                // Use tenant ID from stored token or 'common' for multi-tenant
-                $azureTenantId = $credentials['azure_tenant_id'] ?? 'common';
+    /**
+     * Run the user delegation token exchange:
+     * Azure refresh_token → Azure access_token → SAML2 assertion → SAP C4C access_token
+     *
+     * @return array{value: array{access_token: string}, expires_at: int}
+     */
+    private function exchangeUserDelegationToken(array $credentials): array
+    {
+        try {
+            $this->logger?->info('Starting OAuth2 token exchange for SAP C4C');
 
-                // Derive C4C host from base URL for OBO scope
-                $c4cTenantHost = parse_url($credentials['base_url'], PHP_URL_HOST) ?? '';
+            // Get Azure AD app credentials from environment
+            $azureClientId = $_ENV['AZURE_CLIENT_ID'] ?? '';
+            $azureClientSecret = $_ENV['AZURE_CLIENT_SECRET'] ?? '';
 
-                // Step 1: Refresh Azure access token
-                $azureResult = $this->azureOboTokenService->refreshAccessToken(
-                    $credentials['azure_refresh_token'],
-                    $azureTenantId,
-                    $azureClientId,
-                    $azureClientSecret,
-                    'openid profile email offline_access'
+            if (empty($azureClientId) || empty($azureClientSecret)) {
+                throw new \RuntimeException(
+                    'Azure AD app credentials not configured. Please set AZURE_CLIENT_ID and AZURE_CLIENT_SECRET.'
                 );
+            }
 
-                if (!$azureResult['success']) {
-                    throw new \RuntimeException(
-                        'Failed to refresh Azure AD token: ' . ($azureResult['error'] ?? 'Unknown error') .
-                        '. Please reconnect via Azure AD.'
-                    );
-                }
-
-                $azureAccessToken = $azureResult['access_token'];
-                $this->logger?->debug('Azure access token refreshed successfully');
-
-                // Step 2: Exchange Azure token for SAML2 assertion via OBO
-                // The scope is derived from C4C base URL
-                $samlAssertion = $this->azureOboTokenService->exchangeJwtForSaml2(
-                    $azureAccessToken,
-                    $azureTenantId,
-                    $azureClientId,
-                    $azureClientSecret,
-                    $c4cTenantHost
-                );
+            // Use tenant ID from stored token or 'common' for multi-tenant
+            $azureTenantId = $credentials['azure_tenant_id'] ?? 'common';
+
+            // Derive C4C host from base URL for OBO scope
+            $c4cTenantHost = parse_url($credentials['base_url'], PHP_URL_HOST) ?? '';
 
-                $this->logger?->debug('SAML2 assertion obtained from Azure AD');
+            // Step 1: Refresh Azure access token
+            $azureResult = $this->azureOboTokenService->refreshAccessToken(
+                $credentials['azure_refresh_token'],
+                $azureTenantId,
+                $azureClientId,
+                $azureClientSecret,
+                'openid profile email offline_access'
+            );
 
-                // Step 3: Exchange SAML2 assertion for SAP C4C token
-                $c4cResult = $this->sapC4cOAuthService->exchangeSaml2ForC4cToken(
-                    $samlAssertion,
-                    $credentials['base_url'],
-                    $credentials['c4c_oauth_client_id'],
-                    $credentials['c4c_oauth_client_secret']
+            if (!$azureResult['success']) {
+                throw new \RuntimeException(
+                    'Failed to refresh Azure AD token: ' . ($azureResult['error'] ?? 'Unknown error') .
+                    '. Please reconnect via Azure AD.'
                 );
+            }
 
-                if (!$c4cResult['success']) {
-                    throw new \RuntimeException(
-                        'Failed to get SAP C4C token: ' . ($c4cResult['error'] ?? 'Unknown error')
-                    );
-                }
-
-                $this->logger?->info('SAP C4C OAuth2 token exchange completed successfully');
-
-                // Return credentials with Bearer token for API calls
-                return array_merge($credentials, [
-                    'c4c_access_token' => $c4cResult['access_token'],
-                    'auth_type' => 'bearer',
-                ]);
-            } catch (\Exception $e) {
-                $this->logger?->error('OAuth2 token exchange failed: ' . $e->getMessage());
-                throw $e;
+            $azureAccessToken = $azureResult['access_token'];
+            $this->logger?->debug('Azure access token refreshed successfully');
+
+            // Step 2: Exchange Azure token for SAML2 assertion via OBO
+            // The scope is derived from C4C base URL
+            $samlAssertion = $this->azureOboTokenService->exchangeJwtForSaml2(
+                $azureAccessToken,
+                $azureTenantId,
+                $azureClientId,
+                $azureClientSecret,
+                $c4cTenantHost
+            );
+
+            $this->logger?->debug('SAML2 assertion obtained from Azure AD');
+
+            // Step 3: Exchange SAML2 assertion for SAP C4C token
+            $c4cResult = $this->sapC4cOAuthService->exchangeSaml2ForC4cToken(
+                $samlAssertion,
+                $credentials['base_url'],
+                $credentials['c4c_oauth_client_id'],
+                $credentials['c4c_oauth_client_secret']
+            );
+
+            if (empty($c4cResult['access_token'])) {
+                throw new \RuntimeException('Failed to get SAP C4C token: no access token in response');
             }
-        }
 
-        return $credentials;
+            $this->logger?->info('SAP C4C OAuth2 token exchange completed successfully');
+
+            return [
+                'value' => ['access_token' => $c4cResult['access_token']],
+                'expires_at' => $c4cResult['expires_at'],
+            ];
+        } catch (\Exception $e) {
+            $this->logger?->error('OAuth2 token exchange failed: ' . $e->getMessage());
+            throw $e;
+        }
     }
 
     public function getType(): string
@@ -8,6 +8,7 @@ use App\Integration\ToolDefinition;
 use App\Integration\CredentialField;
 use App\Service\Integration\SapSacService;
 use App\Service\Integration\AzureOboTokenService;
+use App\Service\TokenCache;
 use Psr\Log\LoggerInterface;
 use Twig\Environment;
 
@@ -30,7 +31,8 @@ class SapSacIntegration implements PersonalizedSkillInterface
         private SapSacService $sapSacService,
         private Environment $twig,
         private ?AzureOboTokenService $azureOboTokenService = null,
-        private ?LoggerInterface $logger = null
+        private ?LoggerInterface $logger = null,
+        private ?TokenCache $tokenCache = null
     ) {
     }
 
@@ -74,85 +76,107 @@ class SapSacIntegration implements PersonalizedSkillInterface
                 );
             }
 
-            try {
-                $this->logger?->info('Starting OAuth2 token exchange for SAP SAC');
-
-                // Get Azure AD app credentials from environment
-                $azureClientId = $_ENV['AZURE_CLIENT_ID'] ?? '';
-                $azureClientSecret = $_ENV['AZURE_CLIENT_SECRET'] ?? '';
-
-                if (empty($azureClientId) || empty($azureClientSecret)) {
-                    throw new \RuntimeException(
-                        'Azure AD app credentials not configured. Please set AZURE_CLIENT_ID and AZURE_CLIENT_SECRET.'
-                    );
-                }
-
-                // Use tenant ID from stored token or 'common' for multi-tenant
-                $azureTenantId = $credentials['azure_tenant_id'] ?? 'common';
-
-                // Derive SAC host from tenant URL for OBO scope
-                $sacTenantHost = parse_url($credentials['tenant_url'], PHP_URL_HOST) ?? '';
-
-                // Step 1: Refresh Azure access token
-                $azureResult = $this->azureOboTokenService->refreshAccessToken(
-                    $credentials['azure_refresh_token'],
-                    $azureTenantId,
-                    $azureClientId,
-                    $azureClientSecret,
-                    'openid profile email offline_access'
-                );
+            // Reuse the SAC token of earlier tool calls, only one worker runs the exchange
+            $exchange = fn(): array => $this->exchangeUserDelegationToken($credentials);
+            $token = $this->tokenCache !== null
+                ? $this->tokenCache->get(
+                    TokenCache::key('sap_sac', $credentials['azure_refresh_token'], $credentials['tenant_url'], $credentials['sac_oauth_client_id']),
+                    $exchange
+                )
+                : $exchange()['value'];
+
+            // Return credentials with Bearer token for API calls
+            return array_merge($credentials, $token);
+        }
+
+        // Fallback - use client credentials
+        return $this->sapSacService->ensureValidToken($credentials);
+    }
+
+    /**
+     * Run the user delegation token exchange:
+     * Azure refresh_token → Azure access_token → SAML2 assertion → SAC access_token
+     *
+     * @return array{value: array{access_token: string, expires_at: int}, expires_at: int}
+     */
+    private function exchangeUserDelegationToken(array $credentials): array
+    {
+        try {
+            $this->logger?->info('Starting OAuth2 token exchange for SAP SAC');
+
+            // Get Azure AD app credentials from environment
+            $azureClientId = $_ENV['AZURE_CLIENT_ID'] ?? '';
+            $azureClientSecret = $_ENV['AZURE_CLIENT_SECRET'] ?? '';
 
-                if (!$azureResult['success']) {
-                    throw new \RuntimeException(
-                        'Failed to refresh Azure AD token: ' . ($azureResult['error'] ?? 'Unknown error') .
-                        '. Please reconnect via Azure AD.'
-                    );
-                }
-
-                $azureAccessToken = $azureResult['access_token'];
-                $this->logger?->debug('Azure access token refreshed successfully');
-
-                // Step 2: Exchange Azure token for SAML2 assertion via OBO
-                // The scope is derived from SAC tenant URL
-                $samlAssertion = $this->azureOboTokenService->exchangeJwtForSaml2(
-                    $azureAccessToken,
-                    $azureTenantId,
-                    $azureClientId,
-                    $azureClientSecret,
-                    $sacTenantHost
+            if (empty($azureClientId) || empty($azureClientSecret)) {
+                throw new \RuntimeException(
+                    'Azure AD app credentials not configured. Please set AZURE_CLIENT_ID and AZURE_CLIENT_SECRET.'
                 );
+            }
+
+            // Use tenant ID from stored token or 'common' for multi-tenant
+            $azureTenantId = $credentials['azure_tenant_id'] ?? 'common';
+
+            // Derive SAC host from tenant URL for OBO scope
+            $sacTenantHost = parse_url($credentials['tenant_url'], PHP_URL_HOST) ?? '';
 
-                $this->logger?->debug('SAML2 assertion obtained from Azure AD');
+            // Step 1: Refresh Azure access token
+            $azureResult = $this->azureOboTokenService->refreshAccessToken(
+                $credentials['azure_refresh_token'],
+                $azureTenantId,
+                $azureClientId,
+                $azureClientSecret,
+                'openid profile email offline_access'
+            );
 
-                // Step 3: Exchange SAML2 assertion for SAP SAC token
-                $sacResult = $this->sapSacService->exchangeSaml2ForSacToken(
-                    $samlAssertion,
-                    $credentials['tenant_url'],
-                    $credentials['sac_oauth_client_id'],
-                    $credentials['sac_oauth_client_secret']
+            if (!$azureResult['success']) {
+                throw new \RuntimeException(
+                    'Failed to refresh Azure AD token: ' . ($azureResult['error'] ?? 'Unknown error') .
+                    '. Please reconnect via Azure AD.'
                 );
+            }
 
-                if (!$sacResult['success']) {
-                    throw new \RuntimeException(
-                        'Failed to get SAP SAC token: ' . ($sacResult['error'] ?? 'Unknown error')
-                    );
-                }
-
-                $this->logger?->info('SAP SAC OAuth2 token exchange completed successfully');
-
-                // Return credentials with Bearer token for API calls
-                return array_merge($credentials, [
-                    'access_token' => $sacResult['access_token'],
-                    'expires_at' => time() + ($sacResult['expires_in'] ?? 3600),
-                ]);
-            } catch (\Exception $e) {
-                $this->logger?->error('OAuth2 token exchange failed: ' . $e->getMessage());
-                throw $e;
+            $azureAccessToken = $azureResult['access_token'];
+            $this->logger?->debug('Azure access token refreshed successfully');
+
+            // Step 2: Exchange Azure token for SAML2 assertion via OBO
+            // The scope is derived from SAC tenant URL
+            $samlAssertion = $this->azureOboTokenService->exchangeJwtForSaml2(
+                $azureAccessToken,
+                $azureTenantId,
+                $azureClientId,
+                $azureClientSecret,
+                $sacTenantHost
+            );
+
+            $this->logger?->debug('SAML2 assertion obtained from Azure AD');
+
+            // Step 3: Exchange SAML2 assertion for SAP SAC token
+            $sacResult = $this->sapSacService->exchangeSaml2ForSacToken(
+                $samlAssertion,
+                $credentials['tenant_url'],
+                $credentials['sac_oauth_client_id'],
+                $credentials['sac_oauth_client_secret']
+            );
+
+            if (!$sacResult['success']) {
+                throw new \RuntimeException(
+                    'Failed to get SAP SAC token: ' . ($sacResult['error'] ?? 'Unknown error')
+                );
             }
-        }
 
-        // Fallback - use client credentials
-        return $this->sapSacService->ensureValidToken($credentials);
+            $this->logger?->info('SAP SAC OAuth2 token exchange completed successfully');
+
+            $expiresAt = time() + ($sacResult['expires_in'] ?? 3600);
+
+            return [
+                'value' => ['access_token' => $sacResult['access_token'], 'expires_at' => $expiresAt],
+                'expires_at' => $expiresAt,
+            ];
+        } catch (\Exception $e) {
+            $this->logger?->error('OAuth2 token exchange failed: ' . $e->getMessage());
+            throw $e;
+        }
     }
 
     public function getType(): string
@@ -9,10 +9,23 @@ use App\Service\ScheduledTask\ScheduledTaskExecutor;
 use Doctrine\ORM\EntityManagerInterface;
 use Psr\Log\LoggerInterface;
 use Symfony\Component\Messenger\Attribute\AsMessageHandler;
+use Symfony\Component\Messenger\Handler\Acknowledger;
+use Symfony\Component\Messenger\Handler\BatchHandlerInterface;
+use Symfony\Component\Messenger\Handler\BatchHandlerTrait;
 
+/**
+ * Collects queued executions and runs them together, so one consumer
+ * process waits on several webhook responses at the same time. A partial
+ * batch is processed as soon as the worker runs out of messages, and each
+ * execution is saved and acknowledged as soon as its own response has ended.
+ */
 #[AsMessageHandler]
-class ExecuteScheduledTaskHandler
+class ExecuteScheduledTaskHandler implements BatchHandlerInterface
 {
+    use BatchHandlerTrait;
+
+    private const BATCH_SIZE = 10;
+
     public function __construct(
         private ScheduledTaskRepository $taskRepository,
         private ScheduledTaskExecutor $executor,
@@ -21,25 +34,66 @@ class ExecuteScheduledTaskHandler
     ) {
     }
 
-    public function __invoke(ExecuteScheduledTaskMessage $message): void
+    public function __invoke(ExecuteScheduledTaskMessage $message, ?Acknowledger $ack = null): mixed
     {
-        $task = $this->taskRepository->find($message->getScheduledTaskId());
-        if ($task === null) {
-            $this->logger->warning('Scheduled task not found for async execution', [
-                'task_id' => $message->getScheduledTaskId(),
-            ]);
-            return;
+        return $this->handle($message, $ack);
+    }
+
+    /**
+     * @param list<array{0: ExecuteScheduledTaskMessage, 1: Acknowledger}> $jobs
+     */
+    private function process(array $jobs): void
+    {
+        $items = [];
+        $acks = [];
+
+        foreach ($jobs as [$message, $ack]) {
+            $task = $this->taskRepository->find($message->getScheduledTaskId());
+            if ($task === null) {
+                $this->logger->warning('Scheduled task not found for async execution', [
+                    'task_id' => $message->getScheduledTaskId(),
+                ]);
+                $ack->ack();
+                continue;
+            }
+
+            $execution = $this->entityManager->getRepository(ScheduledTaskExecution::class)
+                ->find($message->getExecutionId());
+            if ($execution === null) {
+                $this->logger->warning('Execution record not found for async execution', [
+                    'execution_id' => $message->getExecutionId(),
+                ]);
+                $ack->ack();
+                continue;
+            }
+
+            $items[] = [$task, $execution];
+            $acks[] = $ack;
         }
 
-        $execution = $this->entityManager->getRepository(ScheduledTaskExecution::class)
-            ->find($message->getExecutionId());
-        if ($execution === null) {
-            $this->logger->warning('Execution record not found for async execution', [
-                'execution_id' => $message->getExecutionId(),
-            ]);
+        if ($items === []) {
             return;
         }
 
-        $this->executor->executeAsync($task, $execution);
+        // Each run is acknowledged as soon as it is saved, a slow run doesn't hold back the others
+        $acked = [];
+        try {
+            $this->executor->executeBatch($items, function (int $key) use ($acks, &$acked): void {
+                $acks[$key]->ack();
+                $acked[$key] = true;
+            });
+        } catch (\Throwable $e) {
+            // Only runs that weren't finished are retried, finished webhooks must not be sent twice
+            foreach ($acks as $key => $ack) {
+                if (!isset($acked[$key])) {
+                    $ack->nack($e);
+                }
+            }
+        }
+    }
+
+    private function getBatchSize(): int
+    {
+        return self::BATCH_SIZE;
     }
 }
@@ -3,6 +3,8 @@
 namespace App\Repository;
 
 use App\Entity\AuditLog;
+use Doctrine\DBAL\ParameterType;
+use Doctrine\DBAL\Types\Types;
 use Doctrine\Bundle\DoctrineBundle\Repository\ServiceEntityRepository;
 use Doctrine\Persistence\ManagerRegistry;
 
@@ -25,6 +27,75 @@ class AuditLogRepository extends ServiceEntityRepository
         }
     }
 
+    /**
+     * Insert audit logs with multi-row INSERT statements, bypassing the unit of work.
+     *
+     * Related organisations and users must already be persisted.
+     *
+     * @param AuditLog[] $auditLogs
+     */
+    public function insertMultiple(array $auditLogs, int $chunkSize = 500): void
+    {
+        if ($auditLogs === []) {
+            return;
+        }
+
+        $metadata = $this->getEntityManager()->getClassMetadata(AuditLog::class);
+        $columns = [
+            $metadata->getSingleAssociationJoinColumnName('organisation'),
+            $metadata->getSingleAssociationJoinColumnName('user'),
+            $metadata->getColumnName('action'),
+            $metadata->getColumnName('data'),
+            $metadata->getColumnName('ip'),
+            $metadata->getColumnName('userAgent'),
+            $metadata->getColumnName('createdAt'),
+            $metadata->getColumnName('executionId'),
+        ];
+        $rowTypes = [
+            ParameterType::INTEGER,
+            ParameterType::INTEGER,
+            Types::STRING,
+            Types::JSON,
+            Types::STRING,
+            Types::TEXT,
+            Types::DATETIME_MUTABLE,
+            Types::STRING,
+        ];
+        $rowPlaceholder = '(' . implode(', ', array_fill(0, count($columns), '?')) . ')';
+        $connection = $this->getEntityManager()->getConnection();
+
+        foreach (array_chunk($auditLogs, $chunkSize) as $chunk) {
+            $params = [];
+            $types = [];
+
+            foreach ($chunk as $auditLog) {
+                array_push(
+                    $params,
+                    $auditLog->getOrganisation()?->getId(),
+                    $auditLog->getUser()?->getId(),
+                    $auditLog->getAction(),
+                    $auditLog->getData(),
+                    $auditLog->getIp(),
+                    $auditLog->getUserAgent(),
+                    $auditLog->getCreatedAt() ?? new \DateTime(),
+                    $auditLog->getExecutionId(),
+                );
+                array_push($types, ...$rowTypes);
+            }
+
+            $connection->executeStatement(
+                sprintf(
+                    'INSERT INTO %s (%s) VALUES %s',
+                    $metadata->getTableName(),
+                    implode(', ', $columns),
+                    implode(', ', array_fill(0, count($chunk), $rowPlaceholder))
+                ),
+                $params,
+                $types
+            );
+        }
+    }
+
     public function remove(AuditLog $entity, bool $flush = false): void
     {
         $this->getEntityManager()->remove($entity);
@@ -146,282 +217,242 @@ class AuditLogRepository extends ServiceEntityRepository
     }
 
     /**
-     * Find audit logs grouped by execution_id
+     * Find audit logs grouped by execution_id, using keyset pagination
+     *
+     * Groups are ordered by their first timestamp and execution_id. Pass the
+     * cursor of the last group to get the next page, or the cursor of the first
+     * group with $backward = true to get the previous page. The logs of all
+     * groups on the page are loaded in a single query.
      *
      * @param int $organisationId
-     * @param array $filters ['search' => string, 'date_from' => DateTime, 'date_to' => DateTime]
-     * @param int $page
+     * @param array $filters ['search' => string, 'date_from' => DateTime, 'date_to' => DateTime, 'execution_id' => string]
      * @param int $limit
      * @param string $sortDir Sort direction (ASC, DESC)
-     * @return array ['groups' => array[], 'total' => int, 'pages' => int]
+     * @param array{created_at: string, execution_id: ?string}|null $cursor
+     * @param bool $backward
+     * @return array ['groups' => array[], 'next_cursor' => ?array, 'prev_cursor' => ?array]
      */
     public function findByOrganisationGroupedByExecutionId(
         int $organisationId,
         array $filters = [],
-        int $page = 1,
         int $limit = 20,
-        string $sortDir = 'DESC'
+        string $sortDir = 'DESC',
+        ?array $cursor = null,
+        bool $backward = false
     ): array {
-        // First get distinct execution_ids with their first timestamp and count
+        // Walking backwards queries in reverse order, the page is flipped back below
+        $descending = ($sortDir === 'DESC') !== $backward;
+        $direction = $descending ? 'DESC' : 'ASC';
+
         $qb = $this->createQueryBuilder('a')
             ->select('a.executionId, MIN(a.createdAt) as firstCreatedAt, COUNT(a.id) as logCount')
             ->andWhere('a.organisation = :org')
             ->setParameter('org', $organisationId)
-            ->groupBy('a.executionId');
-
-        // Apply search filter
-        if (!empty($filters['search'])) {
-            $qb->andWhere('a.action LIKE :search')
-                ->setParameter('search', '%' . $filters['search'] . '%');
+            ->groupBy('a.executionId')
+            ->orderBy('firstCreatedAt', $direction)
+            ->addOrderBy('a.executionId', $direction)
+            ->setMaxResults($limit + 1);
+
+        [$conditions, $parameters] = $this->buildGroupFilterConditions($filters);
+        foreach ($conditions as $condition) {
+            $qb->andWhere($condition);
         }
-
-        // Date range filter
-        if (!empty($filters['date_from'])) {
-            $qb->andWhere('a.createdAt >= :dateFrom')
-                ->setParameter('dateFrom', $filters['date_from']);
+        foreach ($parameters as $name => $value) {
+            $qb->setParameter($name, $value);
         }
 
-        if (!empty($filters['date_to'])) {
-            $dateTo = clone $filters['date_to'];
-            $dateTo->setTime(23, 59, 59);
-            $qb->andWhere('a.createdAt <= :dateTo')
-                ->setParameter('dateTo', $dateTo);
+        if ($cursor !== null) {
+            // NULL execution ids sort like the empty string
+            $qb->having(sprintf(
+                "MIN(a.createdAt) %1\$s :cursorTime OR (MIN(a.createdAt) = :cursorTime AND COALESCE(a.executionId, '') %1\$s :cursorExecutionId)",
+                $descending ? '<' : '>'
+            ))
+                ->setParameter('cursorTime', $cursor['created_at'])
+                ->setParameter('cursorExecutionId', $cursor['execution_id'] ?? '');
         }
 
-        // Execution ID filter (when filtering by specific execution_id in grouped view)
-        if (!empty($filters['execution_id'])) {
-            $qb->andWhere('a.executionId = :executionId')
-                ->setParameter('executionId', $filters['execution_id']);
+        $groupResults = $qb->getQuery()->getResult();
+        $hasMore = count($groupResults) > $limit;
+        $groupResults = array_slice($groupResults, 0, $limit);
+        if ($backward) {
+            $groupResults = array_reverse($groupResults);
         }
 
-        $qb->orderBy('firstCreatedAt', $sortDir);
+        $logsByExecutionId = $this->findLogsForGroups($organisationId, $groupResults, $conditions, $parameters);
 
-        // Get total count of groups
-        $countQb = clone $qb;
-        $countQb->select('COUNT(DISTINCT a.executionId)');
-        $total = (int) $countQb->getQuery()->getSingleScalarResult();
-
-        // Apply pagination
-        $offset = ($page - 1) * $limit;
-        $qb->setFirstResult($offset)
-            ->setMaxResults($limit);
-
-        $groupResults = $qb->getQuery()->getResult();
-
-        // Now fetch full logs for each execution_id group
         $groups = [];
         foreach ($groupResults as $group) {
             $executionId = $group['executionId'];
 
-            $logsQb = $this->createQueryBuilder('a')
-                ->leftJoin('a.user', 'u')
-                ->addSelect('u')
-                ->andWhere('a.organisation = :org')
-                ->setParameter('org', $organisationId)
-                ->orderBy('a.createdAt', 'ASC');
-
-            if ($executionId !== null) {
-                $logsQb->andWhere('a.executionId = :execId')
-                    ->setParameter('execId', $executionId);
-            } else {
-                $logsQb->andWhere('a.executionId IS NULL');
-            }
-
-            $logs = $logsQb->getQuery()->getResult();
-
             $groups[] = [
                 'execution_id' => $executionId,
-                'logs' => $logs,
+                'logs' => $logsByExecutionId[$executionId ?? ''] ?? [],
                 'count' => (int) $group['logCount'],
                 'first_timestamp' => $group['firstCreatedAt'],
             ];
         }
 
+        $firstCursor = $groups !== [] ? $this->buildGroupCursor($groups[0]) : null;
+        $lastCursor = $groups !== [] ? $this->buildGroupCursor($groups[count($groups) - 1]) : null;
+
         return [
             'groups' => $groups,
-            'total' => $total,
-            'pages' => (int) ceil($total / $limit),
-            'current_page' => $page,
+            'next_cursor' => ($backward || $hasMore) ? $lastCursor : null,
+            'prev_cursor' => ($backward ? $hasMore : $cursor !== null) ? $firstCursor : null,
             'per_page' => $limit,
         ];
     }
 
-    public function countDistinctExecutionIds(
-        int $orgId,
-        int $userId,
-        ?string $workflowUserId,
-        \DateTimeInterface $since
-    ): int {
+    /**
+     * Count execution_id groups matching the filters (used for the page total only)
+     */
+    public function countExecutionGroups(int $organisationId, array $filters = []): int
+    {
         $qb = $this->createQueryBuilder('a')
             ->select('COUNT(DISTINCT a.executionId)')
             ->andWhere('a.organisation = :org')
-            ->andWhere('a.createdAt >= :since')
-            ->setParameter('org', $orgId)
-            ->setParameter('since', $since);
+            ->setParameter('org', $organisationId);
 
-        $this->applyUserScope($qb, $userId, $workflowUserId);
+        [$conditions, $parameters] = $this->buildGroupFilterConditions($filters);
+        foreach ($conditions as $condition) {
+            $qb->andWhere($condition);
+        }
+        foreach ($parameters as $name => $value) {
+            $qb->setParameter($name, $value);
+        }
 
-        return (int) $qb->getQuery()->getSingleScalarResult();
+        // COUNT(DISTINCT) ignores NULL, the "no execution id" group counts as one
+        $hasNullGroup = (clone $qb)
+            ->select('a.id')
+            ->andWhere('a.executionId IS NULL')
+            ->setMaxResults(1)
+            ->getQuery()
+            ->getOneOrNullResult() !== null;
+
+        return (int) $qb->getQuery()->getSingleScalarResult() + ($hasNullGroup ? 1 : 0);
     }
 
     /**
-     * @return array{started: int, completed: int, failed: int}
+     * Load the logs of all groups on a page in one query, indexed by execution_id
+     *
+     * Execution groups show their full trace; the "no execution id" group only
+     * contains logs matching the filters, otherwise it would span the whole table.
+     *
+     * @param array<int, array{executionId: ?string}> $groupResults
+     * @param string[] $conditions
+     * @return array<string, AuditLog[]>
      */
-    public function countToolExecutions(
-        int $orgId,
-        int $userId,
-        ?string $workflowUserId,
-        \DateTimeInterface $since
-    ): array {
-        $qb = $this->createQueryBuilder('a')
-            ->select("a.action, COUNT(a.id) as cnt")
-            ->andWhere('a.organisation = :org')
-            ->andWhere('a.createdAt >= :since')
-            ->andWhere('a.action IN (:actions)')
-            ->setParameter('org', $orgId)
-            ->setParameter('since', $since)
-            ->setParameter('actions', [
-                'tool_execution.started',
-                'tool_execution.completed',
-                'tool_execution.failed',
-            ])
-            ->groupBy('a.action');
+    private function findLogsForGroups(int $organisationId, array $groupResults, array $conditions, array $parameters): array
+    {
+        if ($groupResults === []) {
+            return [];
+        }
 
-        $this->applyUserScope($qb, $userId, $workflowUserId);
+        $executionIds = array_values(array_filter(
+            array_column($groupResults, 'executionId'),
+            fn(?string $executionId) => $executionId !== null
+        ));
+        $hasNullGroup = count($executionIds) < count($groupResults);
 
-        $results = $qb->getQuery()->getResult();
+        $qb = $this->createQueryBuilder('a')
+            ->leftJoin('a.user', 'u')
+            ->addSelect('u')
+            ->andWhere('a.organisation = :org')
+            ->setParameter('org', $organisationId)
+            ->orderBy('a.createdAt', 'ASC')
+            ->addOrderBy('a.id', 'ASC');
 
-        $counts = ['started' => 0, 'completed' => 0, 'failed' => 0];
-        foreach ($results as $row) {
-            $key = str_replace('tool_execution.', '', (string) $row['action']);
-            if (isset($counts[$key])) {
-                $counts[$key] = (int) $row['cnt'];
+        $groupConditions = [];
+        if ($executionIds !== []) {
+            $groupConditions[] = 'a.executionId IN (:executionIds)';
+            $qb->setParameter('executionIds', $executionIds);
+        }
+        if ($hasNullGroup) {
+            $groupConditions[] = '(' . implode(' AND ', ['a.executionId IS NULL', ...$conditions]) . ')';
+            foreach ($parameters as $name => $value) {
+                $qb->setParameter($name, $value);
             }
         }
+        $qb->andWhere('(' . implode(' OR ', $groupConditions) . ')');
 
-        return $counts;
+        $logsByExecutionId = [];
+        foreach ($qb->getQuery()->getResult() as $log) {
+            $logsByExecutionId[$log->getExecutionId() ?? ''][] = $log;
+        }
+
+        return $logsByExecutionId;
     }
 
-    public function countApiCalls(
-        int $orgId,
-        int $userId,
-        ?string $workflowUserId,
-        \DateTimeInterface $since
-    ): int {
-        $qb = $this->createQueryBuilder('a')
-            ->select('COUNT(a.id)')
-            ->andWhere('a.organisation = :org')
-            ->andWhere('a.createdAt >= :since')
-            ->andWhere('a.action IN (:actions)')
-            ->setParameter('org', $orgId)
-            ->setParameter('since', $since)
-            ->setParameter('actions', [
-                'api.get_tools',
-                'api.get_skills',
-                'api.mcp.get_tools',
-                'api.prompts.list',
-            ]);
+    /**
+     * @return array{0: string[], 1: array<string, mixed>} DQL conditions and their parameters
+     */
+    private function buildGroupFilterConditions(array $filters): array
+    {
+        $conditions = [];
+        $parameters = [];
 
-        $this->applyUserScope($qb, $userId, $workflowUserId);
+        // Search filter (action name)
+        if (!empty($filters['search'])) {
+            $conditions[] = 'a.action LIKE :search';
+            $parameters['search'] = '%' . $filters['search'] . '%';
+        }
 
-        return (int) $qb->getQuery()->getSingleScalarResult();
+        // Date range filter
+        if (!empty($filters['date_from'])) {
+            $conditions[] = 'a.createdAt >= :dateFrom';
+            $parameters['dateFrom'] = $filters['date_from'];
+        }
+
+        if (!empty($filters['date_to'])) {
+            $dateTo = clone $filters['date_to'];
+            $dateTo->setTime(23, 59, 59);
+            $conditions[] = 'a.createdAt <= :dateTo';
+            $parameters['dateTo'] = $dateTo;
+        }
+
+        // Execution ID filter (when filtering by specific execution_id in grouped view)
+        if (!empty($filters['execution_id'])) {
+            $conditions[] = 'a.executionId = :executionId';
+            $parameters['executionId'] = $filters['execution_id'];
+        }
+
+        return [$conditions, $parameters];
+    }
+
+    /**
+     * @param array{execution_id: ?string, first_timestamp: mixed} $group
+     * @return array{created_at: string, execution_id: ?string}
+     */
+    private function buildGroupCursor(array $group): array
+    {
+        $firstTimestamp = $group['first_timestamp'];
+
+        return [
+            'created_at' => $firstTimestamp instanceof \DateTimeInterface
+                ? $firstTimestamp->format('Y-m-d H:i:s')
+                : (string) $firstTimestamp,
+            'execution_id' => $group['execution_id'],
+        ];
     }
 
-    public function countPromptActivity(
+    public function countDistinctExecutionIds(
         int $orgId,
         int $userId,
         ?string $workflowUserId,
         \DateTimeInterface $since
     ): int {
         $qb = $this->createQueryBuilder('a')
-            ->select('COUNT(a.id)')
+            ->select('COUNT(DISTINCT a.executionId)')
             ->andWhere('a.organisation = :org')
             ->andWhere('a.createdAt >= :since')
-            ->andWhere('a.action IN (:actions)')
             ->setParameter('org', $orgId)
-            ->setParameter('since', $since)
-            ->setParameter('actions', [
-                'prompt.created',
-                'prompt.updated',
-                'prompt.upvote.added',
-                'prompt.upvote.removed',
-                'prompt.comment.added',
-                'prompt.comment.deleted',
-            ]);
+            ->setParameter('since', $since);
 
         $this->applyUserScope($qb, $userId, $workflowUserId);
 
         return (int) $qb->getQuery()->getSingleScalarResult();
     }
 
-    public function countUniqueToolTypes(
-        int $orgId,
-        int $userId,
-        ?string $workflowUserId,
-        \DateTimeInterface $since
-    ): int {
-        $conn = $this->getEntityManager()->getConnection();
-
-        $sql = 'SELECT COUNT(DISTINCT JSON_UNQUOTE(JSON_EXTRACT(data, \'$.integration_type\'))) as cnt
-                FROM audit_log
-                WHERE organisation_id = :orgId
-                  AND created_at >= :since
-                  AND action LIKE \'tool_execution.%\'
-                  AND JSON_EXTRACT(data, \'$.integration_type\') IS NOT NULL
-                  AND (user_id = :userId OR JSON_UNQUOTE(JSON_EXTRACT(data, \'$.workflow_user_id\')) = :workflowUserId)';
-
-        /** @var array{cnt: string} $result */
-        $result = $conn->fetchAssociative($sql, [
-            'orgId' => $orgId,
-            'since' => $since->format('Y-m-d H:i:s'),
-            'userId' => $userId,
-            'workflowUserId' => $workflowUserId ?? '',
-        ]);
-
-        return (int) ($result['cnt'] ?? 0);
-    }
-
-    /**
-     * @return array<int, array{tool_name: string, count: int}>
-     */
-    public function findTopTools(
-        int $orgId,
-        int $userId,
-        ?string $workflowUserId,
-        \DateTimeInterface $since,
-        int $limit = 3
-    ): array {
-        $conn = $this->getEntityManager()->getConnection();
-
-        $sql = 'SELECT JSON_UNQUOTE(JSON_EXTRACT(data, \'$.tool_name\')) as tool_name,
-                       COUNT(*) as cnt
-                FROM audit_log
-                WHERE organisation_id = :orgId
-                  AND created_at >= :since
-                  AND action = \'tool_execution.started\'
-                  AND JSON_EXTRACT(data, \'$.tool_name\') IS NOT NULL
-                  AND (user_id = :userId OR JSON_UNQUOTE(JSON_EXTRACT(data, \'$.workflow_user_id\')) = :workflowUserId)
-                GROUP BY tool_name
-                ORDER BY cnt DESC
-                LIMIT :lim';
-
-        /** @var array<int, array{tool_name: string, cnt: string}> $rows */
-        $rows = $conn->fetchAllAssociative($sql, [
-            'orgId' => $orgId,
-            'since' => $since->format('Y-m-d H:i:s'),
-            'userId' => $userId,
-            'workflowUserId' => $workflowUserId ?? '',
-            'lim' => $limit,
-        ], [
-            'lim' => \Doctrine\DBAL\ParameterType::INTEGER,
-        ]);
-
-        return array_map(fn (array $row) => [
-            'tool_name' => (string) $row['tool_name'],
-            'count' => (int) $row['cnt'],
-        ], $rows);
-    }
-
     private function applyUserScope(
         \Doctrine\ORM\QueryBuilder $qb,
         int $userId,
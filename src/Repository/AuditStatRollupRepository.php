@@ -0,0 +1,293 @@
+<?php
+
+namespace App\Repository;
+
+use App\Entity\AuditLog;
+use App\Entity\AuditStatRollup;
+use Doctrine\Bundle\DoctrineBundle\Repository\ServiceEntityRepository;
+use Doctrine\DBAL\ArrayParameterType;
+use Doctrine\DBAL\ParameterType;
+use Doctrine\Persistence\ManagerRegistry;
+
+/**
+ * @extends ServiceEntityRepository<AuditStatRollup>
+ */
+class AuditStatRollupRepository extends ServiceEntityRepository
+{
+    // Only tool executions are broken down by integration type and tool name
+    private const TOOL_ACTION_PREFIX = 'tool_execution.';
+
+    private const COLUMNS = 'organisation_id, bucket_date, dimension_hash, action, user_id, workflow_user_id, integration_type, tool_name, event_count';
+
+    public function __construct(ManagerRegistry $registry)
+    {
+        parent::__construct($registry, AuditStatRollup::class);
+    }
+
+    /**
+     * Add freshly written audit logs to the daily counters with one upsert.
+     *
+     * @param AuditLog[] $auditLogs
+     */
+    public function incrementFromAuditLogs(array $auditLogs): void
+    {
+        $buckets = [];
+        foreach ($auditLogs as $auditLog) {
+            $organisationId = $auditLog->getOrganisation()?->getId();
+            if ($organisationId === null) {
+                continue;
+            }
+
+            $action = (string) $auditLog->getAction();
+            $data = $auditLog->getData() ?? [];
+            $isToolAction = str_starts_with($action, self::TOOL_ACTION_PREFIX);
+
+            $row = [
+                'organisation_id' => $organisationId,
+                'bucket_date' => ($auditLog->getCreatedAt() ?? new \DateTime())->format('Y-m-d'),
+                'action' => $action,
+                'user_id' => $auditLog->getUser()?->getId(),
+                'workflow_user_id' => $this->extractDimension($data, 'workflow_user_id'),
+                'integration_type' => $isToolAction ? $this->extractDimension($data, 'integration_type') : null,
+                'tool_name' => $isToolAction ? $this->extractDimension($data, 'tool_name') : null,
+            ];
+            $row['dimension_hash'] = self::hashDimensions(
+                $row['action'],
+                $row['user_id'],
+                $row['workflow_user_id'],
+                $row['integration_type'],
+                $row['tool_name']
+            );
+
+            $key = $row['organisation_id'] . ':' . $row['bucket_date'] . ':' . $row['dimension_hash'];
+            $buckets[$key] ??= $row + ['event_count' => 0];
+            $buckets[$key]['event_count']++;
+        }
+
+        if ($buckets === []) {
+            return;
+        }
+
+        $params = [];
+        foreach ($buckets as $bucket) {
+            array_push(
+                $params,
+                $bucket['organisation_id'],
+                $bucket['bucket_date'],
+                $bucket['dimension_hash'],
+                $bucket['action'],
+                $bucket['user_id'],
+                $bucket['workflow_user_id'],
+                $bucket['integration_type'],
+                $bucket['tool_name'],
+                $bucket['event_count'],
+            );
+        }
+
+        $this->getEntityManager()->getConnection()->executeStatement(
+            sprintf(
+                'INSERT INTO audit_stat_rollup (%s) VALUES %s
+                 ON DUPLICATE KEY UPDATE event_count = event_count + VALUES(event_count)',
+                self::COLUMNS,
+                implode(', ', array_fill(0, count($buckets), '(?, ?, ?, ?, ?, ?, ?, ?, ?)'))
+            ),
+            $params
+        );
+    }
+
+    /**
+     * Recompute the counters of one day from the raw audit log.
+     *
+     * @return int Number of rollup rows written
+     */
+    public function rebuildDay(\DateTimeInterface $day): int
+    {
+        $from = \DateTimeImmutable::createFromInterface($day)->setTime(0, 0);
+        $to = $from->modify('+1 day');
+
+        $workflowUserId = $this->jsonDimensionSql('workflow_user_id');
+        $integrationType = $this->jsonDimensionSql('integration_type', true);
+        $toolName = $this->jsonDimensionSql('tool_name', true);
+
+        $sql = sprintf(
+            "INSERT INTO audit_stat_rollup (%s)
+             SELECT organisation_id, bucket_date,
+                    MD5(CONCAT_WS('|', action, COALESCE(user_id, ''), COALESCE(workflow_user_id, ''), COALESCE(integration_type, ''), COALESCE(tool_name, ''))),
+                    action, user_id, workflow_user_id, integration_type, tool_name, COUNT(*)
+             FROM (
+                 SELECT organisation_id, DATE(created_at) AS bucket_date, action, user_id,
+                        %s AS workflow_user_id, %s AS integration_type, %s AS tool_name
+                 FROM audit_log
+                 WHERE organisation_id IS NOT NULL AND created_at >= :from AND created_at < :to
+             ) events
+             GROUP BY organisation_id, bucket_date, action, user_id, workflow_user_id, integration_type, tool_name
+             ON DUPLICATE KEY UPDATE event_count = VALUES(event_count)",
+            self::COLUMNS,
+            $workflowUserId,
+            $integrationType,
+            $toolName
+        );
+
+        $params = [
+            'from' => $from->format('Y-m-d H:i:s'),
+            'to' => $to->format('Y-m-d H:i:s'),
+        ];
+
+        return $this->getEntityManager()->getConnection()->transactional(function ($connection) use ($sql, $params, $from): int {
+            $connection->executeStatement(
+                'DELETE FROM audit_stat_rollup WHERE bucket_date = :day',
+                ['day' => $from->format('Y-m-d')]
+            );
+
+            return (int) $connection->executeStatement($sql, $params);
+        });
+    }
+
+    public function findOldestAuditDate(): ?\DateTimeImmutable
+    {
+        $oldest = $this->getEntityManager()->getConnection()->fetchOne('SELECT MIN(created_at) FROM audit_log');
+
+        return $oldest ? new \DateTimeImmutable($oldest) : null;
+    }
+
+    /**
+     * @param string[] $actions
+     * @return array<string, int> Event count per action
+     */
+    public function sumByAction(
+        int $orgId,
+        int $userId,
+        ?string $workflowUserId,
+        \DateTimeInterface $since,
+        array $actions
+    ): array {
+        $rows = $this->getEntityManager()->getConnection()->fetchAllAssociative(
+            'SELECT action, SUM(event_count) AS cnt
+             FROM audit_stat_rollup
+             WHERE organisation_id = :orgId
+               AND bucket_date >= :since
+               AND action IN (:actions)
+               AND ' . $this->userScopeSql($workflowUserId) . '
+             GROUP BY action',
+            $this->scopeParams($orgId, $userId, $workflowUserId, $since) + ['actions' => $actions],
+            ['actions' => ArrayParameterType::STRING]
+        );
+
+        $counts = array_fill_keys($actions, 0);
+        foreach ($rows as $row) {
+            $counts[(string) $row['action']] = (int) $row['cnt'];
+        }
+
+        return $counts;
+    }
+
+    public function countUniqueToolTypes(
+        int $orgId,
+        int $userId,
+        ?string $workflowUserId,
+        \DateTimeInterface $since
+    ): int {
+        return (int) $this->getEntityManager()->getConnection()->fetchOne(
+            'SELECT COUNT(DISTINCT integration_type)
+             FROM audit_stat_rollup
+             WHERE organisation_id = :orgId
+               AND bucket_date >= :since
+               AND integration_type IS NOT NULL
+               AND ' . $this->userScopeSql($workflowUserId),
+            $this->scopeParams($orgId, $userId, $workflowUserId, $since)
+        );
+    }
+
+    /**
+     * @return array<int, array{tool_name: string, count: int}>
+     */
+    public function findTopTools(
+        int $orgId,
+        int $userId,
+        ?string $workflowUserId,
+        \DateTimeInterface $since,
+        int $limit = 3
+    ): array {
+        $rows = $this->getEntityManager()->getConnection()->fetchAllAssociative(
+            'SELECT tool_name, SUM(event_count) AS cnt
+             FROM audit_stat_rollup
+             WHERE organisation_id = :orgId
+               AND bucket_date >= :since
+               AND action = \'tool_execution.started\'
+               AND tool_name IS NOT NULL
+               AND ' . $this->userScopeSql($workflowUserId) . '
+             GROUP BY tool_name
+             ORDER BY cnt DESC
+             LIMIT :lim',
+            $this->scopeParams($orgId, $userId, $workflowUserId, $since) + ['lim' => $limit],
+            ['lim' => ParameterType::INTEGER]
+        );
+
+        return array_map(fn (array $row) => [
+            'tool_name' => (string) $row['tool_name'],
+            'count' => (int) $row['cnt'],
+        ], $rows);
+    }
+
+    public static function hashDimensions(
+        string $action,
+        ?int $userId,
+        ?string $workflowUserId,
+        ?string $integrationType,
+        ?string $toolName
+    ): string {
+        // Must match the MD5(CONCAT_WS(...)) expression used in rebuildDay()
+        return md5(implode('|', [$action, (string) $userId, (string) $workflowUserId, (string) $integrationType, (string) $toolName]));
+    }
+
+    private function extractDimension(array $data, string $key): ?string
+    {
+        $value = $data[$key] ?? null;
+        if (!is_scalar($value) || $value === '') {
+            return null;
+        }
+
+        return (string) $value;
+    }
+
+    /**
+     * SQL counterpart of extractDimension() for the backfill
+     */
+    private function jsonDimensionSql(string $key, bool $toolActionsOnly = false): string
+    {
+        $expression = sprintf("NULLIF(NULLIF(JSON_UNQUOTE(JSON_EXTRACT(data, '$.%s')), ''), 'null')", $key);
+
+        if ($toolActionsOnly) {
+            return sprintf("CASE WHEN action LIKE '%s%%' THEN %s END", self::TOOL_ACTION_PREFIX, $expression);
+        }
+
+        return $expression;
+    }
+
+    private function userScopeSql(?string $workflowUserId): string
+    {
+        if ($workflowUserId !== null) {
+            return '(user_id = :userId OR (user_id IS NULL AND workflow_user_id = :workflowUserId))';
+        }
+
+        return 'user_id = :userId';
+    }
+
+    /**
+     * @return array<string, int|string>
+     */
+    private function scopeParams(int $orgId, int $userId, ?string $workflowUserId, \DateTimeInterface $since): array
+    {
+        $params = [
+            'orgId' => $orgId,
+            'userId' => $userId,
+            'since' => $since->format('Y-m-d'),
+        ];
+
+        if ($workflowUserId !== null) {
+            $params['workflowUserId'] = $workflowUserId;
+        }
+
+        return $params;
+    }
+}
@@ -13,6 +13,8 @@ use Doctrine\Persistence\ManagerRegistry;
  */
 class IntegrationConfigRepository extends ServiceEntityRepository
 {
+    private const LAST_ACCESSED_WRITE_INTERVAL = 60; // seconds
+
     public function __construct(ManagerRegistry $registry)
     {
         parent::__construct($registry, IntegrationConfig::class);
@@ -122,9 +124,41 @@ class IntegrationConfigRepository extends ServiceEntityRepository
      */
     public function updateLastAccessed(IntegrationConfig $config): void
     {
-        $config->setLastAccessedAt(new \DateTime());
-        $this->getEntityManager()->persist($config);
-        $this->getEntityManager()->flush();
+        if ($config->getId() !== null) {
+            $this->updateLastAccessedById($config->getId(), $config->getLastAccessedAt());
+        }
+    }
+
+    /**
+     * Update last accessed timestamp without loading the config
+     *
+     * Writes at most once per LAST_ACCESSED_WRITE_INTERVAL per config. The
+     * conditional UPDATE also merges concurrent calls from other workers, and
+     * it runs without flushing the unit of work.
+     *
+     * @return \DateTimeInterface|null The new timestamp, or null if the write was skipped
+     */
+    public function updateLastAccessedById(int $configId, ?\DateTimeInterface $lastAccessedAt): ?\DateTimeInterface
+    {
+        $now = new \DateTime();
+        $threshold = (clone $now)->modify(sprintf('-%d seconds', self::LAST_ACCESSED_WRITE_INTERVAL));
+
+        if ($lastAccessedAt !== null && $lastAccessedAt > $threshold) {
+            return null;
+        }
+
+        $this->createQueryBuilder('ic')
+            ->update()
+            ->set('ic.lastAccessedAt', ':now')
+            ->andWhere('ic.id = :id')
+            ->andWhere('(ic.lastAccessedAt IS NULL OR ic.lastAccessedAt <= :threshold)')
+            ->setParameter('now', $now)
+            ->setParameter('id', $configId)
+            ->setParameter('threshold', $threshold)
+            ->getQuery()
+            ->execute();
+
+        return $now;
     }
 
     /**
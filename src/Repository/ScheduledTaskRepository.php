@@ -34,19 +34,46 @@ class ScheduledTaskRepository extends ServiceEntityRepository
     }
 
     /**
+     * Lock due tasks for the current transaction, skipping tasks already locked
+     * by another worker. Must be called inside a transaction.
+     *
      * @return ScheduledTask[]
      */
-    public function findDueForExecution(\DateTimeInterface $now): array
+    public function lockDueForExecution(\DateTimeInterface $now, int $limit): array
     {
-        return $this->createQueryBuilder('st')
-            ->andWhere('st.active = :active')
-            ->andWhere('st.frequency != :manual')
-            ->andWhere('st.nextExecutionAt <= :now')
-            ->setParameter('active', true)
-            ->setParameter('manual', 'manual')
-            ->setParameter('now', $now)
-            ->getQuery()
-            ->getResult();
+        $ids = $this->getEntityManager()->getConnection()->fetchFirstColumn(
+            sprintf(
+                'SELECT id FROM scheduled_task
+                 WHERE active = 1 AND frequency <> :manual AND next_execution_at <= :now
+                 ORDER BY next_execution_at
+                 LIMIT %d
+                 FOR UPDATE SKIP LOCKED',
+                $limit
+            ),
+            [
+                'manual' => 'manual',
+                'now' => $now->format('Y-m-d H:i:s'),
+            ]
+        );
+
+        if ($ids === []) {
+            return [];
+        }
+
+        return $this->findBy(['id' => $ids], ['nextExecutionAt' => 'ASC']);
+    }
+
+    /**
+     * Earliest upcoming execution time (UTC) of all active scheduled tasks
+     */
+    public function findNextExecutionAt(): ?\DateTimeImmutable
+    {
+        $next = $this->getEntityManager()->getConnection()->fetchOne(
+            'SELECT MIN(next_execution_at) FROM scheduled_task WHERE active = 1 AND frequency <> :manual',
+            ['manual' => 'manual']
+        );
+
+        return $next ? new \DateTimeImmutable($next, new \DateTimeZone('UTC')) : null;
     }
 
     public function findByUuidAndOrganisation(string $uuid, Organisation $organisation): ?ScheduledTask
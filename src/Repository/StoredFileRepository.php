@@ -0,0 +1,107 @@
+<?php
+
+namespace App\Repository;
+
+use App\Entity\StoredFile;
+use Doctrine\DBAL\ParameterType;
+use Doctrine\DBAL\Types\Types;
+use Doctrine\Bundle\DoctrineBundle\Repository\ServiceEntityRepository;
+use Doctrine\Persistence\ManagerRegistry;
+
+/**
+ * @extends ServiceEntityRepository<StoredFile>
+ */
+class StoredFileRepository extends ServiceEntityRepository
+{
+    public function __construct(ManagerRegistry $registry)
+    {
+        parent::__construct($registry, StoredFile::class);
+    }
+
+    /**
+     * Add files to the index with one multi-row INSERT IGNORE, bypassing the unit of work.
+     *
+     * Keys that are already indexed (e.g. backfilled by a concurrent request) are skipped.
+     *
+     * @param StoredFile[] $storedFiles
+     */
+    public function insertIgnoreMultiple(array $storedFiles): void
+    {
+        if ($storedFiles === []) {
+            return;
+        }
+
+        $metadata = $this->getEntityManager()->getClassMetadata(StoredFile::class);
+        $columns = [
+            $metadata->getColumnName('storageKey'),
+            $metadata->getColumnName('originalName'),
+            $metadata->getColumnName('uploadedBy'),
+            $metadata->getColumnName('mimeType'),
+            $metadata->getColumnName('size'),
+            $metadata->getColumnName('uploadedAt'),
+        ];
+        $rowTypes = [
+            Types::STRING,
+            Types::STRING,
+            ParameterType::INTEGER,
+            Types::STRING,
+            ParameterType::INTEGER,
+            Types::DATETIME_MUTABLE,
+        ];
+
+        $params = [];
+        $types = [];
+        foreach ($storedFiles as $storedFile) {
+            array_push(
+                $params,
+                $storedFile->getStorageKey(),
+                $storedFile->getOriginalName(),
+                $storedFile->getUploadedBy(),
+                $storedFile->getMimeType(),
+                $storedFile->getSize(),
+                $storedFile->getUploadedAt(),
+            );
+            array_push($types, ...$rowTypes);
+        }
+
+        $rowPlaceholder = '(' . implode(', ', array_fill(0, count($columns), '?')) . ')';
+
+        $this->getEntityManager()->getConnection()->executeStatement(
+            sprintf(
+                'INSERT IGNORE INTO %s (%s) VALUES %s',
+                $metadata->getTableName(),
+                implode(', ', $columns),
+                implode(', ', array_fill(0, count($storedFiles), $rowPlaceholder))
+            ),
+            $params,
+            $types
+        );
+    }
+
+    /**
+     * @param string[] $storageKeys
+     * @return array<string, StoredFile> Indexed by storage key
+     */
+    public function findByStorageKeys(array $storageKeys): array
+    {
+        if ($storageKeys === []) {
+            return [];
+        }
+
+        return $this->createQueryBuilder('sf', 'sf.storageKey')
+            ->andWhere('sf.storageKey IN (:keys)')
+            ->setParameter('keys', $storageKeys)
+            ->getQuery()
+            ->getResult();
+    }
+
+    public function deleteByStorageKey(string $storageKey): void
+    {
+        $this->createQueryBuilder('sf')
+            ->delete()
+            ->andWhere('sf.storageKey = :key')
+            ->setParameter('key', $storageKey)
+            ->getQuery()
+            ->execute();
+    }
+}
@@ -5,13 +5,34 @@ namespace App\Service;
 use App\Entity\AuditLog;
 use App\Entity\User;
 use App\Repository\AuditLogRepository;
+use App\Repository\AuditStatRollupRepository;
+use Psr\Log\LoggerInterface;
 use Symfony\Component\HttpFoundation\RequestStack;
-
-class AuditLogService
+use Symfony\Contracts\Service\ResetInterface;
+
+/**
+ * Records audit events with write-behind semantics.
+ *
+ * Events are buffered in memory and written as one multi-row INSERT when the
+ * request, command or message finishes (see AuditLogFlushSubscriber), instead
+ * of a Doctrine flush per event. The daily statistics rollups are updated in
+ * the same step.
+ */
+class AuditLogService implements ResetInterface
 {
+    // Long-running loops flush early so the buffer can't grow unbounded
+    private const MAX_BUFFER_SIZE = 200;
+
+    /**
+     * @var AuditLog[]
+     */
+    private array $buffer = [];
+
     public function __construct(
         private AuditLogRepository $auditLogRepository,
-        private RequestStack $requestStack
+        private AuditStatRollupRepository $auditStatRollupRepository,
+        private RequestStack $requestStack,
+        private LoggerInterface $logger,
     ) {
     }
 
@@ -36,7 +57,7 @@ class AuditLogService
             $auditLog->setUserAgent($request->headers->get('User-Agent'));
         }
 
-        $this->auditLogRepository->save($auditLog, true);
+        $this->enqueue($auditLog);
     }
 
     public function logWithOrganisation(string $action, \App\Entity\Organisation $organisation, ?User $user = null, array $data = [], ?string $executionId = null): void
@@ -58,7 +79,61 @@ class AuditLogService
             $auditLog->setUserAgent($request->headers->get('User-Agent'));
         }
 
-        $this->auditLogRepository->save($auditLog, true);
+        $this->enqueue($auditLog);
+    }
+
+    /**
+     * Write all buffered audit events in a single statement
+     */
+    public function flush(): void
+    {
+        if ($this->buffer === []) {
+            return;
+        }
+
+        $auditLogs = $this->buffer;
+        $this->buffer = [];
+
+        $actions = array_values(array_unique(array_map(fn(AuditLog $log) => $log->getAction(), $auditLogs)));
+
+        // Audit logging must never break the request it describes
+        try {
+            $this->auditLogRepository->insertMultiple($auditLogs);
+        } catch (\Throwable $e) {
+            $this->logger->error('Failed to write audit log batch', [
+                'count' => count($auditLogs),
+                'actions' => $actions,
+                'error' => $e->getMessage(),
+            ]);
+
+            return;
+        }
+
+        try {
+            $this->auditStatRollupRepository->incrementFromAuditLogs($auditLogs);
+        } catch (\Throwable $e) {
+            // The audit log rows are written, the counters can be repaired with app:audit:rebuild-rollups
+            $this->logger->error('Failed to update audit stat rollups', [
+                'count' => count($auditLogs),
+                'actions' => $actions,
+                'error' => $e->getMessage(),
+            ]);
+        }
+    }
+
+    public function reset(): void
+    {
+        $this->flush();
+    }
+
+    private function enqueue(AuditLog $auditLog): void
+    {
+        $auditLog->setCreatedAt(new \DateTime());
+        $this->buffer[] = $auditLog;
+
+        if (count($this->buffer) >= self::MAX_BUFFER_SIZE) {
+            $this->flush();
+        }
     }
 
     /**
@@ -39,6 +39,7 @@ class ConnectionStatusService
         'timeout',
         'connection refused',
         'service unavailable',
+        'is unavailable', // UpstreamUnavailableException, open circuit
         'internal server error',
         'bad gateway',
         'network error',
@@ -53,6 +54,7 @@ class ConnectionStatusService
         private readonly EntityManagerInterface $entityManager,
         private readonly AuditLogService $auditLogService,
         private readonly LoggerInterface $logger,
+        private readonly ExecutionContextCache $executionContextCache,
     ) {
     }
 
@@ -221,6 +223,7 @@ class ConnectionStatusService
 
         $config->disconnect($truncatedReason);
         $this->entityManager->flush();
+        $this->executionContextCache->invalidateConfig($config->getId());
 
         $this->logger->warning('Integration marked as disconnected', [
             'integration_id' => $config->getId(),
@@ -249,6 +252,7 @@ class ConnectionStatusService
     {
         $config->reconnect();
         $this->entityManager->flush();
+        $this->executionContextCache->invalidateConfig($config->getId());
 
         $this->logger->info('Integration reconnected', [
             'integration_id' => $config->getId(),
@@ -7,6 +7,7 @@ namespace App\Service;
 use App\Entity\Organisation;
 use App\Entity\User;
 use App\Repository\AuditLogRepository;
+use App\Repository\AuditStatRollupRepository;
 use App\Repository\IntegrationConfigRepository;
 use Symfony\Contracts\Cache\CacheInterface;
 use Symfony\Contracts\Cache\ItemInterface;
@@ -15,8 +16,25 @@ class DashboardStatsService
 {
     private const CACHE_TTL = 300; // 5 minutes
 
+    private const API_CALL_ACTIONS = [
+        'api.get_tools',
+        'api.get_skills',
+        'api.mcp.get_tools',
+        'api.prompts.list',
+    ];
+
+    private const PROMPT_ACTIVITY_ACTIONS = [
+        'prompt.created',
+        'prompt.updated',
+        'prompt.upvote.added',
+        'prompt.upvote.removed',
+        'prompt.comment.added',
+        'prompt.comment.deleted',
+    ];
+
     public function __construct(
         private readonly AuditLogRepository $auditLogRepository,
+        private readonly AuditStatRollupRepository $auditStatRollupRepository,
         private readonly IntegrationConfigRepository $integrationConfigRepository,
         private readonly CacheInterface $cache,
     ) {
@@ -43,21 +61,28 @@ class DashboardStatsService
 
             $agentSessions = $this->auditLogRepository->countDistinctExecutionIds($orgId, $userId, $workflowUserId, $since);
 
-            $toolExecCounts = $this->auditLogRepository->countToolExecutions($orgId, $userId, $workflowUserId, $since);
-
-            $apiCalls = $this->auditLogRepository->countApiCalls($orgId, $userId, $workflowUserId, $since);
-            $promptActivity = $this->auditLogRepository->countPromptActivity($orgId, $userId, $workflowUserId, $since);
+            // Counters come from the daily rollups, so their cost doesn't grow with the audit log
+            $actionCounts = $this->auditStatRollupRepository->sumByAction(
+                $orgId,
+                $userId,
+                $workflowUserId,
+                $since,
+                ['tool_execution.started', ...self::API_CALL_ACTIONS, ...self::PROMPT_ACTIVITY_ACTIONS]
+            );
+            $toolExecutions = $actionCounts['tool_execution.started'];
+            $apiCalls = array_sum(array_intersect_key($actionCounts, array_flip(self::API_CALL_ACTIONS)));
+            $promptActivity = array_sum(array_intersect_key($actionCounts, array_flip(self::PROMPT_ACTIVITY_ACTIONS)));
 
             $activeSkills = count(
                 $this->integrationConfigRepository->findByOrganisationAndWorkflowUser($organisation, $workflowUserId)
             );
 
-            $toolTypesUsed = $this->auditLogRepository->countUniqueToolTypes($orgId, $userId, $workflowUserId, $since);
-            $topTools = $this->auditLogRepository->findTopTools($orgId, $userId, $workflowUserId, $since);
+            $toolTypesUsed = $this->auditStatRollupRepository->countUniqueToolTypes($orgId, $userId, $workflowUserId, $since);
+            $topTools = $this->auditStatRollupRepository->findTopTools($orgId, $userId, $workflowUserId, $since);
 
             return [
                 'agent_sessions' => $agentSessions,
-                'tool_executions' => $toolExecCounts['started'],
+                'tool_executions' => $toolExecutions,
                 'api_calls' => $apiCalls,
                 'prompt_activity' => $promptActivity,
                 'active_skills' => $activeSkills,
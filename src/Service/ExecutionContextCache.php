@@ -0,0 +1,275 @@
+<?php
+
+namespace App\Service;
+
+use App\Entity\Organisation;
+use App\Entity\User;
+use App\Integration\ToolCategory;
+use App\Repository\IntegrationConfigRepository;
+use App\Repository\OrganisationRepository;
+use Doctrine\ORM\EntityManagerInterface;
+
+/**
+ * Per-worker cache of everything /execute resolves before running a tool:
+ * the organisation, the workflow user's access mode and the integration
+ * config including its decrypted credentials.
+ *
+ * Agents call many tools for the same user and config within seconds, so
+ * entries live in memory for a short TTL. Every entry is bound to the
+ * organisation's tool catalog version (one Redis GET), which is bumped on
+ * any config, access mode or organisation change in any worker. Decrypted
+ * credentials are zeroed when their entry is evicted.
+ */
+class ExecutionContextCache
+{
+    private const TTL = 30; // seconds
+    private const MAX_ENTRIES = 1000;
+
+    /**
+     * @var array<string, array{organisation_id: int, version: string, expires_at: float, value: mixed}>
+     */
+    private array $entries = [];
+
+    public function __construct(
+        private readonly OrganisationRepository $organisationRepository,
+        private readonly IntegrationConfigRepository $integrationConfigRepository,
+        private readonly EncryptionService $encryptionService,
+        private readonly ToolCatalogCache $toolCatalogCache,
+        private readonly EntityManagerInterface $entityManager,
+    ) {
+    }
+
+    /**
+     * @return array{id: int, uuid: string, name: string, version: string, entity: Organisation}|null
+     */
+    public function resolveOrganisation(string $uuid): ?array
+    {
+        $key = 'org:' . $uuid;
+        $entry = $this->entries[$key] ?? null;
+
+        if ($entry !== null) {
+            $version = $this->toolCatalogCache->getVersion($entry['organisation_id']);
+            if ($this->isFresh($entry, $version)) {
+                return $entry['value'] + [
+                    'version' => $version,
+                    'entity' => $this->entityManager->getReference(Organisation::class, $entry['organisation_id']),
+                ];
+            }
+            $this->evict($key);
+        }
+
+        $organisation = $this->organisationRepository->findOneBy(['uuid' => $uuid]);
+        if (!$organisation) {
+            return null;
+        }
+
+        $version = $this->toolCatalogCache->getVersion($organisation->getId());
+        $value = [
+            'id' => $organisation->getId(),
+            'uuid' => $organisation->getUuid(),
+            'name' => $organisation->getName(),
+        ];
+        $this->store($key, $organisation->getId(), $version, $value);
+
+        return $value + ['version' => $version, 'entity' => $organisation];
+    }
+
+    /**
+     * Access mode of the user behind a workflow user ID, null if no user is linked.
+     *
+     * @param array{id: int, version: string, entity: Organisation} $organisation
+     * @return array{mode: string, categories: ToolCategory[]}|null
+     */
+    public function getAccessMode(array $organisation, string $workflowUserId): ?array
+    {
+        $value = $this->remember(
+            'access:' . $organisation['id'] . ':' . $workflowUserId,
+            $organisation,
+            function () use ($organisation, $workflowUserId): ?array {
+                $user = $this->integrationConfigRepository->findUserByWorkflowUserId($organisation['entity'], $workflowUserId);
+
+                return $user ? [
+                    'mode' => $user->getToolAccessMode(),
+                    'categories' => array_map(fn(ToolCategory $category) => $category->value, $user->getAllowedToolCategories()),
+                ] : null;
+            }
+        );
+
+        return $value === null ? null : [
+            'mode' => $value['mode'],
+            'categories' => array_map(fn(string $category) => ToolCategory::from($category), $value['categories']),
+        ];
+    }
+
+    /**
+     * Integration config of the organisation with decrypted credentials, null if it doesn't belong to it.
+     *
+     * @param array{id: int, version: string, entity: Organisation} $organisation
+     * @return array{id: int, user_id: ?int, active: bool, disabled_tools: string[], last_accessed_at: ?\DateTimeInterface, credentials: ?array}|null
+     */
+    public function getConfig(array $organisation, int $configId): ?array
+    {
+        $value = $this->remember(
+            $this->configKey($organisation['id'], $configId),
+            $organisation,
+            function () use ($organisation, $configId): ?array {
+                $config = $this->integrationConfigRepository->find($configId);
+                if (!$config || $config->getOrganisation()?->getId() !== $organisation['id']) {
+                    return null;
+                }
+
+                $encryptedCredentials = $config->getEncryptedCredentials();
+
+                return [
+                    'id' => $configId,
+                    'user_id' => $config->getUser()?->getId(),
+                    'active' => $config->isActive(),
+                    'disabled_tools' => $config->getDisabledTools(),
+                    'last_accessed_at' => $config->getLastAccessedAt(),
+                    'credentials_json' => $encryptedCredentials ? $this->encryptionService->decrypt($encryptedCredentials) : null,
+                ];
+            }
+        );
+
+        if ($value === null) {
+            return null;
+        }
+
+        $credentialsJson = $value['credentials_json'];
+        unset($value['credentials_json']);
+
+        return $value + ['credentials' => $credentialsJson !== null ? json_decode($credentialsJson, true) : null];
+    }
+
+    /**
+     * Config of a system tool integration for the workflow user (only used for tool toggles).
+     *
+     * @param array{id: int, version: string, entity: Organisation} $organisation
+     * @return array{active: bool, disabled_tools: string[]}|null
+     */
+    public function getSystemToolConfig(array $organisation, string $integrationType, ?string $workflowUserId): ?array
+    {
+        return $this->remember(
+            'system:' . $organisation['id'] . ':' . $integrationType . ':' . $workflowUserId,
+            $organisation,
+            function () use ($organisation, $integrationType, $workflowUserId): ?array {
+                $config = $this->integrationConfigRepository->findOneByOrganisationAndType(
+                    $organisation['entity'],
+                    $integrationType,
+                    $workflowUserId
+                );
+
+                return $config ? [
+                    'active' => $config->isActive(),
+                    'disabled_tools' => $config->getDisabledTools(),
+                ] : null;
+            }
+        );
+    }
+
+    /**
+     * Record a config access; the database is written at most once per interval.
+     *
+     * @param array{id: int} $organisation
+     * @param array{id: int, last_accessed_at: ?\DateTimeInterface} $config
+     */
+    public function markAccessed(array $organisation, array $config): void
+    {
+        $accessedAt = $this->integrationConfigRepository->updateLastAccessedById($config['id'], $config['last_accessed_at']);
+
+        $key = $this->configKey($organisation['id'], $config['id']);
+        if ($accessedAt !== null && isset($this->entries[$key]['value'])) {
+            $this->entries[$key]['value']['last_accessed_at'] = $accessedAt;
+        }
+    }
+
+    public function getUserReference(int $userId): User
+    {
+        return $this->entityManager->getReference(User::class, $userId);
+    }
+
+    /**
+     * Drop a config from this worker's cache, e.g. after it was saved or disconnected.
+     * Other workers notice the change through the bumped catalog version.
+     */
+    public function invalidateConfig(int $configId): void
+    {
+        // The config may have been looked up by several organisations, only the owner got it
+        foreach (array_keys($this->entries) as $key) {
+            if (str_starts_with($key, 'config:') && str_ends_with($key, ':' . $configId)) {
+                $this->evict($key);
+            }
+        }
+    }
+
+    private function configKey(int $organisationId, int $configId): string
+    {
+        return 'config:' . $organisationId . ':' . $configId;
+    }
+
+    /**
+     * @param array{id: int, version: string} $organisation
+     */
+    private function remember(string $key, array $organisation, callable $loader): mixed
+    {
+        $entry = $this->entries[$key] ?? null;
+        if ($entry !== null) {
+            // Catalog versions are per organisation counters, so they alone can't tell organisations apart
+            if ($entry['organisation_id'] === $organisation['id'] && $this->isFresh($entry, $organisation['version'])) {
+                return $entry['value'];
+            }
+            $this->evict($key);
+        }
+
+        $value = $loader();
+        $this->store($key, $organisation['id'], $organisation['version'], $value);
+
+        return $value;
+    }
+
+    private function isFresh(array $entry, string $version): bool
+    {
+        return $entry['version'] === $version && $entry['expires_at'] > microtime(true);
+    }
+
+    private function store(string $key, int $organisationId, string $version, mixed $value): void
+    {
+        if (count($this->entries) >= self::MAX_ENTRIES) {
+            $this->evictExpired();
+        }
+        if (count($this->entries) >= self::MAX_ENTRIES) {
+            // Oldest entry first, insertion order is kept by the array
+            $this->evict(array_key_first($this->entries));
+        }
+
+        $this->entries[$key] = [
+            'organisation_id' => $organisationId,
+            'version' => $version,
+            'expires_at' => microtime(true) + self::TTL,
+            'value' => $value,
+        ];
+    }
+
+    private function evictExpired(): void
+    {
+        $now = microtime(true);
+        foreach ($this->entries as $key => $entry) {
+            if ($entry['expires_at'] <= $now) {
+                $this->evict($key);
+            }
+        }
+    }
+
+    private function evict(string $key): void
+    {
+        if (!isset($this->entries[$key])) {
+            return;
+        }
+
+        if (is_string($this->entries[$key]['value']['credentials_json'] ?? null)) {
+            sodium_memzero($this->entries[$key]['value']['credentials_json']);
+        }
+
+        unset($this->entries[$key]);
+    }
+}
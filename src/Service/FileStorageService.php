@@ -2,14 +2,21 @@
 
 namespace App\Service;
 
+use App\Entity\StoredFile;
+use App\Repository\StoredFileRepository;
+use Aws\Exception\MultipartUploadException;
+use Aws\ResultInterface;
 use Aws\S3\S3Client;
 use Aws\S3\Exception\S3Exception;
+use GuzzleHttp\Promise\Utils;
 use Psr\Log\LoggerInterface;
 use Symfony\Component\HttpFoundation\File\UploadedFile;
 use Symfony\Component\DependencyInjection\ParameterBag\ParameterBagInterface;
 
 class FileStorageService
 {
+    public const LIST_PAGE_SIZE = 100;
+
     private ?S3Client $s3Client = null;
     private string $bucket;
     private array $allowedExtensions = [
@@ -17,10 +24,13 @@ class FileStorageService
         'jpg', 'jpeg', 'png', 'gif', 'bmp'
     ];
     private int $maxFileSize = 104857600; // 100MB
-    private bool $bucketChecked = false;
+
+    // Shared by all instances, the bucket only has to be checked once per process
+    private static bool $bucketChecked = false;
 
     public function __construct(
         private ParameterBagInterface $params,
+        private StoredFileRepository $storedFileRepository,
         private LoggerInterface $logger
     ) {
         $this->bucket = $params->get('minio.bucket');
@@ -45,7 +55,7 @@ class FileStorageService
 
     private function ensureBucketExists(): void
     {
-        if ($this->bucketChecked) {
+        if (self::$bucketChecked) {
             return;
         }
 
@@ -56,13 +66,38 @@ class FileStorageService
                     'Bucket' => $this->bucket,
                 ]);
             }
-            $this->bucketChecked = true;
+            self::$bucketChecked = true;
         } catch (S3Exception $e) {
+            // Not marked as checked, the next upload tries again
             $this->logger->error('Failed to create bucket', [
                 'bucket' => $this->bucket,
                 'error' => $e->getMessage()
             ]);
-            $this->bucketChecked = true; // Mark as checked even on failure to avoid repeated attempts
+        }
+    }
+
+    /**
+     * @param string|resource $body
+     * @param array<string, string> $metadata
+     */
+    private function putObject(string $key, mixed $body, string $contentType, array $metadata): ResultInterface
+    {
+        return MultipartUpload::upload($this->getS3Client(), $this->bucket, $key, $body, [
+            'ContentType' => $contentType,
+            'Metadata' => $metadata,
+        ]);
+    }
+
+    private function index(StoredFile $storedFile): void
+    {
+        try {
+            $this->storedFileRepository->insertIgnoreMultiple([$storedFile]);
+        } catch (\Throwable $e) {
+            // The file is still listed, its metadata is read from storage instead
+            $this->logger->warning('Failed to index uploaded file', [
+                'error' => $e->getMessage(),
+                'key' => $storedFile->getStorageKey()
+            ]);
         }
     }
 
@@ -89,18 +124,21 @@ class FileStorageService
         );
 
         try {
-            $result = $this->getS3Client()->putObject([
-                'Bucket' => $this->bucket,
-                'Key' => $filename,
-                'Body' => fopen($file->getPathname(), 'r'),
-                'ContentType' => $file->getMimeType(),
-                'Metadata' => [
-                    'original_name' => $file->getClientOriginalName(),
-                    'uploaded_by' => (string) $userId,
-                    'uploaded_at' => date('Y-m-d H:i:s'),
-                ]
+            $result = $this->putObject($filename, fopen($file->getPathname(), 'r'), $file->getMimeType(), [
+                'original_name' => $file->getClientOriginalName(),
+                'uploaded_by' => (string) $userId,
+                'uploaded_at' => date('Y-m-d H:i:s'),
             ]);
 
+            $this->index(new StoredFile(
+                $filename,
+                $file->getClientOriginalName(),
+                $userId,
+                $file->getMimeType(),
+                (int) $file->getSize(),
+                new \DateTime()
+            ));
+
             return [
                 'key' => $filename,
                 'original_name' => $file->getClientOriginalName(),
@@ -108,7 +146,7 @@ class FileStorageService
                 'mime_type' => $file->getMimeType(),
                 'url' => $result['ObjectURL'] ?? null,
             ];
-        } catch (S3Exception $e) {
+        } catch (S3Exception|MultipartUploadException $e) {
             $this->logger->error('File upload failed', [
                 'error' => $e->getMessage(),
                 'file' => $file->getClientOriginalName()
@@ -117,7 +155,10 @@ class FileStorageService
         }
     }
 
-    public function uploadContent(string $content, string $filename, string $orgUuid, int $userId): array
+    /**
+     * @param string|resource $content Text, or a stream to upload without loading it into memory
+     */
+    public function uploadContent(mixed $content, string $filename, string $orgUuid, int $userId): array
     {
         $this->ensureBucketExists();
 
@@ -135,7 +176,7 @@ class FileStorageService
         }
 
         // Validate content size
-        $contentSize = strlen($content);
+        $contentSize = is_resource($content) ? (fstat($content)['size'] ?? 0) : strlen($content);
         if ($contentSize > $this->maxFileSize) {
             throw new \InvalidArgumentException('Content size exceeds maximum allowed size');
         }
@@ -149,18 +190,14 @@ class FileStorageService
         );
 
         try {
-            $result = $this->getS3Client()->putObject([
-                'Bucket' => $this->bucket,
-                'Key' => $key,
-                'Body' => $content,
-                'ContentType' => 'text/plain; charset=utf-8',
-                'Metadata' => [
-                    'original_name' => $filename,
-                    'uploaded_by' => (string) $userId,
-                    'uploaded_at' => date('Y-m-d H:i:s'),
-                ]
+            $result = $this->putObject($key, $content, 'text/plain; charset=utf-8', [
+                'original_name' => $filename,
+                'uploaded_by' => (string) $userId,
+                'uploaded_at' => date('Y-m-d H:i:s'),
             ]);
 
+            $this->index(new StoredFile($key, $filename, $userId, 'text/plain', $contentSize, new \DateTime()));
+
             return [
                 'key' => $key,
                 'original_name' => $filename,
@@ -168,7 +205,7 @@ class FileStorageService
                 'mime_type' => 'text/plain',
                 'url' => $result['ObjectURL'] ?? null,
             ];
-        } catch (S3Exception $e) {
+        } catch (S3Exception|MultipartUploadException $e) {
             $this->logger->error('Text file creation failed', [
                 'error' => $e->getMessage(),
                 'filename' => $filename
@@ -177,34 +214,50 @@ class FileStorageService
         }
     }
 
-    public function listFiles(string $orgUuid): array
+    /**
+     * List one page of the organisation's files.
+     *
+     * Metadata comes from the StoredFile index; objects missing from it are
+     * read with concurrent HEAD requests and added to the index.
+     *
+     * @return array{files: array<int, array<string, mixed>>, next_token: ?string}
+     */
+    public function listFiles(string $orgUuid, ?string $continuationToken = null, int $limit = self::LIST_PAGE_SIZE): array
     {
-        $this->ensureBucketExists();
-
         try {
             $s3Client = $this->getS3Client();
-            $objects = $s3Client->listObjectsV2([
+            $request = [
                 'Bucket' => $this->bucket,
                 'Prefix' => $orgUuid . '/',
-            ]);
+                'MaxKeys' => $limit,
+            ];
+            if ($continuationToken !== null && $continuationToken !== '') {
+                $request['ContinuationToken'] = $continuationToken;
+            }
+            $objects = $s3Client->listObjectsV2($request);
+
+            $contents = $objects['Contents'] ?? [];
+            $indexed = $this->storedFileRepository->findByStorageKeys(array_column($contents, 'Key'));
+            $heads = $this->fetchMissingMetadata($contents, $indexed);
 
             $files = [];
-            foreach ($objects['Contents'] ?? [] as $object) {
-                $metadata = $s3Client->headObject([
-                    'Bucket' => $this->bucket,
-                    'Key' => $object['Key'],
-                ]);
+            foreach ($contents as $object) {
+                $storedFile = $indexed[$object['Key']] ?? null;
+                $metadata = $heads[$object['Key']] ?? [];
 
                 $files[] = [
                     'key' => $object['Key'],
-                    'original_name' => $metadata['Metadata']['original_name'] ?? basename($object['Key']),
+                    'original_name' => $storedFile?->getOriginalName() ?? $metadata['original_name'] ?? basename($object['Key']),
                     'size' => $object['Size'],
                     'last_modified' => $object['LastModified'],
-                    'uploaded_by' => $metadata['Metadata']['uploaded_by'] ?? null,
+                    'uploaded_by' => $storedFile?->getUploadedBy() ?? $metadata['uploaded_by'] ?? null,
                 ];
             }
 
-            return $files;
+            return [
+                'files' => $files,
+                'next_token' => !empty($objects['IsTruncated']) ? ($objects['NextContinuationToken'] ?? null) : null,
+            ];
         } catch (S3Exception $e) {
             $this->logger->error('Failed to list files', [
                 'error' => $e->getMessage(),
@@ -216,15 +269,77 @@ class FileStorageService
         }
     }
 
-    public function delete(string $key): bool
+    /**
+     * HEAD all listed objects that aren't indexed yet, concurrently, and backfill the index.
+     *
+     * @param array<int, array<string, mixed>> $contents
+     * @param array<string, StoredFile> $indexed
+     * @return array<string, array<string, string>> Object metadata by key
+     */
+    private function fetchMissingMetadata(array $contents, array $indexed): array
     {
-        $this->ensureBucketExists();
+        $s3Client = $this->getS3Client();
+        $promises = [];
+        foreach ($contents as $object) {
+            if (!isset($indexed[$object['Key']])) {
+                $promises[$object['Key']] = $s3Client->headObjectAsync([
+                    'Bucket' => $this->bucket,
+                    'Key' => $object['Key'],
+                ]);
+            }
+        }
+
+        if ($promises === []) {
+            return [];
+        }
+
+        $objectsByKey = array_column($contents, null, 'Key');
+        $metadataByKey = [];
+        $backfill = [];
+        foreach (Utils::settle($promises)->wait() as $key => $result) {
+            if ($result['state'] !== 'fulfilled') {
+                $this->logger->warning('Failed to read file metadata', [
+                    'key' => $key,
+                    'error' => $result['reason'] instanceof \Throwable ? $result['reason']->getMessage() : (string) $result['reason']
+                ]);
+                continue;
+            }
+
+            $metadata = $result['value']['Metadata'] ?? [];
+            $metadataByKey[$key] = $metadata;
+
+            $uploadedAt = \DateTime::createFromFormat('Y-m-d H:i:s', $metadata['uploaded_at'] ?? '')
+                ?: new \DateTime($objectsByKey[$key]['LastModified']->format(\DateTimeInterface::ATOM));
+            $backfill[] = new StoredFile(
+                $key,
+                $metadata['original_name'] ?? basename($key),
+                isset($metadata['uploaded_by']) ? (int) $metadata['uploaded_by'] : null,
+                $result['value']['ContentType'] ?? null,
+                (int) $objectsByKey[$key]['Size'],
+                $uploadedAt
+            );
+        }
+
+        try {
+            $this->storedFileRepository->insertIgnoreMultiple($backfill);
+        } catch (\Throwable $e) {
+            $this->logger->warning('Failed to backfill file index', [
+                'error' => $e->getMessage(),
+                'count' => count($backfill)
+            ]);
+        }
+
+        return $metadataByKey;
+    }
 
+    public function delete(string $key): bool
+    {
         try {
             $this->getS3Client()->deleteObject([
                 'Bucket' => $this->bucket,
                 'Key' => $key,
             ]);
+            $this->storedFileRepository->deleteByStorageKey($key);
             return true;
         } catch (S3Exception $e) {
             $this->logger->error('Failed to delete file', [
@@ -237,8 +352,6 @@ class FileStorageService
 
     public function getDownloadUrl(string $key, int $expiration = 3600): string
     {
-        $this->ensureBucketExists();
-
         try {
             $s3Client = $this->getS3Client();
             $cmd = $s3Client->getCommand('GetObject', [
@@ -264,6 +377,7 @@ class FileStorageService
             $this->getS3Client()->headBucket([
                 'Bucket' => $this->bucket,
             ]);
+            self::$bucketChecked = true;
             return true;
         } catch (S3Exception $e) {
             $this->logger->error('MinIO connection check failed', [
@@ -0,0 +1,122 @@
+<?php
+
+namespace App\Service\Http;
+
+use Symfony\Component\DependencyInjection\Attribute\AsDecorator;
+use Symfony\Component\DependencyInjection\Attribute\AutowireDecorated;
+use Symfony\Component\HttpClient\AsyncDecoratorTrait;
+use Symfony\Component\HttpClient\Response\AsyncContext;
+use Symfony\Component\HttpClient\Response\AsyncResponse;
+use Symfony\Contracts\HttpClient\ChunkInterface;
+use Symfony\Contracts\HttpClient\Exception\TransportExceptionInterface;
+use Symfony\Contracts\HttpClient\HttpClientInterface;
+use Symfony\Contracts\HttpClient\ResponseInterface;
+use Symfony\Contracts\Service\ResetInterface;
+
+/**
+ * Guards every request of the application HttpClient with the UpstreamCircuitBreaker.
+ *
+ * Requests are grouped by host; callers can name the upstream explicitly with
+ * the "extra" option, e.g. ['extra' => ['upstream' => 'remote_mcp:42']]. Hosts
+ * shared by all customers are grouped per UpstreamScope (e.g.
+ * graph.microsoft.com:config:42) and left unguarded outside of one, so a single
+ * tenant can't open the circuit or use up the slots for everybody. When the
+ * circuit of the upstream is open, request() throws an UpstreamUnavailableException
+ * right away. Otherwise the response releases its slot once it completes and
+ * reports whether the upstream failed. Throttling responses with Retry-After
+ * are the upstream pacing one tenant, not an outage, and don't count as failures.
+ *
+ * Decorated before MultiplexingHttpClient (higher priority), so concurrent
+ * tasks are limited like any other request.
+ */
+#[AsDecorator('http_client', priority: 10)]
+class CircuitBreakingHttpClient implements HttpClientInterface, ResetInterface
+{
+    use AsyncDecoratorTrait;
+
+    // Multi-tenant SaaS hosts, their state is tracked per UpstreamScope
+    public const SHARED_HOSTS = [
+        'graph.microsoft.com',
+        'login.microsoftonline.com',
+        'api.hubapi.com',
+        'api.trello.com',
+        'www.wrike.com',
+        'login.wrike.com',
+        'gitlab.com',
+    ];
+
+    private const FAILURE_STATUS_CODES = [502, 503, 504];
+
+    public function __construct(
+        #[AutowireDecorated]
+        HttpClientInterface $client,
+        private UpstreamCircuitBreaker $circuitBreaker,
+        private UpstreamScope $upstreamScope,
+    ) {
+        $this->client = $client;
+    }
+
+    public function request(string $method, string $url, array $options = []): ResponseInterface
+    {
+        $upstream = $options['extra']['upstream'] ?? $this->resolveUpstream($url, $options);
+        $ticket = $upstream !== null ? $this->circuitBreaker->acquire($upstream) : null;
+
+        if ($ticket === null) {
+            return new AsyncResponse($this->client, $method, $url, $options);
+        }
+
+        $released = false;
+        $release = function (?string $failure) use ($ticket, &$released): void {
+            if (!$released) {
+                $released = true;
+                $this->circuitBreaker->release($ticket, $failure);
+            }
+        };
+
+        return new AsyncResponse(
+            $this->client,
+            $method,
+            $url,
+            $options,
+            static function (ChunkInterface $chunk, AsyncContext $context) use ($release): \Generator {
+                try {
+                    if ($chunk->isTimeout()) {
+                        $release('Idle timeout reached');
+                    } elseif ($chunk->isFirst()) {
+                        $statusCode = $context->getStatusCode();
+                        if (in_array($statusCode, self::FAILURE_STATUS_CODES, true) && !isset($context->getHeaders()['retry-after'])) {
+                            $release('HTTP ' . $statusCode);
+                        }
+                    } elseif ($chunk->isLast()) {
+                        $release(null);
+                    }
+                } catch (TransportExceptionInterface $e) {
+                    // Error chunks throw when inspected, the caller still gets the error from the yielded chunk
+                    $release($e->getMessage());
+                }
+
+                yield $chunk;
+            }
+        );
+    }
+
+    private function resolveUpstream(string $url, array $options): ?string
+    {
+        $host = parse_url($url, PHP_URL_HOST);
+        if (!is_string($host) && isset($options['base_uri'])) {
+            $host = parse_url((string) $options['base_uri'], PHP_URL_HOST);
+        }
+        if (!is_string($host)) {
+            return null;
+        }
+
+        $host = strtolower($host);
+        if (!in_array($host, self::SHARED_HOSTS, true)) {
+            return $host;
+        }
+
+        $scope = $this->upstreamScope->current();
+
+        return $scope !== null ? $host . ':' . $scope : null;
+    }
+}
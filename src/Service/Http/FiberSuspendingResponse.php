@@ -0,0 +1,87 @@
+<?php
+
+namespace App\Service\Http;
+
+use Symfony\Component\HttpClient\Exception\TimeoutException;
+use Symfony\Contracts\HttpClient\ResponseInterface;
+
+/**
+ * Response handed out by MultiplexingHttpClient inside a concurrent task.
+ *
+ * Instead of blocking the whole process, reading the response suspends the
+ * task's Fiber until the scheduler has received the complete response.
+ */
+class FiberSuspendingResponse implements ResponseInterface
+{
+    private bool $completed = false;
+    private bool $timedOut = false;
+
+    public function __construct(
+        private readonly ResponseInterface $response,
+    ) {
+    }
+
+    public function getInnerResponse(): ResponseInterface
+    {
+        return $this->response;
+    }
+
+    /**
+     * Called by the scheduler once the last chunk (or an error) was received.
+     */
+    public function markCompleted(bool $timedOut = false): void
+    {
+        $this->completed = true;
+        $this->timedOut = $timedOut;
+    }
+
+    public function getStatusCode(): int
+    {
+        $this->await();
+
+        return $this->response->getStatusCode();
+    }
+
+    public function getHeaders(bool $throw = true): array
+    {
+        $this->await();
+
+        return $this->response->getHeaders($throw);
+    }
+
+    public function getContent(bool $throw = true): string
+    {
+        $this->await();
+
+        return $this->response->getContent($throw);
+    }
+
+    public function toArray(bool $throw = true): array
+    {
+        $this->await();
+
+        return $this->response->toArray($throw);
+    }
+
+    public function cancel(): void
+    {
+        $this->completed = true;
+        $this->response->cancel();
+    }
+
+    public function getInfo(?string $type = null): mixed
+    {
+        return $this->response->getInfo($type);
+    }
+
+    private function await(): void
+    {
+        while (!$this->completed && \Fiber::getCurrent() !== null) {
+            \Fiber::suspend($this);
+        }
+
+        if ($this->timedOut) {
+            throw new TimeoutException(sprintf('Idle timeout reached for "%s".', $this->response->getInfo('url')));
+        }
+    }
+}
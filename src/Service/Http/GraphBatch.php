@@ -0,0 +1,171 @@
+<?php
+
+namespace App\Service\Http;
+
+use Symfony\Contracts\HttpClient\HttpClientInterface;
+use Symfony\Contracts\HttpClient\ResponseInterface;
+
+/**
+ * Sends independent Microsoft Graph requests as JSON batches ($batch).
+ *
+ * Graph accepts up to MAX_BATCH_SIZE requests per batch, larger sets are split
+ * and the batches are sent concurrently. Every request gets its own status
+ * code back; requests throttled by Graph (429/503, for the whole batch or a
+ * single item) are sent again after the longest Retry-After they reported,
+ * capped at MAX_RETRY_AFTER_SECONDS. So "list my teams with their channels"
+ * costs two round trips instead of one per team.
+ *
+ * Integration services create one per call with their own HttpClient and the
+ * user's access token, like the Paginator.
+ */
+class GraphBatch
+{
+    public const MAX_BATCH_SIZE = 20;
+    private const BATCH_URL = 'https://graph.microsoft.com/v1.0/$batch';
+    private const MAX_ATTEMPTS = 3;
+    private const MAX_RETRY_AFTER_SECONDS = 30;
+    private const DEFAULT_RETRY_AFTER_SECONDS = 5;
+
+    public function __construct(
+        private HttpClientInterface $httpClient,
+        private string $accessToken
+    ) {
+    }
+
+    /**
+     * Execute the requests and return their results in the order given.
+     *
+     * @param array<string|int, array{method?: string, url: string, body?: array<string, mixed>, headers?: array<string, string>}> $requests
+     *        Keyed by a caller chosen ID, url is relative to the v1.0 endpoint (e.g. "/teams/{id}/channels?$select=id")
+     * @return array<string|int, array{status: int, body: mixed}> Keyed by the request IDs
+     */
+    public function execute(array $requests): array
+    {
+        $results = [];
+        $pending = $requests;
+
+        for ($attempt = 1; $pending !== []; $attempt++) {
+            $isLastAttempt = $attempt >= self::MAX_ATTEMPTS;
+            $throttled = [];
+            $retryAfter = 0;
+
+            // Send all batches first so they run concurrently, then read them in order
+            $batches = [];
+            foreach (array_chunk($pending, self::MAX_BATCH_SIZE, true) as $chunk) {
+                $batches[] = [$chunk, $this->send($chunk)];
+            }
+
+            foreach ($batches as [$chunk, $response]) {
+                $status = $response->getStatusCode();
+
+                if (self::isThrottled($status) && !$isLastAttempt) {
+                    $throttled += $chunk;
+                    $retryAfter = max($retryAfter, self::retryAfter($response->getHeaders(false)));
+                    continue;
+                }
+
+                if ($status < 200 || $status >= 300) {
+                    $body = json_decode($response->getContent(false), true);
+                    foreach (array_keys($chunk) as $id) {
+                        $results[$id] = ['status' => $status, 'body' => $body];
+                    }
+                    continue;
+                }
+
+                foreach ($response->toArray()['responses'] ?? [] as $item) {
+                    $id = $item['id'] ?? null;
+                    if ($id === null || !array_key_exists($id, $chunk)) {
+                        continue;
+                    }
+
+                    $itemStatus = (int) ($item['status'] ?? 0);
+                    if (self::isThrottled($itemStatus) && !$isLastAttempt) {
+                        $throttled[$id] = $chunk[$id];
+                        $retryAfter = max($retryAfter, self::retryAfter($item['headers'] ?? []));
+                        continue;
+                    }
+
+                    $results[$id] = ['status' => $itemStatus, 'body' => $item['body'] ?? null];
+                }
+            }
+
+            if ($throttled !== []) {
+                error_log(sprintf('Microsoft Graph batch: %d requests throttled, retrying after %d seconds', count($throttled), $retryAfter));
+                sleep($retryAfter);
+            }
+
+            $pending = $throttled;
+        }
+
+        $ordered = [];
+        foreach (array_keys($requests) as $id) {
+            $ordered[$id] = $results[$id] ?? ['status' => 0, 'body' => null];
+        }
+
+        return $ordered;
+    }
+
+    /**
+     * Error message of a batch result, null when the request succeeded.
+     *
+     * @param array{status: int, body: mixed} $result
+     */
+    public static function errorMessage(array $result): ?string
+    {
+        if ($result['status'] >= 200 && $result['status'] < 300) {
+            return null;
+        }
+
+        $message = is_array($result['body']) ? ($result['body']['error']['message'] ?? null) : null;
+
+        return $message ?? ($result['status'] === 0 ? 'No response in batch' : 'HTTP ' . $result['status']);
+    }
+
+    /**
+     * @param array<string|int, array{method?: string, url: string, body?: array<string, mixed>, headers?: array<string, string>}> $requests
+     */
+    private function send(array $requests): ResponseInterface
+    {
+        $items = [];
+        foreach ($requests as $id => $request) {
+            $item = [
+                'id' => (string) $id,
+                'method' => $request['method'] ?? 'GET',
+                'url' => $request['url'],
+            ];
+            if (isset($request['body'])) {
+                $item['body'] = $request['body'];
+                $item['headers'] = ($request['headers'] ?? []) + ['Content-Type' => 'application/json'];
+            } elseif (isset($request['headers'])) {
+                $item['headers'] = $request['headers'];
+            }
+            $items[] = $item;
+        }
+
+        return $this->httpClient->request('POST', self::BATCH_URL, [
+            'auth_bearer' => $this->accessToken,
+            'json' => ['requests' => $items],
+        ]);
+    }
+
+    private static function isThrottled(int $status): bool
+    {
+        return $status === 429 || $status === 503;
+    }
+
+    /**
+     * Seconds to wait according to Retry-After, from HTTP response headers (lists) or batch item headers (strings).
+     *
+     * @param array<string, string|string[]> $headers
+     */
+    private static function retryAfter(array $headers): int
+    {
+        $value = array_change_key_case($headers)['retry-after'] ?? null;
+        if (is_array($value)) {
+            $value = $value[0] ?? null;
+        }
+        $seconds = is_numeric($value) ? (int) $value : self::DEFAULT_RETRY_AFTER_SECONDS;
+
+        return max(0, min($seconds, self::MAX_RETRY_AFTER_SECONDS));
+    }
+}
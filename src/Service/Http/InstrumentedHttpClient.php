@@ -0,0 +1,85 @@
+<?php
+
+namespace App\Service\Http;
+
+use App\Service\MetricsService;
+use Symfony\Component\DependencyInjection\Attribute\AsDecorator;
+use Symfony\Component\DependencyInjection\Attribute\AutowireDecorated;
+use Symfony\Component\HttpClient\AsyncDecoratorTrait;
+use Symfony\Component\HttpClient\Response\AsyncContext;
+use Symfony\Component\HttpClient\Response\AsyncResponse;
+use Symfony\Contracts\HttpClient\ChunkInterface;
+use Symfony\Contracts\HttpClient\Exception\TransportExceptionInterface;
+use Symfony\Contracts\HttpClient\HttpClientInterface;
+use Symfony\Contracts\HttpClient\ResponseInterface;
+use Symfony\Contracts\Service\ResetInterface;
+
+/**
+ * Records the duration of every upstream request, labelled with the upstream and
+ * the tool making it (see MetricsService::setToolContext()).
+ *
+ * Customer hosts (Jira sites, SAP systems, remote MCP servers, ...) would give
+ * every tenant its own series, so only the shared SaaS hosts are labelled by
+ * name; other requests are labelled with the integration making them.
+ *
+ * Decorated innermost (highest priority), so requests rejected by the
+ * CircuitBreakingHttpClient are not counted as upstream requests.
+ */
+#[AsDecorator('http_client', priority: 20)]
+class InstrumentedHttpClient implements HttpClientInterface, ResetInterface
+{
+    use AsyncDecoratorTrait;
+
+    public function __construct(
+        #[AutowireDecorated]
+        HttpClientInterface $client,
+        private MetricsService $metricsService,
+    ) {
+        $this->client = $client;
+    }
+
+    public function request(string $method, string $url, array $options = []): ResponseInterface
+    {
+        $toolContext = $this->metricsService->getToolContext();
+        $labels = ['upstream' => $this->resolveUpstream($url, $options, $toolContext['integration'])] + $toolContext;
+        $startedAt = microtime(true);
+        $status = null;
+
+        $record = function (string $outcome) use ($labels, $startedAt, &$status): void {
+            if ($status === null) {
+                $status = $outcome;
+                $this->metricsService->observe('workoflow_upstream_request_duration_seconds', microtime(true) - $startedAt, $labels);
+                $this->metricsService->increment('workoflow_upstream_requests_total', ['upstream' => $labels['upstream'], 'status' => $outcome]);
+            }
+        };
+
+        return new AsyncResponse(
+            $this->client,
+            $method,
+            $url,
+            $options,
+            static function (ChunkInterface $chunk, AsyncContext $context) use ($record): \Generator {
+                try {
+                    // Idle timeouts are not final, the caller decides whether to keep waiting
+                    if (!$chunk->isTimeout() && $chunk->isLast()) {
+                        $record(intdiv($context->getStatusCode(), 100) . 'xx');
+                    }
+                } catch (TransportExceptionInterface) {
+                    $record('error');
+                }
+
+                yield $chunk;
+            }
+        );
+    }
+
+    private function resolveUpstream(string $url, array $options, string $integration): string
+    {
+        $host = parse_url($url, PHP_URL_HOST) ?? parse_url((string) ($options['base_uri'] ?? ''), PHP_URL_HOST);
+        if (is_string($host) && in_array(strtolower($host), CircuitBreakingHttpClient::SHARED_HOSTS, true)) {
+            return strtolower($host);
+        }
+
+        return $integration !== 'none' ? $integration : 'other';
+    }
+}
@@ -0,0 +1,173 @@
+<?php
+
+namespace App\Service\Http;
+
+use Symfony\Component\DependencyInjection\Attribute\AsDecorator;
+use Symfony\Component\DependencyInjection\Attribute\AutowireDecorated;
+use Symfony\Contracts\HttpClient\Exception\TransportExceptionInterface;
+use Symfony\Contracts\HttpClient\HttpClientInterface;
+use Symfony\Contracts\HttpClient\ResponseInterface;
+use Symfony\Contracts\HttpClient\ResponseStreamInterface;
+use Symfony\Contracts\Service\ResetInterface;
+
+/**
+ * Decorates the application HttpClient to run independent tasks concurrently.
+ *
+ * Each task passed to runConcurrently() runs in its own Fiber. Requests made
+ * by a task return a FiberSuspendingResponse; reading it suspends the task
+ * while this client multiplexes all pending responses via stream(). Integration
+ * services keep their blocking code style, but their upstream calls overlap,
+ * so a batch takes about as long as its slowest call.
+ *
+ * Outside of runConcurrently() the client behaves exactly like the decorated one.
+ */
+#[AsDecorator('http_client')]
+class MultiplexingHttpClient implements HttpClientInterface, ResetInterface
+{
+    /**
+     * @var \WeakMap<\Fiber, true> Fibers started by runConcurrently(), shared with clones from withOptions()
+     */
+    private \WeakMap $managedFibers;
+
+    public function __construct(
+        #[AutowireDecorated]
+        private HttpClientInterface $client,
+    ) {
+        $this->managedFibers = new \WeakMap();
+    }
+
+    public function request(string $method, string $url, array $options = []): ResponseInterface
+    {
+        $response = $this->client->request($method, $url, $options);
+
+        $fiber = \Fiber::getCurrent();
+        if ($fiber === null || !isset($this->managedFibers[$fiber])) {
+            return $response;
+        }
+
+        return new FiberSuspendingResponse($response);
+    }
+
+    public function stream(ResponseInterface|iterable $responses, ?float $timeout = null): ResponseStreamInterface
+    {
+        if ($responses instanceof ResponseInterface) {
+            $responses = [$responses];
+        }
+
+        $innerResponses = [];
+        foreach ($responses as $response) {
+            $innerResponses[] = $response instanceof FiberSuspendingResponse ? $response->getInnerResponse() : $response;
+        }
+
+        return $this->client->stream($innerResponses, $timeout);
+    }
+
+    public function withOptions(array $options): static
+    {
+        $clone = clone $this;
+        $clone->client = $this->client->withOptions($options);
+
+        return $clone;
+    }
+
+    public function reset(): void
+    {
+        if ($this->client instanceof ResetInterface) {
+            $this->client->reset();
+        }
+    }
+
+    /**
+     * Run tasks concurrently and return their outcomes in input order.
+     *
+     * A task that throws does not affect the others; its exception is returned
+     * under the 'error' key instead of 'result'.
+     *
+     * @param array<array-key, callable(): mixed> $tasks
+     * @return array<array-key, array{result?: mixed, error?: \Throwable}>
+     */
+    public function runConcurrently(array $tasks): array
+    {
+        $fibers = [];
+        $outcomes = [];
+        /** @var array<array-key, FiberSuspendingResponse> $waiting */
+        $waiting = [];
+
+        foreach ($tasks as $key => $task) {
+            $fiber = new \Fiber($task);
+            $this->managedFibers[$fiber] = true;
+            $fibers[$key] = $fiber;
+
+            $this->advance($key, $fiber, null, $waiting, $outcomes);
+        }
+
+        while ($waiting !== []) {
+            $byInner = new \SplObjectStorage();
+            foreach ($waiting as $key => $pending) {
+                $byInner[$pending->getInnerResponse()] = $key;
+            }
+
+            // Block until any pending response completes, then resume its task.
+            // The stream is restarted afterwards because the task may have issued new requests.
+            foreach ($this->client->stream(iterator_to_array($byInner, false)) as $response => $chunk) {
+                $timedOut = false;
+                try {
+                    if ($chunk->isTimeout()) {
+                        $timedOut = true;
+                        $response->cancel();
+                    } elseif (!$chunk->isLast()) {
+                        continue;
+                    }
+                } catch (TransportExceptionInterface) {
+                    // Transport errors are rethrown when the task reads the response
+                }
+
+                $key = $byInner[$response];
+                $pending = $waiting[$key];
+                unset($waiting[$key]);
+
+                $pending->markCompleted($timedOut);
+                $this->advance($key, $fibers[$key], $pending, $waiting, $outcomes);
+                break;
+            }
+        }
+
+        $ordered = [];
+        foreach (array_keys($tasks) as $key) {
+            $ordered[$key] = $outcomes[$key];
+        }
+
+        return $ordered;
+    }
+
+    /**
+     * Start or resume a task until it finishes or waits for another response.
+     *
+     * @param array<array-key, FiberSuspendingResponse> $waiting
+     * @param array<array-key, array{result?: mixed, error?: \Throwable}> $outcomes
+     */
+    private function advance(int|string $key, \Fiber $fiber, ?FiberSuspendingResponse $completed, array &$waiting, array &$outcomes): void
+    {
+        try {
+            $suspendedOn = $fiber->isStarted() ? $fiber->resume($completed) : $fiber->start();
+        } catch (\Throwable $e) {
+            $outcomes[$key] = ['error' => $e];
+
+            return;
+        }
+
+        if ($fiber->isTerminated()) {
+            $outcomes[$key] = ['result' => $fiber->getReturn()];
+
+            return;
+        }
+
+        if (!$suspendedOn instanceof FiberSuspendingResponse) {
+            $outcomes[$key] = ['error' => new \LogicException('Concurrent task was suspended outside of an HTTP response read')];
+
+            return;
+        }
+
+        $waiting[$key] = $suspendedOn;
+    }
+}
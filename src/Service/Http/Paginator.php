@@ -0,0 +1,180 @@
+<?php
+
+namespace App\Service\Http;
+
+use Symfony\Contracts\HttpClient\HttpClientInterface;
+use Symfony\Contracts\HttpClient\ResponseInterface;
+
+/**
+ * Collects the items of a paginated API into one bounded result.
+ *
+ * Offset APIs that report a total (Jira Agile, Confluence) get their first
+ * page fetched alone; all remaining pages up to the limit are then requested
+ * at once, a few at a time, and read back in order. Cursor APIs (Jira
+ * nextPageToken, Graph @odata.nextLink, Confluence _links.next) are followed
+ * page by page. Both stop as soon as the limit is reached and never fetch more
+ * than MAX_PAGES pages, so an agent can ask for "all issues" in one tool call.
+ *
+ * Integration services create one per call with their own HttpClient, or with a
+ * request callable when they wrap requests (e.g. Graph 429 retries).
+ */
+class Paginator
+{
+    public const MAX_PAGES = 20;
+    private const CONCURRENCY = 4;
+
+    /** @var callable(string, string, array): ResponseInterface */
+    private $request;
+
+    /**
+     * @param (callable(string, string, array): ResponseInterface)|null $request Defaults to $httpClient->request()
+     */
+    public function __construct(HttpClientInterface $httpClient, ?callable $request = null)
+    {
+        $this->request = $request ?? $httpClient->request(...);
+    }
+
+    /**
+     * Fetch pages of an offset paginated endpoint (startAt/maxResults, start/limit).
+     *
+     * @param array<string, mixed> $options Request options of the first page, the offset and page size are added to its query
+     * @param string $totalKey Response key holding the total number of items; without it pages are fetched one by one
+     * @return array{items: array<int, mixed>, total: ?int, truncated: bool, first_page: array<string, mixed>}
+     */
+    public function fetchOffset(
+        string $method,
+        string $url,
+        array $options,
+        string $itemsKey,
+        int $limit,
+        int $pageSize,
+        string $offsetParam = 'startAt',
+        string $limitParam = 'maxResults',
+        string $totalKey = 'total',
+    ): array {
+        $pageSize = max(1, min($pageSize, $limit));
+        $pageOptions = fn(int $offset): array => array_replace_recursive($options, [
+            'query' => [$offsetParam => $offset, $limitParam => min($pageSize, $limit - $offset)],
+        ]);
+
+        $firstPage = ($this->request)($method, $url, $pageOptions(0))->toArray();
+        $items = $firstPage[$itemsKey] ?? [];
+        $total = isset($firstPage[$totalKey]) ? (int) $firstPage[$totalKey] : null;
+        $isLast = $firstPage['isLast'] ?? null;
+
+        // Servers may return fewer items per page than requested, continue at their page size
+        $step = count($items);
+        $end = min($total ?? $limit, $limit);
+
+        if ($total !== null) {
+            // Every remaining offset is known, request the pages concurrently
+            $offsets = $step > 0 && $step < $end ? range($step, $end - 1, $step) : [];
+            $offsets = array_slice($offsets, 0, self::MAX_PAGES - 1);
+
+            foreach (array_chunk($offsets, self::CONCURRENCY) as $chunk) {
+                $responses = array_map(fn(int $offset) => ($this->request)($method, $url, $pageOptions($offset)), $chunk);
+                foreach ($responses as $response) {
+                    array_push($items, ...($response->toArray()[$itemsKey] ?? []));
+                }
+            }
+        } else {
+            $pages = 1;
+            $lastCount = $step;
+            while (
+                $lastCount > 0
+                && count($items) < $end
+                && $pages < self::MAX_PAGES
+                && ($isLast !== null ? !$isLast : $lastCount >= $step)
+            ) {
+                $page = ($this->request)($method, $url, $pageOptions(count($items)))->toArray();
+                $pageItems = $page[$itemsKey] ?? [];
+                array_push($items, ...$pageItems);
+                $lastCount = count($pageItems);
+                $isLast = $page['isLast'] ?? null;
+                $pages++;
+            }
+        }
+
+        $items = array_slice($items, 0, $limit);
+
+        return [
+            'items' => $items,
+            'total' => $total,
+            'truncated' => $total !== null ? count($items) < $total : count($items) >= $limit && $isLast !== true,
+            'first_page' => $firstPage,
+        ];
+    }
+
+    /**
+     * Follow the cursor of an endpoint until the limit is reached or no next page exists.
+     *
+     * @param array<string, mixed> $options Request options of the first page
+     * @param callable(array $page, string $url, array $options): ?array{0: string, 1: array<string, mixed>} $next
+     *        URL and options of the next page, null on the last page
+     * @param (callable(array $items): bool)|null $until Stop early once this returns true for the items so far
+     * @param string|null $limitParam Query parameter of the page size; the last page then asks only for the
+     *                                remaining items, so the cursor it returns continues right after them
+     * @return array{items: array<int, mixed>, truncated: bool, cut: bool, first_page: array<string, mixed>, last_page: array<string, mixed>}
+     *         cut is true when items beyond the limit were dropped, the cursor of the last page then skips them
+     */
+    public function fetchCursor(
+        string $method,
+        string $url,
+        array $options,
+        string $itemsKey,
+        int $limit,
+        callable $next,
+        ?callable $until = null,
+        ?string $limitParam = null,
+    ): array {
+        $items = [];
+        $firstPage = null;
+        $pages = 0;
+
+        while (true) {
+            if ($limitParam !== null) {
+                $options['query'][$limitParam] = min((int) ($options['query'][$limitParam] ?? $limit), $limit - count($items));
+            }
+
+            $page = ($this->request)($method, $url, $options)->toArray();
+            $firstPage ??= $page;
+            array_push($items, ...($page[$itemsKey] ?? []));
+            $pages++;
+
+            $nextRequest = $next($page, $url, $options);
+            if ($nextRequest === null || count($items) >= $limit || ($until !== null && $until($items))) {
+                break;
+            }
+            if ($pages >= self::MAX_PAGES) {
+                break;
+            }
+
+            [$url, $options] = $nextRequest;
+        }
+
+        return [
+            'items' => array_slice($items, 0, $limit),
+            'truncated' => $nextRequest !== null || count($items) > $limit,
+            'cut' => count($items) > $limit,
+            'first_page' => $firstPage,
+            'last_page' => $page,
+        ];
+    }
+
+    /**
+     * Next page of a Microsoft Graph collection, its @odata.nextLink already carries the query.
+     *
+     * @return callable(array, string, array): ?array{0: string, 1: array<string, mixed>}
+     */
+    public static function graphNextLink(): callable
+    {
+        return static function (array $page, string $url, array $options): ?array {
+            if (empty($page['@odata.nextLink'])) {
+                return null;
+            }
+            unset($options['query']);
+
+            return [$page['@odata.nextLink'], $options];
+        };
+    }
+}
@@ -0,0 +1,191 @@
+<?php
+
+namespace App\Service\Http;
+
+use App\Service\RedisStore;
+use Predis\PredisException;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Circuit breaker and concurrency limit per upstream, shared by all workers via Redis.
+ *
+ * An upstream is a host (e.g. acme.atlassian.net), a shared host per tenant
+ * (e.g. graph.microsoft.com:config:42) or an explicit name set by the caller
+ * (e.g. remote_mcp:42). Failures are the temporary kind that
+ * ConnectionStatusService never treats as credential problems: transport errors
+ * (timeouts, refused connections) and 502/503/504 responses without Retry-After.
+ *
+ * - closed: requests pass, at most MAX_CONCURRENT_REQUESTS at a time;
+ * - open: after FAILURE_THRESHOLD failures within FAILURE_WINDOW, requests fail
+ *   fast for OPEN_DURATION instead of tying up a worker until their timeout;
+ * - half-open: afterwards a single probe request is let through, its success
+ *   closes the circuit, its failure opens it again.
+ *
+ * When Redis is unreachable, requests pass unguarded.
+ */
+class UpstreamCircuitBreaker
+{
+    public const FAILURE_THRESHOLD = 5;
+    public const MAX_CONCURRENT_REQUESTS = 32;
+    private const FAILURE_WINDOW = 60; // seconds
+    private const OPEN_DURATION = 30; // seconds
+    private const SLOT_TTL = 120; // seconds, frees slots of requests whose worker died
+    private const KEY_PREFIX = 'upstream:';
+    private const KNOWN_UPSTREAMS_KEY = 'upstream_known';
+    private const KNOWN_UPSTREAMS_TTL = 86400; // seconds
+
+    /**
+     * @var array<string, int> Upstreams this worker registered as known, with the time of registration
+     */
+    private array $registeredAt = [];
+
+    public function __construct(
+        private readonly RedisStore $redisStore,
+        private readonly LoggerInterface $logger,
+    ) {
+    }
+
+    /**
+     * Reserve a slot for one request to $upstream.
+     *
+     * @return array{upstream: string, slot: string, probe: ?string}|null Ticket to pass to release(), null when unguarded
+     *
+     * @throws UpstreamUnavailableException When the circuit is open or the upstream has too many requests in flight
+     */
+    public function acquire(string $upstream): ?array
+    {
+        try {
+            $state = $this->redisStore->getMultiple($this->key($upstream, 'open'), $this->key($upstream, 'failures'));
+
+            $open = $state[$this->key($upstream, 'open')];
+            if ($open !== null) {
+                $openedAt = (int) (json_decode($open, true)['opened_at'] ?? time());
+
+                throw UpstreamUnavailableException::circuitOpen($upstream, max(1, $openedAt + self::OPEN_DURATION - time()));
+            }
+
+            $probe = null;
+            if ((int) $state[$this->key($upstream, 'failures')] >= self::FAILURE_THRESHOLD) {
+                $probe = $this->redisStore->acquireLock($this->key($upstream, 'probe'), self::SLOT_TTL);
+                if ($probe === null) {
+                    throw UpstreamUnavailableException::circuitOpen($upstream, self::OPEN_DURATION);
+                }
+            }
+
+            $slot = bin2hex(random_bytes(8));
+            $slotsKey = $this->key($upstream, 'slots');
+            if (!$this->redisStore->addToExpiringSet($slotsKey, $slot, self::SLOT_TTL, self::MAX_CONCURRENT_REQUESTS)) {
+                if ($probe !== null) {
+                    $this->redisStore->releaseLock($this->key($upstream, 'probe'), $probe);
+                }
+
+                throw UpstreamUnavailableException::tooManyRequests($upstream);
+            }
+
+            $this->register($upstream);
+
+            return ['upstream' => $upstream, 'slot' => $slot, 'probe' => $probe];
+        } catch (PredisException $e) {
+            $this->logger->warning('Circuit breaker unavailable, sending request unguarded', [
+                'upstream' => $upstream,
+                'error' => $e->getMessage(),
+            ]);
+
+            return null;
+        }
+    }
+
+    /**
+     * Free the slot of a finished request and record whether the upstream failed.
+     *
+     * @param array{upstream: string, slot: string, probe: ?string} $ticket
+     */
+    public function release(array $ticket, ?string $failure = null): void
+    {
+        $upstream = $ticket['upstream'];
+
+        try {
+            $this->redisStore->removeFromExpiringSet($this->key($upstream, 'slots'), $ticket['slot']);
+
+            if ($failure !== null) {
+                $failures = $this->redisStore->increment($this->key($upstream, 'failures'), 1, self::FAILURE_WINDOW);
+                if ($failures >= self::FAILURE_THRESHOLD) {
+                    $this->redisStore->set(
+                        $this->key($upstream, 'open'),
+                        json_encode(['opened_at' => time(), 'reason' => $failure]),
+                        self::OPEN_DURATION
+                    );
+
+                    $this->logger->warning('Circuit opened for upstream', [
+                        'upstream' => $upstream,
+                        'failures' => $failures,
+                        'reason' => $failure,
+                    ]);
+                }
+            } elseif ($ticket['probe'] !== null) {
+                $this->redisStore->delete($this->key($upstream, 'failures'));
+
+                $this->logger->info('Circuit closed for upstream', ['upstream' => $upstream]);
+            }
+
+            if ($ticket['probe'] !== null) {
+                $this->redisStore->releaseLock($this->key($upstream, 'probe'), $ticket['probe']);
+            }
+        } catch (PredisException $e) {
+            $this->logger->warning('Failed to update circuit breaker', [
+                'upstream' => $upstream,
+                'error' => $e->getMessage(),
+            ]);
+        }
+    }
+
+    /**
+     * State of every upstream used in the last day, for operators.
+     *
+     * @return list<array{upstream: string, state: string, failures: int, in_flight: int, opened_at: ?int, reason: ?string}>
+     */
+    public function getStates(): array
+    {
+        $states = [];
+        foreach ($this->redisStore->getExpiringSetMembers(self::KNOWN_UPSTREAMS_KEY) as $upstream) {
+            $state = $this->redisStore->getMultiple($this->key($upstream, 'open'), $this->key($upstream, 'failures'));
+            $open = json_decode($state[$this->key($upstream, 'open')] ?? 'null', true);
+            $failures = (int) $state[$this->key($upstream, 'failures')];
+
+            $states[] = [
+                'upstream' => $upstream,
+                'state' => match (true) {
+                    $open !== null => 'open',
+                    $failures >= self::FAILURE_THRESHOLD => 'half_open',
+                    default => 'closed',
+                },
+                'failures' => $failures,
+                'in_flight' => count($this->redisStore->getExpiringSetMembers($this->key($upstream, 'slots'))),
+                'opened_at' => $open['opened_at'] ?? null,
+                'reason' => $open['reason'] ?? null,
+            ];
+        }
+
+        usort($states, fn(array $a, array $b) => strcmp($a['upstream'], $b['upstream']));
+
+        return $states;
+    }
+
+    /**
+     * Remember the upstream for getStates(), refreshed about twice a day per worker.
+     */
+    private function register(string $upstream): void
+    {
+        if (($this->registeredAt[$upstream] ?? 0) > time() - self::KNOWN_UPSTREAMS_TTL / 2) {
+            return;
+        }
+
+        $this->redisStore->addToExpiringSet(self::KNOWN_UPSTREAMS_KEY, $upstream, self::KNOWN_UPSTREAMS_TTL);
+        $this->registeredAt[$upstream] = time();
+    }
+
+    private function key(string $upstream, string $suffix): string
+    {
+        return self::KEY_PREFIX . $upstream . ':' . $suffix;
+    }
+}
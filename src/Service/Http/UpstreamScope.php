@@ -0,0 +1,64 @@
+<?php
+
+namespace App\Service\Http;
+
+/**
+ * Names the tenant that upstream requests are made for, e.g. "config:42".
+ *
+ * Hosts shared by all customers (Microsoft Graph, HubSpot, ...) are guarded per
+ * scope by the CircuitBreakingHttpClient, so one tenant's failures or load
+ * don't block the host for everybody. Kept per Fiber, so concurrently executed
+ * tools are told apart.
+ */
+class UpstreamScope
+{
+    private ?string $scope = null;
+
+    /**
+     * @var \WeakMap<\Fiber, string> Scope of tasks run concurrently
+     */
+    private \WeakMap $fiberScopes;
+
+    public function __construct()
+    {
+        $this->fiberScopes = new \WeakMap();
+    }
+
+    /**
+     * Run $callback with its upstream requests made for $scope.
+     *
+     * @template T
+     * @param callable(): T $callback
+     * @return T
+     */
+    public function run(string $scope, callable $callback): mixed
+    {
+        $fiber = \Fiber::getCurrent();
+        $previous = $this->current();
+        $this->set($fiber, $scope);
+
+        try {
+            return $callback();
+        } finally {
+            $this->set($fiber, $previous);
+        }
+    }
+
+    public function current(): ?string
+    {
+        $fiber = \Fiber::getCurrent();
+
+        return $fiber !== null ? ($this->fiberScopes[$fiber] ?? null) : $this->scope;
+    }
+
+    private function set(?\Fiber $fiber, ?string $scope): void
+    {
+        if ($fiber === null) {
+            $this->scope = $scope;
+        } elseif ($scope === null) {
+            unset($this->fiberScopes[$fiber]);
+        } else {
+            $this->fiberScopes[$fiber] = $scope;
+        }
+    }
+}
@@ -0,0 +1,48 @@
+<?php
+
+namespace App\Service\Http;
+
+use Symfony\Component\HttpClient\Exception\TransportException;
+
+/**
+ * Thrown instead of sending a request to an upstream that is known to be failing
+ * or already has too many requests in flight, see UpstreamCircuitBreaker.
+ *
+ * It is a transport exception, so callers treat it like an unreachable host
+ * and it never counts as a credential failure.
+ */
+class UpstreamUnavailableException extends TransportException
+{
+    public function __construct(
+        private readonly string $upstream,
+        private readonly int $retryAfter,
+        string $reason,
+    ) {
+        parent::__construct(sprintf(
+            'Upstream %s is unavailable (%s), retry in %d seconds',
+            $upstream,
+            $reason,
+            $retryAfter
+        ), 503);
+    }
+
+    public static function circuitOpen(string $upstream, int $retryAfter): self
+    {
+        return new self($upstream, $retryAfter, 'too many recent failures');
+    }
+
+    public static function tooManyRequests(string $upstream): self
+    {
+        return new self($upstream, 1, 'too many concurrent requests');
+    }
+
+    public function getUpstream(): string
+    {
+        return $this->upstream;
+    }
+
+    public function getRetryAfter(): int
+    {
+        return $this->retryAfter;
+    }
+}
@@ -2,18 +2,22 @@
 
 namespace App\Service\Integration;
 
+use App\Service\TokenCache;
 use Psr\Log\LoggerInterface;
 use Symfony\Contracts\HttpClient\HttpClientInterface;
 
 /**
  * Service for Azure AD On-Behalf-Of (OBO) token exchange.
  * Exchanges user JWT tokens for SAML2 assertions for SAP C4C user delegation.
+ *
+ * Exchanged tokens are cached per user token and audience until shortly before they expire.
  */
 class AzureOboTokenService
 {
     public function __construct(
         private HttpClientInterface $httpClient,
         private LoggerInterface $logger,
+        private TokenCache $tokenCache,
     ) {
     }
 
@@ -40,16 +44,15 @@ class AzureOboTokenService
         string $azureClientSecret,
         string $c4cTenantUrl
     ): string {
-        $tokenEndpoint = "https://login.microsoftonline.com/{$azureTenantId}/oauth2/v2.0/token";
-
-        $this->logger->info('Azure OBO: Starting JWT to SAML2 exchange', [
-            'tenant_id' => $azureTenantId,
-            'c4c_tenant' => $c4cTenantUrl,
-        ]);
-
-        try {
-            $response = $this->httpClient->request('POST', $tokenEndpoint, [
-                'body' => [
+        $token = $this->tokenCache->get(
+            TokenCache::key('azure_obo_saml2', $userJwtToken, $azureTenantId, $azureClientId, $c4cTenantUrl),
+            function () use ($userJwtToken, $azureTenantId, $azureClientId, $azureClientSecret, $c4cTenantUrl): array {
+                $this->logger->info('Azure OBO: Starting JWT to SAML2 exchange', [
+                    'tenant_id' => $azureTenantId,
+                    'c4c_tenant' => $c4cTenantUrl,
+                ]);
+
+                $token = $this->requestOboToken($azureTenantId, [
                     'grant_type' => 'urn:ietf:params:oauth:grant-type:jwt-bearer',
                     'client_id' => $azureClientId,
                     'client_secret' => $azureClientSecret,
@@ -57,30 +60,15 @@ class AzureOboTokenService
                     'requested_token_use' => 'on_behalf_of',
                     'scope' => "https://{$c4cTenantUrl}/.default",
                     'requested_token_type' => 'urn:ietf:params:oauth:token-type:saml2',
-                ],
-                'timeout' => 30,
-            ]);
+                ]);
 
-            $data = $response->toArray();
+                $this->logger->info('Azure OBO: Successfully exchanged JWT for SAML2 assertion');
 
-            if (!isset($data['access_token'])) {
-                throw new \RuntimeException('No access_token in Azure OBO response');
+                return $token;
             }
+        );
 
-            $this->logger->info('Azure OBO: Successfully exchanged JWT for SAML2 assertion');
-
-            return $data['access_token'];
-        } catch (\Exception $e) {
-            $this->logger->error('Azure OBO: Token exchange failed', [
-                'error' => $e->getMessage(),
-            ]);
-
-            throw new \RuntimeException(
-                'Azure AD OBO token exchange failed: ' . $e->getMessage(),
-                0,
-                $e
-            );
-        }
+        return $token['access_token'];
     }
 
     /**
@@ -105,46 +93,28 @@ class AzureOboTokenService
         string $azureClientSecret,
         string $scope
     ): array {
-        $tokenEndpoint = "https://login.microsoftonline.com/{$azureTenantId}/oauth2/v2.0/token";
-
-        $this->logger->info('Azure OBO: Starting JWT to access token exchange', [
-            'tenant_id' => $azureTenantId,
-            'scope' => $scope,
-        ]);
+        return $this->tokenCache->get(
+            TokenCache::key('azure_obo', $userJwtToken, $azureTenantId, $azureClientId, $scope),
+            function () use ($userJwtToken, $azureTenantId, $azureClientId, $azureClientSecret, $scope): array {
+                $this->logger->info('Azure OBO: Starting JWT to access token exchange', [
+                    'tenant_id' => $azureTenantId,
+                    'scope' => $scope,
+                ]);
 
-        try {
-            $response = $this->httpClient->request('POST', $tokenEndpoint, [
-                'body' => [
+                $token = $this->requestOboToken($azureTenantId, [
                     'grant_type' => 'urn:ietf:params:oauth:grant-type:jwt-bearer',
                     'client_id' => $azureClientId,
                     'client_secret' => $azureClientSecret,
                     'assertion' => $userJwtToken,
                     'requested_token_use' => 'on_behalf_of',
                     'scope' => $scope,
-                ],
-                'timeout' => 30,
-            ]);
+                ]);
 
-            $data = $response->toArray();
+                $this->logger->info('Azure OBO: Successfully exchanged JWT for access token');
 
-            if (!isset($data['access_token'])) {
-                throw new \RuntimeException('No access_token in Azure OBO response');
+                return $token;
             }
-
-            $this->logger->info('Azure OBO: Successfully exchanged JWT for access token');
-
-            return $data;
-        } catch (\Exception $e) {
-            $this->logger->error('Azure OBO: Token exchange failed', [
-                'error' => $e->getMessage(),
-            ]);
-
-            throw new \RuntimeException(
-                'Azure AD OBO token exchange failed: ' . $e->getMessage(),
-                0,
-                $e
-            );
-        }
+        );
     }
 
     /**
@@ -211,4 +181,45 @@ class AzureOboTokenService
             ];
         }
     }
+
+    /**
+     * Call the Azure AD token endpoint with an On-Behalf-Of grant.
+     *
+     * @param array<string, string> $body Form parameters of the grant
+     * @return array{value: array<string, mixed>, expires_at: int} Token response and its expiry, as stored by the TokenCache
+     *
+     * @throws \RuntimeException When token exchange fails
+     */
+    private function requestOboToken(string $azureTenantId, array $body): array
+    {
+        $tokenEndpoint = "https://login.microsoftonline.com/{$azureTenantId}/oauth2/v2.0/token";
+
+        try {
+            $response = $this->httpClient->request('POST', $tokenEndpoint, [
+                'body' => $body,
+                'timeout' => 30,
+            ]);
+
+            $data = $response->toArray();
+
+            if (!isset($data['access_token'])) {
+                throw new \RuntimeException('No access_token in Azure OBO response');
+            }
+
+            return [
+                'value' => $data,
+                'expires_at' => time() + (int) ($data['expires_in'] ?? 3600),
+            ];
+        } catch (\Exception $e) {
+            $this->logger->error('Azure OBO: Token exchange failed', [
+                'error' => $e->getMessage(),
+            ]);
+
+            throw new \RuntimeException(
+                'Azure AD OBO token exchange failed: ' . $e->getMessage(),
+                0,
+                $e
+            );
+        }
+    }
 }
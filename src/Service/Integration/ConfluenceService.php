@@ -3,6 +3,7 @@
 namespace App\Service\Integration;
 
 use Symfony\Contracts\HttpClient\HttpClientInterface;
+use App\Service\Http\Paginator;
 use App\Service\UrlNormalizer;
 use InvalidArgumentException;
 
@@ -18,6 +19,21 @@ class ConfluenceService
      */
     private const MAX_COMMENT_LENGTH = 1000;
 
+    /**
+     * Results per page of search and comment lists; larger limits follow the _links.next cursor
+     */
+    private const PAGE_SIZE = 50;
+
+    /**
+     * Upper bound of search results a single call collects across all pages
+     */
+    private const MAX_SEARCH_RESULTS = 500;
+
+    /**
+     * Upper bound of comments fetched for a page
+     */
+    private const MAX_COMMENTS = 200;
+
     public function __construct(
         private HttpClientInterface $httpClient,
         private UrlNormalizer $urlNormalizer,
@@ -349,16 +365,31 @@ class ConfluenceService
     public function search(array $credentials, string $query, int $limit = 25): array
     {
         $url = $this->validateAndNormalizeUrl($credentials['url']);
-        $response = $this->httpClient->request('GET', $url . '/wiki/rest/api/content/search', [
-            'auth_basic' => [$credentials['username'], $credentials['api_token']],
-            'query' => [
-                'cql' => $query,
-                'limit' => $limit,
-                'expand' => 'space,version',
-            ],
-        ]);
+        $limit = max(1, min($limit, self::MAX_SEARCH_RESULTS));
 
-        $data = $response->toArray();
+        $result = (new Paginator($this->httpClient))->fetchCursor(
+            'GET',
+            $url . '/wiki/rest/api/content/search',
+            [
+                'auth_basic' => [$credentials['username'], $credentials['api_token']],
+                'query' => [
+                    'cql' => $query,
+                    'limit' => min($limit, self::PAGE_SIZE),
+                    'expand' => 'space,version',
+                ],
+            ],
+            'results',
+            $limit,
+            $this->nextPageLink($url)
+        );
+
+        $data = [
+            'results' => $result['items'],
+            'start' => 0,
+            'limit' => $limit,
+            'size' => count($result['items']),
+            'totalSize' => $result['first_page']['totalSize'] ?? count($result['items']),
+        ];
 
         // Transform search results to AI-friendly format (simplified, no content)
         if (!empty($data['results'])) {
@@ -402,30 +433,51 @@ class ConfluenceService
     public function getComments(array $credentials, string $pageId): array
     {
         $url = $this->validateAndNormalizeUrl($credentials['url']);
-        $response = $this->httpClient->request('GET', $url . '/wiki/rest/api/content/' . $pageId . '/child/comment', [
-            'auth_basic' => [$credentials['username'], $credentials['api_token']],
-            'query' => [
-                'expand' => 'body.storage,version',
+        $result = (new Paginator($this->httpClient))->fetchCursor(
+            'GET',
+            $url . '/wiki/rest/api/content/' . $pageId . '/child/comment',
+            [
+                'auth_basic' => [$credentials['username'], $credentials['api_token']],
+                'query' => [
+                    'expand' => 'body.storage,version',
+                    'limit' => self::PAGE_SIZE,
+                ],
             ],
-        ]);
-
-        $data = $response->toArray();
+            'results',
+            self::MAX_COMMENTS,
+            $this->nextPageLink($url)
+        );
 
         // Transform comments to AI-friendly format with plain text content
-        $comments = [];
-        if (!empty($data['results'])) {
-            $comments = array_map(
-                fn($comment) => $this->mapCommentToAIFormat($comment),
-                $data['results']
-            );
-        }
+        $comments = array_map(
+            fn($comment) => $this->mapCommentToAIFormat($comment),
+            $result['items']
+        );
 
         return [
             'comments' => $comments,
-            'total' => $data['size'] ?? count($comments),
+            'total' => count($comments),
         ];
     }
 
+    /**
+     * Next page of a Confluence v1 list, _links.next is relative to the /wiki context and carries the query
+     *
+     * @return callable(array, string, array): ?array{0: string, 1: array<string, mixed>}
+     */
+    private function nextPageLink(string $url): callable
+    {
+        return static function (array $page, string $pageUrl, array $options) use ($url): ?array {
+            if (empty($page['_links']['next'])) {
+                return null;
+            }
+            unset($options['query']);
+
+            // Always resolved against the configured URL, so credentials are never sent to another host
+            return [$url . '/wiki' . $page['_links']['next'], $options];
+        };
+    }
+
     /**
      * Convert content from various formats to Confluence storage format
      *
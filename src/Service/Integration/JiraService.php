@@ -3,6 +3,7 @@
 namespace App\Service\Integration;
 
 use Symfony\Contracts\HttpClient\HttpClientInterface;
+use App\Service\Http\Paginator;
 use App\Service\UrlNormalizer;
 use InvalidArgumentException;
 use Psr\Log\LoggerInterface;
@@ -72,6 +73,22 @@ class JiraService
      */
     private const MAX_COMMENT_LENGTH = 1000;
 
+    /**
+     * Largest page Jira returns for issue lists with fields; bigger limits are fetched in several pages
+     */
+    private const ISSUE_PAGE_SIZE = 100;
+
+    /**
+     * Upper bound of issues a single list call collects across all pages
+     */
+    private const MAX_ISSUE_RESULTS = 1000;
+
+    /**
+     * Sprints per page of the board sprint list, all pages are fetched
+     */
+    private const SPRINT_PAGE_SIZE = 50;
+    private const MAX_SPRINT_RESULTS = 500;
+
     public function __construct(
         private HttpClientInterface $httpClient,
         private LoggerInterface $logger,
@@ -517,8 +534,13 @@ class JiraService
         }
     }
 
-    public function search(array $credentials, string $jql, int $maxResults = 50, ?array $additionalFields = null): array
-    {
+    public function search(
+        array $credentials,
+        string $jql,
+        int $maxResults = 50,
+        ?array $additionalFields = null,
+        ?string $nextPageToken = null
+    ): array {
         $url = $this->validateAndNormalizeUrl($credentials['url']);
 
         // Default to ordering by created date if JQL is empty
@@ -532,25 +554,46 @@ class JiraService
             $fieldsToFetch = array_unique(array_merge($fieldsToFetch, $additionalFields));
         }
 
+        $maxResults = max(1, min($maxResults, self::MAX_ISSUE_RESULTS));
+
         try {
             // Use /search/jql endpoint (the /search endpoint was deprecated and removed)
-            $response = $this->httpClient->request('GET', $url . '/rest/api/3/search/jql', [
-                'auth_basic' => [$credentials['username'], $credentials['api_token']],
-                'query' => [
-                    'jql' => $jql,
-                    'maxResults' => $maxResults,
-                    'fields' => implode(',', $fieldsToFetch),
-                ],
-            ]);
+            // It pages with nextPageToken, follow it until maxResults issues are collected
+            $query = [
+                'jql' => $jql,
+                'maxResults' => min($maxResults, self::ISSUE_PAGE_SIZE),
+                'fields' => implode(',', $fieldsToFetch),
+            ];
+            if ($nextPageToken !== null && $nextPageToken !== '') {
+                $query['nextPageToken'] = $nextPageToken;
+            }
 
-            $data = $response->toArray();
+            $result = (new Paginator($this->httpClient))->fetchCursor(
+                'GET',
+                $url . '/rest/api/3/search/jql',
+                [
+                    'auth_basic' => [$credentials['username'], $credentials['api_token']],
+                    'query' => $query,
+                ],
+                'issues',
+                $maxResults,
+                static fn(array $page, string $pageUrl, array $options): ?array => empty($page['nextPageToken']) || !empty($page['isLast'])
+                    ? null
+                    : [$pageUrl, array_replace_recursive($options, ['query' => ['nextPageToken' => $page['nextPageToken']]])],
+                limitParam: 'maxResults'
+            );
 
-            // Transform issues to AI-friendly format (pass additionalFields for _rawFields)
-            if (!empty($data['issues'])) {
-                $data['issues'] = array_map(
+            $data = [
+                // Transform issues to AI-friendly format (pass additionalFields for _rawFields)
+                'issues' => array_map(
                     fn($issue) => $this->mapIssueToAIFormat($issue, $additionalFields),
-                    $data['issues']
-                );
+                    $result['items']
+                ),
+                'isLast' => !$result['truncated'],
+            ];
+            // The token continues after the last page, unless Jira returned more issues than asked for
+            if ($result['truncated'] && !$result['cut'] && !empty($result['last_page']['nextPageToken'])) {
+                $data['nextPageToken'] = $result['last_page']['nextPageToken'];
             }
 
             return $data;
@@ -686,15 +729,22 @@ class JiraService
         $url = $this->validateAndNormalizeUrl($credentials['url']);
 
         try {
-            $response = $this->httpClient->request('GET', $url . '/rest/agile/1.0/board/' . $boardId . '/sprint', [
-                'auth_basic' => [$credentials['username'], $credentials['api_token']],
-                'query' => [
-                    'startAt' => 0,
-                    'maxResults' => 50,
-                ],
-            ]);
+            // The sprint list has no total, pages are followed until isLast
+            $result = (new Paginator($this->httpClient))->fetchOffset(
+                'GET',
+                $url . '/rest/agile/1.0/board/' . $boardId . '/sprint',
+                ['auth_basic' => [$credentials['username'], $credentials['api_token']]],
+                'values',
+                self::MAX_SPRINT_RESULTS,
+                self::SPRINT_PAGE_SIZE
+            );
 
-            return $response->toArray();
+            return [
+                'maxResults' => count($result['items']),
+                'startAt' => 0,
+                'isLast' => !$result['truncated'],
+                'values' => $result['items'],
+            ];
         /** @phpstan-ignore-next-line catch.neverThrown */
         } catch (\Symfony\Component\HttpClient\Exception\ClientException $e) {
             $response = $e->getResponse();
@@ -766,9 +816,10 @@ class JiraService
             $fieldsToFetch = array_unique(array_merge($fieldsToFetch, $additionalFields));
         }
 
-        // Build query with optional JQL filtering
+        $maxResults = max(1, min($maxResults, self::MAX_ISSUE_RESULTS));
+
+        // Build query with optional JQL filtering, the paginator adds startAt/maxResults
         $query = [
-            'maxResults' => $maxResults,
             'fields' => implode(',', $fieldsToFetch),
         ];
 
@@ -784,22 +835,30 @@ class JiraService
         }
 
         try {
-            $response = $this->httpClient->request('GET', $url . '/rest/agile/1.0/sprint/' . $sprintId . '/issue', [
-                'auth_basic' => [$credentials['username'], $credentials['api_token']],
-                'query' => $query,
-            ]);
-
-            $data = $response->toArray();
+            // The first page reports the total, the remaining pages are fetched concurrently
+            $result = (new Paginator($this->httpClient))->fetchOffset(
+                'GET',
+                $url . '/rest/agile/1.0/sprint/' . $sprintId . '/issue',
+                [
+                    'auth_basic' => [$credentials['username'], $credentials['api_token']],
+                    'query' => $query,
+                ],
+                'issues',
+                $maxResults,
+                self::ISSUE_PAGE_SIZE
+            );
 
-            // Transform issues to AI-friendly format (pass additionalFields for _rawFields)
-            if (!empty($data['issues'])) {
-                $data['issues'] = array_map(
+            return [
+                'expand' => $result['first_page']['expand'] ?? '',
+                'startAt' => 0,
+                'maxResults' => $maxResults,
+                'total' => $result['total'] ?? count($result['items']),
+                // Transform issues to AI-friendly format (pass additionalFields for _rawFields)
+                'issues' => array_map(
                     fn($issue) => $this->mapIssueToAIFormat($issue, $additionalFields),
-                    $data['issues']
-                );
-            }
-
-            return $data;
+                    $result['items']
+                ),
+            ];
         /** @phpstan-ignore-next-line catch.neverThrown */
         } catch (\Symfony\Component\HttpClient\Exception\ClientException $e) {
             $response = $e->getResponse();
@@ -1283,9 +1342,10 @@ class JiraService
             $fieldsToFetch = array_unique(array_merge($fieldsToFetch, $additionalFields));
         }
 
-        // Build query with optional JQL filtering
+        $maxResults = max(1, min($maxResults, self::MAX_ISSUE_RESULTS));
+
+        // Build query with optional JQL filtering, the paginator adds startAt/maxResults
         $query = [
-            'maxResults' => $maxResults,
             'fields' => implode(',', $fieldsToFetch),
         ];
 
@@ -1303,22 +1363,30 @@ class JiraService
         try {
             // Use the Jira Agile API to get all issues on the board
             // This endpoint works for both Kanban and Scrum boards
-            $response = $this->httpClient->request('GET', $url . '/rest/agile/1.0/board/' . $boardId . '/issue', [
-                'auth_basic' => [$credentials['username'], $credentials['api_token']],
-                'query' => $query,
-            ]);
-
-            $data = $response->toArray();
+            // The first page reports the total, the remaining pages are fetched concurrently
+            $result = (new Paginator($this->httpClient))->fetchOffset(
+                'GET',
+                $url . '/rest/agile/1.0/board/' . $boardId . '/issue',
+                [
+                    'auth_basic' => [$credentials['username'], $credentials['api_token']],
+                    'query' => $query,
+                ],
+                'issues',
+                $maxResults,
+                self::ISSUE_PAGE_SIZE
+            );
 
-            // Transform issues to AI-friendly format (pass additionalFields for _rawFields)
-            if (!empty($data['issues'])) {
-                $data['issues'] = array_map(
+            return [
+                'expand' => $result['first_page']['expand'] ?? '',
+                'startAt' => 0,
+                'maxResults' => $maxResults,
+                'total' => $result['total'] ?? count($result['items']),
+                // Transform issues to AI-friendly format (pass additionalFields for _rawFields)
+                'issues' => array_map(
                     fn($issue) => $this->mapIssueToAIFormat($issue, $additionalFields),
-                    $data['issues']
-                );
-            }
-
-            return $data;
+                    $result['items']
+                ),
+            ];
         /** @phpstan-ignore-next-line catch.neverThrown */
         } catch (\Symfony\Component\HttpClient\Exception\ClientException $e) {
             $response = $e->getResponse();
@@ -2,6 +2,7 @@
 
 namespace App\Service\Integration;
 
+use App\Service\Http\GraphBatch;
 use Symfony\Contracts\HttpClient\HttpClientInterface;
 
 class MsTeamsService
@@ -105,7 +106,10 @@ class MsTeamsService
         }
     }
 
-    public function listTeams(array $credentials): array
+    /**
+     * @param bool $includeChannels Also list the channels of every team, fetched in one Graph batch
+     */
+    public function listTeams(array $credentials, bool $includeChannels = false): array
     {
         try {
             $response = $this->httpClient->request('GET', self::GRAPH_API_BASE . '/me/joinedTeams', [
@@ -126,6 +130,10 @@ class MsTeamsService
                 ];
             }
 
+            if ($includeChannels && $teams !== []) {
+                $teams = $this->addChannels($credentials, $teams);
+            }
+
             return ['teams' => $teams, 'count' => count($teams)];
         } catch (\Exception $e) {
             error_log('MS Teams list teams failed: ' . $e->getMessage());
@@ -144,16 +152,7 @@ class MsTeamsService
             ]);
 
             $data = $response->toArray();
-            $channels = [];
-
-            foreach ($data['value'] ?? [] as $channel) {
-                $channels[] = [
-                    'id' => $channel['id'],
-                    'displayName' => $channel['displayName'] ?? '',
-                    'description' => $channel['description'] ?? '',
-                    'membershipType' => $channel['membershipType'] ?? 'standard',
-                ];
-            }
+            $channels = array_map(fn($channel) => $this->formatChannel($channel), $data['value'] ?? []);
 
             return ['channels' => $channels, 'count' => count($channels), 'teamId' => $teamId];
         } catch (\Exception $e) {
@@ -364,6 +363,47 @@ class MsTeamsService
         ];
     }
 
+    /**
+     * Add the channels of each team, requesting all channel lists in one Graph batch.
+     *
+     * A team whose channels cannot be read keeps an empty list and a channelsError.
+     */
+    private function addChannels(array $credentials, array $teams): array
+    {
+        $requests = [];
+        foreach ($teams as $index => $team) {
+            $requests[$index] = [
+                'url' => '/teams/' . urlencode($team['id']) . '/channels?$select=id,displayName,description,membershipType',
+            ];
+        }
+
+        $results = (new GraphBatch($this->httpClient, $credentials['access_token']))->execute($requests);
+
+        foreach ($results as $index => $result) {
+            $error = GraphBatch::errorMessage($result);
+            if ($error !== null) {
+                error_log('MS Teams list channels of team ' . $teams[$index]['id'] . ' failed: ' . $error);
+                $teams[$index]['channels'] = [];
+                $teams[$index]['channelsError'] = $error;
+                continue;
+            }
+
+            $teams[$index]['channels'] = array_map(fn($channel) => $this->formatChannel($channel), $result['body']['value'] ?? []);
+        }
+
+        return $teams;
+    }
+
+    private function formatChannel(array $channel): array
+    {
+        return [
+            'id' => $channel['id'],
+            'displayName' => $channel['displayName'] ?? '',
+            'description' => $channel['description'] ?? '',
+            'membershipType' => $channel['membershipType'] ?? 'standard',
+        ];
+    }
+
     private function formatMessage(array $msg): array
     {
         $bodyContent = $msg['body']['content'] ?? '';
@@ -2,11 +2,13 @@
 
 namespace App\Service\Integration;
 
+use App\Service\Http\GraphBatch;
 use Symfony\Contracts\HttpClient\HttpClientInterface;
 
 class OutlookCalendarService
 {
     private const GRAPH_API_BASE = 'https://graph.microsoft.com/v1.0';
+    private const EVENT_SELECT = 'id,subject,body,start,end,location,organizer,attendees,isOnlineMeeting,onlineMeetingUrl,onlineMeeting,isAllDay,isCancelled,showAs,recurrence,categories';
 
     public function __construct(
         private HttpClientInterface $httpClient
@@ -148,37 +150,48 @@ class OutlookCalendarService
             $response = $this->httpClient->request('GET', self::GRAPH_API_BASE . '/me/events/' . urlencode($eventId), [
                 'auth_bearer' => $credentials['access_token'],
                 'query' => [
-                    '$select' => 'id,subject,body,start,end,location,organizer,attendees,isOnlineMeeting,onlineMeetingUrl,onlineMeeting,isAllDay,isCancelled,showAs,recurrence,categories',
+                    '$select' => self::EVENT_SELECT,
                 ],
             ]);
 
-            $event = $response->toArray();
+            return $this->formatEventDetails($response->toArray());
+        } catch (\Exception $e) {
+            error_log('Outlook Calendar get event failed: ' . $e->getMessage());
+            return ['error' => 'Failed to get event: ' . $e->getMessage()];
+        }
+    }
 
-            $bodyContent = $event['body']['content'] ?? '';
-            if (($event['body']['contentType'] ?? '') === 'html') {
-                $bodyContent = strip_tags(str_replace(['<br>', '<br/>', '<br />', '</p>', '</div>'], "\n", $bodyContent));
-                $bodyContent = preg_replace('/\n{3,}/', "\n\n", trim($bodyContent));
+    /**
+     * Read several events in one Graph batch request.
+     *
+     * @param string[] $eventIds At most GraphBatch::MAX_BATCH_SIZE IDs are read
+     */
+    public function getEvents(array $credentials, array $eventIds): array
+    {
+        try {
+            $eventIds = array_slice(array_values(array_unique($eventIds)), 0, GraphBatch::MAX_BATCH_SIZE);
+            $query = http_build_query(['$select' => self::EVENT_SELECT], '', '&', PHP_QUERY_RFC3986);
+
+            $requests = [];
+            foreach ($eventIds as $index => $eventId) {
+                $requests[$index] = ['url' => '/me/events/' . urlencode($eventId) . '?' . $query];
             }
 
-            $result = $this->formatEvent($event);
-            $result['body'] = $bodyContent;
-            $result['attendees'] = array_map(fn($a) => [
-                'name' => $a['emailAddress']['name'] ?? '',
-                'email' => $a['emailAddress']['address'] ?? '',
-                'type' => $a['type'] ?? 'required',
-                'responseStatus' => $a['status']['response'] ?? 'none',
-            ], $event['attendees'] ?? []);
-            $result['recurrence'] = $event['recurrence'] ?? null;
-            $result['categories'] = $event['categories'] ?? [];
-
-            if (isset($event['onlineMeeting']['joinUrl'])) {
-                $result['onlineMeetingJoinUrl'] = $event['onlineMeeting']['joinUrl'];
+            $events = [];
+            $errors = [];
+            foreach ((new GraphBatch($this->httpClient, $credentials['access_token']))->execute($requests) as $index => $result) {
+                $error = GraphBatch::errorMessage($result);
+                if ($error !== null) {
+                    $errors[] = ['eventId' => $eventIds[$index], 'error' => $error];
+                    continue;
+                }
+                $events[] = $this->formatEventDetails($result['body']);
             }
 
-            return $result;
+            return ['events' => $events, 'count' => count($events), 'errors' => $errors];
         } catch (\Exception $e) {
-            error_log('Outlook Calendar get event failed: ' . $e->getMessage());
-            return ['error' => 'Failed to get event: ' . $e->getMessage()];
+            error_log('Outlook Calendar get events failed: ' . $e->getMessage());
+            return ['error' => 'Failed to get events: ' . $e->getMessage(), 'events' => [], 'count' => 0];
         }
     }
 
@@ -352,4 +365,30 @@ class OutlookCalendarService
             'showAs' => $event['showAs'] ?? 'busy',
         ];
     }
+
+    private function formatEventDetails(array $event): array
+    {
+        $bodyContent = $event['body']['content'] ?? '';
+        if (($event['body']['contentType'] ?? '') === 'html') {
+            $bodyContent = strip_tags(str_replace(['<br>', '<br/>', '<br />', '</p>', '</div>'], "\n", $bodyContent));
+            $bodyContent = preg_replace('/\n{3,}/', "\n\n", trim($bodyContent));
+        }
+
+        $result = $this->formatEvent($event);
+        $result['body'] = $bodyContent;
+        $result['attendees'] = array_map(fn($a) => [
+            'name' => $a['emailAddress']['name'] ?? '',
+            'email' => $a['emailAddress']['address'] ?? '',
+            'type' => $a['type'] ?? 'required',
+            'responseStatus' => $a['status']['response'] ?? 'none',
+        ], $event['attendees'] ?? []);
+        $result['recurrence'] = $event['recurrence'] ?? null;
+        $result['categories'] = $event['categories'] ?? [];
+
+        if (isset($event['onlineMeeting']['joinUrl'])) {
+            $result['onlineMeetingJoinUrl'] = $event['onlineMeeting']['joinUrl'];
+        }
+
+        return $result;
+    }
 }
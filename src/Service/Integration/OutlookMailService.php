@@ -2,11 +2,14 @@
 
 namespace App\Service\Integration;
 
+use App\Service\Http\GraphBatch;
 use Symfony\Contracts\HttpClient\HttpClientInterface;
 
 class OutlookMailService
 {
     private const GRAPH_API_BASE = 'https://graph.microsoft.com/v1.0';
+    private const MESSAGE_SELECT = 'id,subject,from,toRecipients,ccRecipients,bccRecipients,receivedDateTime,sentDateTime,body,hasAttachments,importance,isRead,conversationId,internetMessageId';
+    private const MESSAGE_EXPAND = 'attachments($select=id,name,contentType,size)';
 
     public function __construct(
         private HttpClientInterface $httpClient
@@ -162,49 +165,49 @@ class OutlookMailService
             $response = $this->httpClient->request('GET', self::GRAPH_API_BASE . '/me/messages/' . urlencode($messageId), [
                 'auth_bearer' => $credentials['access_token'],
                 'query' => [
-                    '$select' => 'id,subject,from,toRecipients,ccRecipients,bccRecipients,receivedDateTime,sentDateTime,body,hasAttachments,importance,isRead,conversationId,internetMessageId',
-                    '$expand' => 'attachments($select=id,name,contentType,size)',
+                    '$select' => self::MESSAGE_SELECT,
+                    '$expand' => self::MESSAGE_EXPAND,
                 ],
             ]);
 
-            $msg = $response->toArray();
+            return $this->formatFullMessage($response->toArray());
+        } catch (\Exception $e) {
+            error_log('Outlook Mail get message failed: ' . $e->getMessage());
+            return ['error' => 'Failed to get message: ' . $e->getMessage()];
+        }
+    }
 
-            $bodyContent = $msg['body']['content'] ?? '';
-            if (($msg['body']['contentType'] ?? '') === 'html') {
-                $bodyContent = strip_tags(str_replace(['<br>', '<br/>', '<br />', '</p>', '</div>', '</li>'], "\n", $bodyContent));
-                $bodyContent = preg_replace('/\n{3,}/', "\n\n", trim($bodyContent));
+    /**
+     * Read several messages in one Graph batch request.
+     *
+     * @param string[] $messageIds At most GraphBatch::MAX_BATCH_SIZE IDs are read
+     */
+    public function getMessages(array $credentials, array $messageIds): array
+    {
+        try {
+            $messageIds = array_slice(array_values(array_unique($messageIds)), 0, GraphBatch::MAX_BATCH_SIZE);
+            $query = http_build_query(['$select' => self::MESSAGE_SELECT, '$expand' => self::MESSAGE_EXPAND], '', '&', PHP_QUERY_RFC3986);
+
+            $requests = [];
+            foreach ($messageIds as $index => $messageId) {
+                $requests[$index] = ['url' => '/me/messages/' . urlencode($messageId) . '?' . $query];
             }
 
-            return [
-                'id' => $msg['id'],
-                'subject' => $msg['subject'] ?? '(No Subject)',
-                'from' => [
-                    'name' => $msg['from']['emailAddress']['name'] ?? '',
-                    'email' => $msg['from']['emailAddress']['address'] ?? '',
-                ],
-                'toRecipients' => array_map(
-                    fn($r) => ['name' => $r['emailAddress']['name'] ?? '', 'email' => $r['emailAddress']['address'] ?? ''],
-                    $msg['toRecipients'] ?? []
-                ),
-                'ccRecipients' => array_map(
-                    fn($r) => ['name' => $r['emailAddress']['name'] ?? '', 'email' => $r['emailAddress']['address'] ?? ''],
-                    $msg['ccRecipients'] ?? []
-                ),
-                'receivedDateTime' => $msg['receivedDateTime'] ?? '',
-                'sentDateTime' => $msg['sentDateTime'] ?? '',
-                'body' => $bodyContent,
-                'hasAttachments' => $msg['hasAttachments'] ?? false,
-                'attachments' => array_map(
-                    fn($a) => ['id' => $a['id'], 'name' => $a['name'], 'contentType' => $a['contentType'], 'size' => $a['size']],
-                    $msg['attachments'] ?? []
-                ),
-                'importance' => $msg['importance'] ?? 'normal',
-                'isRead' => $msg['isRead'] ?? false,
-                'conversationId' => $msg['conversationId'] ?? null,
-            ];
+            $messages = [];
+            $errors = [];
+            foreach ((new GraphBatch($this->httpClient, $credentials['access_token']))->execute($requests) as $index => $result) {
+                $error = GraphBatch::errorMessage($result);
+                if ($error !== null) {
+                    $errors[] = ['messageId' => $messageIds[$index], 'error' => $error];
+                    continue;
+                }
+                $messages[] = $this->formatFullMessage($result['body']);
+            }
+
+            return ['messages' => $messages, 'count' => count($messages), 'errors' => $errors];
         } catch (\Exception $e) {
-            error_log('Outlook Mail get message failed: ' . $e->getMessage());
-            return ['error' => 'Failed to get message: ' . $e->getMessage()];
+            error_log('Outlook Mail get messages failed: ' . $e->getMessage());
+            return ['error' => 'Failed to get messages: ' . $e->getMessage(), 'messages' => [], 'count' => 0];
         }
     }
 
@@ -301,4 +304,41 @@ class OutlookMailService
             'expires_at' => time() + ($data['expires_in'] ?? 3600),
         ];
     }
+
+    private function formatFullMessage(array $msg): array
+    {
+        $bodyContent = $msg['body']['content'] ?? '';
+        if (($msg['body']['contentType'] ?? '') === 'html') {
+            $bodyContent = strip_tags(str_replace(['<br>', '<br/>', '<br />', '</p>', '</div>', '</li>'], "\n", $bodyContent));
+            $bodyContent = preg_replace('/\n{3,}/', "\n\n", trim($bodyContent));
+        }
+
+        return [
+            'id' => $msg['id'],
+            'subject' => $msg['subject'] ?? '(No Subject)',
+            'from' => [
+                'name' => $msg['from']['emailAddress']['name'] ?? '',
+                'email' => $msg['from']['emailAddress']['address'] ?? '',
+            ],
+            'toRecipients' => array_map(
+                fn($r) => ['name' => $r['emailAddress']['name'] ?? '', 'email' => $r['emailAddress']['address'] ?? ''],
+                $msg['toRecipients'] ?? []
+            ),
+            'ccRecipients' => array_map(
+                fn($r) => ['name' => $r['emailAddress']['name'] ?? '', 'email' => $r['emailAddress']['address'] ?? ''],
+                $msg['ccRecipients'] ?? []
+            ),
+            'receivedDateTime' => $msg['receivedDateTime'] ?? '',
+            'sentDateTime' => $msg['sentDateTime'] ?? '',
+            'body' => $bodyContent,
+            'hasAttachments' => $msg['hasAttachments'] ?? false,
+            'attachments' => array_map(
+                fn($a) => ['id' => $a['id'], 'name' => $a['name'], 'contentType' => $a['contentType'], 'size' => $a['size']],
+                $msg['attachments'] ?? []
+            ),
+            'importance' => $msg['importance'] ?? 'normal',
+            'isRead' => $msg['isRead'] ?? false,
+            'conversationId' => $msg['conversationId'] ?? null,
+        ];
+    }
 }
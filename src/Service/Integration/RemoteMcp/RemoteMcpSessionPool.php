@@ -0,0 +1,142 @@
+<?php
+
+namespace App\Service\Integration\RemoteMcp;
+
+use App\Service\RedisStore;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Shares initialized MCP sessions between all PHP workers.
+ *
+ * Sessions are stored in Redis per IntegrationConfig id together with a
+ * fingerprint of the server URL and auth type, so a changed configuration
+ * never reuses a session of the old server. Only one worker runs the
+ * initialize handshake for a config at a time; the others wait for its result.
+ */
+class RemoteMcpSessionPool
+{
+    private const SESSION_TTL = 900; // 15 minutes
+    private const SESSION_KEY_PREFIX = 'rmcp_session:';
+    private const LOCK_PREFIX = 'rmcp_session_init:';
+    private const LOCK_TTL = 65; // initialize + initialized notification, 30s timeout each
+    private const LOCK_WAIT_SECONDS = 65;
+    private const LOCK_POLL_INTERVAL_US = 100_000;
+    private const STATS_HITS_KEY = 'rmcp_session_pool:hits';
+    private const STATS_MISSES_KEY = 'rmcp_session_pool:misses';
+
+    public function __construct(
+        private readonly RedisStore $store,
+        private readonly LoggerInterface $logger,
+    ) {
+    }
+
+    /**
+     * Return the pooled session ID for a config, running $initializer only when
+     * no valid session exists. The session ID may be null for servers without
+     * session management; that is pooled as well.
+     *
+     * @param callable(): ?string $initializer
+     */
+    public function acquire(int $configId, string $fingerprint, callable $initializer): ?string
+    {
+        $deadline = microtime(true) + self::LOCK_WAIT_SECONDS;
+        $missCounted = false;
+
+        do {
+            $entry = $this->read($configId, $fingerprint);
+            if ($entry !== null) {
+                if (!$missCounted) {
+                    $this->store->increment(self::STATS_HITS_KEY);
+                }
+
+                return $entry['session_id'];
+            }
+
+            if (!$missCounted) {
+                $this->store->increment(self::STATS_MISSES_KEY);
+                $missCounted = true;
+            }
+
+            $token = $this->store->acquireLock(self::LOCK_PREFIX . $configId, self::LOCK_TTL);
+            if ($token !== null) {
+                try {
+                    // Another worker may have finished the handshake while we were waiting
+                    $entry = $this->read($configId, $fingerprint);
+                    if ($entry !== null) {
+                        return $entry['session_id'];
+                    }
+
+                    $sessionId = $initializer();
+
+                    $this->store->set(self::SESSION_KEY_PREFIX . $configId, json_encode([
+                        'session_id' => $sessionId,
+                        'fingerprint' => $fingerprint,
+                    ]), self::SESSION_TTL);
+
+                    $this->logger->debug('Remote MCP session initialized', [
+                        'config_id' => $configId,
+                        'has_session_id' => $sessionId !== null,
+                    ]);
+
+                    return $sessionId;
+                } finally {
+                    $this->store->releaseLock(self::LOCK_PREFIX . $configId, $token);
+                }
+            }
+
+            usleep(self::LOCK_POLL_INTERVAL_US);
+        } while (microtime(true) < $deadline);
+
+        throw new \RuntimeException(sprintf('Timed out waiting for MCP session handshake (config %d)', $configId));
+    }
+
+    /**
+     * Drop the pooled session for a config.
+     *
+     * When $staleSessionId is given, the entry is only removed if it still holds
+     * that session, so a session freshly created by another worker survives.
+     */
+    public function invalidate(int $configId, ?string $staleSessionId = null): void
+    {
+        $key = self::SESSION_KEY_PREFIX . $configId;
+
+        if ($staleSessionId !== null) {
+            $raw = $this->store->get($key);
+            $entry = $raw !== null ? json_decode($raw, true) : null;
+            if (!is_array($entry) || ($entry['session_id'] ?? null) !== $staleSessionId) {
+                return;
+            }
+        }
+
+        $this->store->delete($key);
+    }
+
+    /**
+     * @return array{hits: int, misses: int}
+     */
+    public function getStats(): array
+    {
+        return [
+            'hits' => (int) $this->store->get(self::STATS_HITS_KEY),
+            'misses' => (int) $this->store->get(self::STATS_MISSES_KEY),
+        ];
+    }
+
+    /**
+     * @return array{session_id: ?string}|null
+     */
+    private function read(int $configId, string $fingerprint): ?array
+    {
+        $raw = $this->store->get(self::SESSION_KEY_PREFIX . $configId);
+        if ($raw === null) {
+            return null;
+        }
+
+        $entry = json_decode($raw, true);
+        if (!is_array($entry) || ($entry['fingerprint'] ?? null) !== $fingerprint) {
+            return null;
+        }
+
+        return ['session_id' => $entry['session_id'] ?? null];
+    }
+}
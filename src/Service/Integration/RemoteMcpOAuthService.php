@@ -4,6 +4,7 @@ namespace App\Service\Integration;
 
 use App\Entity\IntegrationConfig;
 use App\Service\EncryptionService;
+use App\Service\TokenCache;
 use Doctrine\ORM\EntityManagerInterface;
 use Psr\Log\LoggerInterface;
 use Symfony\Contracts\HttpClient\HttpClientInterface;
@@ -19,6 +20,7 @@ class RemoteMcpOAuthService
         private readonly LoggerInterface $logger,
         private readonly EncryptionService $encryptionService,
         private readonly EntityManagerInterface $entityManager,
+        private readonly TokenCache $tokenCache,
     ) {
     }
 
@@ -349,12 +351,39 @@ class RemoteMcpOAuthService
             return $credentials; // Token still valid
         }
 
-        $this->logger->debug('OAuth token expired or near-expiry, refreshing', [
-            'expires_at' => $expiresAt,
-            'config_id' => $configId,
-        ]);
+        // Refresh tokens rotate: one worker refreshes, the others wait for its tokens.
+        // A token that is still valid is used and refreshed after the response is sent.
+        $tokens = $this->tokenCache->get(
+            TokenCache::key('remote_mcp_oauth', $configId !== null ? (string) $configId : ($credentials['oauth_refresh_token'] ?? '')),
+            function () use ($credentials, $configId, $expiresAt): array {
+                $this->logger->debug('OAuth token expired or near-expiry, refreshing', [
+                    'expires_at' => $expiresAt,
+                    'config_id' => $configId,
+                ]);
+
+                $refreshed = $this->refreshAccessToken($credentials, $configId);
+                $refreshedExpiresAt = $refreshed['oauth_expires_at'] ?? time() + 3600;
+
+                return [
+                    'value' => [
+                        'oauth_access_token' => $refreshed['oauth_access_token'],
+                        'oauth_refresh_token' => $refreshed['oauth_refresh_token'] ?? null,
+                        'oauth_expires_at' => $refreshedExpiresAt,
+                    ],
+                    'expires_at' => $refreshedExpiresAt,
+                ];
+            },
+            $expiresAt > 0 && !empty($credentials['oauth_access_token']) ? [
+                'value' => [
+                    'oauth_access_token' => $credentials['oauth_access_token'],
+                    'oauth_refresh_token' => $credentials['oauth_refresh_token'] ?? null,
+                    'oauth_expires_at' => $expiresAt,
+                ],
+                'expires_at' => $expiresAt,
+            ] : null
+        );
 
-        return $this->refreshAccessToken($credentials, $configId);
+        return array_merge($credentials, $tokens);
     }
 
     /**
@@ -2,6 +2,8 @@
 
 namespace App\Service\Integration;
 
+use App\Service\Integration\RemoteMcp\RemoteMcpSessionPool;
+use App\Service\MetricsService;
 use App\Service\UrlNormalizer;
 use Psr\Log\LoggerInterface;
 use Symfony\Contracts\Cache\CacheInterface;
@@ -16,6 +18,7 @@ class RemoteMcpService
     private const CLIENT_NAME = 'workoflow-platform';
     private const CLIENT_VERSION = '1.0.0';
     private const REQUEST_TIMEOUT = 30;
+    private const SESSION_EXPIRED_CODE = 404;
 
     public function __construct(
         private readonly HttpClientInterface $httpClient,
@@ -23,6 +26,8 @@ class RemoteMcpService
         private readonly LoggerInterface $logger,
         private readonly UrlNormalizer $urlNormalizer,
         private readonly RemoteMcpOAuthService $oauthService,
+        private readonly RemoteMcpSessionPool $sessionPool,
+        private readonly ?MetricsService $metricsService = null,
     ) {
     }
 
@@ -43,10 +48,11 @@ class RemoteMcpService
         return $this->cache->get($cacheKey, function (ItemInterface $item) use ($credentials, $configId): array {
             $item->expiresAfter(self::CACHE_TTL);
 
-            $sessionId = $this->initialize($credentials, $configId);
-            $tools = $this->listTools($credentials, $sessionId, $configId);
-
-            return $tools;
+            return $this->withSession(
+                $credentials,
+                $configId,
+                fn(?string $sessionId): array => $this->listTools($credentials, $sessionId, $configId)
+            );
         });
     }
 
@@ -59,9 +65,21 @@ class RemoteMcpService
      */
     public function executeTool(array $credentials, string $toolName, array $parameters, ?int $configId = null): array
     {
-        $sessionId = $this->initialize($credentials, $configId);
+        return $this->withSession(
+            $credentials,
+            $configId,
+            fn(?string $sessionId): array => $this->callTool($credentials, $sessionId, $toolName, $parameters, $configId)
+        );
+    }
 
-        return $this->callTool($credentials, $sessionId, $toolName, $parameters, $configId);
+    /**
+     * Get hit/miss counters of the shared MCP session pool.
+     *
+     * @return array{hits: int, misses: int}
+     */
+    public function getSessionPoolStats(): array
+    {
+        return $this->sessionPool->getStats();
     }
 
     /**
@@ -180,12 +198,81 @@ class RemoteMcpService
     }
 
     /**
-     * Perform MCP initialize handshake.
+     * Run an MCP request with a pooled session.
+     *
+     * Sessions are shared across workers per IntegrationConfig, so the
+     * initialize handshake only happens on the first call or after the server
+     * rejected the session. Calls without a config ID are not pooled.
+     *
+     * @template T
+     * @param array<string, mixed> $credentials
+     * @param callable(?string): T $operation
+     * @return T
+     */
+    private function withSession(array $credentials, ?int $configId, callable $operation): mixed
+    {
+        if ($configId === null) {
+            return $operation($this->initialize($credentials));
+        }
+
+        $fingerprint = md5(json_encode([
+            $credentials['server_url'] ?? '',
+            $credentials['auth_type'] ?? '',
+        ]));
+        $initializer = fn(): ?string => $this->initialize($credentials, $configId);
+
+        $sessionId = $this->sessionPool->acquire($configId, $fingerprint, $initializer);
+
+        try {
+            return $operation($sessionId);
+        } catch (\RuntimeException $e) {
+            if ($e->getCode() !== self::SESSION_EXPIRED_CODE) {
+                throw $e;
+            }
+
+            $this->logger->info('Remote MCP session rejected by server, re-initializing', [
+                'config_id' => $configId,
+                'url' => $credentials['server_url'] ?? 'unknown',
+            ]);
+
+            $this->sessionPool->invalidate($configId, $sessionId);
+            $sessionId = $this->sessionPool->acquire($configId, $fingerprint, $initializer);
+
+            return $operation($sessionId);
+        }
+    }
+
+    /**
+     * Perform MCP initialize handshake, recording its duration.
      * Returns session ID if the server provides one (via Mcp-Session-Id header).
      *
      * @param array<string, mixed> $credentials
      */
     private function initialize(array $credentials, ?int $configId = null): ?string
+    {
+        $startedAt = microtime(true);
+        $status = 'error';
+
+        try {
+            $sessionId = $this->handshake($credentials, $configId);
+            $status = 'success';
+
+            return $sessionId;
+        } finally {
+            $this->metricsService?->observe(
+                'workoflow_remote_mcp_handshake_duration_seconds',
+                microtime(true) - $startedAt,
+                ['status' => $status]
+            );
+        }
+    }
+
+    /**
+     * Send initialize and the initialized notification, returning the session ID if the server assigned one.
+     *
+     * @param array<string, mixed> $credentials
+     */
+    private function handshake(array $credentials, ?int $configId): ?string
     {
         $url = $this->validateUrl($credentials['server_url'] ?? '');
         $credentials = $this->prepareCredentials($credentials, $configId);
@@ -213,6 +300,7 @@ class RemoteMcpService
             ]),
             'json' => $initPayload,
             'timeout' => self::REQUEST_TIMEOUT,
+            'extra' => ['upstream' => $this->upstreamName($url, $configId)],
         ]);
 
         $statusCode = $response->getStatusCode();
@@ -248,6 +336,7 @@ class RemoteMcpService
             'headers' => $notificationHeaders,
             'json' => $notificationPayload,
             'timeout' => self::REQUEST_TIMEOUT,
+            'extra' => ['upstream' => $this->upstreamName($url, $configId)],
         ]);
 
         return $sessionId;
@@ -285,8 +374,11 @@ class RemoteMcpService
             'headers' => $requestHeaders,
             'json' => $payload,
             'timeout' => self::REQUEST_TIMEOUT,
+            'extra' => ['upstream' => $this->upstreamName($url, $configId)],
         ]);
 
+        $this->assertSessionAccepted($response, $sessionId);
+
         $result = $this->parseResponse($response);
         if (isset($result['error'])) {
             throw new \RuntimeException('MCP tools/list error: ' . ($result['error']['message'] ?? 'Unknown error'));
@@ -331,8 +423,11 @@ class RemoteMcpService
             'headers' => $requestHeaders,
             'json' => $payload,
             'timeout' => self::REQUEST_TIMEOUT,
+            'extra' => ['upstream' => $this->upstreamName($url, $configId)],
         ]);
 
+        $this->assertSessionAccepted($response, $sessionId);
+
         $result = $this->parseResponse($response);
         if (isset($result['error'])) {
             throw new \RuntimeException('MCP tools/call error: ' . ($result['error']['message'] ?? 'Unknown error'));
@@ -341,6 +436,28 @@ class RemoteMcpService
         return $result['result'] ?? [];
     }
 
+    /**
+     * Detect a session the server no longer knows.
+     * Servers answer 404 for terminated sessions; some reply 400 with a session error instead.
+     */
+    private function assertSessionAccepted(\Symfony\Contracts\HttpClient\ResponseInterface $response, ?string $sessionId): void
+    {
+        if ($sessionId === null) {
+            return;
+        }
+
+        $statusCode = $response->getStatusCode();
+        $expired = $statusCode === 404
+            || ($statusCode === 400 && str_contains(strtolower($response->getContent(false)), 'session'));
+
+        if ($expired) {
+            throw new \RuntimeException(
+                "MCP session expired (HTTP {$statusCode})",
+                self::SESSION_EXPIRED_CODE
+            );
+        }
+    }
+
     /**
      * Parse the HTTP response, handling both JSON and SSE formats.
      *
@@ -472,6 +589,15 @@ class RemoteMcpService
         return $headers;
     }
 
+    /**
+     * Upstream name for the circuit breaker (see UpstreamCircuitBreaker). Configured servers are
+     * guarded one by one, so a failing server does not block others hosted on the same domain.
+     */
+    private function upstreamName(string $url, ?int $configId): string
+    {
+        return $configId !== null ? 'remote_mcp:' . $configId : strtolower((string) parse_url($url, PHP_URL_HOST));
+    }
+
     /**
      * Validate and return the server URL. Requires HTTPS.
      */
@@ -2,6 +2,8 @@
 
 namespace App\Service\Integration;
 
+use App\Service\Http\GraphBatch;
+use App\Service\Http\Paginator;
 use Symfony\Contracts\HttpClient\HttpClientInterface;
 use Symfony\Contracts\HttpClient\Exception\ClientExceptionInterface;
 use Symfony\Component\HttpFoundation\Response;
@@ -13,6 +15,12 @@ class SharePointService
 {
     private const GRAPH_API_BASE = 'https://graph.microsoft.com/v1.0';
     private const MAX_RETRY_AFTER_SECONDS = 30;
+    private const PAGE_SIZE = 100;
+
+    /**
+     * Upper bound of items a listing collects by following @odata.nextLink
+     */
+    private const MAX_LIST_RESULTS = 1000;
 
     public function __construct(
         private HttpClientInterface $httpClient
@@ -48,6 +56,27 @@ class SharePointService
         return $this->httpClient->request($method, $url, $options);
     }
 
+    /**
+     * Collect a Graph collection across its @odata.nextLink pages (with 429 retries).
+     *
+     * @param (callable(array $items): bool)|null $until Stop paging once this returns true
+     * @return array Graph response with the items of all pages in 'value'
+     */
+    private function graphCollection(string $url, array $options, int $limit = self::MAX_LIST_RESULTS, ?callable $until = null): array
+    {
+        $paginator = new Paginator($this->httpClient, fn(string $method, string $url, array $options) => $this->graphRequest($method, $url, $options));
+        $result = $paginator->fetchCursor('GET', $url, $options, 'value', $limit, Paginator::graphNextLink(), $until);
+
+        $data = $result['first_page'];
+        unset($data['@odata.nextLink']);
+        $data['value'] = $result['items'];
+        if ($result['truncated']) {
+            $data['truncated'] = true;
+        }
+
+        return $data;
+    }
+
     public function testConnection(array $credentials): bool
     {
         try {
@@ -161,6 +190,8 @@ class SharePointService
                 }
             }
 
+            $results = $this->resolveSiteNames($credentials, $results);
+
             // Apply server-side relevance scoring when userQuery is provided
             $relevanceScored = false;
             if ($userQuery !== null && $userQuery !== '' && count($results) > 0) {
@@ -228,16 +259,14 @@ class SharePointService
             $search = $searchQuery ?? '*';
             error_log('Listing SharePoint sites with search: ' . $search);
 
-            $response = $this->graphRequest('GET', self::GRAPH_API_BASE . '/sites', [
+            $data = $this->graphCollection(self::GRAPH_API_BASE . '/sites', [
                 'auth_bearer' => $credentials['access_token'],
                 'query' => [
                     'search' => $search,
-                    '$top' => 100,
+                    '$top' => self::PAGE_SIZE,
                     '$select' => 'id,displayName,name,webUrl,description'
                 ]
             ]);
-
-            $data = $response->toArray();
             $sites = [];
 
             if (isset($data['value'])) {
@@ -291,19 +320,32 @@ class SharePointService
             if (!preg_match('/^[a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12}$/i', $pageId)) {
                 error_log('PageID appears to be a name/title, attempting to resolve to actual page ID');
 
-                // Get all pages from the site and find the one matching the name/title
-                $pagesResponse = $this->graphRequest('GET', self::GRAPH_API_BASE . "/sites/{$siteId}/pages", [
-                    'auth_bearer' => $credentials['access_token'],
-                    'query' => [
-                        '$top' => 100  // Get more pages to find the right one
-                    ]
-                ]);
+                // Page through the site pages until one matches the name/title exactly
+                $pageNameLower = strtolower($pageId);
+                $urlFriendlyNameLower = strtolower(str_replace('-', ' ', $pageId));
+                $pages = $this->graphCollection(
+                    self::GRAPH_API_BASE . "/sites/{$siteId}/pages",
+                    [
+                        'auth_bearer' => $credentials['access_token'],
+                        'query' => [
+                            '$select' => 'id,name,title',
+                            '$top' => self::PAGE_SIZE
+                        ]
+                    ],
+                    until: static function (array $items) use ($pageNameLower, $urlFriendlyNameLower): bool {
+                        foreach ($items as $page) {
+                            $title = strtolower($page['title'] ?? '');
+                            if ($title === $pageNameLower || $title === $urlFriendlyNameLower || strtolower($page['name'] ?? '') === $pageNameLower) {
+                                return true;
+                            }
+                        }
 
-                $pages = $pagesResponse->toArray();
+                        return false;
+                    }
+                );
 
                 if (isset($pages['value'])) {
                     $resolvedPageId = null;
-                    $pageNameLower = strtolower($pageId);
 
                     // Try to find exact match first by title or name
                     foreach ($pages['value'] as $page) {
@@ -407,15 +449,13 @@ class SharePointService
 
             error_log('Listing SharePoint files - SiteID: ' . $siteId . ', Path: ' . ($path ?: 'root'));
 
-            $response = $this->graphRequest('GET', self::GRAPH_API_BASE . $endpoint, [
+            $data = $this->graphCollection(self::GRAPH_API_BASE . $endpoint, [
                 'auth_bearer' => $credentials['access_token'],
                 'query' => [
                     '$select' => 'id,name,size,lastModifiedDateTime,file,folder,webUrl',
-                    '$top' => 100
+                    '$top' => self::PAGE_SIZE
                 ]
             ]);
-
-            $data = $response->toArray();
             error_log('SharePoint files listed successfully, count: ' . (isset($data['value']) ? count($data['value']) : 0));
             return $data;
         } catch (\Symfony\Component\HttpClient\Exception\ClientException $e) {
@@ -490,7 +530,7 @@ class SharePointService
 
             $query = [
                 '$expand' => 'fields',
-                '$top' => 100
+                '$top' => self::PAGE_SIZE
             ];
 
             if (!empty($filters['filter'])) {
@@ -502,12 +542,10 @@ class SharePointService
                 $query['$orderby'] = $filters['orderby'];
             }
 
-            $response = $this->graphRequest('GET', self::GRAPH_API_BASE . "/sites/{$siteId}/lists/{$listId}/items", [
+            $data = $this->graphCollection(self::GRAPH_API_BASE . "/sites/{$siteId}/lists/{$listId}/items", [
                 'auth_bearer' => $credentials['access_token'],
                 'query' => $query
             ]);
-
-            $data = $response->toArray();
             error_log('SharePoint list items retrieved successfully, count: ' . (isset($data['value']) ? count($data['value']) : 0));
             return $data;
         } catch (\Symfony\Component\HttpClient\Exception\ClientException $e) {
@@ -633,6 +671,61 @@ class SharePointService
         return $resolvedId;
     }
 
+    /**
+     * Replace site names used as siteId placeholders in search results with real site IDs.
+     *
+     * Hits without a siteId only carry the site name from their URL. All distinct
+     * sites are looked up in one Graph batch, so reading the documents afterwards
+     * does not need a site search per result. Sites that cannot be resolved keep
+     * their name, which resolveSiteId() and readDocument() still accept.
+     *
+     * @param array<int, array<string, mixed>> $results
+     * @return array<int, array<string, mixed>>
+     */
+    private function resolveSiteNames(array $credentials, array $results): array
+    {
+        $requests = [];
+        foreach ($results as $result) {
+            $siteId = $result['siteId'] ?? '';
+            $hostname = parse_url($result['webUrl'] ?? '', PHP_URL_HOST);
+            if ($siteId === '' || str_contains($siteId, ',') || !$hostname) {
+                continue;
+            }
+            $requests[$hostname . ':/sites/' . $siteId] ??= [
+                'url' => '/sites/' . $hostname . ':/sites/' . $siteId . '?$select=id',
+            ];
+        }
+
+        if ($requests === []) {
+            return $results;
+        }
+
+        try {
+            $siteIds = [];
+            foreach ((new GraphBatch($this->httpClient, $credentials['access_token']))->execute($requests) as $key => $response) {
+                if (GraphBatch::errorMessage($response) === null && !empty($response['body']['id'])) {
+                    $siteIds[$key] = $response['body']['id'];
+                }
+            }
+        } catch (\Exception $e) {
+            error_log('Failed to resolve site names of search results: ' . $e->getMessage());
+            return $results;
+        }
+
+        foreach ($results as &$result) {
+            $hostname = parse_url($result['webUrl'] ?? '', PHP_URL_HOST);
+            $key = $hostname . ':/sites/' . ($result['siteId'] ?? '');
+            if (isset($siteIds[$key])) {
+                $result['siteId'] = $siteIds[$key];
+            }
+        }
+        unset($result);
+
+        error_log('Resolved ' . count($siteIds) . ' of ' . count($requests) . ' site names in search results');
+
+        return $results;
+    }
+
     /**
      * Get site information by site ID
      *
@@ -7,6 +7,7 @@ use Psr\Log\LoggerInterface;
 use Symfony\Component\Mime\Part\DataPart;
 use Symfony\Component\Mime\Part\Multipart\FormDataPart;
 use Symfony\Contracts\HttpClient\HttpClientInterface;
+use Symfony\Contracts\HttpClient\ResponseInterface;
 
 class KnowledgeBaseService
 {
@@ -81,12 +82,18 @@ class KnowledgeBaseService
         try {
             $response = $this->httpClient->request('GET', $baseUrl . "/api/kb/documents/{$docId}/download", [
                 'auth_basic' => [$this->apiAuthUser, $this->apiAuthPassword],
+                // Idle timeout between chunks, large documents may take longer in total
                 'timeout' => 30,
                 'query' => ['org_uuid' => $organisation->getUuid()],
             ]);
 
-            $contentDisposition = $response->getHeaders()['content-disposition'][0] ?? '';
-            $contentType = $response->getHeaders()['content-type'][0] ?? 'application/octet-stream';
+            $headers = $response->getHeaders();
+            $contentDisposition = $headers['content-disposition'][0] ?? '';
+            $contentType = $headers['content-type'][0] ?? 'application/octet-stream';
+            // Lets clients notice a download that was cut off; the length of an encoded body differs from the decoded one
+            $contentLength = !isset($headers['content-encoding']) && ctype_digit($headers['content-length'][0] ?? '')
+                ? (int) $headers['content-length'][0]
+                : null;
             $filename = 'document';
             if (preg_match('/filename="([^"]+)"/', $contentDisposition, $m)) {
                 $filename = $m[1];
@@ -95,9 +102,10 @@ class KnowledgeBaseService
             }
 
             return [
-                'content' => $response->getContent(),
+                'chunks' => $this->streamBody($response, $docId),
                 'filename' => $filename,
                 'content_type' => $contentType,
+                'content_length' => $contentLength,
             ];
         } catch (\Throwable $e) {
             $this->logger->error('KB download failed', ['error' => $e->getMessage(), 'docId' => $docId]);
@@ -105,6 +113,27 @@ class KnowledgeBaseService
         }
     }
 
+    /**
+     * Body of a response as it arrives, so downloads are passed through without buffering the document.
+     *
+     * Headers are already sent when the body is streamed, so an interrupted
+     * download is logged and ends the stream instead of throwing; clients
+     * notice the short body through the Content-Length passed on with it.
+     *
+     * @return \Generator<string>
+     */
+    private function streamBody(ResponseInterface $response, string $docId): \Generator
+    {
+        try {
+            foreach ($this->httpClient->stream($response) as $chunk) {
+                yield $chunk->getContent();
+            }
+        } catch (\Throwable $e) {
+            $response->cancel();
+            $this->logger->error('KB download interrupted', ['error' => $e->getMessage(), 'docId' => $docId]);
+        }
+    }
+
     public function addSnippet(Organisation $organisation, string $title, string $text, string $uploadedBy): array
     {
         return $this->request($organisation, 'POST', '/api/kb/snippet', [
@@ -0,0 +1,282 @@
+<?php
+
+namespace App\Service;
+
+use Predis\PredisException;
+use Psr\Log\LoggerInterface;
+use Symfony\Contracts\Service\ResetInterface;
+
+/**
+ * Timings and counters of the hot paths, exported in the Prometheus text format.
+ *
+ * Observations are buffered in memory and added to one Redis hash once the unit
+ * of work is finished (see MetricsSubscriber), so the series cover all workers
+ * at the cost of a single round trip per request. Histogram buckets are stored
+ * cumulatively, as Prometheus expects them.
+ *
+ * Phase timings of the current request are also kept for the Server-Timing header.
+ */
+class MetricsService implements ResetInterface
+{
+    public const BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120];
+    private const KEY = 'metrics';
+
+    /**
+     * @var array<string, array{0: string, 1: string}> Metric name => [type, help]
+     */
+    private const METRICS = [
+        'workoflow_http_request_duration_seconds' => ['histogram', 'Duration of HTTP requests by route'],
+        'workoflow_phase_duration_seconds' => ['histogram', 'Duration of the phases of tool execution requests'],
+        'workoflow_tool_calls_total' => ['counter', 'Tool calls by integration, tool and outcome'],
+        'workoflow_upstream_request_duration_seconds' => ['histogram', 'Duration of upstream HTTP requests by integration, tool and upstream'],
+        'workoflow_upstream_requests_total' => ['counter', 'Upstream HTTP requests by upstream and status class'],
+        'workoflow_remote_mcp_handshake_duration_seconds' => ['histogram', 'Duration of remote MCP session handshakes'],
+        'workoflow_scheduled_task_duration_seconds' => ['histogram', 'Duration of scheduled task runs by status'],
+        'workoflow_scheduled_task_time_to_first_byte_seconds' => ['histogram', 'Time until a scheduled task webhook started responding'],
+    ];
+
+    /**
+     * @var array<string, float> Hash field => increment, not yet written to Redis
+     */
+    private array $pending = [];
+
+    /**
+     * @var array<string, float> Phase => milliseconds spent in the current request
+     */
+    private array $serverTiming = [];
+
+    /**
+     * @var array{integration: string, tool: string}|null
+     */
+    private ?array $toolContext = null;
+
+    /**
+     * @var \WeakMap<\Fiber, array{integration: string, tool: string}> Tool context of tasks run concurrently
+     */
+    private \WeakMap $fiberToolContexts;
+
+    public function __construct(
+        private readonly RedisStore $redisStore,
+        private readonly LoggerInterface $logger,
+    ) {
+        $this->fiberToolContexts = new \WeakMap();
+    }
+
+    /**
+     * Run $operation and record its duration as a phase of the current request.
+     *
+     * @template T
+     * @param callable(): T $operation
+     * @return T
+     */
+    public function measure(string $phase, callable $operation, string $source = 'api'): mixed
+    {
+        $startedAt = microtime(true);
+
+        try {
+            return $operation();
+        } finally {
+            $this->recordPhase($phase, $startedAt, $source);
+        }
+    }
+
+    /**
+     * Record the time since $startedAt (from microtime(true)) as a phase of the current request.
+     */
+    public function recordPhase(string $phase, float $startedAt, string $source = 'api'): void
+    {
+        $seconds = microtime(true) - $startedAt;
+
+        $this->observe('workoflow_phase_duration_seconds', $seconds, ['phase' => $phase, 'source' => $source]);
+        $this->serverTiming[$phase] = ($this->serverTiming[$phase] ?? 0.0) + $seconds * 1000;
+    }
+
+    /**
+     * Add an observation to a histogram.
+     *
+     * @param array<string, string> $labels
+     */
+    public function observe(string $name, float $value, array $labels = []): void
+    {
+        $this->assertType($name, 'histogram');
+
+        $series = $this->series($name, $labels);
+        foreach (self::BUCKETS as $bucket) {
+            if ($value <= $bucket) {
+                $this->add($series . '|bucket|' . $bucket, 1);
+            }
+        }
+        $this->add($series . '|bucket|+Inf', 1);
+        $this->add($series . '|sum', $value);
+        $this->add($series . '|count', 1);
+    }
+
+    /**
+     * @param array<string, string> $labels
+     */
+    public function increment(string $name, array $labels = [], float $by = 1): void
+    {
+        $this->assertType($name, 'counter');
+
+        $this->add($this->series($name, $labels) . '|value', $by);
+    }
+
+    /**
+     * Set the tool whose upstream requests are being made, for the labels of upstream metrics.
+     * Kept per Fiber, so concurrently executed tools are told apart.
+     */
+    public function setToolContext(?string $integration, ?string $tool): void
+    {
+        $context = $integration !== null && $tool !== null ? ['integration' => $integration, 'tool' => $tool] : null;
+
+        $fiber = \Fiber::getCurrent();
+        if ($fiber === null) {
+            $this->toolContext = $context;
+        } elseif ($context === null) {
+            unset($this->fiberToolContexts[$fiber]);
+        } else {
+            $this->fiberToolContexts[$fiber] = $context;
+        }
+    }
+
+    /**
+     * @return array{integration: string, tool: string}
+     */
+    public function getToolContext(): array
+    {
+        $fiber = \Fiber::getCurrent();
+        $context = $fiber !== null ? ($this->fiberToolContexts[$fiber] ?? null) : $this->toolContext;
+
+        return $context ?? ['integration' => 'none', 'tool' => 'none'];
+    }
+
+    /**
+     * Server-Timing header value for the phases of the current request, null if none were recorded.
+     */
+    public function getServerTiming(): ?string
+    {
+        if ($this->serverTiming === []) {
+            return null;
+        }
+
+        $entries = [];
+        foreach ($this->serverTiming as $phase => $milliseconds) {
+            $entries[] = sprintf('%s;dur=%.1f', $phase, $milliseconds);
+        }
+
+        return implode(', ', $entries);
+    }
+
+    /**
+     * Write the buffered observations to Redis.
+     */
+    public function flush(): void
+    {
+        $pending = $this->pending;
+        $this->pending = [];
+
+        try {
+            $this->redisStore->incrementFields(self::KEY, $pending);
+        } catch (PredisException $e) {
+            // Metrics are best effort, never fail the request for them
+            $this->logger->debug('Failed to write metrics', ['error' => $e->getMessage()]);
+        }
+    }
+
+    public function reset(): void
+    {
+        $this->serverTiming = [];
+        $this->toolContext = null;
+    }
+
+    /**
+     * Render all series in the Prometheus text exposition format.
+     */
+    public function render(): string
+    {
+        $series = [];
+        foreach ($this->redisStore->getFields(self::KEY) as $field => $value) {
+            $parts = explode('|', $field);
+            if (count($parts) < 3 || !isset(self::METRICS[$parts[0]])) {
+                continue;
+            }
+
+            [$name, $labels, $kind] = $parts;
+            if ($kind === 'bucket') {
+                $series[$name][$labels]['bucket'][$parts[3] ?? '+Inf'] = (float) $value;
+            } else {
+                $series[$name][$labels][$kind] = (float) $value;
+            }
+        }
+
+        $lines = [];
+        foreach (self::METRICS as $name => [$type, $help]) {
+            if (!isset($series[$name])) {
+                continue;
+            }
+
+            $lines[] = sprintf('# HELP %s %s', $name, $help);
+            $lines[] = sprintf('# TYPE %s %s', $name, $type);
+            ksort($series[$name]);
+
+            foreach ($series[$name] as $labels => $values) {
+                if ($type === 'counter') {
+                    $lines[] = sprintf('%s%s %s', $name, $this->labelSet($labels), $this->number($values['value'] ?? 0));
+                    continue;
+                }
+
+                foreach ([...self::BUCKETS, '+Inf'] as $bucket) {
+                    $le = sprintf('le="%s"', $bucket);
+                    $count = $values['bucket'][(string) $bucket] ?? 0;
+                    $lines[] = sprintf('%s_bucket%s %s', $name, $this->labelSet($labels, $le), $this->number($count));
+                }
+                $lines[] = sprintf('%s_sum%s %s', $name, $this->labelSet($labels), $this->number($values['sum'] ?? 0));
+                $lines[] = sprintf('%s_count%s %s', $name, $this->labelSet($labels), $this->number($values['count'] ?? 0));
+            }
+        }
+
+        return $lines === [] ? '' : implode("\n", $lines) . "\n";
+    }
+
+    private function add(string $field, float $by): void
+    {
+        $this->pending[$field] = ($this->pending[$field] ?? 0.0) + $by;
+    }
+
+    /**
+     * Series identifier: metric name and the labels in exposition syntax, sorted by label name.
+     *
+     * @param array<string, string> $labels
+     */
+    private function series(string $name, array $labels): string
+    {
+        ksort($labels);
+
+        $pairs = [];
+        foreach ($labels as $label => $value) {
+            $value = str_replace(['\\', '"', "\n", '|'], ['\\\\', '\\"', '\\n', '_'], (string) $value);
+            $pairs[] = sprintf('%s="%s"', $label, $value);
+        }
+
+        return $name . '|' . implode(',', $pairs);
+    }
+
+    private function labelSet(string $labels, string $extra = ''): string
+    {
+        $all = implode(',', array_filter([$labels, $extra], fn(string $part) => $part !== ''));
+
+        return $all === '' ? '' : '{' . $all . '}';
+    }
+
+    private function number(float $value): string
+    {
+        return $value == (int) $value ? (string) (int) $value : (string) $value;
+    }
+
+    private function assertType(string $name, string $type): void
+    {
+        if ((self::METRICS[$name][0] ?? null) !== $type) {
+            throw new \InvalidArgumentException(sprintf('Unknown %s metric "%s"', $type, $name));
+        }
+    }
+}
@@ -0,0 +1,37 @@
+<?php
+
+namespace App\Service;
+
+use Aws\ResultInterface;
+use Aws\S3\ObjectUploader;
+use Aws\S3\S3Client;
+
+/**
+ * Uploads an object to the S3 compatible storage (MinIO).
+ *
+ * Larger bodies are uploaded in parts, at most PART_SIZE * CONCURRENCY bytes
+ * are held in memory, so streams of any size can be stored. Used by the file
+ * storage and file sharing services.
+ */
+class MultipartUpload
+{
+    private const THRESHOLD = 16777216; // 16MB
+    private const PART_SIZE = 8388608; // 8MB
+    private const CONCURRENCY = 2;
+
+    /**
+     * @param string|resource $body
+     * @param array<string, mixed> $params Extra PutObject / CreateMultipartUpload parameters, e.g. ContentType
+     */
+    public static function upload(S3Client $s3Client, string $bucket, string $key, mixed $body, array $params = []): ResultInterface
+    {
+        $uploader = new ObjectUploader($s3Client, $bucket, $key, $body, 'private', [
+            'mup_threshold' => self::THRESHOLD,
+            'part_size' => self::PART_SIZE,
+            'concurrency' => self::CONCURRENCY,
+            'params' => $params,
+        ]);
+
+        return $uploader->upload();
+    }
+}
@@ -0,0 +1,209 @@
+<?php
+
+namespace App\Service;
+
+use Predis\ClientInterface;
+
+/**
+ * Small wrapper around the shared Redis connection.
+ *
+ * The cache pool (cache.app) is fine for plain key/value caching, but some
+ * state has to be coordinated between all PHP workers: exclusive locks,
+ * atomic counters, wake-up signals and values that must be compared before
+ * they are replaced.
+ * This service exposes exactly those primitives with a common key prefix.
+ */
+class RedisStore
+{
+    private const KEY_PREFIX = 'workoflow:';
+    private const LOCK_PREFIX = 'lock:';
+
+    // Only delete the lock if it is still owned by the caller
+    private const RELEASE_LOCK_SCRIPT = <<<'LUA'
+        if redis.call('get', KEYS[1]) == ARGV[1] then
+            return redis.call('del', KEYS[1])
+        end
+        return 0
+        LUA;
+
+    // Drop expired members, then add the member unless the set is full
+    private const ADD_TO_EXPIRING_SET_SCRIPT = <<<'LUA'
+        redis.call('zremrangebyscore', KEYS[1], '-inf', ARGV[1])
+        local limit = tonumber(ARGV[4])
+        if limit > 0 and redis.call('zcard', KEYS[1]) >= limit then
+            return 0
+        end
+        redis.call('zadd', KEYS[1], ARGV[2], ARGV[3])
+        redis.call('expire', KEYS[1], ARGV[5])
+        return 1
+        LUA;
+
+    public function __construct(
+        private readonly ClientInterface $redis,
+    ) {
+    }
+
+    public function get(string $key): ?string
+    {
+        $value = $this->redis->get(self::KEY_PREFIX . $key);
+
+        return $value === null ? null : (string) $value;
+    }
+
+    /**
+     * Read several keys in a single round trip.
+     *
+     * @return array<string, ?string> Values indexed by the given keys (null when missing)
+     */
+    public function getMultiple(string ...$keys): array
+    {
+        if ($keys === []) {
+            return [];
+        }
+
+        $values = $this->redis->mget(array_map(fn(string $key) => self::KEY_PREFIX . $key, $keys));
+
+        $result = [];
+        foreach ($keys as $i => $key) {
+            $result[$key] = isset($values[$i]) ? (string) $values[$i] : null;
+        }
+
+        return $result;
+    }
+
+    public function set(string $key, string $value, ?int $ttl = null): void
+    {
+        if ($ttl !== null) {
+            $this->redis->setex(self::KEY_PREFIX . $key, $ttl, $value);
+
+            return;
+        }
+
+        $this->redis->set(self::KEY_PREFIX . $key, $value);
+    }
+
+    public function delete(string ...$keys): void
+    {
+        if ($keys === []) {
+            return;
+        }
+
+        $this->redis->del(array_map(fn(string $key) => self::KEY_PREFIX . $key, $keys));
+    }
+
+    /**
+     * Atomically increment a counter and return the new value.
+     *
+     * With a $ttl, the counter is removed $ttl seconds after its first increment.
+     */
+    public function increment(string $key, int $by = 1, ?int $ttl = null): int
+    {
+        $value = (int) $this->redis->incrby(self::KEY_PREFIX . $key, $by);
+
+        if ($ttl !== null && $value === $by) {
+            $this->redis->expire(self::KEY_PREFIX . $key, $ttl);
+        }
+
+        return $value;
+    }
+
+    /**
+     * Wake up one process blocked in waitForSignal(). Signals sent while nobody waits are coalesced into one.
+     */
+    public function sendSignal(string $key): void
+    {
+        $this->redis->lpush(self::KEY_PREFIX . $key, ['1']);
+        $this->redis->ltrim(self::KEY_PREFIX . $key, 0, 0);
+    }
+
+    /**
+     * Block until a signal arrives or the timeout (in seconds) passes.
+     *
+     * Returns true if woken up by a signal.
+     */
+    public function waitForSignal(string $key, float $timeout): bool
+    {
+        return $this->redis->blpop([self::KEY_PREFIX . $key], $timeout) !== null;
+    }
+
+    /**
+     * Try to acquire an exclusive lock shared by all workers.
+     *
+     * Returns an owner token on success or null if the lock is held by someone else.
+     * The lock expires on its own after $ttl seconds in case the owner dies.
+     */
+    public function acquireLock(string $name, int $ttl): ?string
+    {
+        $token = bin2hex(random_bytes(16));
+        $result = $this->redis->set(self::KEY_PREFIX . self::LOCK_PREFIX . $name, $token, 'EX', $ttl, 'NX');
+
+        return $result !== null ? $token : null;
+    }
+
+    public function releaseLock(string $name, string $token): void
+    {
+        $this->redis->eval(self::RELEASE_LOCK_SCRIPT, 1, self::KEY_PREFIX . self::LOCK_PREFIX . $name, $token);
+    }
+
+    /**
+     * Add a member to a set in which every member expires $ttl seconds after it was added.
+     *
+     * With a $limit, the member is only added while the set holds fewer members,
+     * which makes the set usable as a counting semaphore shared by all workers.
+     * Returns false if the set is full.
+     */
+    public function addToExpiringSet(string $key, string $member, int $ttl, int $limit = 0): bool
+    {
+        $now = time();
+
+        return (bool) $this->redis->eval(
+            self::ADD_TO_EXPIRING_SET_SCRIPT,
+            1,
+            self::KEY_PREFIX . $key,
+            $now,
+            $now + $ttl,
+            $member,
+            $limit,
+            $ttl
+        );
+    }
+
+    public function removeFromExpiringSet(string $key, string $member): void
+    {
+        $this->redis->zrem(self::KEY_PREFIX . $key, $member);
+    }
+
+    /**
+     * @return string[] Members that have not expired yet
+     */
+    public function getExpiringSetMembers(string $key): array
+    {
+        return array_map('strval', $this->redis->zrangebyscore(self::KEY_PREFIX . $key, '(' . time(), '+inf'));
+    }
+
+    /**
+     * Add to several numeric fields of a hash in one round trip.
+     *
+     * @param array<string, int|float> $increments Field => amount
+     */
+    public function incrementFields(string $key, array $increments): void
+    {
+        if ($increments === []) {
+            return;
+        }
+
+        $this->redis->pipeline(function ($pipe) use ($key, $increments): void {
+            foreach ($increments as $field => $by) {
+                $pipe->hincrbyfloat(self::KEY_PREFIX . $key, (string) $field, $by);
+            }
+        });
+    }
+
+    /**
+     * @return array<string, string> All fields of a hash
+     */
+    public function getFields(string $key): array
+    {
+        return $this->redis->hgetall(self::KEY_PREFIX . $key);
+    }
+}
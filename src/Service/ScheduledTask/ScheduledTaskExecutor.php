@@ -6,6 +6,7 @@ use App\Entity\ScheduledTask;
 use App\Entity\ScheduledTaskExecution;
 use App\Service\AuditLogService;
 use App\Service\EncryptionService;
+use App\Service\MetricsService;
 use Doctrine\ORM\EntityManagerInterface;
 use Psr\Log\LoggerInterface;
 use Symfony\Contracts\HttpClient\HttpClientInterface;
@@ -24,7 +25,9 @@ class ScheduledTaskExecutor
         private EntityManagerInterface $entityManager,
         private AuditLogService $auditLogService,
         private LoggerInterface $logger,
+        private MetricsService $metricsService,
         iterable $payloadBuilders,
+        private int $maxOutputBytes = 1048576,
     ) {
         $this->payloadBuilders = $payloadBuilders;
     }
@@ -45,137 +48,267 @@ class ScheduledTaskExecutor
     }
 
     /**
-     * Execute a pre-existing pending execution asynchronously (called by Messenger handler).
+     * Perform several executions at once.
+     *
+     * All webhook requests are sent up front and their responses are read
+     * together through a single multiplexed stream, so one slow agent run
+     * doesn't hold up the others. Response bodies are captured chunk by chunk
+     * up to the configured size cap.
+     *
+     * Each execution is saved as soon as its own response has ended and then
+     * reported to $onFinished with its key, so callers can acknowledge it
+     * without waiting for the rest of the batch. A failure to save is logged
+     * and still reported as finished: the webhook was delivered, running it
+     * again would start a second agent run.
+     *
+     * @param array<int, array{0: ScheduledTask, 1: ScheduledTaskExecution}> $items
+     * @param (callable(int): void)|null $onFinished
      */
-    public function executeAsync(ScheduledTask $task, ScheduledTaskExecution $execution): void
+    public function executeBatch(array $items, ?callable $onFinished = null): void
     {
-        $this->performExecution($task, $execution);
+        // Webhook calls can take a long time (n8n workflow processing)
+        set_time_limit(180);
+
+        $runs = [];
+        $responses = new \SplObjectStorage();
+
+        foreach ($items as $key => [$task, $execution]) {
+            $runs[$key] = [
+                'task' => $task,
+                'execution' => $execution,
+                'start' => microtime(true),
+                'output' => '',
+                'truncated' => false,
+                'done' => false,
+            ];
+
+            try {
+                [$url, $options] = $this->buildRequest($task);
+                $responses[$this->httpClient->request('POST', $url, $options)] = $key;
+            } catch (\Throwable $e) {
+                $this->failRun($runs[$key], $e);
+                $this->finishRun($runs[$key], $key, $onFinished);
+            }
+        }
+
+        if (count($responses) > 0) {
+            foreach ($this->httpClient->stream($responses) as $response => $chunk) {
+                $key = $responses[$response];
+                if ($runs[$key]['done']) {
+                    continue;
+                }
+
+                try {
+                    if ($chunk->isTimeout()) {
+                        $response->cancel();
+                        $this->failRun($runs[$key], new \RuntimeException('Idle timeout reached for webhook response'));
+                    } else {
+                        if ($chunk->isFirst()) {
+                            $runs[$key]['execution']->setTimeToFirstByte((int) ((microtime(true) - $runs[$key]['start']) * 1000));
+                        }
+
+                        $this->appendOutput($runs[$key], $chunk->getContent());
+
+                        if ($runs[$key]['truncated']) {
+                            // Nothing more will be kept, stop downloading
+                            $this->completeRun($runs[$key], $response->getStatusCode());
+                            $response->cancel();
+                        } elseif ($chunk->isLast()) {
+                            $this->completeRun($runs[$key], $response->getStatusCode());
+                        }
+                    }
+                } catch (\Throwable $e) {
+                    $this->failRun($runs[$key], $e);
+                }
+
+                if ($runs[$key]['done']) {
+                    $this->finishRun($runs[$key], $key, $onFinished);
+                }
+            }
+        }
+
+        foreach ($runs as $key => $run) {
+            if (!$run['done']) {
+                $this->failRun($runs[$key], new \RuntimeException('Webhook response ended unexpectedly'));
+                $this->finishRun($runs[$key], $key, $onFinished);
+            }
+        }
     }
 
     /**
-     * Synchronous execute: creates execution + performs it. Used by the scheduled worker.
+     * @return array{0: string, 1: array<string, mixed>} Webhook URL and request options
      */
-    public function execute(ScheduledTask $task, string $trigger): ScheduledTaskExecution
+    private function buildRequest(ScheduledTask $task): array
     {
-        $execution = new ScheduledTaskExecution();
-        $execution->setScheduledTask($task);
-        $execution->setTrigger($trigger);
-
-        $this->performExecution($task, $execution);
+        $org = $task->getOrganisation();
+        $user = $task->getUser();
 
-        return $execution;
-    }
+        if ($org === null || $user === null) {
+            throw new \RuntimeException('Task has no organisation or user');
+        }
 
-    private function performExecution(ScheduledTask $task, ScheduledTaskExecution $execution): void
-    {
-        $startTime = microtime(true);
+        // Prefer the internal orchestrator URL (platform-side, inside Docker).
+        // orchestratorApiUrl is a base URL — append /webhook for the message endpoint.
+        // webhookUrl is a full URL (already includes path) used by external clients.
+        $orchestratorApiUrl = $org->getOrchestratorApiUrl();
+        if (!empty($orchestratorApiUrl)) {
+            $webhookUrl = rtrim($orchestratorApiUrl, '/') . '/webhook';
+        } else {
+            $webhookUrl = $org->getWebhookUrl();
+        }
+        if (empty($webhookUrl)) {
+            throw new \RuntimeException('Organisation has no orchestrator API URL or webhook URL configured');
+        }
 
-        // Webhook calls can take a long time (n8n workflow processing)
-        set_time_limit(180);
+        $tenantType = $org->getTenantType();
+        if (empty($tenantType)) {
+            throw new \RuntimeException('Organisation has no tenant type configured');
+        }
 
-        try {
-            $org = $task->getOrganisation();
-            $user = $task->getUser();
+        // Decrypt auth header
+        $webhookAuthHeader = '';
+        $encryptedHeader = $org->getEncryptedWebhookAuthHeader();
+        if (!empty($encryptedHeader)) {
+            $webhookAuthHeader = $this->encryptionService->decrypt($encryptedHeader);
+        }
 
-            if ($org === null || $user === null) {
-                throw new \RuntimeException('Task has no organisation or user');
+        // Find the user's organisation relationship
+        $userOrg = null;
+        foreach ($user->getUserOrganisations() as $uo) {
+            if ($uo->getOrganisation() === $org) {
+                $userOrg = $uo;
+                break;
             }
+        }
 
-            // Prefer the internal orchestrator URL (platform-side, inside Docker).
-            // orchestratorApiUrl is a base URL — append /webhook for the message endpoint.
-            // webhookUrl is a full URL (already includes path) used by external clients.
-            $orchestratorApiUrl = $org->getOrchestratorApiUrl();
-            if (!empty($orchestratorApiUrl)) {
-                $webhookUrl = rtrim($orchestratorApiUrl, '/') . '/webhook';
-            } else {
-                $webhookUrl = $org->getWebhookUrl();
-            }
-            if (empty($webhookUrl)) {
-                throw new \RuntimeException('Organisation has no orchestrator API URL or webhook URL configured');
-            }
+        if ($userOrg === null) {
+            throw new \RuntimeException('User is not a member of the task organisation');
+        }
 
-            $tenantType = $org->getTenantType();
-            if (empty($tenantType)) {
-                throw new \RuntimeException('Organisation has no tenant type configured');
+        // Find matching payload builder
+        $builder = null;
+        foreach ($this->payloadBuilders as $payloadBuilder) {
+            if ($payloadBuilder->supports($tenantType)) {
+                $builder = $payloadBuilder;
+                break;
             }
+        }
 
-            // Decrypt auth header
-            $webhookAuthHeader = '';
-            $encryptedHeader = $org->getEncryptedWebhookAuthHeader();
-            if (!empty($encryptedHeader)) {
-                $webhookAuthHeader = $this->encryptionService->decrypt($encryptedHeader);
-            }
+        if ($builder === null) {
+            throw new \RuntimeException(sprintf('No payload builder found for tenant type "%s"', $tenantType));
+        }
 
-            // Find the user's organisation relationship
-            $userOrg = null;
-            foreach ($user->getUserOrganisations() as $uo) {
-                if ($uo->getOrganisation() === $org) {
-                    $userOrg = $uo;
-                    break;
-                }
-            }
+        $payload = $builder->buildPayload($task, $org, $user, $userOrg, $webhookAuthHeader);
 
-            if ($userOrg === null) {
-                throw new \RuntimeException('User is not a member of the task organisation');
-            }
+        // Ensure webhook URL has protocol
+        $url = $webhookUrl;
+        if (!str_starts_with($url, 'http://') && !str_starts_with($url, 'https://')) {
+            $url = 'https://' . $url;
+        }
 
-            // Find matching payload builder
-            $builder = null;
-            foreach ($this->payloadBuilders as $payloadBuilder) {
-                if ($payloadBuilder->supports($tenantType)) {
-                    $builder = $payloadBuilder;
-                    break;
-                }
-            }
+        return [$url, [
+            'headers' => $payload['headers'],
+            'json' => $payload['body'],
+            'timeout' => 120,
+        ]];
+    }
 
-            if ($builder === null) {
-                throw new \RuntimeException(sprintf('No payload builder found for tenant type "%s"', $tenantType));
-            }
+    private function appendOutput(array &$run, string $content): void
+    {
+        $remaining = $this->maxOutputBytes - strlen($run['output']);
 
-            $payload = $builder->buildPayload($task, $org, $user, $userOrg, $webhookAuthHeader);
+        if (strlen($content) > $remaining) {
+            $run['output'] .= substr($content, 0, max(0, $remaining));
+            $run['truncated'] = true;
 
-            // Ensure webhook URL has protocol
-            $url = $webhookUrl;
-            if (!str_starts_with($url, 'http://') && !str_starts_with($url, 'https://')) {
-                $url = 'https://' . $url;
-            }
+            return;
+        }
 
-            $response = $this->httpClient->request('POST', $url, [
-                'headers' => $payload['headers'],
-                'json' => $payload['body'],
-                'timeout' => 120,
-            ]);
+        $run['output'] .= $content;
+    }
+
+    private function completeRun(array &$run, int $statusCode): void
+    {
+        $run['done'] = true;
+
+        /** @var ScheduledTaskExecution $execution */
+        $execution = $run['execution'];
+        $execution->setHttpStatusCode($statusCode);
+        $execution->setOutput($run['truncated']
+            ? $run['output'] . sprintf("\n... [Response truncated at %d bytes]", $this->maxOutputBytes)
+            : $run['output']);
+
+        if ($statusCode >= 200 && $statusCode < 300) {
+            $execution->setStatus('success');
+        } else {
+            $execution->setStatus('failed');
+            $execution->setErrorMessage(sprintf('HTTP %d response', $statusCode));
+        }
 
-            $statusCode = $response->getStatusCode();
-            $responseBody = $response->getContent(false);
+        $execution->setDuration((int) ((microtime(true) - $run['start']) * 1000));
+    }
 
-            $execution->setHttpStatusCode($statusCode);
-            $execution->setOutput($responseBody);
+    private function failRun(array &$run, \Throwable $e): void
+    {
+        $run['done'] = true;
+
+        /** @var ScheduledTaskExecution $execution */
+        $execution = $run['execution'];
+        $execution->setStatus('failed');
+        $execution->setErrorMessage($e->getMessage());
+        $execution->setDuration((int) ((microtime(true) - $run['start']) * 1000));
+
+        $this->logger->error('Scheduled task execution failed', [
+            'task_uuid' => $run['task']->getUuid(),
+            'error' => $e->getMessage(),
+        ]);
+    }
 
-            if ($statusCode >= 200 && $statusCode < 300) {
-                $execution->setStatus('success');
-            } else {
-                $execution->setStatus('failed');
-                $execution->setErrorMessage(sprintf('HTTP %d response', $statusCode));
-            }
+    private function recordMetrics(ScheduledTaskExecution $execution): void
+    {
+        $this->metricsService->observe(
+            'workoflow_scheduled_task_duration_seconds',
+            ($execution->getDuration() ?? 0) / 1000,
+            ['status' => $execution->getStatus()]
+        );
+
+        if ($execution->getTimeToFirstByte() !== null) {
+            $this->metricsService->observe(
+                'workoflow_scheduled_task_time_to_first_byte_seconds',
+                $execution->getTimeToFirstByte() / 1000
+            );
+        }
+    }
+
+    /**
+     * Save a finished execution on its own and report it to the caller.
+     *
+     * @param (callable(int): void)|null $onFinished
+     */
+    private function finishRun(array $run, int $key, ?callable $onFinished): void
+    {
+        /** @var ScheduledTask $task */
+        $task = $run['task'];
+        /** @var ScheduledTaskExecution $execution */
+        $execution = $run['execution'];
+
+        try {
+            // Update task
+            $task->setLastExecutionAt(new \DateTime('now', new \DateTimeZone('UTC')));
+            $task->computeNextExecutionAt();
+
+            $this->entityManager->persist($execution);
+            $this->entityManager->flush();
         } catch (\Throwable $e) {
-            $execution->setStatus('failed');
-            $execution->setErrorMessage($e->getMessage());
-            $this->logger->error('Scheduled task execution failed', [
+            $this->logger->error('Failed to save scheduled task execution', [
                 'task_uuid' => $task->getUuid(),
+                'execution_id' => $execution->getId(),
+                'status' => $execution->getStatus(),
                 'error' => $e->getMessage(),
             ]);
         }
 
-        $duration = (int) ((microtime(true) - $startTime) * 1000);
-        $execution->setDuration($duration);
-
-        // Update task
-        $task->setLastExecutionAt(new \DateTime('now', new \DateTimeZone('UTC')));
-        $task->computeNextExecutionAt();
-
-        $this->entityManager->persist($execution);
-        $this->entityManager->flush();
+        $this->recordMetrics($execution);
 
         $this->auditLogService->logWithOrganisation(
             'scheduled_task.executed',
@@ -186,8 +319,13 @@ class ScheduledTaskExecutor
                 'task_name' => $task->getName(),
                 'trigger' => $execution->getTrigger(),
                 'status' => $execution->getStatus(),
-                'duration_ms' => $duration,
+                'duration_ms' => $execution->getDuration(),
+                'time_to_first_byte_ms' => $execution->getTimeToFirstByte(),
             ],
         );
+
+        if ($onFinished !== null) {
+            $onFinished($key);
+        }
     }
 }
@@ -0,0 +1,48 @@
+<?php
+
+namespace App\Service\ScheduledTask;
+
+use App\Service\RedisStore;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Wakes the scheduled task worker when a task is created or rescheduled, so a
+ * task that is due earlier than the worker's current sleep target starts on time.
+ */
+class ScheduledTaskWakeup
+{
+    private const SIGNAL_KEY = 'scheduled_task_wakeup';
+
+    public function __construct(
+        private readonly RedisStore $store,
+        private readonly LoggerInterface $logger,
+    ) {
+    }
+
+    public function notify(): void
+    {
+        try {
+            $this->store->sendSignal(self::SIGNAL_KEY);
+        } catch (\Throwable $e) {
+            // The worker still re-checks the schedule on its own, just later
+            $this->logger->warning('Failed to wake up scheduled task worker', ['error' => $e->getMessage()]);
+        }
+    }
+
+    /**
+     * Sleep for up to $seconds, returning early when notify() is called.
+     */
+    public function wait(float $seconds): void
+    {
+        if ($seconds <= 0) {
+            return;
+        }
+
+        try {
+            $this->store->waitForSignal(self::SIGNAL_KEY, $seconds);
+        } catch (\Throwable $e) {
+            $this->logger->warning('Scheduled task wake-up channel unavailable, sleeping instead', ['error' => $e->getMessage()]);
+            usleep((int) ($seconds * 1_000_000));
+        }
+    }
+}
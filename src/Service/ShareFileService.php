@@ -10,6 +10,10 @@ use Symfony\Component\Uid\Uuid;
 
 class ShareFileService
 {
+    // Decoded files larger than this are buffered on disk instead of in memory
+    private const TEMP_MEMORY_LIMIT = 2097152; // 2MB
+    private const DECODE_CHUNK_SIZE = 1048576; // 1MB
+
     private ?S3Client $s3Client = null;
     private string $bucket;
     private string $publicBucket;
@@ -111,6 +115,22 @@ class ShareFileService
     }
 
     public function shareFile(string $binaryData, string $contentType, string $orgUuid): array
+    {
+        $stream = $this->decodeToStream($binaryData);
+
+        try {
+            return $this->shareStream($stream, $contentType, $orgUuid);
+        } finally {
+            fclose($stream);
+        }
+    }
+
+    /**
+     * Share a file from a stream; large files are uploaded in parts without loading them into memory.
+     *
+     * @param resource $stream
+     */
+    public function shareStream($stream, string $contentType, string $orgUuid): array
     {
         $this->ensureBucketExists();
 
@@ -119,23 +139,15 @@ class ShareFileService
             $fileId = Uuid::v4()->toString();
             $extension = $this->getExtensionFromMimeType($contentType);
             $filename = sprintf('%s/%s.%s', $orgUuid, $fileId, $extension);
-
-            // Decode base64 data
-            $decodedData = base64_decode($binaryData, true);
-            if ($decodedData === false) {
-                throw new \InvalidArgumentException('Invalid base64 encoded data');
-            }
+            $size = fstat($stream)['size'] ?? null;
 
             // Upload to public bucket
-            $result = $this->getS3Client()->putObject([
-                'Bucket' => $this->publicBucket,
-                'Key' => $filename,
-                'Body' => $decodedData,
+            MultipartUpload::upload($this->getS3Client(), $this->publicBucket, $filename, $stream, [
                 'ContentType' => $contentType,
                 'Metadata' => [
                     'shared_at' => date('Y-m-d H:i:s'),
                     'org_uuid' => $orgUuid
-                ]
+                ],
             ]);
 
             // Generate public URL using the application route
@@ -150,7 +162,7 @@ class ShareFileService
                 'org_uuid' => $orgUuid,
                 'file_id' => $fileId,
                 'content_type' => $contentType,
-                'size' => strlen($decodedData)
+                'size' => $size
             ]);
 
             return [
@@ -168,6 +180,71 @@ class ShareFileService
         }
     }
 
+    /**
+     * Decode base64 data chunk by chunk into a temp stream, so the decoded file isn't kept as a second string.
+     *
+     * Accepts what base64_decode() accepts in strict mode: the base64 alphabet and
+     * whitespace, padding only at the end, optionally left out.
+     *
+     * @return resource
+     */
+    private function decodeToStream(string $binaryData)
+    {
+        $whitespace = " \t\r\n";
+        $length = strlen($binaryData);
+        if (strspn($binaryData, "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=" . $whitespace) !== $length) {
+            throw new \RuntimeException('Failed to share file: Invalid base64 encoded data');
+        }
+
+        $dataLength = $length;
+        foreach (str_split($whitespace) as $character) {
+            $dataLength -= substr_count($binaryData, $character);
+        }
+
+        $paddingAt = strpos($binaryData, '=');
+        $padding = $paddingAt === false ? 0 : substr_count($binaryData, '=', $paddingAt);
+        $paddingValid = $paddingAt === false || (
+            strspn($binaryData, '=' . $whitespace, $paddingAt) === $length - $paddingAt
+            && $padding <= 2
+            && $dataLength % 4 === 0
+        );
+        if (!$paddingValid || $dataLength % 4 === 1) {
+            throw new \RuntimeException('Failed to share file: Invalid base64 encoded data');
+        }
+
+        $stream = fopen('php://temp/maxmemory:' . self::TEMP_MEMORY_LIMIT, 'w+b');
+        $filter = stream_filter_append($stream, 'convert.base64-decode', STREAM_FILTER_WRITE);
+
+        // Unpadded data is completed, the filter expects whole 4 character groups
+        $chunks = (function () use ($binaryData, $length, $dataLength): \Generator {
+            for ($offset = 0; $offset < $length; $offset += self::DECODE_CHUNK_SIZE) {
+                yield substr($binaryData, $offset, self::DECODE_CHUNK_SIZE);
+            }
+            if ($dataLength % 4 !== 0) {
+                yield str_repeat('=', 4 - $dataLength % 4);
+            }
+        })();
+
+        foreach ($chunks as $chunk) {
+            // The filter reports invalid input as a warning and a failed write
+            $written = @fwrite($stream, $chunk);
+            if ($written !== strlen($chunk)) {
+                fclose($stream);
+
+                throw new \RuntimeException('Failed to share file: Invalid base64 encoded data');
+            }
+        }
+
+        if (!@stream_filter_remove($filter)) {
+            fclose($stream);
+
+            throw new \RuntimeException('Failed to share file: Invalid base64 encoded data');
+        }
+        rewind($stream);
+
+        return $stream;
+    }
+
     private function getExtensionFromMimeType(string $mimeType): string
     {
         $extensions = [
@@ -0,0 +1,123 @@
+<?php
+
+namespace App\Service;
+
+use App\Entity\IntegrationConfig;
+use App\Integration\PersonalizedSkillInterface;
+use App\Integration\ToolDefinition;
+use Symfony\Component\DependencyInjection\Attribute\Autowire;
+use Symfony\Contracts\Service\ResetInterface;
+
+/**
+ * Caches the rendered system prompts served by GET /api/skills/.
+ *
+ * Entries are keyed by integration type, config id and config updatedAt, a
+ * hash of the prompt templates, the integration's tool names (prompts list
+ * and count them), the locale and the current date (the templates print it),
+ * so any change to a config, template or tool set renders the prompt again.
+ * prefetch() loads the prompts of a whole skill list with a single Redis
+ * round trip.
+ */
+class SkillPromptCache implements ResetInterface
+{
+    private const CACHE_TTL = 86400; // the date in the key rolls entries over daily anyway
+    private const KEY_PREFIX = 'skill_prompt:';
+
+    /**
+     * @var array<string, string> Cache key => prompt, loaded by prefetch()
+     */
+    private array $prefetched = [];
+
+    private ?string $templateHash = null;
+
+    /**
+     * @var array<string, string> Integration type => hash of its tool names
+     */
+    private array $toolHashes = [];
+
+    public function __construct(
+        private readonly RedisStore $store,
+        #[Autowire('%kernel.project_dir%/templates/skills/prompts')]
+        private readonly string $templateDir,
+    ) {
+    }
+
+    /**
+     * Load the cached prompts of several skills at once.
+     *
+     * @param list<array{0: PersonalizedSkillInterface, 1: IntegrationConfig|null}> $skills
+     */
+    public function prefetch(array $skills, string $locale): void
+    {
+        $keys = array_map(fn(array $skill) => $this->buildKey($skill[0], $skill[1], $locale), $skills);
+
+        foreach ($this->store->getMultiple(...$keys) as $key => $prompt) {
+            if ($prompt !== null) {
+                $this->prefetched[$key] = $prompt;
+            }
+        }
+    }
+
+    /**
+     * Cached system prompt of a skill, rendered and stored on a miss.
+     */
+    public function getSystemPrompt(PersonalizedSkillInterface $integration, ?IntegrationConfig $config, string $locale): string
+    {
+        $key = $this->buildKey($integration, $config, $locale);
+
+        $prompt = $this->prefetched[$key] ?? $this->store->get($key);
+        if ($prompt === null) {
+            $prompt = $integration->getSystemPrompt($config);
+            $this->store->set($key, $prompt, self::CACHE_TTL);
+        }
+
+        return $prompt;
+    }
+
+    public function reset(): void
+    {
+        $this->prefetched = [];
+    }
+
+    private function buildKey(PersonalizedSkillInterface $integration, ?IntegrationConfig $config, string $locale): string
+    {
+        return self::KEY_PREFIX . $integration->getType() . ':' . ($config?->getId() ?? 'default') . ':' . md5(json_encode([
+            $config?->getUpdatedAt()?->format('U.u'),
+            $this->getTemplateHash(),
+            $this->getToolHash($integration),
+            $locale,
+            date('Y-m-d'),
+        ]));
+    }
+
+    /**
+     * Hash over the tool names of an integration, computed once per worker.
+     */
+    private function getToolHash(PersonalizedSkillInterface $integration): string
+    {
+        return $this->toolHashes[$integration->getType()] ??= hash('xxh128', implode("\0", array_map(
+            fn(ToolDefinition $tool) => $tool->getName(),
+            $integration->getTools()
+        )));
+    }
+
+    /**
+     * Hash over the contents of all prompt templates, computed once per worker.
+     */
+    private function getTemplateHash(): string
+    {
+        if ($this->templateHash === null) {
+            $files = glob($this->templateDir . '/*.twig') ?: [];
+            sort($files);
+
+            $context = hash_init('xxh128');
+            foreach ($files as $file) {
+                hash_update($context, basename($file) . "\0");
+                hash_update_file($context, $file);
+            }
+            $this->templateHash = hash_final($context);
+        }
+
+        return $this->templateHash;
+    }
+}
@@ -0,0 +1,242 @@
+<?php
+
+namespace App\Service;
+
+use Predis\PredisException;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Shared cache for access tokens obtained from identity providers.
+ *
+ * Token exchanges (Azure OBO, SAML2 bearer, OAuth refresh) cost one or more
+ * round trips to the provider, and concurrent tool calls for the same user
+ * used to run them side by side, each discarding the token of the other
+ * (refresh tokens rotate). Tokens are now kept encrypted in Redis, keyed by
+ * owner and audience, until shortly before they expire:
+ *
+ * - fresh tokens are returned from memory or Redis;
+ * - tokens within REFRESH_AHEAD of their expiry are still returned, and a new
+ *   one is fetched after the response is sent (see TokenCacheRefreshSubscriber);
+ * - missing or expired tokens are fetched by one worker holding a Redis lock,
+ *   the other workers wait for its result instead of calling the provider.
+ */
+class TokenCache
+{
+    private const KEY_PREFIX = 'token:';
+    private const REFRESH_AHEAD = 300; // seconds before expiry
+    private const EXPIRY_MARGIN = 30; // never hand out tokens expiring sooner
+    private const LOCK_TTL = 30; // seconds, covers the slowest token exchange
+    private const LOCK_WAIT = 10.0; // seconds to wait for another worker's refresh
+    private const POLL_INTERVAL = 100000; // microseconds
+    private const MAX_LOCAL_ENTRIES = 500;
+
+    /**
+     * Per-worker copy of the tokens read from Redis.
+     *
+     * @var array<string, array{value: array<string, mixed>, expires_at: int}>
+     */
+    private array $local = [];
+
+    /**
+     * @var array<string, array{fetch: callable, expires_at: int}>
+     */
+    private array $pendingRefreshes = [];
+
+    public function __construct(
+        private readonly RedisStore $redisStore,
+        private readonly EncryptionService $encryptionService,
+        private readonly LoggerInterface $logger,
+    ) {
+    }
+
+    /**
+     * Build a cache key from the token type and everything identifying owner and audience.
+     *
+     * The parts are hashed, so secrets like refresh tokens never appear in Redis keys.
+     */
+    public static function key(string $type, string ...$parts): string
+    {
+        return $type . ':' . hash('sha256', implode("\0", $parts));
+    }
+
+    /**
+     * Return the token for $key, fetching a new one when it is missing or about to expire.
+     *
+     * @param callable(): array{value: array<string, mixed>, expires_at: int} $fetch Obtains a new token from the provider
+     * @param array{value: array<string, mixed>, expires_at: int}|null $current Token the caller already holds, e.g. from stored credentials
+     * @return array<string, mixed> The token value
+     */
+    public function get(string $key, callable $fetch, ?array $current = null): array
+    {
+        try {
+            $entry = $this->lookup($key);
+            if ($current !== null && ($entry === null || $current['expires_at'] > $entry['expires_at'])) {
+                $entry = $current;
+            }
+
+            if ($entry !== null && $this->isUsable($entry)) {
+                if ($entry['expires_at'] - self::REFRESH_AHEAD <= time()) {
+                    $this->pendingRefreshes[$key] = ['fetch' => $fetch, 'expires_at' => $entry['expires_at']];
+                }
+
+                return $entry['value'];
+            }
+
+            return $this->refresh($key, $fetch, $entry['expires_at'] ?? 0, true);
+        } catch (PredisException $e) {
+            $this->logger->warning('Token cache unavailable, fetching token directly', [
+                'key' => $key,
+                'error' => $e->getMessage(),
+            ]);
+
+            return $fetch()['value'];
+        }
+    }
+
+    /**
+     * Fetch new tokens for everything handed out close to its expiry during this request.
+     */
+    public function refreshPending(): void
+    {
+        $pending = $this->pendingRefreshes;
+        $this->pendingRefreshes = [];
+
+        foreach ($pending as $key => $refresh) {
+            try {
+                $this->refresh($key, $refresh['fetch'], $refresh['expires_at'], false);
+            } catch (\Throwable $e) {
+                $this->logger->warning('Background token refresh failed', [
+                    'key' => $key,
+                    'error' => $e->getMessage(),
+                ]);
+            }
+        }
+    }
+
+    /**
+     * Fetch a token newer than $staleExpiresAt, only one worker at a time per key.
+     *
+     * Without $wait, returns null when another worker is already refreshing.
+     *
+     * @return array<string, mixed>|null
+     */
+    private function refresh(string $key, callable $fetch, int $staleExpiresAt, bool $wait): ?array
+    {
+        $lockName = self::KEY_PREFIX . $key;
+        $lockToken = $this->redisStore->acquireLock($lockName, self::LOCK_TTL);
+
+        if ($lockToken === null) {
+            if (!$wait) {
+                return null;
+            }
+
+            $deadline = microtime(true) + self::LOCK_WAIT;
+            while (microtime(true) < $deadline) {
+                usleep(self::POLL_INTERVAL);
+                $entry = $this->load($key);
+                if ($entry !== null && $entry['expires_at'] > $staleExpiresAt && $this->isUsable($entry)) {
+                    return $entry['value'];
+                }
+            }
+
+            $this->logger->warning('Timed out waiting for another worker to refresh a token', ['key' => $key]);
+
+            return $this->store($key, $fetch());
+        }
+
+        try {
+            // Another worker may have stored a new token between our read and the lock
+            $entry = $this->load($key);
+            if ($entry !== null && $entry['expires_at'] > $staleExpiresAt && $this->isUsable($entry)) {
+                return $entry['value'];
+            }
+
+            return $this->store($key, $fetch());
+        } finally {
+            $this->redisStore->releaseLock($lockName, $lockToken);
+        }
+    }
+
+    /**
+     * @return array{value: array<string, mixed>, expires_at: int}|null
+     */
+    private function lookup(string $key): ?array
+    {
+        $entry = $this->local[$key] ?? null;
+        if ($entry !== null && $this->isUsable($entry)) {
+            return $entry;
+        }
+
+        return $this->load($key);
+    }
+
+    /**
+     * @return array{value: array<string, mixed>, expires_at: int}|null
+     */
+    private function load(string $key): ?array
+    {
+        $encrypted = $this->redisStore->get(self::KEY_PREFIX . $key);
+        if ($encrypted === null) {
+            return null;
+        }
+
+        try {
+            $entry = json_decode($this->encryptionService->decrypt($encrypted), true, 512, JSON_THROW_ON_ERROR);
+        } catch (\Exception $e) {
+            $this->logger->warning('Discarding unreadable cached token', ['key' => $key, 'error' => $e->getMessage()]);
+
+            return null;
+        }
+
+        $this->remember($key, $entry);
+
+        return $entry;
+    }
+
+    /**
+     * @param array{value: array<string, mixed>, expires_at: int} $entry
+     * @return array<string, mixed>
+     */
+    private function store(string $key, array $entry): array
+    {
+        $ttl = $entry['expires_at'] - time();
+        if ($ttl <= self::EXPIRY_MARGIN) {
+            return $entry['value'];
+        }
+
+        $this->remember($key, $entry);
+
+        // The token is fetched already, losing the shared copy must not fail the caller
+        try {
+            $this->redisStore->set(
+                self::KEY_PREFIX . $key,
+                $this->encryptionService->encrypt(json_encode($entry)),
+                $ttl
+            );
+        } catch (PredisException $e) {
+            $this->logger->warning('Failed to share refreshed token', ['key' => $key, 'error' => $e->getMessage()]);
+        }
+
+        return $entry['value'];
+    }
+
+    /**
+     * @param array{value: array<string, mixed>, expires_at: int} $entry
+     */
+    private function remember(string $key, array $entry): void
+    {
+        unset($this->local[$key]);
+        if (count($this->local) >= self::MAX_LOCAL_ENTRIES) {
+            unset($this->local[array_key_first($this->local)]);
+        }
+        $this->local[$key] = $entry;
+    }
+
+    /**
+     * @param array{value: array<string, mixed>, expires_at: int} $entry
+     */
+    private function isUsable(array $entry): bool
+    {
+        return $entry['expires_at'] - self::EXPIRY_MARGIN > time();
+    }
+}
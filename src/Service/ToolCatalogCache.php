@@ -0,0 +1,103 @@
+<?php
+
+namespace App\Service;
+
+use App\DTO\ToolFilterCriteria;
+
+/**
+ * Caches the assembled tool list served by GET /api/integrations/{org}/.
+ *
+ * Entries are keyed by organisation, workflow user and tool type filter and
+ * tagged with the organisation's catalog version. Any change to the inputs of
+ * the tool list (integration configs, access modes, tool toggles) bumps the
+ * version, so stale entries are never served. Entries also expire after a
+ * short TTL because remote MCP and orchestrator tools are discovered dynamically.
+ */
+class ToolCatalogCache
+{
+    private const CACHE_TTL = 300; // 5 minutes, aligned with orchestrator capabilities cache
+    private const ENTRY_PREFIX = 'tool_catalog:';
+    private const VERSION_PREFIX = 'tool_catalog_version:';
+
+    public function __construct(
+        private readonly RedisStore $store,
+    ) {
+    }
+
+    /**
+     * Look up the cached tool list and the current catalog version in a single Redis round trip.
+     *
+     * @return array{version: string, entry: array{etag: string, json: string, tools_count: int}|null}
+     */
+    public function get(int $organisationId, ToolFilterCriteria $criteria): array
+    {
+        $versionKey = self::VERSION_PREFIX . $organisationId;
+        $entryKey = $this->buildEntryKey($organisationId, $criteria);
+
+        $values = $this->store->getMultiple($versionKey, $entryKey);
+        $version = $values[$versionKey] ?? '0';
+
+        $entry = $values[$entryKey] !== null ? json_decode($values[$entryKey], true) : null;
+        if (!is_array($entry) || ($entry['version'] ?? null) !== $version) {
+            return ['version' => $version, 'entry' => null];
+        }
+
+        return [
+            'version' => $version,
+            'entry' => [
+                'etag' => $entry['etag'],
+                'json' => $entry['json'],
+                'tools_count' => $entry['tools_count'],
+            ],
+        ];
+    }
+
+    /**
+     * Store an encoded tool list for the catalog version it was built from.
+     *
+     * @return array{etag: string, json: string, tools_count: int}
+     */
+    public function save(int $organisationId, ToolFilterCriteria $criteria, string $version, string $json, int $toolsCount): array
+    {
+        $entry = [
+            'etag' => hash('xxh128', $json),
+            'json' => $json,
+            'tools_count' => $toolsCount,
+        ];
+
+        $this->store->set(
+            $this->buildEntryKey($organisationId, $criteria),
+            json_encode(['version' => $version] + $entry),
+            self::CACHE_TTL
+        );
+
+        return $entry;
+    }
+
+    /**
+     * Current catalog version of an organisation; changes whenever its configs, tool toggles or access modes change.
+     */
+    public function getVersion(int $organisationId): string
+    {
+        return $this->store->get(self::VERSION_PREFIX . $organisationId) ?? '0';
+    }
+
+    /**
+     * Invalidate all cached tool lists of an organisation by bumping its catalog version.
+     */
+    public function invalidateOrganisation(int $organisationId): void
+    {
+        $this->store->increment(self::VERSION_PREFIX . $organisationId);
+    }
+
+    private function buildEntryKey(int $organisationId, ToolFilterCriteria $criteria): string
+    {
+        $toolTypes = $criteria->getToolTypes();
+        sort($toolTypes);
+
+        return self::ENTRY_PREFIX . $organisationId . ':' . md5(json_encode([
+            $criteria->getWorkflowUserId(),
+            $toolTypes,
+        ]));
+    }
+}
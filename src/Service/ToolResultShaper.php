@@ -0,0 +1,363 @@
+<?php
+
+namespace App\Service;
+
+use App\Integration\ToolDefinition;
+use Predis\PredisException;
+use Psr\Log\LoggerInterface;
+
+/**
+ * Keeps tool results sent back to agents within a byte budget.
+ *
+ * Results within their budget are returned unchanged. Larger results are
+ * projected to the essential fields declared on the ToolDefinition, then long
+ * strings are cut with a marker and finally the tails of the largest lists are
+ * dropped until the result fits. The full result is kept in Redis for a while
+ * under a continuation handle, so the agent can fetch the omitted parts with
+ * the tool_result_continue tool.
+ */
+class ToolResultShaper
+{
+    public const DEFAULT_MAX_BYTES = 32768; // ~8k tokens
+    public const CONTINUATION_TTL = 900; // seconds
+    private const KEY_PREFIX = 'tool_result:';
+    private const MAX_STRING_LENGTH = 4000; // characters, first truncation pass
+    private const MIN_STRING_LENGTH = 250; // characters, never cut strings shorter
+    private const DEFAULT_CHUNK_LENGTH = 20000; // characters returned per continuation call
+
+    public function __construct(
+        private readonly RedisStore $redisStore,
+        private readonly LoggerInterface $logger,
+    ) {
+    }
+
+    /**
+     * Shape a tool result for the agent.
+     *
+     * @param array<mixed> $result The result as returned by the integration
+     * @param ToolDefinition|null $tool Null for tools without a definition (remote MCP)
+     * @return array{result: array<mixed>, continuation: array<string, mixed>|null}
+     */
+    public function shape(array $result, string $organisationUuid, ?ToolDefinition $tool = null): array
+    {
+        $maxBytes = $tool?->getMaxResultBytes() ?? self::DEFAULT_MAX_BYTES;
+        $originalBytes = $this->size($result);
+        if ($originalBytes <= $maxBytes) {
+            return ['result' => $result, 'continuation' => null];
+        }
+
+        $handle = bin2hex(random_bytes(12));
+
+        try {
+            $this->redisStore->set(
+                $this->key($organisationUuid, $handle),
+                json_encode($result, JSON_INVALID_UTF8_SUBSTITUTE),
+                self::CONTINUATION_TTL
+            );
+        } catch (PredisException $e) {
+            // Without a stored copy, nothing cut away could be fetched again
+            $this->logger->warning('Failed to store tool result continuation, returning full result', [
+                'error' => $e->getMessage(),
+            ]);
+
+            return ['result' => $result, 'continuation' => null];
+        }
+
+        $fields = $tool?->getResultFields() ?? [];
+        $shaped = $fields !== [] ? $this->project($result, $this->fieldTree($fields), true) : $result;
+        ['data' => $shaped, 'omitted_items' => $omittedItems] = $this->fit($shaped, $maxBytes, $handle, '');
+
+        $this->logger->info('Tool result shaped', [
+            'tool' => $tool?->getName(),
+            'original_bytes' => $originalBytes,
+            'returned_bytes' => $this->size($shaped),
+            'omitted_lists' => count($omittedItems),
+        ]);
+
+        $continuation = [
+            'handle' => $handle,
+            'original_bytes' => $originalBytes,
+            'fields_omitted' => $fields !== [],
+            'expires_in' => self::CONTINUATION_TTL,
+            'hint' => 'The result was shortened. Call tool_result_continue with this handle and the path of a '
+                . 'field (e.g. "issues.0.labels") to read what was left out.',
+        ];
+        if ($omittedItems !== []) {
+            $continuation['items_omitted'] = $omittedItems;
+            $continuation['hint'] .= sprintf(
+                ' Items at the end of some lists were left out (see items_omitted), read them with the list path and '
+                . 'the index of the first missing item as offset (e.g. path "%s", offset %d).',
+                $omittedItems[0]['path'],
+                $omittedItems[0]['from']
+            );
+        }
+
+        return [
+            'result' => $shaped,
+            'continuation' => $continuation,
+        ];
+    }
+
+    /**
+     * Read part of a stored result.
+     *
+     * Strings are returned in chunks of $length characters starting at $offset,
+     * lists from the item at index $offset on, any other value is returned
+     * shaped to the default budget.
+     *
+     * @return array<string, mixed>
+     *
+     * @throws \RuntimeException When the handle is unknown or expired
+     * @throws \InvalidArgumentException When the path does not exist in the result
+     */
+    public function continue(
+        string $organisationUuid,
+        string $handle,
+        string $path = '',
+        int $offset = 0,
+        ?int $length = null
+    ): array {
+        $stored = $this->redisStore->get($this->key($organisationUuid, $handle));
+        if ($stored === null) {
+            throw new \RuntimeException('Continuation handle is unknown or has expired, run the original tool again');
+        }
+
+        $value = json_decode($stored, true);
+        $segments = $path === '' ? [] : explode('.', $path);
+        foreach ($segments as $segment) {
+            if (!is_array($value) || !array_key_exists($segment, $value)) {
+                throw new \InvalidArgumentException(sprintf('Path "%s" does not exist in the result', $path));
+            }
+            $value = $value[$segment];
+        }
+
+        $offset = max(0, $offset);
+
+        if (is_array($value)) {
+            $firstIndex = array_is_list($value) ? min($offset, count($value)) : 0;
+            $items = $firstIndex > 0 ? array_slice($value, $firstIndex) : $value;
+            $fitted = $this->fit($items, self::DEFAULT_MAX_BYTES, $handle, $path, $firstIndex);
+
+            $response = ['path' => $path];
+            if (array_is_list($value)) {
+                // content[0] is the item at index offset
+                $response += ['offset' => $firstIndex, 'total_items' => count($value)];
+            }
+            $response['content'] = $fitted['data'];
+            if ($fitted['omitted_items'] !== []) {
+                $response['items_omitted'] = $fitted['omitted_items'];
+            }
+
+            return $response;
+        }
+
+        if (!is_string($value)) {
+            return ['path' => $path, 'content' => $value];
+        }
+
+        $length = max(1, $length ?? self::DEFAULT_CHUNK_LENGTH);
+        $totalLength = mb_strlen($value);
+
+        return [
+            'path' => $path,
+            'offset' => $offset,
+            'content' => mb_substr($value, $offset, $length),
+            'total_length' => $totalLength,
+            'remaining' => max(0, $totalLength - $offset - $length),
+        ];
+    }
+
+    /**
+     * Turn dot paths into a nested lookup tree, true marking a kept leaf.
+     *
+     * @param string[] $fields
+     * @return array<string, mixed>
+     */
+    private function fieldTree(array $fields): array
+    {
+        $tree = [];
+        foreach ($fields as $field) {
+            $node = &$tree;
+            foreach (explode('.', $field) as $segment) {
+                if (($node[$segment] ?? null) === true) {
+                    continue 2;
+                }
+                $node[$segment] ??= [];
+                $node = &$node[$segment];
+            }
+            $node = true;
+        }
+        unset($node);
+
+        return $tree;
+    }
+
+    /**
+     * Keep only the fields in $tree. Keys and list indexes are preserved, so
+     * paths into the shaped result are valid in the stored full result.
+     *
+     * Scalars at the top level (status, totals, pagination cursors) are always kept.
+     *
+     * @param array<mixed> $data
+     * @param array<string, mixed> $tree
+     * @return array<mixed>
+     */
+    private function project(array $data, array $tree, bool $topLevel = false): array
+    {
+        $projected = [];
+        foreach ($data as $key => $value) {
+            $node = $tree[(string) $key] ?? $tree['*'] ?? null;
+
+            if ($node === true || ($node === null && $topLevel && !is_array($value))) {
+                $projected[$key] = $value;
+            } elseif (is_array($node) && is_array($value)) {
+                $projected[$key] = $this->project($value, $node);
+            }
+        }
+
+        return $projected;
+    }
+
+    /**
+     * Cut long strings, halving the allowed length until the data fits $maxBytes.
+     * If that is not enough, drop the tails of the largest lists.
+     *
+     * @param array<mixed> $data
+     * @param int $firstIndex Index of $data's first item in the stored list at $basePath
+     * @return array{data: array<mixed>, omitted_items: list<array{path: string, from: int, to: int}>}
+     */
+    private function fit(array $data, int $maxBytes, string $handle, string $basePath, int $firstIndex = 0): array
+    {
+        $maxLength = self::MAX_STRING_LENGTH;
+        while (true) {
+            $truncated = $this->truncateStrings($data, $maxLength, $handle, $basePath, $firstIndex);
+            if ($this->size($truncated) <= $maxBytes) {
+                return ['data' => $truncated, 'omitted_items' => []];
+            }
+            if ($maxLength <= self::MIN_STRING_LENGTH) {
+                return $this->trimLists($truncated, $maxBytes, $basePath, $firstIndex);
+            }
+            $maxLength = max(self::MIN_STRING_LENGTH, intdiv($maxLength, 2));
+        }
+    }
+
+    /**
+     * Drop items from the end of the largest list until the data fits $maxBytes.
+     * Kept items keep their index, so paths stay valid in the stored result, and
+     * the omitted index ranges are returned.
+     *
+     * @param array<mixed> $data
+     * @return array{data: array<mixed>, omitted_items: list<array{path: string, from: int, to: int}>}
+     */
+    private function trimLists(array $data, int $maxBytes, string $basePath, int $firstIndex): array
+    {
+        $omitted = [];
+        while (($excess = $this->size($data) - $maxBytes) > 0) {
+            $lists = $this->findLists($data);
+            if ($lists === []) {
+                break; // Nothing left to drop, e.g. a single huge item
+            }
+            usort($lists, fn(array $a, array $b) => $b['bytes'] <=> $a['bytes']);
+            $segments = $lists[0]['segments'];
+
+            $list = &$data;
+            foreach ($segments as $segment) {
+                $list = &$list[$segment];
+            }
+
+            $count = count($list);
+            $keep = $count;
+            $removed = 0;
+            while ($keep > 1 && $removed < $excess) {
+                $keep--;
+                $removed += $this->size([$list[$keep]]) - 1; // the item and its comma
+            }
+            $list = array_slice($list, 0, $keep);
+            unset($list);
+
+            $path = $this->path($basePath, $segments, $firstIndex);
+            $offset = $segments === [] ? $firstIndex : 0;
+            $omitted[$path] = [
+                'path' => $path,
+                'from' => $keep + $offset,
+                'to' => $omitted[$path]['to'] ?? $count - 1 + $offset,
+            ];
+        }
+
+        return ['data' => $data, 'omitted_items' => array_values($omitted)];
+    }
+
+    /**
+     * Lists with more than one item, with their path segments and encoded size.
+     *
+     * @param array<mixed> $data
+     * @param list<int|string> $segments
+     * @return list<array{segments: list<int|string>, bytes: int}>
+     */
+    private function findLists(array $data, array $segments = []): array
+    {
+        $lists = [];
+        if (count($data) > 1 && array_is_list($data)) {
+            $lists[] = ['segments' => $segments, 'bytes' => $this->size($data)];
+        }
+
+        foreach ($data as $key => $value) {
+            if (is_array($value)) {
+                array_push($lists, ...$this->findLists($value, [...$segments, $key]));
+            }
+        }
+
+        return $lists;
+    }
+
+    /**
+     * Dot path of a value in the stored result.
+     *
+     * @param list<int|string> $segments Path below $basePath, the first one offset by $firstIndex
+     */
+    private function path(string $basePath, array $segments, int $firstIndex): string
+    {
+        if ($segments !== [] && is_int($segments[0])) {
+            $segments[0] += $firstIndex;
+        }
+
+        return implode('.', array_filter([$basePath, ...$segments], fn($segment) => $segment !== ''));
+    }
+
+    /**
+     * @param array<mixed> $data
+     * @return array<mixed>
+     */
+    private function truncateStrings(array $data, int $maxLength, string $handle, string $path, int $firstIndex = 0): array
+    {
+        foreach ($data as $key => $value) {
+            $valuePath = $this->path($path, [$key], $firstIndex);
+
+            if (is_array($value)) {
+                $data[$key] = $this->truncateStrings($value, $maxLength, $handle, $valuePath);
+            } elseif (is_string($value) && mb_strlen($value) > $maxLength) {
+                $data[$key] = mb_substr($value, 0, $maxLength) . sprintf(
+                    ' … [truncated %d characters, continue with handle "%s" and path "%s"]',
+                    mb_strlen($value) - $maxLength,
+                    $handle,
+                    $valuePath
+                );
+            }
+        }
+
+        return $data;
+    }
+
+    /**
+     * @param array<mixed> $data
+     */
+    private function size(array $data): int
+    {
+        return strlen(json_encode($data, JSON_INVALID_UTF8_SUBSTITUTE) ?: '');
+    }
+
+    private function key(string $organisationUuid, string $handle): string
+    {
+        return self::KEY_PREFIX . $organisationUuid . ':' . $handle;
+    }
+}
@@ -0,0 +1,185 @@
+<?php
+
+namespace App\Tests\Benchmark;
+
+use Symfony\Bundle\FrameworkBundle\KernelBrowser;
+use Symfony\Component\HttpFoundation\Request;
+use Symfony\Component\HttpKernel\HttpKernelInterface;
+use Symfony\Component\HttpKernel\TerminableInterface;
+
+/**
+ * Request scenarios of the tool discovery and execute APIs, run against a seeded
+ * organisation (see BenchmarkSeeder).
+ *
+ * Requests rotate through the seeded users, so per-user caches see a realistic mix.
+ */
+class ApiBenchmark
+{
+    public const SCENARIOS = [
+        'integration_tools',
+        'integration_execute',
+        'integration_execute_remote_mcp',
+        'mcp_tools',
+        'mcp_execute',
+        'skills',
+    ];
+
+    /**
+     * @param array<string, mixed> $context Seeded data, see BenchmarkSeeder::seed()
+     */
+    public function __construct(
+        private array $context,
+        private string $apiAuthUser,
+        private string $apiAuthPassword,
+    ) {
+    }
+
+    public function supports(string $scenario): bool
+    {
+        return match ($scenario) {
+            'integration_execute', 'mcp_execute' => $this->context['jira_tools'] !== [],
+            'integration_execute_remote_mcp' => $this->context['remote_mcp_tools'] !== [],
+            default => in_array($scenario, self::SCENARIOS, true),
+        };
+    }
+
+    /**
+     * Run $requests timed requests in this process, after $warmup untimed ones.
+     *
+     * Only the kernel handling the request is timed; terminate listeners (audit log,
+     * metrics) run afterwards, as they do after the response is sent in production.
+     *
+     * @return array{latencies_ms: list<float>, status_codes: array<int, int>, started_at: float, finished_at: float, peak_memory_bytes: int}
+     */
+    public function run(HttpKernelInterface&TerminableInterface $kernel, string $scenario, int $warmup, int $requests, int $offset = 0): array
+    {
+        for ($i = 0; $i < $warmup; $i++) {
+            $request = $this->createRequest($scenario, $offset + $i);
+            $kernel->terminate($request, $kernel->handle($request));
+        }
+
+        memory_reset_peak_usage();
+
+        $latencies = [];
+        $statusCodes = [];
+        $startedAt = microtime(true);
+
+        for ($i = 0; $i < $requests; $i++) {
+            $request = $this->createRequest($scenario, $offset + $warmup + $i);
+
+            $start = hrtime(true);
+            $response = $kernel->handle($request);
+            $latencies[] = (hrtime(true) - $start) / 1e6;
+
+            $kernel->terminate($request, $response);
+            $statusCodes[$response->getStatusCode()] = ($statusCodes[$response->getStatusCode()] ?? 0) + 1;
+        }
+
+        return [
+            'latencies_ms' => $latencies,
+            'status_codes' => $statusCodes,
+            'started_at' => $startedAt,
+            'finished_at' => microtime(true),
+            'peak_memory_bytes' => memory_get_peak_usage(),
+        ];
+    }
+
+    /**
+     * Average number of database queries per request, read from the Doctrine profiler collector.
+     */
+    public function countQueries(KernelBrowser $client, string $scenario, int $samples): float
+    {
+        $queries = 0;
+        for ($i = 0; $i < $samples; $i++) {
+            $spec = $this->describe($scenario, $i);
+
+            $client->enableProfiler();
+            $client->request($spec['method'], $spec['uri'], [], [], $spec['server'], $spec['content']);
+
+            $profile = $client->getProfile();
+            if (!$profile) {
+                throw new \RuntimeException('The profiler is not available, the query count requires a debug kernel');
+            }
+
+            /** @var \Doctrine\Bundle\DoctrineBundle\DataCollector\DoctrineDataCollector $collector */
+            $collector = $profile->getCollector('db');
+            $queries += $collector->getQueryCount();
+        }
+
+        return $queries / $samples;
+    }
+
+    public function createRequest(string $scenario, int $iteration): Request
+    {
+        $spec = $this->describe($scenario, $iteration);
+
+        return Request::create($spec['uri'], $spec['method'], [], [], [], $spec['server'], $spec['content']);
+    }
+
+    /**
+     * @return array{method: string, uri: string, server: array<string, string>, content: string|null}
+     */
+    private function describe(string $scenario, int $iteration): array
+    {
+        $organisationUuid = $this->context['organisation_uuid'];
+        $users = $this->context['users'];
+        $user = $users[$iteration % count($users)];
+
+        $basicAuth = ['HTTP_AUTHORIZATION' => 'Basic ' . base64_encode($this->apiAuthUser . ':' . $this->apiAuthPassword)];
+        $json = ['CONTENT_TYPE' => 'application/json', 'HTTP_ACCEPT' => 'application/json'];
+
+        switch ($scenario) {
+            case 'integration_tools':
+                return [
+                    'method' => 'GET',
+                    'uri' => sprintf('/api/integrations/%s?workflow_user_id=%s', $organisationUuid, $user['workflow_user_id']),
+                    'server' => $basicAuth,
+                    'content' => null,
+                ];
+
+            case 'integration_execute':
+            case 'integration_execute_remote_mcp':
+                $tools = $this->context[$scenario === 'integration_execute' ? 'jira_tools' : 'remote_mcp_tools'];
+                $tool = $tools[$iteration % count($tools)];
+
+                return [
+                    'method' => 'POST',
+                    'uri' => sprintf('/api/integrations/%s/execute', $organisationUuid),
+                    'server' => $basicAuth + $json,
+                    'content' => json_encode([
+                        'tool_id' => $tool['tool_id'],
+                        'parameters' => $scenario === 'integration_execute' ? ['jql' => 'project = BENCH'] : ['query' => 'benchmark'],
+                        'workflow_user_id' => $users[$tool['user']]['workflow_user_id'],
+                    ]),
+                ];
+
+            case 'mcp_tools':
+                return [
+                    'method' => 'GET',
+                    'uri' => '/api/mcp/tools',
+                    'server' => ['HTTP_X_PROMPT_TOKEN' => $user['token']],
+                    'content' => null,
+                ];
+
+            case 'mcp_execute':
+                $tool = $this->context['jira_tools'][$iteration % count($this->context['jira_tools'])];
+
+                return [
+                    'method' => 'POST',
+                    'uri' => '/api/mcp/execute',
+                    'server' => ['HTTP_X_PROMPT_TOKEN' => $users[$tool['user']]['token']] + $json,
+                    'content' => json_encode(['tool_id' => $tool['tool_id'], 'parameters' => ['jql' => 'project = BENCH']]),
+                ];
+
+            case 'skills':
+                return [
+                    'method' => 'GET',
+                    'uri' => sprintf('/api/skills/?organisation_uuid=%s&workflow_user_id=%s', $organisationUuid, $user['workflow_user_id']),
+                    'server' => $basicAuth,
+                    'content' => null,
+                ];
+        }
+
+        throw new \InvalidArgumentException(sprintf('Unknown benchmark scenario "%s"', $scenario));
+    }
+}
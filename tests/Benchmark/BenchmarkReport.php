@@ -0,0 +1,141 @@
+<?php
+
+namespace App\Tests\Benchmark;
+
+/**
+ * Aggregates worker results into per-scenario figures and compares them against a saved baseline.
+ */
+class BenchmarkReport
+{
+    public const DEFAULT_THRESHOLD_PERCENT = 10.0;
+
+    /**
+     * Compared metrics => whether a higher value is worse.
+     * Query counts are deterministic, so any increase is reported regardless of the threshold.
+     */
+    private const METRICS = [
+        'throughput_rps' => false,
+        'latency_ms.p50' => true,
+        'latency_ms.p95' => true,
+        'latency_ms.p99' => true,
+        'queries_per_request' => true,
+        'peak_memory_mb' => true,
+    ];
+    private const EXACT_METRICS = ['queries_per_request'];
+
+    /**
+     * @param list<array{latencies_ms: list<float>, status_codes: array<int, int>, started_at: float, finished_at: float, peak_memory_bytes: int}> $workerResults
+     * @return array<string, mixed>
+     */
+    public function summarize(array $workerResults, float $queriesPerRequest): array
+    {
+        $latencies = array_merge(...array_column($workerResults, 'latencies_ms'));
+        sort($latencies);
+
+        $errors = 0;
+        foreach ($workerResults as $result) {
+            foreach ($result['status_codes'] as $statusCode => $count) {
+                if ($statusCode >= 400) {
+                    $errors += $count;
+                }
+            }
+        }
+
+        // Wall time from the first worker starting to the last one finishing
+        $elapsed = max(array_column($workerResults, 'finished_at')) - min(array_column($workerResults, 'started_at'));
+        $requests = count($latencies);
+
+        return [
+            'requests' => $requests,
+            'errors' => $errors,
+            'throughput_rps' => $elapsed > 0 ? round($requests / $elapsed, 2) : 0.0,
+            'latency_ms' => [
+                'p50' => round(self::percentile($latencies, 50), 3),
+                'p95' => round(self::percentile($latencies, 95), 3),
+                'p99' => round(self::percentile($latencies, 99), 3),
+                'mean' => $requests > 0 ? round(array_sum($latencies) / $requests, 3) : 0.0,
+                'max' => $requests > 0 ? round(end($latencies), 3) : 0.0,
+            ],
+            'queries_per_request' => round($queriesPerRequest, 2),
+            'peak_memory_mb' => round(max(array_column($workerResults, 'peak_memory_bytes')) / 1048576, 2),
+        ];
+    }
+
+    /**
+     * Metrics of scenarios present in both reports that got worse by more than $thresholdPercent.
+     *
+     * @param array<string, mixed> $report
+     * @param array<string, mixed> $baseline
+     * @return list<array{scenario: string, metric: string, baseline: float, current: float, change_percent: float|null}>
+     */
+    public function compare(array $report, array $baseline, float $thresholdPercent = self::DEFAULT_THRESHOLD_PERCENT): array
+    {
+        $regressions = [];
+
+        foreach ($report['scenarios'] ?? [] as $scenario => $current) {
+            $previous = $baseline['scenarios'][$scenario] ?? null;
+            if ($previous === null) {
+                continue;
+            }
+
+            foreach (self::METRICS as $metric => $higherIsWorse) {
+                $currentValue = $this->metricValue($current, $metric);
+                $baselineValue = $this->metricValue($previous, $metric);
+                if ($currentValue === null || $baselineValue === null) {
+                    continue;
+                }
+
+                $worsening = $higherIsWorse ? $currentValue - $baselineValue : $baselineValue - $currentValue;
+                $changePercent = $baselineValue != 0 ? ($currentValue - $baselineValue) / $baselineValue * 100 : null;
+
+                $regressed = in_array($metric, self::EXACT_METRICS, true)
+                    ? $worsening > 0
+                    : $worsening > 0 && ($changePercent === null || abs($changePercent) > $thresholdPercent);
+
+                if ($regressed) {
+                    $regressions[] = [
+                        'scenario' => $scenario,
+                        'metric' => $metric,
+                        'baseline' => $baselineValue,
+                        'current' => $currentValue,
+                        'change_percent' => $changePercent !== null ? round($changePercent, 1) : null,
+                    ];
+                }
+            }
+        }
+
+        return $regressions;
+    }
+
+    /**
+     * Nearest-rank percentile of ascending sorted values.
+     *
+     * @param list<float> $sorted
+     */
+    public static function percentile(array $sorted, float $percentile): float
+    {
+        if ($sorted === []) {
+            return 0.0;
+        }
+
+        $rank = (int) ceil($percentile / 100 * count($sorted));
+
+        return $sorted[max(0, min(count($sorted), $rank) - 1)];
+    }
+
+    /**
+     * @param array<string, mixed> $summary
+     */
+    private function metricValue(array $summary, string $metric): ?float
+    {
+        $value = $summary;
+        foreach (explode('.', $metric) as $key) {
+            if (!is_array($value) || !isset($value[$key])) {
+                return null;
+            }
+            $value = $value[$key];
+        }
+
+        return is_numeric($value) ? (float) $value : null;
+    }
+}
@@ -0,0 +1,157 @@
+<?php
+
+namespace App\Tests\Benchmark;
+
+use App\Entity\IntegrationConfig;
+use App\Entity\Organisation;
+use App\Entity\User;
+use App\Entity\UserOrganisation;
+use App\Service\EncryptionService;
+use Doctrine\ORM\EntityManagerInterface;
+
+/**
+ * Seeds a dedicated benchmark organisation into the test database.
+ *
+ * Every run gets its own organisation (and remote MCP server URLs), so runs never
+ * share cached tool catalogs. Reset the test database with
+ * `php bin/console doctrine:fixtures:load --env=test --no-interaction`.
+ */
+class BenchmarkSeeder
+{
+    private const BATCH_SIZE = 100;
+    private const USER_INTEGRATION_TYPES = ['jira', 'confluence'];
+
+    public function __construct(
+        private EntityManagerInterface $entityManager,
+        private EncryptionService $encryptionService,
+    ) {
+    }
+
+    /**
+     * @return array{
+     *     run_id: string,
+     *     organisation_uuid: string,
+     *     users: list<array{workflow_user_id: string, token: string}>,
+     *     jira_tools: list<array{tool_id: string, user: int}>,
+     *     remote_mcp_tools: list<array{tool_id: string, user: int}>,
+     *     remote_mcp_hosts: list<string>
+     * }
+     */
+    public function seed(int $users, int $configs, int $remoteMcpServers): array
+    {
+        if ($users < 1 || $configs < 1) {
+            throw new \InvalidArgumentException('At least one user and one integration config are required');
+        }
+
+        $runId = bin2hex(random_bytes(4));
+        $now = new \DateTime();
+
+        $organisation = new Organisation();
+        $organisation->setName('Benchmark ' . $runId);
+        $organisation->setUuid('bench-org-' . $runId);
+        $organisation->setCreatedAt($now);
+        $organisation->setUpdatedAt($now);
+        $this->entityManager->persist($organisation);
+
+        $seededUsers = [];
+        $userEntities = [];
+        for ($i = 0; $i < $users; $i++) {
+            $user = new User();
+            $user->setEmail(sprintf('bench-%s-%d@test.example.com', $runId, $i));
+            $user->setName('Benchmark User ' . $i);
+            $user->setRoles(['ROLE_USER']);
+            $user->setGoogleId(sprintf('google-id-bench-%s-%d', $runId, $i));
+            $user->setCreatedAt($now);
+            $user->setUpdatedAt($now);
+            $this->entityManager->persist($user);
+
+            $userOrganisation = new UserOrganisation();
+            $userOrganisation->setUser($user);
+            $userOrganisation->setOrganisation($organisation);
+            $userOrganisation->setRole('member');
+            $userOrganisation->setWorkflowUserId(sprintf('bench-workflow-%s-%d', $runId, $i));
+            $userOrganisation->setJoinedAt($now);
+            $token = $userOrganisation->regenerateToken();
+            $this->entityManager->persist($userOrganisation);
+
+            $userEntities[] = $user;
+            $seededUsers[] = ['workflow_user_id' => $userOrganisation->getWorkflowUserId(), 'token' => $token];
+
+            if (($i + 1) % self::BATCH_SIZE === 0) {
+                $this->entityManager->flush();
+            }
+        }
+
+        // Same fixture credentials as OrganisationTestFixtures, answered by TestHttpClientFactory
+        $credentials = $this->encryptionService->encrypt(json_encode([
+            'url' => 'https://test.atlassian.net',
+            'username' => 'test@example.com',
+            'api_token' => 'test-token-12345',
+        ]));
+
+        $jiraConfigs = [];
+        for ($i = 0; $i < $configs; $i++) {
+            $type = self::USER_INTEGRATION_TYPES[$i % count(self::USER_INTEGRATION_TYPES)];
+
+            $config = new IntegrationConfig();
+            $config->setOrganisation($organisation);
+            $config->setUser($userEntities[$i % $users]);
+            $config->setIntegrationType($type);
+            $config->setName(sprintf('Benchmark %s %d', ucfirst($type), $i));
+            $config->setActive(true);
+            $config->setEncryptedCredentials($credentials);
+            $this->entityManager->persist($config);
+
+            if ($type === 'jira') {
+                $jiraConfigs[] = [$config, $i % $users];
+            }
+
+            if (($i + 1) % self::BATCH_SIZE === 0) {
+                $this->entityManager->flush();
+            }
+        }
+
+        $remoteConfigs = [];
+        $remoteHosts = [];
+        for ($i = 0; $i < $remoteMcpServers; $i++) {
+            $host = sprintf('mcp-bench-%s-%d.example.com', $runId, $i);
+
+            $config = new IntegrationConfig();
+            $config->setOrganisation($organisation);
+            $config->setUser($userEntities[$i % $users]);
+            $config->setIntegrationType('remote_mcp');
+            $config->setName('MCP Bench ' . $i);
+            $config->setActive(true);
+            $config->setEncryptedCredentials($this->encryptionService->encrypt(json_encode([
+                'server_url' => 'https://' . $host . '/mcp',
+                'auth_type' => 'bearer',
+                'auth_token' => 'bench-token',
+            ])));
+            $this->entityManager->persist($config);
+
+            $remoteConfigs[] = [$config, $i % $users, $i];
+            $remoteHosts[] = $host;
+        }
+
+        $this->entityManager->flush();
+
+        return [
+            'run_id' => $runId,
+            'organisation_uuid' => $organisation->getUuid(),
+            'users' => $seededUsers,
+            'jira_tools' => array_map(
+                fn(array $entry) => ['tool_id' => 'jira_search_' . $entry[0]->getId(), 'user' => $entry[1]],
+                $jiraConfigs
+            ),
+            // Remote tool IDs are prefixed with the config name, see ToolProviderService::buildRemoteMcpTools()
+            'remote_mcp_tools' => array_map(
+                fn(array $entry) => [
+                    'tool_id' => sprintf('mcp_bench_%d_%s_%d', $entry[2], RemoteMcpServerMock::toolName(0), $entry[0]->getId()),
+                    'user' => $entry[1],
+                ],
+                $remoteConfigs
+            ),
+            'remote_mcp_hosts' => $remoteHosts,
+        ];
+    }
+}
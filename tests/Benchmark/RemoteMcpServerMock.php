@@ -0,0 +1,74 @@
+<?php
+
+namespace App\Tests\Benchmark;
+
+use App\Tests\Mock\TestHttpClientFactory;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+/**
+ * Answers the JSON-RPC calls of the seeded remote MCP servers through the
+ * TestHttpClientFactory override, each server exposing a configurable number of tools.
+ * All other upstream requests fall through to the HTTP response fixtures.
+ */
+class RemoteMcpServerMock
+{
+    public static function toolName(int $index): string
+    {
+        return 'bench_tool_' . $index;
+    }
+
+    /**
+     * @param list<string> $hosts
+     */
+    public static function install(array $hosts, int $toolCount): void
+    {
+        $tools = [];
+        for ($i = 0; $i < $toolCount; $i++) {
+            $tools[] = [
+                'name' => self::toolName($i),
+                'description' => 'Benchmark tool ' . $i,
+                'inputSchema' => [
+                    'type' => 'object',
+                    'properties' => [
+                        'query' => ['type' => 'string', 'description' => 'Search query'],
+                    ],
+                    'required' => ['query'],
+                ],
+            ];
+        }
+
+        TestHttpClientFactory::setOverride(function (string $method, string $url, array $options) use ($hosts, $tools): ?MockResponse {
+            if (!in_array(parse_url($url, PHP_URL_HOST), $hosts, true)) {
+                return null;
+            }
+
+            $data = is_string($options['body'] ?? null) ? json_decode($options['body'], true) : [];
+            $id = $data['id'] ?? 1;
+
+            $result = match ($data['method'] ?? '') {
+                'initialize' => [
+                    'protocolVersion' => '2025-03-26',
+                    'capabilities' => ['tools' => []],
+                    'serverInfo' => ['name' => 'Benchmark MCP Server', 'version' => '1.0'],
+                ],
+                'tools/list' => ['tools' => $tools],
+                'tools/call' => [
+                    'content' => [['type' => 'text', 'text' => 'Result from ' . ($data['params']['name'] ?? '')]],
+                ],
+                default => null,
+            };
+
+            if ($result === null) {
+                return new MockResponse('', ['http_code' => 202]);
+            }
+
+            return new MockResponse(
+                json_encode(['jsonrpc' => '2.0', 'id' => $id, 'result' => $result]),
+                [
+                    'http_code' => 200,
+                    'response_headers' => ['Content-Type' => 'application/json', 'Mcp-Session-Id' => 'bench-session'],
+                ]
+            );
+        });
+    }
+}
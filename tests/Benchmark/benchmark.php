@@ -0,0 +1,218 @@
+<?php
+
+/**
+ * Offline load benchmark of the tool discovery and execute APIs.
+ *
+ * Seeds an organisation into the test database, answers upstream requests from
+ * tests/Fixtures/HttpResponses (see TestHttpClientFactory) and runs every scenario
+ * with --concurrency worker processes. Requires the same database and Redis as the
+ * integration tests.
+ *
+ *   php tests/Benchmark/benchmark.php --save-baseline=var/benchmark/baseline.json
+ *   php tests/Benchmark/benchmark.php --baseline=var/benchmark/baseline.json
+ *
+ * Exits with 1 if a scenario regressed against the baseline.
+ */
+
+use App\Kernel;
+use App\Service\EncryptionService;
+use App\Tests\Benchmark\ApiBenchmark;
+use App\Tests\Benchmark\BenchmarkReport;
+use App\Tests\Benchmark\BenchmarkSeeder;
+use App\Tests\Benchmark\RemoteMcpServerMock;
+use Symfony\Component\Console\Command\Command;
+use Symfony\Component\Console\Input\InputInterface;
+use Symfony\Component\Console\Input\InputOption;
+use Symfony\Component\Console\Output\OutputInterface;
+use Symfony\Component\Console\SingleCommandApplication;
+use Symfony\Component\Console\Style\SymfonyStyle;
+use Symfony\Component\Process\Process;
+
+require dirname(__DIR__) . '/bootstrap.php';
+
+const QUERY_COUNT_SAMPLES = 3;
+const WORKER_TIMEOUT = 600;
+
+(new SingleCommandApplication())
+    ->setName('API benchmark')
+    ->addOption('users', null, InputOption::VALUE_REQUIRED, 'Users in the seeded organisation', '20')
+    ->addOption('configs', null, InputOption::VALUE_REQUIRED, 'Jira/Confluence integration configs, spread over the users', '40')
+    ->addOption('remote-mcp', null, InputOption::VALUE_REQUIRED, 'Remote MCP servers', '2')
+    ->addOption('remote-tools', null, InputOption::VALUE_REQUIRED, 'Tools per remote MCP server', '25')
+    ->addOption('scenario', null, InputOption::VALUE_REQUIRED | InputOption::VALUE_IS_ARRAY, 'Scenarios to run (default: all)', ApiBenchmark::SCENARIOS)
+    ->addOption('concurrency', 'c', InputOption::VALUE_REQUIRED, 'Concurrent worker processes', '4')
+    ->addOption('requests', 'r', InputOption::VALUE_REQUIRED, 'Timed requests per scenario, split over the workers', '400')
+    ->addOption('warmup', null, InputOption::VALUE_REQUIRED, 'Untimed requests per worker before measuring', '10')
+    ->addOption('output', 'o', InputOption::VALUE_REQUIRED, 'Report file', 'var/benchmark/latest.json')
+    ->addOption('baseline', 'b', InputOption::VALUE_REQUIRED, 'Baseline report to compare against')
+    ->addOption('threshold', null, InputOption::VALUE_REQUIRED, 'Regression threshold in percent', (string) BenchmarkReport::DEFAULT_THRESHOLD_PERCENT)
+    ->addOption('save-baseline', null, InputOption::VALUE_REQUIRED, 'Also write the report to this baseline file')
+    // Internal, used for the worker processes
+    ->addOption('worker', null, InputOption::VALUE_REQUIRED)
+    ->addOption('context', null, InputOption::VALUE_REQUIRED)
+    ->addOption('offset', null, InputOption::VALUE_REQUIRED, '', '0')
+    ->setCode(function (InputInterface $input, OutputInterface $output): int {
+        $projectDir = dirname(__DIR__, 2);
+        $apiAuthUser = $_SERVER['API_AUTH_USER'] ?? 'test-api-user';
+        $apiAuthPassword = $_SERVER['API_AUTH_PASSWORD'] ?? 'test-api-password';
+
+        if ($input->getOption('worker') !== null) {
+            $context = json_decode((string) file_get_contents($input->getOption('context')), true);
+            RemoteMcpServerMock::install($context['remote_mcp_hosts'], $context['remote_tools']);
+
+            // Without debug, like production workers
+            $kernel = new Kernel('test', false);
+            $kernel->boot();
+
+            $result = (new ApiBenchmark($context, $apiAuthUser, $apiAuthPassword))->run(
+                $kernel,
+                $input->getOption('worker'),
+                (int) $input->getOption('warmup'),
+                (int) $input->getOption('requests'),
+                (int) $input->getOption('offset')
+            );
+            $output->write(json_encode($result));
+
+            return Command::SUCCESS;
+        }
+
+        $io = new SymfonyStyle($input, $output);
+        $concurrency = max(1, (int) $input->getOption('concurrency'));
+        $requestsPerWorker = (int) ceil(max(1, (int) $input->getOption('requests')) / $concurrency);
+        $profile = [
+            'users' => (int) $input->getOption('users'),
+            'configs' => (int) $input->getOption('configs'),
+            'remote_mcp' => (int) $input->getOption('remote-mcp'),
+            'remote_tools' => (int) $input->getOption('remote-tools'),
+            'concurrency' => $concurrency,
+            'requests' => $requestsPerWorker * $concurrency,
+            'warmup' => (int) $input->getOption('warmup'),
+        ];
+
+        // The debug kernel seeds the data and counts queries through the profiler
+        $kernel = new Kernel('test', true);
+        $kernel->boot();
+        $container = $kernel->getContainer()->get('test.service_container');
+
+        $io->writeln('Seeding benchmark organisation...');
+        $seeder = new BenchmarkSeeder($container->get('doctrine')->getManager(), $container->get(EncryptionService::class));
+        $context = $seeder->seed($profile['users'], $profile['configs'], $profile['remote_mcp']);
+        $context['remote_tools'] = $profile['remote_tools'];
+
+        $contextFile = tempnam(sys_get_temp_dir(), 'benchmark');
+        file_put_contents($contextFile, json_encode($context));
+
+        // Compile the non-debug container once, instead of in every worker
+        (new Kernel('test', false))->boot();
+
+        RemoteMcpServerMock::install($context['remote_mcp_hosts'], $profile['remote_tools']);
+        $benchmark = new ApiBenchmark($context, $apiAuthUser, $apiAuthPassword);
+        $report = new BenchmarkReport();
+        $client = $container->get('test.client');
+
+        $results = [
+            'generated_at' => (new \DateTimeImmutable())->format(\DATE_ATOM),
+            'php_version' => PHP_VERSION,
+            'profile' => $profile,
+            'scenarios' => [],
+        ];
+
+        try {
+            foreach ($input->getOption('scenario') as $scenario) {
+                if (!$benchmark->supports($scenario)) {
+                    $io->warning(sprintf('Skipping "%s", the seeded data does not cover it', $scenario));
+                    continue;
+                }
+
+                $io->writeln(sprintf('Running <info>%s</info>...', $scenario));
+                $queries = $benchmark->countQueries($client, $scenario, QUERY_COUNT_SAMPLES);
+
+                $workers = [];
+                for ($i = 0; $i < $concurrency; $i++) {
+                    $worker = new Process([
+                        PHP_BINARY,
+                        __FILE__,
+                        '--worker=' . $scenario,
+                        '--context=' . $contextFile,
+                        '--requests=' . $requestsPerWorker,
+                        '--warmup=' . $profile['warmup'],
+                        '--offset=' . $i * ($requestsPerWorker + $profile['warmup']),
+                    ], $projectDir, null, null, WORKER_TIMEOUT);
+                    $worker->start();
+                    $workers[] = $worker;
+                }
+
+                $workerResults = [];
+                foreach ($workers as $worker) {
+                    $worker->wait();
+                    if (!$worker->isSuccessful()) {
+                        throw new \RuntimeException(sprintf('Benchmark worker for "%s" failed: %s', $scenario, $worker->getErrorOutput()));
+                    }
+                    $workerResults[] = json_decode($worker->getOutput(), true, flags: JSON_THROW_ON_ERROR);
+                }
+
+                $results['scenarios'][$scenario] = $report->summarize($workerResults, $queries);
+            }
+        } finally {
+            unlink($contextFile);
+        }
+
+        $rows = [];
+        foreach ($results['scenarios'] as $scenario => $summary) {
+            $rows[] = [
+                $scenario,
+                $summary['throughput_rps'],
+                $summary['latency_ms']['p50'],
+                $summary['latency_ms']['p95'],
+                $summary['latency_ms']['p99'],
+                $summary['queries_per_request'],
+                $summary['peak_memory_mb'],
+                $summary['errors'],
+            ];
+        }
+        $io->table(['Scenario', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'Queries', 'Peak MB', 'Errors'], $rows);
+
+        $regressions = [];
+        if ($input->getOption('baseline') !== null) {
+            $baseline = json_decode((string) file_get_contents($input->getOption('baseline')), true, flags: JSON_THROW_ON_ERROR);
+            if (($baseline['profile'] ?? null) !== $profile) {
+                $io->warning('The baseline was recorded with a different load profile, the comparison may be misleading');
+            }
+
+            $regressions = $report->compare($results, $baseline, (float) $input->getOption('threshold'));
+            $results['regressions'] = $regressions;
+        }
+
+        $json = json_encode($results, JSON_PRETTY_PRINT | JSON_UNESCAPED_SLASHES);
+        foreach (array_filter([$input->getOption('output'), $input->getOption('save-baseline')]) as $file) {
+            $path = str_starts_with($file, '/') ? $file : $projectDir . '/' . $file;
+            if (!is_dir(dirname($path))) {
+                mkdir(dirname($path), 0777, true);
+            }
+            file_put_contents($path, $json . "\n");
+            $io->writeln(sprintf('Report written to <info>%s</info>', $file));
+        }
+
+        if ($regressions !== []) {
+            $io->error(sprintf('%d regression(s) against the baseline', count($regressions)));
+            $io->table(['Scenario', 'Metric', 'Baseline', 'Current', 'Change %'], array_map(
+                fn(array $regression) => [
+                    $regression['scenario'],
+                    $regression['metric'],
+                    $regression['baseline'],
+                    $regression['current'],
+                    $regression['change_percent'] ?? 'n/a',
+                ],
+                $regressions
+            ));
+
+            return Command::FAILURE;
+        }
+
+        if ($input->getOption('baseline') !== null) {
+            $io->success('No regressions against the baseline');
+        }
+
+        return Command::SUCCESS;
+    })
+    ->run();
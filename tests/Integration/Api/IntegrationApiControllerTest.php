@@ -0,0 +1,238 @@
+<?php
+
+namespace App\Tests\Integration\Api;
+
+use App\Entity\IntegrationConfig;
+use App\Entity\Organisation;
+use App\Entity\User;
+use App\Tests\Integration\AbstractIntegrationTestCase;
+use App\Tests\Mock\TestHttpClientFactory;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class IntegrationApiControllerTest extends AbstractIntegrationTestCase
+{
+    private array $authHeaders;
+
+    protected function setUp(): void
+    {
+        parent::setUp();
+
+        $this->loginUser('admin@test.example.com');
+
+        $this->authHeaders = [
+            'HTTP_AUTHORIZATION' => 'Basic ' . base64_encode('test-api-user:test-api-password'),
+        ];
+    }
+
+    protected function tearDown(): void
+    {
+        TestHttpClientFactory::reset();
+        parent::tearDown();
+    }
+
+    public function testGetToolsReturnsStrongEtag(): void
+    {
+        $this->client->request('GET', $this->getToolsUrl(), [], [], $this->authHeaders);
+
+        $this->assertResponseIsSuccessful();
+        $etag = $this->client->getResponse()->headers->get('ETag');
+        $this->assertNotNull($etag);
+        $this->assertStringStartsNotWith('W/', $etag);
+        $this->assertArrayHasKey('tools', json_decode($this->client->getResponse()->getContent(), true));
+    }
+
+    public function testGetToolsAnswersIfNoneMatchWith304(): void
+    {
+        $this->client->request('GET', $this->getToolsUrl(), [], [], $this->authHeaders);
+        $etag = $this->client->getResponse()->headers->get('ETag');
+
+        $this->client->request('GET', $this->getToolsUrl(), [], [], $this->authHeaders + [
+            'HTTP_IF_NONE_MATCH' => $etag,
+        ]);
+
+        $this->assertResponseStatusCodeSame(304);
+        $this->assertSame('', $this->client->getResponse()->getContent());
+    }
+
+    public function testConfigChangeInvalidatesCachedToolList(): void
+    {
+        $config = $this->entityManager
+            ->getRepository(IntegrationConfig::class)
+            ->findOneBy([
+                'user' => $this->currentUser,
+                'organisation' => $this->currentOrganisation,
+                'integrationType' => 'jira',
+                'active' => true,
+            ]);
+        $this->assertNotNull($config, 'Active Jira config should exist from fixtures');
+
+        $this->client->request('GET', $this->getToolsUrl(), [], [], $this->authHeaders);
+        $etag = $this->client->getResponse()->headers->get('ETag');
+
+        $disabledTools = $config->getDisabledTools();
+        $config->setDisabledTools(array_merge($disabledTools, ['jira_search']));
+        $this->entityManager->flush();
+
+        try {
+            $this->client->request('GET', $this->getToolsUrl(), [], [], $this->authHeaders + [
+                'HTTP_IF_NONE_MATCH' => $etag,
+            ]);
+
+            $this->assertResponseIsSuccessful();
+            $this->assertNotSame($etag, $this->client->getResponse()->headers->get('ETag'));
+        } finally {
+            $config->setDisabledTools($disabledTools);
+            $this->entityManager->flush();
+        }
+    }
+
+    public function testLargeSearchResultIsProjectedToEssentialFields(): void
+    {
+        $config = $this->getJiraConfig();
+
+        $issues = [];
+        for ($i = 1; $i <= 100; $i++) {
+            $issues[] = [
+                'id' => (string) (10000 + $i),
+                'key' => 'TEST-' . $i,
+                'fields' => [
+                    'summary' => 'Issue ' . $i,
+                    'status' => ['name' => 'To Do', 'statusCategory' => ['name' => 'To Do']],
+                    'reporter' => ['displayName' => 'Reporter User'],
+                    'labels' => array_fill(0, 40, 'a-rather-long-label-name'),
+                ],
+            ];
+        }
+
+        TestHttpClientFactory::setOverride(function (string $method, string $url) use ($issues): ?MockResponse {
+            if (str_contains($url, '/rest/api/3/search/jql')) {
+                return new MockResponse(json_encode(['issues' => $issues, 'isLast' => true]), [
+                    'http_code' => 200,
+                    'response_headers' => ['Content-Type' => 'application/json'],
+                ]);
+            }
+
+            return null;
+        });
+
+        $data = $this->jsonRequest('POST', $this->getToolsUrl() . '/execute', [
+            'tool_id' => 'jira_search_' . $config->getId(),
+            'parameters' => ['jql' => 'project = TEST', 'maxResults' => 100],
+        ], $this->authHeaders);
+
+        $this->assertResponseIsSuccessful();
+        $this->assertCount(100, $data['result']['issues']);
+        $this->assertSame('TEST-7', $data['result']['issues'][6]['key']);
+        $this->assertSame('Issue 7', $data['result']['issues'][6]['summary']);
+        $this->assertArrayNotHasKey('labels', $data['result']['issues'][6]);
+        $this->assertArrayNotHasKey('reporter', $data['result']['issues'][6]);
+        $this->assertTrue($data['continuation']['fields_omitted']);
+    }
+
+    public function testBatchRequiresBasicAuth(): void
+    {
+        $data = $this->jsonRequest('POST', $this->getToolsUrl() . '/execute-batch', [
+            'calls' => [['tool_id' => 'jira_search_1', 'parameters' => []]],
+        ]);
+
+        $this->assertResponseStatusCodeSame(401);
+        $this->assertSame('Unauthorized', $data['error']);
+    }
+
+    public function testBatchForUnknownOrganisationIsNotFound(): void
+    {
+        $data = $this->jsonRequest('POST', '/api/integrations/unknown-organisation/execute-batch', [
+            'calls' => [['tool_id' => 'jira_search_1', 'parameters' => []]],
+        ], $this->authHeaders);
+
+        $this->assertResponseStatusCodeSame(404);
+        $this->assertSame('Organisation not found', $data['error']);
+    }
+
+    public function testBatchRejectsEmptyAndOversizedCallLists(): void
+    {
+        $this->jsonRequest('POST', $this->getToolsUrl() . '/execute-batch', ['calls' => []], $this->authHeaders);
+        $this->assertResponseStatusCodeSame(400);
+
+        $calls = array_fill(0, 21, ['tool_id' => 'jira_search_1', 'parameters' => []]);
+        $data = $this->jsonRequest('POST', $this->getToolsUrl() . '/execute-batch', ['calls' => $calls], $this->authHeaders);
+
+        $this->assertResponseStatusCodeSame(400);
+        $this->assertSame('A batch may contain at most 20 calls', $data['error']);
+    }
+
+    public function testBatchReportsEachCallInRequestOrder(): void
+    {
+        $config = $this->getJiraConfig();
+        $foreignConfig = $this->createTestIntegrationConfig(
+            'jira',
+            'Foreign JIRA',
+            $this->entityManager->getRepository(User::class)->findOneBy(['email' => 'other@test.example.com']),
+            $this->entityManager->getRepository(Organisation::class)->findOneBy(['name' => 'Other Organisation'])
+        );
+
+        TestHttpClientFactory::setOverride(function (string $method, string $url): ?MockResponse {
+            if (str_contains($url, '/rest/api/3/search/jql')) {
+                return new MockResponse(json_encode([
+                    'issues' => [['id' => '10001', 'key' => 'TEST-1', 'fields' => ['summary' => 'First issue']]],
+                    'isLast' => true,
+                ]), [
+                    'http_code' => 200,
+                    'response_headers' => ['Content-Type' => 'application/json'],
+                ]);
+            }
+
+            return null;
+        });
+
+        try {
+            $calls = [
+                ['tool_id' => 'unknown_tool_' . $config->getId(), 'parameters' => []],
+                ['tool_id' => 'jira_search_' . $config->getId(), 'parameters' => ['jql' => 'project = TEST']],
+                ['tool_id' => 'jira_search_' . $foreignConfig->getId(), 'parameters' => ['jql' => 'project = TEST']],
+                ['parameters' => []],
+            ];
+
+            $data = $this->jsonRequest('POST', $this->getToolsUrl() . '/execute-batch', ['calls' => $calls], $this->authHeaders);
+        } finally {
+            $this->entityManager->remove($foreignConfig);
+            $this->entityManager->flush();
+        }
+
+        // One failing call doesn't fail the batch request, only its own result
+        $this->assertResponseIsSuccessful();
+        $this->assertFalse($data['success']);
+        $this->assertSame(
+            array_map(fn(array $call) => $call['tool_id'] ?? null, $calls),
+            array_column($data['results'], 'tool_id')
+        );
+        $this->assertSame([404, 200, 404, 400], array_column($data['results'], 'status_code'));
+
+        $this->assertSame('Tool not found', $data['results'][0]['error']);
+        $this->assertTrue($data['results'][1]['success']);
+        $this->assertSame('TEST-1', $data['results'][1]['result']['issues'][0]['key']);
+        // Configs of other organisations are not visible
+        $this->assertSame('Configuration not found', $data['results'][2]['error']);
+        $this->assertSame('Tool ID is required', $data['results'][3]['error']);
+    }
+
+    private function getJiraConfig(): IntegrationConfig
+    {
+        $config = $this->entityManager
+            ->getRepository(IntegrationConfig::class)
+            ->findOneBy([
+                'user' => $this->currentUser,
+                'organisation' => $this->currentOrganisation,
+                'integrationType' => 'jira',
+                'active' => true,
+            ]);
+        $this->assertNotNull($config, 'Active Jira config should exist from fixtures');
+
+        return $config;
+    }
+
+    private function getToolsUrl(): string
+    {
+        return '/api/integrations/' . $this->currentOrganisation->getUuid();
+    }
+}
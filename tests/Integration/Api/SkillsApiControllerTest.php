@@ -84,4 +84,21 @@ class SkillsApiControllerTest extends AbstractIntegrationTestCase
 
         $this->assertEquals(404, $this->client->getResponse()->getStatusCode());
     }
+
+    public function testGetSkillsAnswersIfNoneMatchWith304(): void
+    {
+        $this->client->request('GET', '/api/skills/', [], [], [
+            'HTTP_AUTHORIZATION' => $this->basicAuthHeader,
+        ]);
+        $etag = $this->client->getResponse()->headers->get('ETag');
+        $this->assertNotNull($etag);
+
+        $this->client->request('GET', '/api/skills/', [], [], [
+            'HTTP_AUTHORIZATION' => $this->basicAuthHeader,
+            'HTTP_IF_NONE_MATCH' => $etag,
+        ]);
+
+        $this->assertResponseStatusCodeSame(304);
+        $this->assertSame('', $this->client->getResponse()->getContent());
+    }
 }
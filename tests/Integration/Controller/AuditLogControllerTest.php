@@ -0,0 +1,96 @@
+<?php
+
+namespace App\Tests\Integration\Controller;
+
+use App\Entity\AuditLog;
+use App\Tests\Integration\AbstractIntegrationTestCase;
+use Symfony\Component\DomCrawler\Crawler;
+use Symfony\Component\DomCrawler\Link;
+
+class AuditLogControllerTest extends AbstractIntegrationTestCase
+{
+    // Far away from the days other tests write audit logs for
+    private const DAY = '2020-02-11';
+
+    protected function setUp(): void
+    {
+        parent::setUp();
+
+        $this->loginUser('admin@test.example.com');
+        $this->deleteDay();
+    }
+
+    protected function tearDown(): void
+    {
+        $this->deleteDay();
+        parent::tearDown();
+    }
+
+    public function testGroupedViewFollowsCursorLinksAcrossIdenticalTimestamps(): void
+    {
+        $executionIds = array_map(fn(int $i) => sprintf('exec-%02d', $i), range(0, 24));
+        $auditLogs = [];
+        foreach ($executionIds as $executionId) {
+            $auditLog = new AuditLog();
+            $auditLog->setOrganisation($this->currentOrganisation);
+            $auditLog->setUser($this->currentUser);
+            $auditLog->setAction('tool_execution.started');
+            $auditLog->setExecutionId($executionId);
+            $auditLog->setCreatedAt(new \DateTime(self::DAY . ' 10:30:00'));
+            $auditLogs[] = $auditLog;
+        }
+        $this->entityManager->getRepository(AuditLog::class)->insertMultiple($auditLogs);
+
+        $firstPage = $this->client->request('GET', '/audit-log/', [
+            'view_mode' => 'grouped',
+            'date_from' => self::DAY . ' 00:00',
+            'date_to' => self::DAY,
+        ]);
+        $this->assertResponseIsSuccessful();
+        $this->assertSame(array_slice(array_reverse($executionIds), 0, 20), $this->groupIds($firstPage));
+
+        $secondPage = $this->client->click($this->paginationLink($firstPage, 'after'));
+        $this->assertResponseIsSuccessful();
+        $this->assertSame(array_slice(array_reverse($executionIds), 20), $this->groupIds($secondPage));
+        $this->assertCount(0, $secondPage->filter('a.pagination-link[href*="after="]'));
+
+        $backToFirst = $this->client->click($this->paginationLink($secondPage, 'before'));
+        $this->assertResponseIsSuccessful();
+        $this->assertSame($this->groupIds($firstPage), $this->groupIds($backToFirst));
+    }
+
+    public function testInvalidCursorShowsTheFirstPage(): void
+    {
+        $crawler = $this->client->request('GET', '/audit-log/', [
+            'view_mode' => 'grouped',
+            'after' => 'not-a-cursor',
+        ]);
+
+        $this->assertResponseIsSuccessful();
+        $this->assertCount(0, $crawler->filter('a.pagination-link[href*="before="]'));
+    }
+
+    /**
+     * @return string[]
+     */
+    private function groupIds(Crawler $crawler): array
+    {
+        return $crawler->filter('.execution-group')->each(fn(Crawler $group) => $group->attr('data-execution-id'));
+    }
+
+    private function paginationLink(Crawler $crawler, string $direction): Link
+    {
+        $link = $crawler->filter(sprintf('a.pagination-link[href*="%s="]', $direction));
+        $this->assertCount(1, $link, sprintf('Expected a "%s" pagination link', $direction));
+
+        return $link->link();
+    }
+
+    private function deleteDay(): void
+    {
+        $this->entityManager->getConnection()->executeStatement(
+            'DELETE FROM audit_log WHERE created_at >= ? AND created_at < ?',
+            [self::DAY . ' 00:00:00', (new \DateTimeImmutable(self::DAY . ' +1 day'))->format('Y-m-d H:i:s')]
+        );
+    }
+}
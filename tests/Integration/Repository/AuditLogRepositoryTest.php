@@ -0,0 +1,100 @@
+<?php
+
+namespace App\Tests\Integration\Repository;
+
+use App\Entity\AuditLog;
+use App\Repository\AuditLogRepository;
+use App\Tests\Integration\AbstractIntegrationTestCase;
+
+class AuditLogRepositoryTest extends AbstractIntegrationTestCase
+{
+    // Far away from the days other tests write audit logs for
+    private const DAY = '2020-02-10';
+
+    private AuditLogRepository $auditLogRepository;
+
+    protected function setUp(): void
+    {
+        parent::setUp();
+
+        $this->loginUser('admin@test.example.com');
+        $this->auditLogRepository = $this->entityManager->getRepository(AuditLog::class);
+        $this->deleteDay();
+    }
+
+    protected function tearDown(): void
+    {
+        $this->deleteDay();
+        parent::tearDown();
+    }
+
+    public function testGroupsWithIdenticalTimestampsArePagedWithoutGapsOrRepeats(): void
+    {
+        $executionIds = array_map(fn(int $i) => sprintf('exec-%02d', $i), range(0, 24));
+        $auditLogs = [];
+        foreach ([...$executionIds, null] as $executionId) {
+            // Two logs per group, all written in the same second
+            $auditLogs[] = $this->createAuditLog('tool_execution.started', $executionId);
+            $auditLogs[] = $this->createAuditLog('tool_execution.completed', $executionId);
+        }
+        $this->auditLogRepository->insertMultiple($auditLogs);
+
+        $expected = [...array_reverse($executionIds), null];
+
+        // Forward
+        $pages = [];
+        $cursor = null;
+        do {
+            $result = $this->findGroups($cursor);
+            $pages[] = array_column($result['groups'], 'execution_id');
+            $cursor = $result['next_cursor'];
+        } while ($cursor !== null);
+
+        $this->assertSame([10, 10, 6], array_map('count', $pages));
+        $this->assertSame($expected, array_merge(...$pages));
+        $this->assertSame([2], array_unique(array_column($result['groups'], 'count')));
+
+        // And back again from the last page
+        $previousPage = $this->findGroups($result['prev_cursor'], true);
+        $this->assertSame($pages[1], array_column($previousPage['groups'], 'execution_id'));
+        $firstPage = $this->findGroups($previousPage['prev_cursor'], true);
+        $this->assertSame($pages[0], array_column($firstPage['groups'], 'execution_id'));
+        $this->assertNull($firstPage['prev_cursor']);
+        $this->assertSame($previousPage['groups'][0]['execution_id'], $this->findGroups($firstPage['next_cursor'])['groups'][0]['execution_id']);
+    }
+
+    /**
+     * @param array{created_at: string, execution_id: ?string}|null $cursor
+     */
+    private function findGroups(?array $cursor, bool $backward = false): array
+    {
+        return $this->auditLogRepository->findByOrganisationGroupedByExecutionId(
+            $this->currentOrganisation->getId(),
+            ['date_from' => new \DateTime(self::DAY . ' 00:00:00'), 'date_to' => new \DateTime(self::DAY)],
+            10,
+            'DESC',
+            $cursor,
+            $backward
+        );
+    }
+
+    private function createAuditLog(string $action, ?string $executionId): AuditLog
+    {
+        $auditLog = new AuditLog();
+        $auditLog->setOrganisation($this->currentOrganisation);
+        $auditLog->setUser($this->currentUser);
+        $auditLog->setAction($action);
+        $auditLog->setExecutionId($executionId);
+        $auditLog->setCreatedAt(new \DateTime(self::DAY . ' 10:30:00'));
+
+        return $auditLog;
+    }
+
+    private function deleteDay(): void
+    {
+        $this->entityManager->getConnection()->executeStatement(
+            'DELETE FROM audit_log WHERE created_at >= ? AND created_at < ?',
+            [self::DAY . ' 00:00:00', (new \DateTimeImmutable(self::DAY . ' +1 day'))->format('Y-m-d H:i:s')]
+        );
+    }
+}
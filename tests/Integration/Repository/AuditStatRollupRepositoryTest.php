@@ -0,0 +1,118 @@
+<?php
+
+namespace App\Tests\Integration\Repository;
+
+use App\Entity\AuditLog;
+use App\Entity\AuditStatRollup;
+use App\Repository\AuditLogRepository;
+use App\Repository\AuditStatRollupRepository;
+use App\Tests\Integration\AbstractIntegrationTestCase;
+
+class AuditStatRollupRepositoryTest extends AbstractIntegrationTestCase
+{
+    // Far away from the days other tests write audit logs for
+    private const DAY = '2020-01-15';
+
+    private AuditStatRollupRepository $rollupRepository;
+
+    protected function setUp(): void
+    {
+        parent::setUp();
+
+        $this->loginUser('admin@test.example.com');
+        $this->rollupRepository = $this->entityManager->getRepository(AuditStatRollup::class);
+        $this->deleteDay();
+    }
+
+    protected function tearDown(): void
+    {
+        $this->deleteDay();
+        parent::tearDown();
+    }
+
+    public function testHashMatchesTheSqlExpressionOfTheBackfill(): void
+    {
+        $dimensions = [
+            ['tool_execution.started', 42, 'wf-1', 'jira', 'jira_search'],
+            ['user.login', null, null, null, null],
+            ['tool_execution.failed', null, 'wf|with|pipes', 'confluence', null],
+        ];
+
+        foreach ($dimensions as $dimension) {
+            $sqlHash = $this->entityManager->getConnection()->fetchOne(
+                "SELECT MD5(CONCAT_WS('|', ?, COALESCE(?, ''), COALESCE(?, ''), COALESCE(?, ''), COALESCE(?, '')))",
+                $dimension
+            );
+
+            $this->assertSame($sqlHash, AuditStatRollupRepository::hashDimensions(...$dimension));
+        }
+    }
+
+    public function testRebuildProducesTheSameRowsAsIncrementalUpdates(): void
+    {
+        $auditLogs = [
+            $this->createAuditLog('tool_execution.started', ['workflow_user_id' => 'wf-1', 'integration_type' => 'jira', 'tool_name' => 'jira_search']),
+            $this->createAuditLog('tool_execution.started', ['workflow_user_id' => 'wf-1', 'integration_type' => 'jira', 'tool_name' => 'jira_search']),
+            $this->createAuditLog('tool_execution.started', ['workflow_user_id' => 'wf-1', 'integration_type' => 'jira', 'tool_name' => 'jira_get_issue']),
+            // Only tool executions are broken down by integration and tool
+            $this->createAuditLog('user.login', ['integration_type' => 'jira', 'workflow_user_id' => '']),
+        ];
+
+        /** @var AuditLogRepository $auditLogRepository */
+        $auditLogRepository = $this->entityManager->getRepository(AuditLog::class);
+        $auditLogRepository->insertMultiple($auditLogs);
+        $this->rollupRepository->incrementFromAuditLogs($auditLogs);
+
+        $incremental = $this->fetchDay();
+        $this->assertSame([
+            ['action' => 'tool_execution.started', 'workflow_user_id' => 'wf-1', 'integration_type' => 'jira', 'tool_name' => 'jira_get_issue', 'event_count' => 1],
+            ['action' => 'tool_execution.started', 'workflow_user_id' => 'wf-1', 'integration_type' => 'jira', 'tool_name' => 'jira_search', 'event_count' => 2],
+            ['action' => 'user.login', 'workflow_user_id' => null, 'integration_type' => null, 'tool_name' => null, 'event_count' => 1],
+        ], array_map(fn(array $row) => array_diff_key($row, ['dimension_hash' => true]), $incremental));
+
+        $this->assertSame(3, $this->rollupRepository->rebuildDay(new \DateTimeImmutable(self::DAY)));
+        $this->assertSame($incremental, $this->fetchDay());
+
+        // Later events of the day are added to the rebuilt rows instead of creating new ones
+        $this->rollupRepository->incrementFromAuditLogs([$auditLogs[0]]);
+        $this->assertSame(3, array_column($this->fetchDay(), 'event_count', 'tool_name')['jira_search']);
+    }
+
+    private function createAuditLog(string $action, array $data): AuditLog
+    {
+        $auditLog = new AuditLog();
+        $auditLog->setOrganisation($this->currentOrganisation);
+        $auditLog->setUser($this->currentUser);
+        $auditLog->setAction($action);
+        $auditLog->setData($data);
+        $auditLog->setCreatedAt(new \DateTime(self::DAY . ' 10:30:00'));
+
+        return $auditLog;
+    }
+
+    /**
+     * @return list<array{dimension_hash: string, action: string, workflow_user_id: ?string, integration_type: ?string, tool_name: ?string, event_count: int}>
+     */
+    private function fetchDay(): array
+    {
+        $rows = $this->entityManager->getConnection()->fetchAllAssociative(
+            'SELECT dimension_hash, action, workflow_user_id, integration_type, tool_name, event_count
+             FROM audit_stat_rollup
+             WHERE organisation_id = ? AND bucket_date = ?
+             ORDER BY action, tool_name',
+            [$this->currentOrganisation->getId(), self::DAY]
+        );
+
+        return array_map(fn(array $row) => array_merge($row, ['event_count' => (int) $row['event_count']]), $rows);
+    }
+
+    private function deleteDay(): void
+    {
+        $connection = $this->entityManager->getConnection();
+        $connection->executeStatement('DELETE FROM audit_stat_rollup WHERE bucket_date = ?', [self::DAY]);
+        $connection->executeStatement(
+            'DELETE FROM audit_log WHERE created_at >= ? AND created_at < ?',
+            [self::DAY . ' 00:00:00', (new \DateTimeImmutable(self::DAY . ' +1 day'))->format('Y-m-d H:i:s')]
+        );
+    }
+}
@@ -0,0 +1,69 @@
+<?php
+
+namespace App\Tests\Unit\Benchmark;
+
+use App\Tests\Benchmark\BenchmarkReport;
+use PHPUnit\Framework\TestCase;
+
+class BenchmarkReportTest extends TestCase
+{
+    private BenchmarkReport $report;
+
+    protected function setUp(): void
+    {
+        $this->report = new BenchmarkReport();
+    }
+
+    public function testSummarizeMergesWorkers(): void
+    {
+        $summary = $this->report->summarize([
+            [
+                'latencies_ms' => [1.0, 2.0, 3.0, 4.0, 5.0],
+                'status_codes' => [200 => 5],
+                'started_at' => 100.0,
+                'finished_at' => 101.0,
+                'peak_memory_bytes' => 8 * 1048576,
+            ],
+            [
+                'latencies_ms' => [6.0, 7.0, 8.0, 9.0, 100.0],
+                'status_codes' => [200 => 4, 503 => 1],
+                'started_at' => 100.5,
+                'finished_at' => 102.0,
+                'peak_memory_bytes' => 12 * 1048576,
+            ],
+        ], 4.0);
+
+        $this->assertSame(10, $summary['requests']);
+        $this->assertSame(1, $summary['errors']);
+        $this->assertSame(5.0, $summary['throughput_rps']);
+        $this->assertSame(5.0, $summary['latency_ms']['p50']);
+        $this->assertSame(100.0, $summary['latency_ms']['p95']);
+        $this->assertSame(100.0, $summary['latency_ms']['max']);
+        $this->assertSame(4.0, $summary['queries_per_request']);
+        $this->assertSame(12.0, $summary['peak_memory_mb']);
+    }
+
+    public function testCompareFlagsRegressionsBeyondThreshold(): void
+    {
+        $baseline = ['scenarios' => [
+            'integration_tools' => ['throughput_rps' => 200.0, 'latency_ms' => ['p50' => 10.0, 'p95' => 20.0, 'p99' => 30.0], 'queries_per_request' => 3.0, 'peak_memory_mb' => 20.0],
+        ]];
+        $current = ['scenarios' => [
+            'integration_tools' => ['throughput_rps' => 190.0, 'latency_ms' => ['p50' => 10.5, 'p95' => 25.0, 'p99' => 20.0], 'queries_per_request' => 4.0, 'peak_memory_mb' => 20.0],
+            'skills' => ['throughput_rps' => 10.0, 'latency_ms' => ['p50' => 90.0, 'p95' => 95.0, 'p99' => 99.0], 'queries_per_request' => 9.0, 'peak_memory_mb' => 30.0],
+        ]];
+
+        $regressions = $this->report->compare($current, $baseline, 10.0);
+
+        $this->assertSame(['latency_ms.p95', 'queries_per_request'], array_column($regressions, 'metric'));
+        $this->assertSame(25.0, $regressions[0]['change_percent']);
+    }
+
+    public function testPercentileUsesNearestRank(): void
+    {
+        $this->assertSame(0.0, BenchmarkReport::percentile([], 99));
+        $this->assertSame(1.0, BenchmarkReport::percentile([1.0], 50));
+        $this->assertSame(2.0, BenchmarkReport::percentile([1.0, 2.0, 3.0, 4.0], 50));
+        $this->assertSame(4.0, BenchmarkReport::percentile([1.0, 2.0, 3.0, 4.0], 99));
+    }
+}
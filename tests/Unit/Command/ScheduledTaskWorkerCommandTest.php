@@ -0,0 +1,121 @@
+<?php
+
+namespace App\Tests\Unit\Command;
+
+use App\Command\ScheduledTaskWorkerCommand;
+use App\Entity\ScheduledTask;
+use App\Entity\ScheduledTaskExecution;
+use App\Message\ExecuteScheduledTaskMessage;
+use App\Repository\ScheduledTaskRepository;
+use App\Service\ScheduledTask\ScheduledTaskExecutor;
+use App\Service\ScheduledTask\ScheduledTaskWakeup;
+use Doctrine\ORM\EntityManagerInterface;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+use Symfony\Component\Console\Command\Command;
+use Symfony\Component\Console\Tester\CommandTester;
+use Symfony\Component\Messenger\Envelope;
+use Symfony\Component\Messenger\MessageBusInterface;
+
+class ScheduledTaskWorkerCommandTest extends TestCase
+{
+    /**
+     * @var ExecuteScheduledTaskMessage[]
+     */
+    private array $dispatched = [];
+
+    protected function setUp(): void
+    {
+        $this->dispatched = [];
+    }
+
+    public function testFailingTaskIsPostponedWithoutBlockingTheOthers(): void
+    {
+        $broken = $this->createTask(1, 'Invalid/Timezone');
+        $valid = $this->createTask(2, 'Europe/Berlin');
+
+        $repository = $this->createStub(ScheduledTaskRepository::class);
+        $repository->method('lockDueForExecution')->willReturnOnConsecutiveCalls([$broken, $valid], []);
+
+        $tester = new CommandTester($this->createCommand($repository));
+        $exitCode = $tester->execute(['--once' => true]);
+
+        $this->assertSame(Command::SUCCESS, $exitCode);
+        $this->assertCount(1, $this->dispatched);
+        $this->assertSame(2, $this->dispatched[0]->getScheduledTaskId());
+
+        // Retried later instead of being claimed again right away
+        $this->assertGreaterThan(new \DateTime('+10 minutes'), $broken->getNextExecutionAt());
+        $this->assertNull($broken->getLastExecutionAt());
+        $this->assertGreaterThan(new \DateTime(), $valid->getNextExecutionAt());
+    }
+
+    public function testOverdueTaskLockedByAnotherWorkerIsNotPolledInALoop(): void
+    {
+        $repository = $this->createStub(ScheduledTaskRepository::class);
+        $repository->method('lockDueForExecution')->willReturn([]);
+        $repository->method('findNextExecutionAt')->willReturn(new \DateTimeImmutable('-1 minute'));
+
+        $waits = [];
+        $wakeup = $this->createMock(ScheduledTaskWakeup::class);
+        $command = $this->createCommand($repository, $wakeup);
+        $wakeup->expects($this->once())->method('wait')->willReturnCallback(function (float $seconds) use (&$waits, $command): void {
+            $waits[] = $seconds;
+            (new \ReflectionProperty($command, 'shouldStop'))->setValue($command, true);
+        });
+
+        (new CommandTester($command))->execute([]);
+
+        $this->assertGreaterThanOrEqual(1.0, $waits[0]);
+    }
+
+    private function createCommand(ScheduledTaskRepository $repository, ?ScheduledTaskWakeup $wakeup = null): ScheduledTaskWorkerCommand
+    {
+        $entityManager = $this->createStub(EntityManagerInterface::class);
+        $entityManager->method('wrapInTransaction')->willReturnCallback(fn(callable $func) => $func());
+        $entityManager->method('isOpen')->willReturn(true);
+
+        $executor = $this->createStub(ScheduledTaskExecutor::class);
+        $executor->method('createPendingExecution')->willReturnCallback(function (ScheduledTask $task): ScheduledTaskExecution {
+            $execution = new ScheduledTaskExecution();
+            $execution->setScheduledTask($task);
+            $this->setId($execution, 100 + $task->getId());
+
+            return $execution;
+        });
+
+        $messageBus = $this->createStub(MessageBusInterface::class);
+        $messageBus->method('dispatch')->willReturnCallback(function (object $message): Envelope {
+            $this->dispatched[] = $message;
+
+            return new Envelope($message);
+        });
+
+        return new ScheduledTaskWorkerCommand(
+            $repository,
+            $executor,
+            $entityManager,
+            new NullLogger(),
+            $messageBus,
+            $wakeup ?? $this->createStub(ScheduledTaskWakeup::class),
+        );
+    }
+
+    private function createTask(int $id, string $timezone): ScheduledTask
+    {
+        $task = new ScheduledTask();
+        $task->setName('Task ' . $id);
+        $task->setFrequency('daily');
+        $task->setExecutionTime('08:00');
+        $task->setTimezone($timezone);
+        $task->setNextExecutionAt(new \DateTime('-1 minute'));
+        $this->setId($task, $id);
+
+        return $task;
+    }
+
+    private function setId(object $entity, int $id): void
+    {
+        (new \ReflectionProperty($entity, 'id'))->setValue($entity, $id);
+    }
+}
@@ -0,0 +1,95 @@
+<?php
+
+namespace App\Tests\Unit\Integration;
+
+use App\CacheWarmer\ToolIndexCacheWarmer;
+use App\Integration\IntegrationInterface;
+use App\Integration\IntegrationRegistry;
+use App\Integration\ToolCategory;
+use App\Integration\ToolDefinition;
+use PHPUnit\Framework\TestCase;
+
+class IntegrationRegistryTest extends TestCase
+{
+    private string $cacheDir;
+
+    protected function setUp(): void
+    {
+        $this->cacheDir = sys_get_temp_dir() . '/tool_index_test_' . bin2hex(random_bytes(4));
+    }
+
+    protected function tearDown(): void
+    {
+        @unlink($this->cacheDir . '/' . IntegrationRegistry::TOOL_INDEX_FILE);
+        @rmdir($this->cacheDir);
+    }
+
+    public function testFindToolResolvesIntegrationAndDefinition(): void
+    {
+        $registry = new IntegrationRegistry($this->createIntegrations());
+
+        $resolved = $registry->findTool('jira_create_issue');
+
+        $this->assertNotNull($resolved);
+        $this->assertSame('jira', $resolved['integration']->getType());
+        $this->assertSame('jira_create_issue', $resolved['tool']->getName());
+        $this->assertSame(ToolCategory::WRITE, $resolved['tool']->getCategory());
+        $this->assertNull($registry->findTool('unknown_tool'));
+    }
+
+    public function testFirstIntegrationWinsOnDuplicateToolNames(): void
+    {
+        $registry = new IntegrationRegistry($this->createIntegrations());
+
+        $this->assertSame('jira', $registry->findTool('shared_tool')['integration']->getType());
+    }
+
+    public function testWarmedIndexIsUsedWithoutBuildingToolDefinitions(): void
+    {
+        $warmer = new ToolIndexCacheWarmer(new IntegrationRegistry($this->createIntegrations()));
+        $warmer->warmUp($this->cacheDir);
+
+        // getTools() must not be called once the compiled index exists
+        $integration = $this->createMock(IntegrationInterface::class);
+        $integration->method('getType')->willReturn('jira');
+        $integration->expects($this->never())->method('getTools');
+
+        $registry = new IntegrationRegistry([$integration], $this->cacheDir);
+        $resolved = $registry->findTool('jira_search');
+
+        $this->assertNotNull($resolved);
+        $this->assertSame($integration, $resolved['integration']);
+        $this->assertSame([['name' => 'jql', 'type' => 'string', 'required' => true]], $resolved['tool']->getParameters());
+        $this->assertSame(['issues.*.key'], $resolved['tool']->getResultFields());
+        $this->assertSame(8192, $resolved['tool']->getMaxResultBytes());
+    }
+
+    /**
+     * @return IntegrationInterface[]
+     */
+    private function createIntegrations(): array
+    {
+        $jira = $this->createStub(IntegrationInterface::class);
+        $jira->method('getType')->willReturn('jira');
+        $jira->method('getTools')->willReturn([
+            new ToolDefinition(
+                'jira_search',
+                'Search issues',
+                [['name' => 'jql', 'type' => 'string', 'required' => true]],
+                resultFields: ['issues.*.key'],
+                maxResultBytes: 8192
+            ),
+            new ToolDefinition('jira_create_issue', 'Create issue', [], ToolCategory::WRITE),
+            new ToolDefinition('shared_tool', 'Jira variant'),
+        ]);
+
+        $confluence = $this->createStub(IntegrationInterface::class);
+        $confluence->method('getType')->willReturn('confluence');
+        $confluence->method('getTools')->willReturn([
+            new ToolDefinition('confluence_search', 'Search pages'),
+            new ToolDefinition('shared_tool', 'Confluence variant'),
+        ]);
+
+        return [$jira, $confluence];
+    }
+}
@@ -0,0 +1,58 @@
+<?php
+
+namespace App\Tests\Unit\MessageHandler;
+
+use App\Entity\ScheduledTask;
+use App\Entity\ScheduledTaskExecution;
+use App\Message\ExecuteScheduledTaskMessage;
+use App\MessageHandler\ExecuteScheduledTaskHandler;
+use App\Repository\ScheduledTaskRepository;
+use App\Service\ScheduledTask\ScheduledTaskExecutor;
+use Doctrine\ORM\EntityManagerInterface;
+use Doctrine\ORM\EntityRepository;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+use Symfony\Component\Messenger\Handler\Acknowledger;
+
+class ExecuteScheduledTaskHandlerTest extends TestCase
+{
+    public function testFinishedRunsAreNotRetriedWhenTheBatchFails(): void
+    {
+        $executor = $this->createStub(ScheduledTaskExecutor::class);
+        $executor->method('executeBatch')->willReturnCallback(function (array $items, callable $onFinished): void {
+            $onFinished(1);
+
+            throw new \RuntimeException('Connection lost');
+        });
+
+        $handler = $this->createHandler($executor);
+
+        $outcomes = [];
+        foreach ([1, 2, 3] as $i) {
+            $handler(new ExecuteScheduledTaskMessage($i, 100 + $i, 'scheduled'), new Acknowledger(
+                ExecuteScheduledTaskHandler::class,
+                function (?\Throwable $error) use (&$outcomes, $i): void {
+                    $outcomes[$i] = $error?->getMessage() ?? 'ack';
+                }
+            ));
+        }
+        $handler->flush(true);
+
+        ksort($outcomes);
+        $this->assertSame([1 => 'Connection lost', 2 => 'ack', 3 => 'Connection lost'], $outcomes);
+    }
+
+    private function createHandler(ScheduledTaskExecutor $executor): ExecuteScheduledTaskHandler
+    {
+        $taskRepository = $this->createStub(ScheduledTaskRepository::class);
+        $taskRepository->method('find')->willReturn(new ScheduledTask());
+
+        $executionRepository = $this->createStub(EntityRepository::class);
+        $executionRepository->method('find')->willReturn(new ScheduledTaskExecution());
+
+        $entityManager = $this->createStub(EntityManagerInterface::class);
+        $entityManager->method('getRepository')->willReturn($executionRepository);
+
+        return new ExecuteScheduledTaskHandler($taskRepository, $executor, $entityManager, new NullLogger());
+    }
+}
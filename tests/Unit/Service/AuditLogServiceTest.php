@@ -0,0 +1,111 @@
+<?php
+
+namespace App\Tests\Unit\Service;
+
+use App\Entity\AuditLog;
+use App\Entity\Organisation;
+use App\Repository\AuditLogRepository;
+use App\Repository\AuditStatRollupRepository;
+use App\Service\AuditLogService;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\LoggerInterface;
+use Psr\Log\NullLogger;
+use Symfony\Component\HttpFoundation\Request;
+use Symfony\Component\HttpFoundation\RequestStack;
+
+class AuditLogServiceTest extends TestCase
+{
+    public function testEventsAreBufferedUntilFlush(): void
+    {
+        $written = [];
+        $repository = $this->createMock(AuditLogRepository::class);
+        $repository->expects($this->never())->method('save');
+        $repository->expects($this->once())
+            ->method('insertMultiple')
+            ->willReturnCallback(function (array $auditLogs) use (&$written): void {
+                $written = $auditLogs;
+            });
+
+        $rollupRepository = $this->createMock(AuditStatRollupRepository::class);
+        $rollupRepository->expects($this->once())
+            ->method('incrementFromAuditLogs')
+            ->with($this->countOf(2));
+
+        $requestStack = new RequestStack();
+        $requestStack->push(Request::create('/api/integrations/x/execute', server: ['REMOTE_ADDR' => '10.0.0.1']));
+
+        $service = new AuditLogService($repository, $rollupRepository, $requestStack, new NullLogger());
+        $service->log('tool_execution.started', null, ['tool' => 'jira_search'], 'exec-1');
+        $service->logWithOrganisation('tool_execution.completed', new Organisation(), null, [], 'exec-1');
+
+        $this->assertSame([], $written);
+
+        $service->flush();
+        $service->flush();
+
+        $this->assertCount(2, $written);
+        $this->assertContainsOnlyInstancesOf(AuditLog::class, $written);
+        $this->assertSame(['tool_execution.started', 'tool_execution.completed'], array_map(
+            fn(AuditLog $log) => $log->getAction(),
+            $written
+        ));
+        $this->assertSame('10.0.0.1', $written[0]->getIp());
+        $this->assertNotNull($written[0]->getCreatedAt());
+    }
+
+    public function testResetFlushesPendingEvents(): void
+    {
+        $repository = $this->createMock(AuditLogRepository::class);
+        $repository->expects($this->once())->method('insertMultiple');
+
+        $service = new AuditLogService($repository, $this->createStub(AuditStatRollupRepository::class), new RequestStack(), new NullLogger());
+        $service->log('user.login');
+        $service->reset();
+    }
+
+    public function testWriteFailureDoesNotPropagate(): void
+    {
+        $repository = $this->createStub(AuditLogRepository::class);
+        $repository->method('insertMultiple')->willThrowException(new \RuntimeException('Database is gone'));
+
+        $service = new AuditLogService($repository, $this->createStub(AuditStatRollupRepository::class), new RequestStack(), new NullLogger());
+        $service->log('user.login');
+        $service->flush();
+
+        $this->addToAssertionCount(1);
+    }
+
+    public function testRollupFailureIsLoggedSeparatelyFromTheBatchWrite(): void
+    {
+        $repository = $this->createMock(AuditLogRepository::class);
+        $repository->expects($this->once())->method('insertMultiple');
+
+        $rollupRepository = $this->createStub(AuditStatRollupRepository::class);
+        $rollupRepository->method('incrementFromAuditLogs')->willThrowException(new \RuntimeException('Deadlock found'));
+
+        $logger = $this->createMock(LoggerInterface::class);
+        $logger->expects($this->once())->method('error')->with('Failed to update audit stat rollups', $this->callback(
+            fn(array $context) => $context['count'] === 1 && $context['error'] === 'Deadlock found'
+        ));
+
+        $service = new AuditLogService($repository, $rollupRepository, new RequestStack(), $logger);
+        $service->log('user.login');
+        $service->flush();
+    }
+
+    public function testRollupIsNotUpdatedWhenTheBatchWriteFails(): void
+    {
+        $repository = $this->createStub(AuditLogRepository::class);
+        $repository->method('insertMultiple')->willThrowException(new \RuntimeException('Database is gone'));
+
+        $rollupRepository = $this->createMock(AuditStatRollupRepository::class);
+        $rollupRepository->expects($this->never())->method('incrementFromAuditLogs');
+
+        $logger = $this->createMock(LoggerInterface::class);
+        $logger->expects($this->once())->method('error')->with('Failed to write audit log batch', $this->anything());
+
+        $service = new AuditLogService($repository, $rollupRepository, new RequestStack(), $logger);
+        $service->log('user.login');
+        $service->flush();
+    }
+}
@@ -0,0 +1,173 @@
+<?php
+
+namespace App\Tests\Unit\Service;
+
+use App\Entity\IntegrationConfig;
+use App\Entity\Organisation;
+use App\Repository\IntegrationConfigRepository;
+use App\Repository\OrganisationRepository;
+use App\Service\EncryptionService;
+use App\Service\ExecutionContextCache;
+use App\Service\ToolCatalogCache;
+use Doctrine\ORM\EntityManagerInterface;
+use PHPUnit\Framework\TestCase;
+
+class ExecutionContextCacheTest extends TestCase
+{
+    private string $catalogVersion = '1';
+
+    private Organisation $organisation;
+
+    protected function setUp(): void
+    {
+        $this->catalogVersion = '1';
+
+        $this->organisation = new Organisation();
+        $this->organisation->setName('Acme');
+        $this->setId($this->organisation, 7);
+    }
+
+    public function testWarmLookupsSkipDatabaseAndDecryption(): void
+    {
+        $organisationRepository = $this->createMock(OrganisationRepository::class);
+        $organisationRepository->expects($this->once())->method('findOneBy')->willReturn($this->organisation);
+
+        $configRepository = $this->createMock(IntegrationConfigRepository::class);
+        $configRepository->expects($this->once())->method('find')->with(42)->willReturn($this->createConfig());
+
+        $encryptionService = $this->createMock(EncryptionService::class);
+        $encryptionService->expects($this->once())->method('decrypt')->willReturn('{"api_token":"secret"}');
+
+        $cache = $this->createCache($organisationRepository, $configRepository, $encryptionService);
+
+        for ($i = 0; $i < 3; $i++) {
+            $organisation = $cache->resolveOrganisation($this->organisation->getUuid());
+            $config = $cache->getConfig($organisation, 42);
+        }
+
+        $this->assertSame(7, $organisation['id']);
+        $this->assertSame('Acme', $organisation['name']);
+        $this->assertSame(['api_token' => 'secret'], $config['credentials']);
+        $this->assertSame(['jira_delete_issue'], $config['disabled_tools']);
+    }
+
+    public function testCatalogVersionChangeReloadsConfig(): void
+    {
+        $configRepository = $this->createMock(IntegrationConfigRepository::class);
+        $configRepository->expects($this->exactly(2))->method('find')->willReturn($this->createConfig());
+
+        $cache = $this->createCache(configRepository: $configRepository);
+
+        $cache->getConfig($cache->resolveOrganisation($this->organisation->getUuid()), 42);
+        $this->catalogVersion = '2';
+        $cache->getConfig($cache->resolveOrganisation($this->organisation->getUuid()), 42);
+    }
+
+    public function testInvalidateConfigReloadsConfig(): void
+    {
+        $configRepository = $this->createMock(IntegrationConfigRepository::class);
+        $configRepository->expects($this->exactly(2))->method('find')->willReturn($this->createConfig());
+
+        $cache = $this->createCache(configRepository: $configRepository);
+        $organisation = $cache->resolveOrganisation($this->organisation->getUuid());
+
+        $cache->getConfig($organisation, 42);
+        $cache->invalidateConfig(42);
+        $cache->getConfig($organisation, 42);
+    }
+
+    public function testConfigOfOtherOrganisationIsNotReturned(): void
+    {
+        $otherOrganisation = new Organisation();
+        $this->setId($otherOrganisation, 8);
+
+        $config = $this->createConfig();
+        $config->setOrganisation($otherOrganisation);
+
+        $configRepository = $this->createStub(IntegrationConfigRepository::class);
+        $configRepository->method('find')->willReturn($config);
+
+        $cache = $this->createCache(configRepository: $configRepository);
+
+        $this->assertNull($cache->getConfig($cache->resolveOrganisation($this->organisation->getUuid()), 42));
+    }
+
+    public function testWarmConfigIsNotReturnedToOtherOrganisation(): void
+    {
+        $otherOrganisation = new Organisation();
+        $this->setId($otherOrganisation, 8);
+
+        $configRepository = $this->createMock(IntegrationConfigRepository::class);
+        $configRepository->expects($this->exactly(2))->method('find')->with(42)->willReturn($this->createConfig());
+
+        $cache = $this->createCache(configRepository: $configRepository);
+        $owner = ['id' => 7, 'version' => '1', 'entity' => $this->organisation];
+        $other = ['id' => 8, 'version' => '1', 'entity' => $otherOrganisation];
+
+        $this->assertNotNull($cache->getConfig($owner, 42));
+        $this->assertNull($cache->getConfig($other, 42));
+        $this->assertNull($cache->getConfig($other, 42));
+        $this->assertNotNull($cache->getConfig($owner, 42));
+    }
+
+    public function testForeignLookupDoesNotHideConfigFromOwner(): void
+    {
+        $otherOrganisation = new Organisation();
+        $this->setId($otherOrganisation, 8);
+
+        $configRepository = $this->createStub(IntegrationConfigRepository::class);
+        $configRepository->method('find')->willReturn($this->createConfig());
+
+        $cache = $this->createCache(configRepository: $configRepository);
+
+        $this->assertNull($cache->getConfig(['id' => 8, 'version' => '1', 'entity' => $otherOrganisation], 42));
+        $this->assertNotNull($cache->getConfig(['id' => 7, 'version' => '1', 'entity' => $this->organisation], 42));
+    }
+
+    private function createCache(
+        ?OrganisationRepository $organisationRepository = null,
+        ?IntegrationConfigRepository $configRepository = null,
+        ?EncryptionService $encryptionService = null,
+    ): ExecutionContextCache {
+        if ($organisationRepository === null) {
+            $organisationRepository = $this->createStub(OrganisationRepository::class);
+            $organisationRepository->method('findOneBy')->willReturn($this->organisation);
+        }
+
+        if ($encryptionService === null) {
+            $encryptionService = $this->createStub(EncryptionService::class);
+            $encryptionService->method('decrypt')->willReturn('{}');
+        }
+
+        $toolCatalogCache = $this->createStub(ToolCatalogCache::class);
+        $toolCatalogCache->method('getVersion')->willReturnCallback(fn() => $this->catalogVersion);
+
+        $entityManager = $this->createStub(EntityManagerInterface::class);
+        $entityManager->method('getReference')->willReturn($this->organisation);
+
+        return new ExecutionContextCache(
+            $organisationRepository,
+            $configRepository ?? $this->createStub(IntegrationConfigRepository::class),
+            $encryptionService,
+            $toolCatalogCache,
+            $entityManager,
+        );
+    }
+
+    private function createConfig(): IntegrationConfig
+    {
+        $config = new IntegrationConfig();
+        $config->setOrganisation($this->organisation);
+        $config->setIntegrationType('jira');
+        $config->setActive(true);
+        $config->setDisabledTools(['jira_delete_issue']);
+        $config->setEncryptedCredentials('encrypted');
+
+        return $config;
+    }
+
+    private function setId(object $entity, int $id): void
+    {
+        (new \ReflectionProperty($entity, 'id'))->setValue($entity, $id);
+    }
+}
@@ -0,0 +1,157 @@
+<?php
+
+namespace App\Tests\Unit\Service\Http;
+
+use App\Service\Http\CircuitBreakingHttpClient;
+use App\Service\Http\UpstreamCircuitBreaker;
+use App\Service\Http\UpstreamScope;
+use App\Service\Http\UpstreamUnavailableException;
+use App\Service\RedisStore;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+use Symfony\Component\HttpClient\MockHttpClient;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class CircuitBreakingHttpClientTest extends TestCase
+{
+    /**
+     * @var array<string, string> Fake Redis values
+     */
+    private array $values = [];
+
+    /**
+     * @var array<string, array<string, true>> Fake Redis expiring sets
+     */
+    private array $sets = [];
+
+    private int $upstreamCalls = 0;
+
+    private UpstreamScope $upstreamScope;
+
+    protected function setUp(): void
+    {
+        $this->values = [];
+        $this->sets = [];
+        $this->upstreamCalls = 0;
+        $this->upstreamScope = new UpstreamScope();
+    }
+
+    public function testCircuitOpensAfterRepeatedFailures(): void
+    {
+        $client = $this->createClient(503);
+
+        for ($i = 0; $i < UpstreamCircuitBreaker::FAILURE_THRESHOLD; $i++) {
+            $this->assertSame(503, $client->request('GET', 'https://acme.atlassian.net/rest/api/3/myself')->getStatusCode());
+        }
+
+        try {
+            $client->request('GET', 'https://acme.atlassian.net/rest/api/3/myself');
+            $this->fail('Requests to an upstream with an open circuit must fail fast');
+        } catch (UpstreamUnavailableException $e) {
+            $this->assertSame('acme.atlassian.net', $e->getUpstream());
+        }
+
+        $this->assertSame(UpstreamCircuitBreaker::FAILURE_THRESHOLD, $this->upstreamCalls);
+        // Other upstreams are not affected
+        $this->assertSame(503, $client->request('GET', 'https://other.atlassian.net/rest/api/3/myself')->getStatusCode());
+    }
+
+    public function testSuccessfulProbeClosesTheCircuit(): void
+    {
+        $this->values['upstream:acme.atlassian.net:failures'] = (string) UpstreamCircuitBreaker::FAILURE_THRESHOLD;
+
+        $client = $this->createClient(200);
+        $client->request('GET', 'https://acme.atlassian.net/rest/api/3/myself')->getContent();
+
+        $this->assertArrayNotHasKey('upstream:acme.atlassian.net:failures', $this->values);
+        $this->assertSame([], $this->sets['upstream:acme.atlassian.net:slots']);
+    }
+
+    public function testSharedHostIsGuardedPerTenant(): void
+    {
+        $client = $this->createClient(503);
+
+        $this->upstreamScope->run('config:1', function () use ($client): void {
+            for ($i = 0; $i < UpstreamCircuitBreaker::FAILURE_THRESHOLD; $i++) {
+                $client->request('GET', 'https://graph.microsoft.com/v1.0/me')->getStatusCode();
+            }
+        });
+        $this->assertArrayHasKey('upstream:graph.microsoft.com:config:1:open', $this->values);
+
+        // Other tenants and requests outside of a tool call still reach Graph
+        $status = $this->upstreamScope->run('config:2', fn() => $client->request('GET', 'https://graph.microsoft.com/v1.0/me')->getStatusCode());
+        $this->assertSame(503, $status);
+        $this->assertSame(503, $client->request('GET', 'https://graph.microsoft.com/v1.0/me')->getStatusCode());
+        $this->assertArrayNotHasKey('upstream:graph.microsoft.com:open', $this->values);
+    }
+
+    public function testThrottlingWithRetryAfterIsNotAFailure(): void
+    {
+        $client = $this->createClient(503, ['Retry-After' => '10']);
+
+        for ($i = 0; $i < UpstreamCircuitBreaker::FAILURE_THRESHOLD + 1; $i++) {
+            $this->assertSame(503, $client->request('GET', 'https://acme.atlassian.net/rest/api/3/myself')->getStatusCode());
+        }
+
+        $this->assertArrayNotHasKey('upstream:acme.atlassian.net:failures', $this->values);
+    }
+
+    public function testConcurrentRequestsAreCapped(): void
+    {
+        $client = $this->createClient(200);
+
+        $responses = [];
+        for ($i = 0; $i < UpstreamCircuitBreaker::MAX_CONCURRENT_REQUESTS; $i++) {
+            $responses[] = $client->request('GET', 'https://mcp.example.com/mcp', ['extra' => ['upstream' => 'remote_mcp:42']]);
+        }
+
+        $this->expectException(UpstreamUnavailableException::class);
+        $client->request('GET', 'https://mcp.example.com/mcp', ['extra' => ['upstream' => 'remote_mcp:42']]);
+    }
+
+    /**
+     * @param array<string, string> $headers
+     */
+    private function createClient(int $statusCode, array $headers = []): CircuitBreakingHttpClient
+    {
+        $mockClient = new MockHttpClient(function () use ($statusCode, $headers): MockResponse {
+            $this->upstreamCalls++;
+
+            return new MockResponse('{}', ['http_code' => $statusCode, 'response_headers' => $headers]);
+        });
+
+        $redisStore = $this->createStub(RedisStore::class);
+        $redisStore->method('getMultiple')->willReturnCallback(
+            fn(string ...$keys) => array_combine($keys, array_map(fn(string $key) => $this->values[$key] ?? null, $keys))
+        );
+        $redisStore->method('set')->willReturnCallback(function (string $key, string $value): void {
+            $this->values[$key] = $value;
+        });
+        $redisStore->method('delete')->willReturnCallback(function (string ...$keys): void {
+            foreach ($keys as $key) {
+                unset($this->values[$key]);
+            }
+        });
+        $redisStore->method('increment')->willReturnCallback(function (string $key, int $by = 1): int {
+            $this->values[$key] = (string) ((int) ($this->values[$key] ?? 0) + $by);
+
+            return (int) $this->values[$key];
+        });
+        $redisStore->method('acquireLock')->willReturn('lock-token');
+        $redisStore->method('addToExpiringSet')->willReturnCallback(
+            function (string $key, string $member, int $ttl, int $limit = 0): bool {
+                if ($limit > 0 && count($this->sets[$key] ?? []) >= $limit) {
+                    return false;
+                }
+                $this->sets[$key][$member] = true;
+
+                return true;
+            }
+        );
+        $redisStore->method('removeFromExpiringSet')->willReturnCallback(function (string $key, string $member): void {
+            unset($this->sets[$key][$member]);
+        });
+
+        return new CircuitBreakingHttpClient($mockClient, new UpstreamCircuitBreaker($redisStore, new NullLogger()), $this->upstreamScope);
+    }
+}
@@ -0,0 +1,72 @@
+<?php
+
+namespace App\Tests\Unit\Service\Http;
+
+use App\Service\Http\GraphBatch;
+use PHPUnit\Framework\TestCase;
+use Symfony\Component\HttpClient\MockHttpClient;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class GraphBatchTest extends TestCase
+{
+    public function testRequestsAreSplitIntoBatchesAndReturnedInOrder(): void
+    {
+        $batchSizes = [];
+        $client = new MockHttpClient(function (string $method, string $url, array $options) use (&$batchSizes): MockResponse {
+            $this->assertSame('POST', $method);
+            $this->assertSame('https://graph.microsoft.com/v1.0/$batch', $url);
+
+            $requests = json_decode($options['body'], true)['requests'];
+            $batchSizes[] = count($requests);
+
+            // Graph does not guarantee the order of the responses
+            $responses = array_map(
+                fn(array $request) => ['id' => $request['id'], 'status' => 200, 'body' => ['url' => $request['url']]],
+                array_reverse($requests)
+            );
+
+            return new MockResponse(json_encode(['responses' => $responses]));
+        });
+
+        $requests = [];
+        for ($i = 0; $i < 25; $i++) {
+            $requests['team-' . $i] = ['url' => '/teams/' . $i . '/channels'];
+        }
+
+        $results = (new GraphBatch($client, 'token'))->execute($requests);
+
+        $this->assertSame([20, 5], $batchSizes);
+        $this->assertSame(array_keys($requests), array_keys($results));
+        $this->assertSame('/teams/24/channels', $results['team-24']['body']['url']);
+    }
+
+    public function testThrottledItemsAreRetried(): void
+    {
+        $client = new MockHttpClient([
+            new MockResponse(json_encode(['responses' => [
+                ['id' => '0', 'status' => 200, 'body' => ['value' => [['id' => 'general']]]],
+                ['id' => '1', 'status' => 429, 'headers' => ['Retry-After' => '0'], 'body' => ['error' => ['code' => 'TooManyRequests']]],
+                ['id' => '2', 'status' => 404, 'body' => ['error' => ['message' => 'Team not found']]],
+            ]])),
+            function (string $method, string $url, array $options): MockResponse {
+                $requests = json_decode($options['body'], true)['requests'];
+                $this->assertSame(['1'], array_column($requests, 'id'));
+
+                return new MockResponse(json_encode(['responses' => [
+                    ['id' => '1', 'status' => 200, 'body' => ['value' => [['id' => 'random']]]],
+                ]]));
+            },
+        ]);
+
+        $results = (new GraphBatch($client, 'token'))->execute([
+            ['url' => '/teams/a/channels'],
+            ['url' => '/teams/b/channels'],
+            ['url' => '/teams/c/channels'],
+        ]);
+
+        $this->assertSame(2, $client->getRequestsCount());
+        $this->assertNull(GraphBatch::errorMessage($results[0]));
+        $this->assertSame('random', $results[1]['body']['value'][0]['id']);
+        $this->assertSame('Team not found', GraphBatch::errorMessage($results[2]));
+    }
+}
@@ -0,0 +1,66 @@
+<?php
+
+namespace App\Tests\Unit\Service\Http;
+
+use App\Service\Http\InstrumentedHttpClient;
+use App\Service\MetricsService;
+use PHPUnit\Framework\TestCase;
+use Symfony\Component\HttpClient\MockHttpClient;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class InstrumentedHttpClientTest extends TestCase
+{
+    /**
+     * @var list<array<string, string>> Labels of workoflow_upstream_requests_total
+     */
+    private array $counted = [];
+
+    private ?array $toolContext = null;
+
+    protected function setUp(): void
+    {
+        $this->counted = [];
+        $this->toolContext = null;
+    }
+
+    public function testCustomerHostsAreLabelledWithTheIntegration(): void
+    {
+        $client = $this->createClient();
+
+        $this->toolContext = ['integration' => 'jira', 'tool' => 'jira_search'];
+        $client->request('GET', 'https://acme.atlassian.net/rest/api/3/myself')->getContent();
+        $client->request('GET', 'https://other-customer.atlassian.net/rest/api/3/myself')->getContent();
+
+        $this->toolContext = ['integration' => 'remote_mcp', 'tool' => 'remote_mcp'];
+        $client->request('POST', 'https://mcp.customer.example/mcp')->getContent();
+
+        $this->toolContext = null;
+        $client->request('GET', 'https://orchestrator.internal/api/kb/documents')->getContent();
+
+        $this->assertSame(['jira', 'jira', 'remote_mcp', 'other'], array_column($this->counted, 'upstream'));
+    }
+
+    public function testSharedHostsKeepTheirName(): void
+    {
+        $this->toolContext = ['integration' => 'outlook_mail', 'tool' => 'outlook_mail_search'];
+
+        $this->createClient()->request('GET', 'https://Graph.Microsoft.com/v1.0/me/messages')->getContent();
+
+        $this->assertSame([['upstream' => 'graph.microsoft.com', 'status' => '2xx']], $this->counted);
+    }
+
+    private function createClient(): InstrumentedHttpClient
+    {
+        $metricsService = $this->createStub(MetricsService::class);
+        $metricsService->method('getToolContext')->willReturnCallback(
+            fn() => $this->toolContext ?? ['integration' => 'none', 'tool' => 'none']
+        );
+        $metricsService->method('increment')->willReturnCallback(function (string $name, array $labels): void {
+            if ($name === 'workoflow_upstream_requests_total') {
+                $this->counted[] = $labels;
+            }
+        });
+
+        return new InstrumentedHttpClient(new MockHttpClient(fn() => new MockResponse('{}')), $metricsService);
+    }
+}
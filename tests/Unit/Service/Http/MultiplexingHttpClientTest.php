@@ -0,0 +1,88 @@
+<?php
+
+namespace App\Tests\Unit\Service\Http;
+
+use App\Service\Http\MultiplexingHttpClient;
+use PHPUnit\Framework\TestCase;
+use Symfony\Component\HttpClient\MockHttpClient;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class MultiplexingHttpClientTest extends TestCase
+{
+    /** @var string[] */
+    private array $events = [];
+
+    public function testTasksIssueRequestsBeforeEarlierResponsesAreRead(): void
+    {
+        $client = $this->createClient();
+
+        $outcomes = $client->runConcurrently([
+            'a' => fn() => $this->fetch($client, 'a'),
+            'b' => fn() => $this->fetch($client, 'b'),
+        ]);
+
+        $this->assertSame(['a' => ['result' => 'body-a'], 'b' => ['result' => 'body-b']], $outcomes);
+        // Both requests are in flight before the first response is consumed
+        $this->assertSame(['request a', 'request b'], array_slice($this->events, 0, 2));
+    }
+
+    public function testFailingTaskDoesNotAffectOthers(): void
+    {
+        $client = $this->createClient();
+
+        $outcomes = $client->runConcurrently([
+            fn() => $this->fetch($client, 'ok'),
+            fn() => $client->request('GET', 'https://upstream.test/error')->getContent(),
+            fn() => throw new \RuntimeException('boom', 400),
+        ]);
+
+        $this->assertSame('body-ok', $outcomes[0]['result']);
+        $this->assertInstanceOf(\Symfony\Contracts\HttpClient\Exception\ServerExceptionInterface::class, $outcomes[1]['error']);
+        $this->assertSame('boom', $outcomes[2]['error']->getMessage());
+    }
+
+    public function testTasksCanChainSequentialRequests(): void
+    {
+        $client = $this->createClient();
+
+        $outcomes = $client->runConcurrently([
+            fn() => $this->fetch($client, 'first') . '+' . $this->fetch($client, 'second'),
+            fn() => $this->fetch($client, 'other'),
+        ]);
+
+        $this->assertSame('body-first+body-second', $outcomes[0]['result']);
+        $this->assertSame('body-other', $outcomes[1]['result']);
+    }
+
+    public function testRequestsOutsideConcurrentTasksAreNotWrapped(): void
+    {
+        $client = $this->createClient();
+
+        $this->assertSame('body-plain', $this->fetch($client, 'plain'));
+        $this->assertSame(['request plain', 'read plain'], $this->events);
+    }
+
+    private function fetch(MultiplexingHttpClient $client, string $name): string
+    {
+        $content = $client->request('GET', 'https://upstream.test/' . $name)->getContent();
+        $this->events[] = 'read ' . $name;
+
+        return $content;
+    }
+
+    private function createClient(): MultiplexingHttpClient
+    {
+        $this->events = [];
+
+        return new MultiplexingHttpClient(new MockHttpClient(function (string $method, string $url): MockResponse {
+            $name = basename(parse_url($url, PHP_URL_PATH));
+            $this->events[] = 'request ' . $name;
+
+            if ($name === 'error') {
+                return new MockResponse('failure', ['http_code' => 500]);
+            }
+
+            return new MockResponse('body-' . $name);
+        }));
+    }
+}
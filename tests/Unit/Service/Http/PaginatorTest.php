@@ -0,0 +1,106 @@
+<?php
+
+namespace App\Tests\Unit\Service\Http;
+
+use App\Service\Http\Paginator;
+use PHPUnit\Framework\TestCase;
+use Symfony\Component\HttpClient\MockHttpClient;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class PaginatorTest extends TestCase
+{
+    public function testOffsetPagesAreFetchedUpToTheLimit(): void
+    {
+        $requestedOffsets = [];
+        $client = new MockHttpClient(function (string $method, string $url, array $options) use (&$requestedOffsets): MockResponse {
+            parse_str(parse_url($url, PHP_URL_QUERY), $query);
+            $requestedOffsets[] = (int) $query['startAt'];
+
+            $issues = array_map(
+                fn(int $i) => ['key' => 'PROJ-' . $i],
+                range((int) $query['startAt'], (int) $query['startAt'] + (int) $query['maxResults'] - 1)
+            );
+
+            return new MockResponse(json_encode(['total' => 1000, 'issues' => $issues]));
+        });
+
+        $result = (new Paginator($client))->fetchOffset('GET', 'https://jira.example.com/rest/agile/1.0/board/1/issue', [], 'issues', 250, 100);
+
+        $this->assertSame([0, 100, 200], $requestedOffsets);
+        $this->assertCount(250, $result['items']);
+        $this->assertSame('PROJ-249', $result['items'][249]['key']);
+        $this->assertSame(1000, $result['total']);
+        $this->assertTrue($result['truncated']);
+    }
+
+    public function testOffsetPagingFollowsIsLastWithoutTotal(): void
+    {
+        $client = new MockHttpClient([
+            new MockResponse(json_encode(['isLast' => false, 'values' => [['id' => 1], ['id' => 2]]])),
+            new MockResponse(json_encode(['isLast' => true, 'values' => [['id' => 3]]])),
+        ]);
+
+        $result = (new Paginator($client))->fetchOffset('GET', 'https://jira.example.com/rest/agile/1.0/board/1/sprint', [], 'values', 500, 2);
+
+        $this->assertSame([1, 2, 3], array_column($result['items'], 'id'));
+        $this->assertFalse($result['truncated']);
+        $this->assertSame(2, $client->getRequestsCount());
+    }
+
+    public function testCursorStopsOnceTheConditionIsMet(): void
+    {
+        $client = new MockHttpClient([
+            new MockResponse(json_encode(['value' => [['title' => 'Home']], '@odata.nextLink' => 'https://graph.example.com/pages?skiptoken=2'])),
+            new MockResponse(json_encode(['value' => [['title' => 'Team Site']], '@odata.nextLink' => 'https://graph.example.com/pages?skiptoken=3'])),
+            new MockResponse(json_encode(['value' => [['title' => 'Never requested']]])),
+        ]);
+
+        $result = (new Paginator($client))->fetchCursor(
+            'GET',
+            'https://graph.example.com/pages',
+            ['query' => ['$top' => 1]],
+            'value',
+            1000,
+            Paginator::graphNextLink(),
+            fn(array $items) => in_array('Team Site', array_column($items, 'title'), true)
+        );
+
+        $this->assertSame(['Home', 'Team Site'], array_column($result['items'], 'title'));
+        $this->assertTrue($result['truncated']);
+        $this->assertSame(2, $client->getRequestsCount());
+    }
+
+    public function testLastCursorPageAsksOnlyForTheRemainingItems(): void
+    {
+        $requestedSizes = [];
+        $client = new MockHttpClient(function (string $method, string $url) use (&$requestedSizes): MockResponse {
+            parse_str(parse_url($url, PHP_URL_QUERY), $query);
+            $start = (int) ($query['nextPageToken'] ?? 0);
+            $requestedSizes[] = (int) $query['maxResults'];
+
+            $issues = array_map(fn(int $i) => ['key' => 'PROJ-' . $i], range($start, $start + (int) $query['maxResults'] - 1));
+
+            return new MockResponse(json_encode(['issues' => $issues, 'nextPageToken' => (string) ($start + count($issues))]));
+        });
+
+        $result = (new Paginator($client))->fetchCursor(
+            'GET',
+            'https://jira.example.com/rest/api/3/search/jql',
+            ['query' => ['jql' => 'project = PROJ', 'maxResults' => 100]],
+            'issues',
+            150,
+            static fn(array $page, string $url, array $options): ?array => [
+                $url,
+                array_replace_recursive($options, ['query' => ['nextPageToken' => $page['nextPageToken']]]),
+            ],
+            limitParam: 'maxResults'
+        );
+
+        $this->assertSame([100, 50], $requestedSizes);
+        $this->assertCount(150, $result['items']);
+        $this->assertTrue($result['truncated']);
+        $this->assertFalse($result['cut']);
+        // The cursor continues right after the last returned issue
+        $this->assertSame('150', $result['last_page']['nextPageToken']);
+    }
+}
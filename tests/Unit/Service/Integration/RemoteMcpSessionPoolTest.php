@@ -0,0 +1,163 @@
+<?php
+
+namespace App\Tests\Unit\Service\Integration;
+
+use App\Service\Integration\RemoteMcp\RemoteMcpSessionPool;
+use App\Service\Integration\RemoteMcpOAuthService;
+use App\Service\Integration\RemoteMcpService;
+use App\Service\RedisStore;
+use App\Service\UrlNormalizer;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+use Symfony\Component\Cache\Adapter\ArrayAdapter;
+use Symfony\Component\HttpClient\MockHttpClient;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class RemoteMcpSessionPoolTest extends TestCase
+{
+    private const CREDENTIALS = [
+        'server_url' => 'https://mcp.example.com/mcp',
+        'auth_type' => 'bearer',
+        'auth_token' => 'secret',
+    ];
+
+    /** @var array<string, string> */
+    private array $redisData = [];
+
+    /** @var string[] JSON-RPC methods received by the fake server, in order */
+    private array $rpcCalls = [];
+
+    private int $sessionCounter = 0;
+
+    /** @var string[] Session IDs the fake server considers terminated */
+    private array $expiredSessions = [];
+
+    protected function setUp(): void
+    {
+        $this->redisData = [];
+        $this->rpcCalls = [];
+        $this->sessionCounter = 0;
+        $this->expiredSessions = [];
+    }
+
+    public function testSessionIsReusedAcrossCalls(): void
+    {
+        $service = $this->createService();
+
+        $service->executeTool(self::CREDENTIALS, 'search', ['q' => 'a'], 42);
+        $service->executeTool(self::CREDENTIALS, 'search', ['q' => 'b'], 42);
+
+        $this->assertSame(
+            ['initialize', 'notifications/initialized', 'tools/call', 'tools/call'],
+            $this->rpcCalls
+        );
+        $this->assertSame(['hits' => 1, 'misses' => 1], $service->getSessionPoolStats());
+    }
+
+    public function testExpiredSessionIsReinitializedOnce(): void
+    {
+        $service = $this->createService();
+
+        $service->executeTool(self::CREDENTIALS, 'search', [], 42);
+        $this->expiredSessions[] = 'session-1';
+
+        $result = $service->executeTool(self::CREDENTIALS, 'search', [], 42);
+
+        $this->assertSame('session-2', $result['session']);
+        $this->assertSame(
+            ['initialize', 'notifications/initialized', 'tools/call', 'tools/call', 'initialize', 'notifications/initialized', 'tools/call'],
+            $this->rpcCalls
+        );
+    }
+
+    public function testChangedServerUrlDoesNotReuseSession(): void
+    {
+        $service = $this->createService();
+
+        $service->executeTool(self::CREDENTIALS, 'search', [], 42);
+        $service->executeTool(
+            array_merge(self::CREDENTIALS, ['server_url' => 'https://other.example.com/mcp']),
+            'search',
+            [],
+            42
+        );
+
+        $this->assertSame(2, count(array_keys($this->rpcCalls, 'initialize', true)));
+    }
+
+    public function testCallsWithoutConfigIdAreNotPooled(): void
+    {
+        $service = $this->createService();
+
+        $service->executeTool(self::CREDENTIALS, 'search', []);
+        $service->executeTool(self::CREDENTIALS, 'search', []);
+
+        $this->assertSame(2, count(array_keys($this->rpcCalls, 'initialize', true)));
+        $this->assertSame(['hits' => 0, 'misses' => 0], $service->getSessionPoolStats());
+    }
+
+    private function createService(): RemoteMcpService
+    {
+        $httpClient = new MockHttpClient(function (string $method, string $url, array $options): MockResponse {
+            $payload = json_decode($options['body'] ?? '{}', true);
+            $rpcMethod = $payload['method'] ?? '';
+            $this->rpcCalls[] = $rpcMethod;
+
+            $sessionHeader = null;
+            foreach ($options['headers'] ?? [] as $header) {
+                if (stripos($header, 'Mcp-Session-Id:') === 0) {
+                    $sessionHeader = trim(substr($header, strlen('Mcp-Session-Id:')));
+                }
+            }
+
+            if ($rpcMethod === 'initialize') {
+                $this->sessionCounter++;
+
+                return new MockResponse(json_encode(['jsonrpc' => '2.0', 'id' => 1, 'result' => []]), [
+                    'response_headers' => ['Mcp-Session-Id' => 'session-' . $this->sessionCounter],
+                ]);
+            }
+
+            if ($sessionHeader !== null && in_array($sessionHeader, $this->expiredSessions, true)) {
+                return new MockResponse('Session not found', ['http_code' => 404]);
+            }
+
+            return new MockResponse(json_encode([
+                'jsonrpc' => '2.0',
+                'id' => $payload['id'] ?? 0,
+                'result' => ['session' => $sessionHeader],
+            ]));
+        });
+
+        return new RemoteMcpService(
+            $httpClient,
+            new ArrayAdapter(),
+            new NullLogger(),
+            new UrlNormalizer(),
+            $this->createStub(RemoteMcpOAuthService::class),
+            new RemoteMcpSessionPool($this->createRedisStore(), new NullLogger()),
+        );
+    }
+
+    private function createRedisStore(): RedisStore
+    {
+        $store = $this->createStub(RedisStore::class);
+        $store->method('get')->willReturnCallback(fn(string $key) => $this->redisData[$key] ?? null);
+        $store->method('set')->willReturnCallback(function (string $key, string $value): void {
+            $this->redisData[$key] = $value;
+        });
+        $store->method('delete')->willReturnCallback(function (string ...$keys): void {
+            foreach ($keys as $key) {
+                unset($this->redisData[$key]);
+            }
+        });
+        $store->method('increment')->willReturnCallback(function (string $key, int $by = 1): int {
+            $this->redisData[$key] = (string) ((int) ($this->redisData[$key] ?? 0) + $by);
+
+            return (int) $this->redisData[$key];
+        });
+        $store->method('acquireLock')->willReturn('token');
+
+        return $store;
+    }
+}
@@ -0,0 +1,75 @@
+<?php
+
+namespace App\Tests\Unit\Service;
+
+use App\Entity\Organisation;
+use App\Service\KnowledgeBaseService;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\LoggerInterface;
+use Psr\Log\NullLogger;
+use Symfony\Component\HttpClient\MockHttpClient;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class KnowledgeBaseServiceTest extends TestCase
+{
+    public function testDownloadIsPassedThroughChunkByChunk(): void
+    {
+        $service = $this->createService(new MockResponse(['%PDF-1.7 ', 'page 1 ', 'page 2'], [
+            'response_headers' => [
+                'content-type' => 'application/pdf',
+                'content-disposition' => 'attachment; filename="handbook.pdf"',
+                'content-length' => '22',
+            ],
+        ]), new NullLogger());
+
+        $download = $service->downloadDocument($this->createOrganisation(), 'doc-1');
+
+        $this->assertSame('handbook.pdf', $download['filename']);
+        $this->assertSame('application/pdf', $download['content_type']);
+        $this->assertSame(22, $download['content_length']);
+        $chunks = array_values(array_filter(iterator_to_array($download['chunks'], false), fn(string $chunk) => $chunk !== ''));
+        $this->assertSame(['%PDF-1.7 ', 'page 1 ', 'page 2'], $chunks);
+    }
+
+    public function testInterruptedDownloadIsLoggedInsteadOfThrown(): void
+    {
+        $body = function (): \Generator {
+            yield 'first chunk';
+            throw new \RuntimeException('Connection reset by peer');
+        };
+
+        $logger = $this->createMock(LoggerInterface::class);
+        $logger->expects($this->once())->method('error')->with('KB download interrupted', $this->callback(
+            fn(array $context) => $context['docId'] === 'doc-1' && str_contains($context['error'], 'Connection reset by peer')
+        ));
+
+        $download = $this->createService(new MockResponse($body()), $logger)->downloadDocument($this->createOrganisation(), 'doc-1');
+
+        $this->assertNull($download['content_length']);
+        $this->assertSame('first chunk', implode('', iterator_to_array($download['chunks'], false)));
+    }
+
+    public function testFailedDownloadReturnsAnError(): void
+    {
+        $service = $this->createService(new MockResponse('Not found', ['http_code' => 404]), new NullLogger());
+
+        $download = $service->downloadDocument($this->createOrganisation(), 'doc-1');
+
+        $this->assertArrayHasKey('error', $download);
+        $this->assertArrayNotHasKey('chunks', $download);
+    }
+
+    private function createService(MockResponse $response, LoggerInterface $logger): KnowledgeBaseService
+    {
+        return new KnowledgeBaseService(new MockHttpClient($response), $logger, 'api-user', 'api-password');
+    }
+
+    private function createOrganisation(): Organisation
+    {
+        $organisation = new Organisation();
+        $organisation->setUuid('org-uuid');
+        $organisation->setOrchestratorApiUrl('https://orchestrator.test');
+
+        return $organisation;
+    }
+}
@@ -0,0 +1,82 @@
+<?php
+
+namespace App\Tests\Unit\Service;
+
+use App\Service\MetricsService;
+use App\Service\RedisStore;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+
+class MetricsServiceTest extends TestCase
+{
+    /**
+     * @var array<string, float> Fake Redis hash
+     */
+    private array $fields = [];
+
+    private MetricsService $metricsService;
+
+    protected function setUp(): void
+    {
+        $this->fields = [];
+
+        $redisStore = $this->createStub(RedisStore::class);
+        $redisStore->method('incrementFields')->willReturnCallback(function (string $key, array $increments): void {
+            foreach ($increments as $field => $by) {
+                $this->fields[$field] = ($this->fields[$field] ?? 0.0) + $by;
+            }
+        });
+        $redisStore->method('getFields')->willReturnCallback(
+            fn() => array_map(fn(float $value) => (string) $value, $this->fields)
+        );
+
+        $this->metricsService = new MetricsService($redisStore, new NullLogger());
+    }
+
+    public function testHistogramIsRenderedWithCumulativeBuckets(): void
+    {
+        $this->metricsService->observe('workoflow_upstream_request_duration_seconds', 0.2, ['tool' => 'jira_search', 'host' => 'acme.atlassian.net']);
+        $this->metricsService->observe('workoflow_upstream_request_duration_seconds', 3.0, ['host' => 'acme.atlassian.net', 'tool' => 'jira_search']);
+        $this->metricsService->flush();
+
+        $output = $this->metricsService->render();
+        $labels = 'host="acme.atlassian.net",tool="jira_search"';
+
+        $this->assertStringContainsString('# TYPE workoflow_upstream_request_duration_seconds histogram', $output);
+        $this->assertStringContainsString('workoflow_upstream_request_duration_seconds_bucket{' . $labels . ',le="0.1"} 0', $output);
+        $this->assertStringContainsString('workoflow_upstream_request_duration_seconds_bucket{' . $labels . ',le="0.25"} 1', $output);
+        $this->assertStringContainsString('workoflow_upstream_request_duration_seconds_bucket{' . $labels . ',le="5"} 2', $output);
+        $this->assertStringContainsString('workoflow_upstream_request_duration_seconds_bucket{' . $labels . ',le="+Inf"} 2', $output);
+        $this->assertStringContainsString('workoflow_upstream_request_duration_seconds_sum{' . $labels . '} 3.2', $output);
+        $this->assertStringContainsString('workoflow_upstream_request_duration_seconds_count{' . $labels . '} 2', $output);
+    }
+
+    public function testCountersAccumulateAcrossFlushes(): void
+    {
+        $this->metricsService->increment('workoflow_tool_calls_total', ['status' => 'success']);
+        $this->metricsService->flush();
+        $this->metricsService->increment('workoflow_tool_calls_total', ['status' => 'success']);
+        $this->metricsService->flush();
+
+        $this->assertStringContainsString('workoflow_tool_calls_total{status="success"} 2', $this->metricsService->render());
+    }
+
+    public function testUnknownMetricIsRejected(): void
+    {
+        $this->expectException(\InvalidArgumentException::class);
+        $this->metricsService->increment('workoflow_http_request_duration_seconds');
+    }
+
+    public function testServerTimingListsPhasesOfTheCurrentRequest(): void
+    {
+        $this->assertNull($this->metricsService->getServerTiming());
+
+        $this->assertSame('ok', $this->metricsService->measure('auth', fn() => 'ok'));
+        $this->metricsService->measure('tool_execution', fn() => null);
+
+        $this->assertMatchesRegularExpression('/^auth;dur=\d+\.\d, tool_execution;dur=\d+\.\d$/', $this->metricsService->getServerTiming());
+
+        $this->metricsService->reset();
+        $this->assertNull($this->metricsService->getServerTiming());
+    }
+}
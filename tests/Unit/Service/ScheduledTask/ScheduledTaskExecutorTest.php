@@ -0,0 +1,154 @@
+<?php
+
+namespace App\Tests\Unit\Service\ScheduledTask;
+
+use App\Entity\Organisation;
+use App\Entity\ScheduledTask;
+use App\Entity\ScheduledTaskExecution;
+use App\Entity\User;
+use App\Service\AuditLogService;
+use App\Service\EncryptionService;
+use App\Service\MetricsService;
+use App\Service\ScheduledTask\ScheduledTaskExecutor;
+use App\Service\ScheduledTask\WebhookPayloadBuilderInterface;
+use Doctrine\ORM\EntityManagerInterface;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+use Symfony\Component\HttpClient\MockHttpClient;
+use Symfony\Component\HttpClient\Response\MockResponse;
+
+class ScheduledTaskExecutorTest extends TestCase
+{
+    public function testEachExecutionIsSavedAndReportedOnItsOwn(): void
+    {
+        $httpClient = new MockHttpClient([
+            new MockResponse(['{"output":', '"done"}']),
+            new MockResponse('Bad gateway', ['http_code' => 502]),
+        ]);
+
+        $entityManager = $this->createMock(EntityManagerInterface::class);
+        $entityManager->expects($this->exactly(2))->method('persist');
+        $entityManager->expects($this->exactly(2))->method('flush');
+
+        $executor = $this->createExecutor($httpClient, $entityManager);
+        $first = $this->createExecution();
+        $second = $this->createExecution();
+
+        $finished = [];
+        $executor->executeBatch([$first, $second], function (int $key) use (&$finished): void {
+            $finished[] = $key;
+        });
+
+        sort($finished);
+        $this->assertSame([0, 1], $finished);
+        $this->assertSame(2, $httpClient->getRequestsCount());
+
+        $this->assertSame('success', $first[1]->getStatus());
+        $this->assertSame(200, $first[1]->getHttpStatusCode());
+        $this->assertSame('{"output":"done"}', $first[1]->getOutput());
+        $this->assertNotNull($first[1]->getTimeToFirstByte());
+        $this->assertNotNull($first[1]->getDuration());
+        $this->assertNotNull($first[0]->getLastExecutionAt());
+
+        $this->assertSame('failed', $second[1]->getStatus());
+        $this->assertSame('HTTP 502 response', $second[1]->getErrorMessage());
+    }
+
+    public function testOutputIsTruncatedAtConfiguredSize(): void
+    {
+        $httpClient = new MockHttpClient([new MockResponse(['abcdef', 'ghijkl', 'mnopqr'])]);
+
+        $executor = $this->createExecutor($httpClient, maxOutputBytes: 8);
+        $item = $this->createExecution();
+
+        $executor->executeBatch([$item]);
+
+        $this->assertSame('success', $item[1]->getStatus());
+        $this->assertSame("abcdefgh\n... [Response truncated at 8 bytes]", $item[1]->getOutput());
+    }
+
+    public function testInvalidTaskFailsWithoutBlockingTheBatch(): void
+    {
+        $httpClient = new MockHttpClient([new MockResponse('ok')]);
+
+        $executor = $this->createExecutor($httpClient);
+        $valid = $this->createExecution();
+        $invalid = $this->createExecution();
+        $invalid[0]->getOrganisation()->setTenantType(null);
+
+        $executor->executeBatch([$invalid, $valid]);
+
+        $this->assertSame(1, $httpClient->getRequestsCount());
+        $this->assertSame('failed', $invalid[1]->getStatus());
+        $this->assertSame('Organisation has no tenant type configured', $invalid[1]->getErrorMessage());
+        $this->assertSame('success', $valid[1]->getStatus());
+    }
+
+    public function testFailureToSaveStillReportsTheDeliveredRun(): void
+    {
+        $httpClient = new MockHttpClient([new MockResponse('ok'), new MockResponse('ok')]);
+
+        $entityManager = $this->createStub(EntityManagerInterface::class);
+        $entityManager->method('flush')->willThrowException(new \RuntimeException('Lock wait timeout exceeded'));
+
+        $executor = $this->createExecutor($httpClient, $entityManager);
+
+        $finished = [];
+        $executor->executeBatch([$this->createExecution(), $this->createExecution()], function (int $key) use (&$finished): void {
+            $finished[] = $key;
+        });
+
+        // Both webhooks were delivered, neither may be retried
+        sort($finished);
+        $this->assertSame([0, 1], $finished);
+    }
+
+    private function createExecutor(
+        MockHttpClient $httpClient,
+        ?EntityManagerInterface $entityManager = null,
+        int $maxOutputBytes = 1048576,
+    ): ScheduledTaskExecutor {
+        $payloadBuilder = $this->createStub(WebhookPayloadBuilderInterface::class);
+        $payloadBuilder->method('supports')->willReturn(true);
+        $payloadBuilder->method('buildPayload')->willReturn(['headers' => [], 'body' => ['prompt' => 'Daily summary']]);
+
+        return new ScheduledTaskExecutor(
+            $httpClient,
+            $this->createStub(EncryptionService::class),
+            $entityManager ?? $this->createStub(EntityManagerInterface::class),
+            $this->createStub(AuditLogService::class),
+            new NullLogger(),
+            $this->createStub(MetricsService::class),
+            [$payloadBuilder],
+            $maxOutputBytes,
+        );
+    }
+
+    /**
+     * @return array{0: ScheduledTask, 1: ScheduledTaskExecution}
+     */
+    private function createExecution(): array
+    {
+        $organisation = new Organisation();
+        $organisation->setName('Acme');
+        $organisation->setTenantType('web');
+        $organisation->setWebhookUrl('https://n8n.example.com/webhook/agent');
+
+        $user = new User();
+        $user->addOrganisation($organisation);
+
+        $task = new ScheduledTask();
+        $task->setName('Daily summary');
+        $task->setPrompt('Summarize my day');
+        $task->setFrequency('daily');
+        $task->setExecutionTime('08:00');
+        $task->setOrganisation($organisation);
+        $task->setUser($user);
+
+        $execution = new ScheduledTaskExecution();
+        $execution->setScheduledTask($task);
+        $execution->setTrigger('scheduled');
+
+        return [$task, $execution];
+    }
+}
@@ -0,0 +1,98 @@
+<?php
+
+namespace App\Tests\Unit\Service;
+
+use App\Service\ShareFileService;
+use Aws\CommandInterface;
+use Aws\MockHandler;
+use Aws\Result;
+use Aws\S3\S3Client;
+use PHPUnit\Framework\Attributes\DataProvider;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+use Symfony\Component\DependencyInjection\ParameterBag\ParameterBag;
+
+class ShareFileServiceTest extends TestCase
+{
+    /**
+     * @var array<string, string> Uploaded object bodies by key
+     */
+    private array $uploads = [];
+
+    protected function setUp(): void
+    {
+        $this->uploads = [];
+    }
+
+    public function testDecodedFileIsUploadedAcrossChunks(): void
+    {
+        // Larger than one decode chunk and not a multiple of 3, so the encoding is padded
+        $content = random_bytes(1048576 + 1);
+
+        $result = $this->createService()->shareFile(base64_encode($content), 'application/pdf', 'org-uuid');
+
+        $this->assertStringEndsWith('/org-uuid/file/' . $result['fileId'], $result['url']);
+        $this->assertSame([sprintf('org-uuid/%s.pdf', $result['fileId'])], array_keys($this->uploads));
+        $this->assertSame($content, $this->uploads[sprintf('org-uuid/%s.pdf', $result['fileId'])]);
+    }
+
+    public function testWrappedAndUnpaddedDataIsAccepted(): void
+    {
+        $service = $this->createService();
+
+        $service->shareFile(chunk_split(base64_encode('Hello, World!'), 8, "\r\n"), 'text/plain', 'org-uuid');
+        $service->shareFile(rtrim(base64_encode('Hello, World!'), '='), 'text/plain', 'org-uuid');
+
+        $this->assertSame(['Hello, World!', 'Hello, World!'], array_values($this->uploads));
+    }
+
+    #[DataProvider('invalidBase64Provider')]
+    public function testInvalidBase64IsRejectedBeforeUploading(string $data): void
+    {
+        try {
+            $this->createService()->shareFile($data, 'text/plain', 'org-uuid');
+            $this->fail('Invalid base64 data must not be shared');
+        } catch (\RuntimeException $e) {
+            $this->assertSame('Failed to share file: Invalid base64 encoded data', $e->getMessage());
+        }
+
+        $this->assertSame([], $this->uploads);
+    }
+
+    public static function invalidBase64Provider(): array
+    {
+        return [
+            'character outside the alphabet' => ['SGVsbG8*'],
+            'padding inside the data' => ['SGVs=bG8='],
+            'too much padding' => ['SGVsbA==='],
+            'padded length not a multiple of 4' => ['SGVsbG8=='],
+            'single trailing character' => ['SGVsbG8hS'],
+        ];
+    }
+
+    private function createService(): ShareFileService
+    {
+        $service = new ShareFileService(new ParameterBag([
+            'minio.bucket' => 'files',
+            'minio.public_bucket' => 'shared-files',
+            'minio.endpoint' => 'http://minio:9000',
+            'app.url' => 'https://app.test',
+        ]), new NullLogger());
+
+        $s3Client = new S3Client([
+            'version' => 'latest',
+            'region' => 'us-east-1',
+            'credentials' => ['key' => 'key', 'secret' => 'secret'],
+            'handler' => new MockHandler(array_fill(0, 2, function (CommandInterface $command): Result {
+                $this->uploads[$command['Key']] = (string) $command['Body'];
+
+                return new Result([]);
+            })),
+        ]);
+
+        (new \ReflectionProperty($service, 's3Client'))->setValue($service, $s3Client);
+        (new \ReflectionProperty($service, 'bucketChecked'))->setValue($service, true);
+
+        return $service;
+    }
+}
@@ -0,0 +1,121 @@
+<?php
+
+namespace App\Tests\Unit\Service;
+
+use App\Entity\IntegrationConfig;
+use App\Integration\PersonalizedSkillInterface;
+use App\Integration\ToolDefinition;
+use App\Service\RedisStore;
+use App\Service\SkillPromptCache;
+use PHPUnit\Framework\TestCase;
+
+class SkillPromptCacheTest extends TestCase
+{
+    /**
+     * @var array<string, string> Fake Redis values
+     */
+    private array $values = [];
+
+    private RedisStore $redisStore;
+    private string $templateDir;
+    private int $renders = 0;
+
+    protected function setUp(): void
+    {
+        $this->values = [];
+        $this->renders = 0;
+
+        $this->redisStore = $this->createStub(RedisStore::class);
+        $this->redisStore->method('get')->willReturnCallback(fn(string $key) => $this->values[$key] ?? null);
+        $this->redisStore->method('getMultiple')->willReturnCallback(
+            fn(string ...$keys) => array_combine($keys, array_map(fn(string $key) => $this->values[$key] ?? null, $keys))
+        );
+        $this->redisStore->method('set')->willReturnCallback(function (string $key, string $value): void {
+            $this->values[$key] = $value;
+        });
+
+        $this->templateDir = sys_get_temp_dir() . '/skill_prompts_' . bin2hex(random_bytes(4));
+        mkdir($this->templateDir);
+        file_put_contents($this->templateDir . '/jira_full.xml.twig', '<jira/>');
+    }
+
+    protected function tearDown(): void
+    {
+        array_map('unlink', glob($this->templateDir . '/*') ?: []);
+        rmdir($this->templateDir);
+    }
+
+    public function testPromptIsRenderedOnce(): void
+    {
+        $integration = $this->createIntegration();
+        $config = $this->createConfig(7, '2026-10-01 10:00:00');
+
+        $cache = new SkillPromptCache($this->redisStore, $this->templateDir);
+        $this->assertSame('prompt 1', $cache->getSystemPrompt($integration, $config, 'de'));
+
+        $otherWorker = new SkillPromptCache($this->redisStore, $this->templateDir);
+        $otherWorker->prefetch([[$integration, $config]], 'de');
+        $this->assertSame('prompt 1', $otherWorker->getSystemPrompt($integration, $config, 'de'));
+
+        $this->assertSame(1, $this->renders);
+    }
+
+    public function testConfigUpdateAndLocaleRenderAgain(): void
+    {
+        $integration = $this->createIntegration();
+        $cache = new SkillPromptCache($this->redisStore, $this->templateDir);
+
+        $cache->getSystemPrompt($integration, $this->createConfig(7, '2026-10-01 10:00:00'), 'de');
+        $cache->getSystemPrompt($integration, $this->createConfig(7, '2026-10-02 09:30:00'), 'de');
+        $cache->getSystemPrompt($integration, $this->createConfig(7, '2026-10-02 09:30:00'), 'en');
+
+        $this->assertSame(3, $this->renders);
+    }
+
+    public function testTemplateChangeRendersAgain(): void
+    {
+        $integration = $this->createIntegration();
+        $config = $this->createConfig(7, '2026-10-01 10:00:00');
+
+        (new SkillPromptCache($this->redisStore, $this->templateDir))->getSystemPrompt($integration, $config, 'de');
+
+        file_put_contents($this->templateDir . '/jira_full.xml.twig', '<jira version="2"/>');
+        $this->assertSame('prompt 2', (new SkillPromptCache($this->redisStore, $this->templateDir))->getSystemPrompt($integration, $config, 'de'));
+    }
+
+    public function testChangedToolSetRendersAgain(): void
+    {
+        $config = $this->createConfig(7, '2026-10-01 10:00:00');
+
+        (new SkillPromptCache($this->redisStore, $this->templateDir))->getSystemPrompt($this->createIntegration(), $config, 'de');
+
+        // A deployment added a tool, the prompt lists and counts the tools
+        $integration = $this->createIntegration(['jira_search', 'jira_get_issue', 'jira_add_comment']);
+        $this->assertSame('prompt 2', (new SkillPromptCache($this->redisStore, $this->templateDir))->getSystemPrompt($integration, $config, 'de'));
+    }
+
+    /**
+     * @param string[] $toolNames
+     */
+    private function createIntegration(array $toolNames = ['jira_search', 'jira_get_issue']): PersonalizedSkillInterface
+    {
+        $integration = $this->createStub(PersonalizedSkillInterface::class);
+        $integration->method('getType')->willReturn('jira');
+        $integration->method('getTools')->willReturn(array_map(
+            fn(string $name) => new ToolDefinition($name, 'Description of ' . $name, []),
+            $toolNames
+        ));
+        $integration->method('getSystemPrompt')->willReturnCallback(fn() => 'prompt ' . ++$this->renders);
+
+        return $integration;
+    }
+
+    private function createConfig(int $id, string $updatedAt): IntegrationConfig
+    {
+        $config = $this->createStub(IntegrationConfig::class);
+        $config->method('getId')->willReturn($id);
+        $config->method('getUpdatedAt')->willReturn(new \DateTime($updatedAt));
+
+        return $config;
+    }
+}
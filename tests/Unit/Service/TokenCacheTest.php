@@ -0,0 +1,109 @@
+<?php
+
+namespace App\Tests\Unit\Service;
+
+use App\Service\EncryptionService;
+use App\Service\RedisStore;
+use App\Service\TokenCache;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+
+class TokenCacheTest extends TestCase
+{
+    /**
+     * @var array<string, string> Fake Redis contents
+     */
+    private array $redis = [];
+
+    protected function setUp(): void
+    {
+        $this->redis = [];
+    }
+
+    public function testTokenIsFetchedOnceAndReused(): void
+    {
+        $fetches = 0;
+        $fetch = function () use (&$fetches): array {
+            $fetches++;
+
+            return ['value' => ['access_token' => 'token-' . $fetches], 'expires_at' => time() + 3600];
+        };
+
+        $cache = $this->createCache();
+        $this->assertSame(['access_token' => 'token-1'], $cache->get('sap_c4c:user', $fetch));
+        $this->assertSame(['access_token' => 'token-1'], $cache->get('sap_c4c:user', $fetch));
+
+        // Another worker finds the token in Redis
+        $this->assertSame(['access_token' => 'token-1'], $this->createCache()->get('sap_c4c:user', $fetch));
+        $this->assertSame(1, $fetches);
+    }
+
+    public function testWaitsForTheWorkerHoldingTheLock(): void
+    {
+        $reads = 0;
+
+        $redisStore = $this->createStub(RedisStore::class);
+        $redisStore->method('acquireLock')->willReturn(null);
+        $redisStore->method('get')->willReturnCallback(function () use (&$reads): ?string {
+            // The other worker publishes its token while we wait
+            return ++$reads < 3 ? null : json_encode(['value' => ['access_token' => 'shared'], 'expires_at' => time() + 3600]);
+        });
+
+        $token = $this->createCache($redisStore)->get('remote_mcp_oauth:42', function (): array {
+            $this->fail('The token must not be fetched while another worker refreshes it');
+        });
+
+        $this->assertSame(['access_token' => 'shared'], $token);
+    }
+
+    public function testTokenCloseToExpiryIsRefreshedAfterwards(): void
+    {
+        $fetches = 0;
+        $fetch = function () use (&$fetches): array {
+            $fetches++;
+
+            return ['value' => ['access_token' => 'new'], 'expires_at' => time() + 3600];
+        };
+        $current = ['value' => ['access_token' => 'old'], 'expires_at' => time() + 120];
+
+        $cache = $this->createCache();
+        $this->assertSame(['access_token' => 'old'], $cache->get('google_user:1', $fetch, $current));
+        $this->assertSame(0, $fetches);
+
+        $cache->refreshPending();
+
+        $this->assertSame(1, $fetches);
+        $this->assertSame(['access_token' => 'new'], $cache->get('google_user:1', $fetch, $current));
+    }
+
+    public function testExpiredTokenIsRefreshedBeforeUse(): void
+    {
+        $current = ['value' => ['access_token' => 'old'], 'expires_at' => time() + 10];
+
+        $token = $this->createCache()->get(
+            'google_user:1',
+            fn(): array => ['value' => ['access_token' => 'new'], 'expires_at' => time() + 3600],
+            $current
+        );
+
+        $this->assertSame(['access_token' => 'new'], $token);
+    }
+
+    private function createCache(?RedisStore $redisStore = null): TokenCache
+    {
+        if ($redisStore === null) {
+            $redisStore = $this->createStub(RedisStore::class);
+            $redisStore->method('get')->willReturnCallback(fn(string $key) => $this->redis[$key] ?? null);
+            $redisStore->method('set')->willReturnCallback(function (string $key, string $value): void {
+                $this->redis[$key] = $value;
+            });
+            $redisStore->method('acquireLock')->willReturn('lock-token');
+        }
+
+        $encryptionService = $this->createStub(EncryptionService::class);
+        $encryptionService->method('encrypt')->willReturnArgument(0);
+        $encryptionService->method('decrypt')->willReturnArgument(0);
+
+        return new TokenCache($redisStore, $encryptionService, new NullLogger());
+    }
+}
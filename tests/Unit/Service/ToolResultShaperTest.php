@@ -0,0 +1,121 @@
+<?php
+
+namespace App\Tests\Unit\Service;
+
+use App\Integration\ToolDefinition;
+use App\Service\RedisStore;
+use App\Service\ToolResultShaper;
+use PHPUnit\Framework\TestCase;
+use Psr\Log\NullLogger;
+
+class ToolResultShaperTest extends TestCase
+{
+    /**
+     * @var array<string, string> Fake Redis contents
+     */
+    private array $redis = [];
+
+    protected function setUp(): void
+    {
+        $this->redis = [];
+    }
+
+    public function testSmallResultIsReturnedUnchanged(): void
+    {
+        $result = ['issues' => [['key' => 'PROJ-1', 'summary' => 'Small']]];
+
+        $shaped = $this->createShaper()->shape($result, 'org-uuid', $this->createTool());
+
+        $this->assertSame($result, $shaped['result']);
+        $this->assertNull($shaped['continuation']);
+        $this->assertSame([], $this->redis);
+    }
+
+    public function testLargeResultIsProjectedToEssentialFields(): void
+    {
+        $result = ['isLast' => true, 'issues' => []];
+        for ($i = 0; $i < 50; $i++) {
+            $result['issues'][] = ['key' => 'PROJ-' . $i, 'summary' => 'Issue ' . $i, 'labels' => array_fill(0, 50, 'label')];
+        }
+
+        $shaped = $this->createShaper()->shape($result, 'org-uuid', $this->createTool(maxResultBytes: 4096));
+
+        $this->assertTrue($shaped['result']['isLast']);
+        $this->assertCount(50, $shaped['result']['issues']);
+        $this->assertSame(['key' => 'PROJ-7', 'summary' => 'Issue 7'], $shaped['result']['issues'][7]);
+        $this->assertTrue($shaped['continuation']['fields_omitted']);
+
+        // The dropped fields can be read through the continuation handle
+        $labels = $this->createShaper()->continue('org-uuid', $shaped['continuation']['handle'], 'issues.7.labels');
+        $this->assertCount(50, $labels['content']);
+    }
+
+    public function testLongStringsAreTruncatedAndReadInChunks(): void
+    {
+        $description = str_repeat('ä', 50000);
+
+        $shaper = $this->createShaper();
+        $shaped = $shaper->shape(['key' => 'PROJ-1', 'description' => $description], 'org-uuid');
+        $handle = $shaped['continuation']['handle'];
+
+        $this->assertLessThanOrEqual(ToolResultShaper::DEFAULT_MAX_BYTES, strlen(json_encode($shaped['result'])));
+        $this->assertStringContainsString('continue with handle "' . $handle . '" and path "description"', $shaped['result']['description']);
+
+        $chunk = $shaper->continue('org-uuid', $handle, 'description', 45000);
+        $this->assertSame(5000, mb_strlen($chunk['content']));
+        $this->assertSame(0, $chunk['remaining']);
+    }
+
+    public function testListTailsAreDroppedWhenShortItemsExceedTheBudget(): void
+    {
+        $result = ['isLast' => true, 'issues' => []];
+        for ($i = 0; $i < 1000; $i++) {
+            $result['issues'][] = ['key' => 'PROJ-' . $i, 'summary' => 'Issue ' . $i];
+        }
+
+        $shaper = $this->createShaper();
+        $shaped = $shaper->shape($result, 'org-uuid', $this->createTool(maxResultBytes: 4096));
+        $omitted = $shaped['continuation']['items_omitted'][0];
+
+        $this->assertLessThanOrEqual(4096, strlen(json_encode($shaped['result'])));
+        $this->assertTrue($shaped['result']['isLast']);
+        $this->assertSame('issues', $omitted['path']);
+        $this->assertCount($omitted['from'], $shaped['result']['issues']);
+        $this->assertSame(999, $omitted['to']);
+
+        // The omitted items are read from the first missing index on
+        $next = $shaper->continue('org-uuid', $shaped['continuation']['handle'], 'issues', $omitted['from']);
+        $this->assertSame($omitted['from'], $next['offset']);
+        $this->assertSame(1000, $next['total_items']);
+        $this->assertSame('PROJ-' . $omitted['from'], $next['content'][0]['key']);
+    }
+
+    public function testContinuationIsScopedToTheOrganisation(): void
+    {
+        $shaped = $this->createShaper()->shape(['text' => str_repeat('x', 50000)], 'org-uuid');
+
+        $this->expectException(\RuntimeException::class);
+        $this->createShaper()->continue('other-org-uuid', $shaped['continuation']['handle']);
+    }
+
+    private function createTool(?int $maxResultBytes = null): ToolDefinition
+    {
+        return new ToolDefinition(
+            'jira_search',
+            'Search issues',
+            resultFields: ['issues.*.key', 'issues.*.summary'],
+            maxResultBytes: $maxResultBytes
+        );
+    }
+
+    private function createShaper(): ToolResultShaper
+    {
+        $redisStore = $this->createStub(RedisStore::class);
+        $redisStore->method('get')->willReturnCallback(fn(string $key) => $this->redis[$key] ?? null);
+        $redisStore->method('set')->willReturnCallback(function (string $key, string $value): void {
+            $this->redis[$key] = $value;
+        });
+
+        return new ToolResultShaper($redisStore, new NullLogger());
+    }
+}